@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Register signal handlers
+        from . import signals  # noqa: F401
+
+        # Request instrumentation: DB query timing and serializer timing
+        from django.db.backends.signals import connection_created
+        from .utils import metrics
+        connection_created.connect(metrics.install_query_timer, dispatch_uid='api.metrics.query_timer')
+        metrics.install_serializer_timer()
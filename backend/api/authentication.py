@@ -3,16 +3,147 @@ Supabase JWT Authentication for Django REST Framework
 Validates Supabase JWT tokens and syncs with Django User model
 """
 
+import hashlib
+import threading
+import time
+
 import jwt
 import requests
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.db import transaction
 from rest_framework import authentication, exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as simplejwt_settings
 from .models import UserProfile
+from .utils.cache import SharedGeneration, TTLCache
 
 User = get_user_model()
 
 
+# ============================================================================
+# VERIFIED-PRINCIPAL CACHE
+# ============================================================================
+
+_cache_settings = getattr(settings, 'SUPABASE_AUTH_CACHE', {})
+
+# Token digest -> CachedPrincipal. Entries live until the token's `exp`, capped
+# at MAX_TTL so that workers which never see an invalidation signal (no shared
+# cache backend) still converge on role/profile changes.
+principal_cache = TTLCache(
+    max_entries=_cache_settings.get('MAX_ENTRIES', 2048),
+    default_ttl=_cache_settings.get('MAX_TTL', 900),
+)
+
+PRINCIPAL_GENERATION_KEY = 'auth:principal_cache:generation'
+
+# Bumped on every invalidation; other workers clear their cache when it moves
+principal_generation = SharedGeneration(
+    PRINCIPAL_GENERATION_KEY,
+    check_interval=_cache_settings.get('VERSION_CHECK_INTERVAL', 5),
+)
+
+
+def _concrete_attnames(model, names):
+    """Order attnames as Model.from_db() expects them (concrete field order)"""
+    return tuple(f.attname for f in model._meta.concrete_fields if f.attname in names)
+
+
+USER_CACHE_FIELDS = _concrete_attnames(User, {
+    'id', 'username', 'email', 'first_name', 'last_name',
+    'is_active', 'is_staff', 'is_superuser',
+})
+PROFILE_CACHE_FIELDS = _concrete_attnames(UserProfile, {
+    'id', 'user_id', 'role', 'organization_id',
+    'assigned_state_id', 'assigned_zone_id', 'assigned_district_id',
+    'assigned_constituency_id', 'assigned_booth_id',
+})
+
+
+class CachedPrincipal:
+    """
+    Immutable snapshot of the user resolved for a verified token
+
+    Only plain column values are kept, so a snapshot can be shared between
+    requests and threads. Every hit rebuilds fresh model instances from it.
+    """
+    __slots__ = ('user_values', 'profile_values')
+
+    def __init__(self, user, profile):
+        self.user_values = tuple(getattr(user, name) for name in USER_CACHE_FIELDS)
+        self.profile_values = tuple(getattr(profile, name) for name in PROFILE_CACHE_FIELDS)
+
+    def _profile_value(self, name):
+        return self.profile_values[PROFILE_CACHE_FIELDS.index(name)]
+
+    @property
+    def user_id(self):
+        return self.user_values[USER_CACHE_FIELDS.index('id')]
+
+    @property
+    def role(self):
+        return self._profile_value('role')
+
+    @property
+    def organization_id(self):
+        return self._profile_value('organization_id')
+
+    @property
+    def geographic_assignment(self):
+        """Assigned state/zone/district/constituency/booth ids"""
+        return {
+            name[len('assigned_'):-len('_id')]: self._profile_value(name)
+            for name in PROFILE_CACHE_FIELDS if name.startswith('assigned_')
+        }
+
+    def build_user(self):
+        """
+        Return a fresh User with its profile pre-attached
+
+        Fields outside the snapshot are deferred, so reading them falls back to
+        the database and saving the instance only writes the loaded columns.
+        """
+        user = User.from_db('default', USER_CACHE_FIELDS, self.user_values)
+        profile = UserProfile.from_db('default', PROFILE_CACHE_FIELDS, self.profile_values)
+        UserProfile.user.field.set_cached_value(profile, user)
+        User.profile.related.set_cached_value(user, profile)
+        return user
+
+
+def token_digest(token):
+    """Cache key for a raw bearer token (the token itself is never stored)"""
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+
+def invalidate_cached_principals(user_id):
+    """
+    Drop every cached principal belonging to user_id, in every worker
+
+    Entries are dropped here now and again once the current transaction
+    commits, when the shared generation is bumped as well, so no worker
+    keeps (or re-caches) the pre-commit user or profile.
+    """
+    def publish():
+        principal_cache.delete_where(lambda key, principal: principal.user_id == user_id)
+        principal_generation.bump()
+
+    removed = principal_cache.delete_where(lambda key, principal: principal.user_id == user_id)
+    transaction.on_commit(publish)
+    return removed
+
+
+def cached_principal(digest):
+    """Cached principal for a token digest, after applying other workers' invalidations"""
+    if principal_generation.changed():
+        principal_cache.clear()
+    return principal_cache.get(digest)
+
+
+def get_principal_cache_stats():
+    """Hit/miss counters for the verified-principal cache"""
+    return principal_cache.stats()
+
+
 class SupabaseJWTAuthentication(authentication.BaseAuthentication):
     """
     Authenticate requests using Supabase JWT tokens
@@ -29,6 +160,12 @@ class SupabaseJWTAuthentication(authentication.BaseAuthentication):
 
         token = auth_header.split(' ')[1]
 
+        # Repeated requests with the same token skip decode and user lookup
+        digest = token_digest(token)
+        principal = cached_principal(digest)
+        if principal is not None:
+            return (principal.build_user(), token)
+
         try:
             # Decode and verify the Supabase JWT token
             payload = self.verify_supabase_token(token)
@@ -36,6 +173,8 @@ class SupabaseJWTAuthentication(authentication.BaseAuthentication):
             # Get or create Django user from Supabase user data
             user = self.get_or_create_user(payload)
 
+            self.cache_principal(digest, user, payload)
+
             return (user, token)
 
         except jwt.ExpiredSignatureError:
@@ -45,6 +184,23 @@ class SupabaseJWTAuthentication(authentication.BaseAuthentication):
         except Exception as e:
             raise exceptions.AuthenticationFailed(f'Authentication failed: {str(e)}')
 
+    def cache_principal(self, digest, user, payload):
+        """
+        Remember the resolved user until the token expires
+
+        Inactive users are never cached so that deactivation takes effect on
+        the next request.
+        """
+        if not user.is_active:
+            return
+
+        ttl = principal_cache.default_ttl
+        exp = payload.get('exp')
+        if exp is not None:
+            ttl = min(ttl, int(exp - time.time()))
+
+        principal_cache.set(digest, CachedPrincipal(user, user.profile), ttl=ttl)
+
     def verify_supabase_token(self, token):
         """
         Verify the Supabase JWT token using the JWT secret
@@ -141,35 +297,135 @@ class SupabaseJWTAuthentication(authentication.BaseAuthentication):
         return 'Bearer realm="api"'
 
 
-class HybridAuthentication(authentication.BaseAuthentication):
+# ============================================================================
+# TOKEN ROUTING
+# ============================================================================
+
+TOKEN_SUPABASE = 'supabase'
+TOKEN_SIMPLEJWT = 'simplejwt'
+TOKEN_UNKNOWN = 'unknown'
+
+
+def classify_token(token):
     """
-    Try Supabase authentication first, fall back to Django JWT if needed
-    This allows both auth methods to work during migration period
+    Decide which verifier owns a token from its unverified header and claims
+
+    Nothing here is trusted: the result only picks the verifier, which then
+    checks the signature as usual.
+
+    - Supabase tokens carry aud='authenticated' and iss='<SUPABASE_URL>/auth/v1'
+    - SimpleJWT tokens carry a token_type claim and the configured user id claim
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+        claims = jwt.decode(token, options={'verify_signature': False})
+    except jwt.InvalidTokenError:
+        return TOKEN_UNKNOWN
+
+    audience = claims.get('aud')
+    audiences = audience if isinstance(audience, list) else [audience]
+    issuer = claims.get('iss') or ''
+    supabase_url = getattr(settings, 'SUPABASE_URL', '')
+
+    if 'authenticated' in audiences or (supabase_url and issuer.startswith(supabase_url)):
+        return TOKEN_SUPABASE
+
+    if claims.get(simplejwt_settings.TOKEN_TYPE_CLAIM) and simplejwt_settings.USER_ID_CLAIM in claims:
+        if header.get('alg') == simplejwt_settings.ALGORITHM:
+            return TOKEN_SIMPLEJWT
+
+    return TOKEN_UNKNOWN
+
+
+class AuthTimings:
+    """
+    Thread-safe per-path counters for authentication cost
+
+    Paths: supabase, simplejwt, fallback (unclassified token), none (no bearer)
     """
 
     def __init__(self):
-        super().__init__()
-        self.supabase_auth = SupabaseJWTAuthentication()
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, path, seconds, authenticated):
+        with self._lock:
+            stats = self._stats.setdefault(path, {
+                'count': 0, 'authenticated': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            })
+            ms = seconds * 1000
+            stats['count'] += 1
+            stats['authenticated'] += 1 if authenticated else 0
+            stats['total_ms'] += ms
+            stats['max_ms'] = max(stats['max_ms'], ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                path: {
+                    **stats,
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 3) if stats['count'] else 0.0,
+                }
+                for path, stats in self._stats.items()
+            }
+
+
+auth_timings = AuthTimings()
+
+
+def get_auth_timing_stats():
+    """Per-path authentication timing counters"""
+    return auth_timings.snapshot()
+
+
+class HybridAuthentication(authentication.BaseAuthentication):
+    """
+    Route each bearer token straight to the verifier that issued it
+
+    Supabase and Django SimpleJWT tokens are told apart from their unverified
+    claims, so SimpleJWT traffic no longer pays for a failed Supabase verify.
+    Tokens that cannot be classified fall back to trying both, Supabase first,
+    which keeps both auth methods working during the migration period.
+    """
+
+    # Verifiers are stateless, so one instance of each serves every request
+    supabase_auth = SupabaseJWTAuthentication()
+    django_jwt_auth = JWTAuthentication()
 
     def authenticate(self, request):
         """
-        Try Supabase auth first, then fall back to Django JWT
+        Authenticate with the verifier matching the token's issuer
         """
-        # Try Supabase authentication
-        try:
-            result = self.supabase_auth.authenticate(request)
-            if result is not None:
-                return result
-        except (exceptions.AuthenticationFailed, Exception):
-            # If Supabase auth fails, try Django JWT
-            pass
-
-        # Fall back to Django JWT
-        from rest_framework_simplejwt.authentication import JWTAuthentication
-        django_jwt_auth = JWTAuthentication()
+        started = time.perf_counter()
+        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
 
+        if not auth_header.startswith('Bearer '):
+            path, result = 'none', None
+        else:
+            token_kind = classify_token(auth_header.split(' ')[1])
+            if token_kind == TOKEN_SUPABASE:
+                path, result = 'supabase', self._try(self.supabase_auth, request)
+            elif token_kind == TOKEN_SIMPLEJWT:
+                path, result = 'simplejwt', self._try(self.django_jwt_auth, request)
+            else:
+                path = 'fallback'
+                result = self._try(self.supabase_auth, request) or self._try(self.django_jwt_auth, request)
+
+        elapsed = time.perf_counter() - started
+        auth_timings.record(path, elapsed, result is not None)
+
+        # Expose the cost of this request's authentication to instrumentation
+        http_request = getattr(request, '_request', request)
+        http_request.auth_path = path
+        http_request.auth_duration = elapsed
+
+        return result
+
+    @staticmethod
+    def _try(verifier, request):
+        """Run a verifier, treating any failure as 'not authenticated by this method'"""
         try:
-            return django_jwt_auth.authenticate(request)
+            return verifier.authenticate(request)
         except Exception:
             return None
 
@@ -27,6 +27,7 @@ from django.http import JsonResponse
 from django.core.exceptions import PermissionDenied
 from rest_framework import status
 from rest_framework.response import Response
+from api.utils.principal import get_principal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,7 +57,8 @@ def require_permission(permission_name):
                 )
 
             # Check if user has profile
-            if not hasattr(request.user, 'profile'):
+            principal = get_principal(request.user)
+            if not principal.has_profile:
                 logger.error(f"User {request.user.username} has no profile")
                 return JsonResponse(
                     {'error': 'User profile not found'},
@@ -64,7 +66,7 @@ def require_permission(permission_name):
                 )
 
             # Check permission
-            if not request.user.profile.has_permission(permission_name):
+            if not principal.has_permission(permission_name):
                 logger.warning(
                     f"Permission denied: User {request.user.username} "
                     f"lacks permission '{permission_name}'"
@@ -280,7 +282,8 @@ class HasPermission(BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        if not hasattr(request.user, 'profile'):
+        principal = get_principal(request.user)
+        if not principal.has_profile:
             return False
 
         # Get required permission from view
@@ -289,7 +292,7 @@ class HasPermission(BasePermission):
             logger.warning(f"No required_permission set on {view.__class__.__name__}")
             return False
 
-        return request.user.profile.has_permission(permission_name)
+        return principal.has_permission(permission_name)
 
 
 class HasRole(BasePermission):
@@ -0,0 +1,68 @@
+"""
+Management command to backfill denormalized geographic paths
+
+Fills PollingBooth.state/zone/district and Voter.state/zone/district/
+constituency from the canonical hierarchy. Booths are processed first, then
+voters, in primary-key batches so each UPDATE holds locks briefly. Safe to
+re-run: it recomputes rather than appends.
+
+Usage:
+    python manage.py backfill_geo_paths
+    python manage.py backfill_geo_paths --batch-size 5000 --model voter
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, Min
+
+from api.models import PollingBooth, Voter
+
+
+class Command(BaseCommand):
+    help = 'Backfills denormalized state/zone/district/constituency columns on booths and voters'
+
+    models = {
+        'pollingbooth': PollingBooth,
+        'voter': Voter,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=10000,
+                            help='Rows per UPDATE (default: 10000)')
+        parser.add_argument('--model', choices=sorted(self.models), action='append',
+                            help='Only backfill this model (repeatable; default: both)')
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches to ease replication lag')
+
+    def handle(self, *args, **options):
+        selected = options['model'] or ['pollingbooth', 'voter']
+
+        # Voters derive from booth -> constituency directly, but keep the
+        # natural order so a partial run leaves booths consistent first
+        for name in ('pollingbooth', 'voter'):
+            if name in selected:
+                self._backfill(self.models[name], options['batch_size'], options['sleep'])
+
+    def _backfill(self, model, batch_size, sleep):
+        label = model._meta.verbose_name_plural
+        bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            self.stdout.write(f'{label}: nothing to backfill')
+            return
+
+        self.stdout.write(f'Backfilling {label} (ids {bounds["low"]}-{bounds["high"]})...')
+        started = time.monotonic()
+        updated = 0
+
+        for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+            with transaction.atomic():
+                updated += model.objects.filter(
+                    pk__gte=start, pk__lt=start + batch_size
+                ).sync_geo_path()
+            if sleep:
+                time.sleep(sleep)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{label}: {updated} rows backfilled in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,48 @@
+"""
+Management command to rebuild sentiment rollups from sentiment analyses
+
+Recomputes the IST daily and hourly SentimentRollup rows of a window (whole
+IST days) from the analyses and replaces the stored rows. Rollups are kept up
+to date on every analysis write; run this after writes that bypass the ORM
+(raw SQL, restores) or to backfill history.
+
+Usage:
+    python manage.py backfill_sentiment_rollups
+    python manage.py backfill_sentiment_rollups --organization bjp --days 7
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.models import Organization
+from api.utils import sentiment_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds daily and hourly sentiment rollups from sentiment analyses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only rebuild this organization (slug)')
+        parser.add_argument('--days', type=int, help='Only rebuild the last N days (default: all history)')
+
+    def handle(self, *args, **options):
+        organization_ids = list(Organization.objects.order_by('id').values_list('id', flat=True))
+        if options['organization']:
+            organization = Organization.objects.filter(slug=options['organization']).first()
+            if organization is None:
+                raise CommandError(f"Organization '{options['organization']}' not found")
+            organization_ids = [organization.id]
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        since = timezone.now() - timedelta(days=options['days']) if options['days'] is not None else None
+
+        started = time.monotonic()
+        written = 0
+        for organization_id in organization_ids:
+            # One organization per transaction keeps each rebuild's memory bounded
+            written += sentiment_rollups.rebuild(organization_id, since)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} sentiment rollups in {elapsed:.1f}s'))
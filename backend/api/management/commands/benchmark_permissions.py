@@ -0,0 +1,85 @@
+"""
+Management command to benchmark permission checks
+
+Compares the previous query-per-check implementation (two EXISTS queries per
+has_permission) with the compiled permission matrix on the current database.
+
+Usage:
+    python manage.py seed_permissions
+    python manage.py benchmark_permissions --checks 20000
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from api.models import Permission, RolePermission, UserPermission, UserProfile
+from api.utils.permission_matrix import PermissionMatrix, permission_engine
+
+
+def legacy_has_permission(profile, permission_name):
+    """has_permission as implemented before the permission matrix"""
+    if profile.role == 'superadmin':
+        return True
+
+    if RolePermission.objects.filter(role=profile.role, permission__name=permission_name).exists():
+        return True
+
+    return UserPermission.objects.filter(
+        user_profile=profile,
+        permission__name=permission_name,
+        granted=True
+    ).exists()
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks permission checks: per-check queries vs. compiled permission matrix'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=10000, help='Checks per implementation')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the check mix')
+
+    def handle(self, *args, **options):
+        profiles = list(UserProfile.objects.exclude(role='superadmin')[:200])
+        permission_names = list(Permission.objects.values_list('name', flat=True))
+
+        if not profiles or not permission_names:
+            self.stdout.write(self.style.WARNING(
+                'Need user profiles and permissions; run seed_permissions and create users first'
+            ))
+            return
+
+        rng = random.Random(options['seed'])
+        checks = [
+            (rng.choice(profiles), rng.choice(permission_names))
+            for _ in range(options['checks'])
+        ]
+
+        started = time.perf_counter()
+        PermissionMatrix.load()
+        load_ms = (time.perf_counter() - started) * 1000
+
+        # Both implementations must agree before timing them
+        mismatches = sum(
+            1 for profile, name in checks[:500]
+            if legacy_has_permission(profile, name) != profile.has_permission(name)
+        )
+
+        legacy_rate = self._rate(legacy_has_permission, checks)
+        permission_engine.matrix()  # warm
+        matrix_rate = self._rate(lambda profile, name: profile.has_permission(name), checks)
+
+        self.stdout.write(f'Profiles: {len(profiles)}  Permissions: {len(permission_names)}  Checks: {len(checks)}')
+        self.stdout.write(f'Matrix load: {load_ms:.1f} ms')
+        self.stdout.write(f'Legacy (queries): {legacy_rate:,.0f} checks/sec')
+        self.stdout.write(f'Matrix (bitset):  {matrix_rate:,.0f} checks/sec')
+        self.stdout.write(self.style.SUCCESS(f'Speed-up: {matrix_rate / legacy_rate:,.0f}x'))
+
+        if mismatches:
+            self.stdout.write(self.style.ERROR(f'{mismatches} checks disagree between implementations'))
+
+    @staticmethod
+    def _rate(check, checks):
+        started = time.perf_counter()
+        for profile, name in checks:
+            check(profile, name)
+        return len(checks) / (time.perf_counter() - started)
@@ -0,0 +1,115 @@
+"""
+Management command to build simplified constituency boundaries per zoom level
+
+Reads Constituency.boundaries, builds one shared-arc topology per
+organization (plus one over every constituency for superadmins) and stores
+it as quantized TopoJSON at each zoom level (BoundaryTopology), served by
+/api/dashboard/heatmap/geometry/?zoom=<level or web map zoom>. Rerun after
+boundaries change.
+
+With --input the same pipeline runs on a GeoJSON FeatureCollection file
+(e.g. a frontend map asset) and writes TopoJSON files instead of rows.
+
+Usage:
+    python manage.py build_boundary_topology
+    python manage.py build_boundary_topology --organization bjp --zoom state
+    python manage.py build_boundary_topology --input tamilnadu-constituencies.json --output-dir maps/
+"""
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import BoundaryTopology, Constituency, Organization
+from api.utils.constituency_geometry import (
+    ZOOM_LEVELS,
+    build_topologies,
+    feature_collection,
+    geometry_version,
+    serialize,
+)
+from api.utils.topology import Topology
+
+
+class Command(BaseCommand):
+    help = 'Builds simplified TopoJSON constituency boundaries for each zoom level'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', help='Only build this organization (slug)')
+        parser.add_argument('--zoom', choices=list(ZOOM_LEVELS), action='append',
+                            help='Only build this zoom level (repeatable)')
+        parser.add_argument('--input', help='GeoJSON FeatureCollection file to convert instead of the database')
+        parser.add_argument('--output-dir', default='.', help='Where --input writes <name>.<zoom>.topojson')
+        parser.add_argument('--id-property', default='AC_NO', help='Feature property used as id with --input')
+        parser.add_argument('--name-property', default='AC_NAME', help='Feature property used as name with --input')
+
+    def handle(self, *args, **options):
+        levels = options['zoom'] or list(ZOOM_LEVELS)
+        if options['input']:
+            self.convert_file(options, levels)
+            return
+
+        organizations = Organization.objects.order_by('id')
+        if options['organization']:
+            organizations = organizations.filter(slug=options['organization'])
+            if not organizations.exists():
+                raise CommandError(f"Organization '{options['organization']}' not found")
+            scopes = list(organizations)
+        else:
+            scopes = [None] + list(organizations)
+
+        for organization in scopes:
+            constituencies = Constituency.objects.all()
+            if organization is not None:
+                constituencies = constituencies.filter(organization=organization)
+            label = organization.slug if organization else 'all organizations'
+            if not constituencies.filter(boundaries__isnull=False).exists():
+                self.stdout.write(f'  {label}: no boundaries, skipped')
+                continue
+
+            started = time.monotonic()
+            version = geometry_version(constituencies)
+            raw_size = len(feature_collection(constituencies, version))
+            topologies = build_topologies(constituencies, levels)
+            with transaction.atomic():
+                for level, topology in topologies.items():
+                    size = len(serialize(topology))
+                    BoundaryTopology.objects.update_or_create(
+                        organization=organization, zoom=level,
+                        defaults={'source_version': version, 'topology': topology, 'size': size},
+                    )
+                    self.report(f'{label}, {level}', raw_size, size)
+            self.stdout.write(self.style.SUCCESS(f'  {label}: built in {time.monotonic() - started:.1f}s'))
+
+    def convert_file(self, options, levels):
+        """Write TopoJSON files for a GeoJSON FeatureCollection"""
+        try:
+            with open(options['input']) as f:
+                collection = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Cannot read {options['input']}: {e}")
+
+        features = collection.get('features') or []
+        topology = Topology(
+            (
+                (feature.get('properties') or {}).get(options['id_property'], feature.get('id', index)),
+                {'name': (feature.get('properties') or {}).get(options['name_property'])},
+                feature.get('geometry'),
+            )
+            for index, feature in enumerate(features)
+        )
+        raw_size = len(serialize(collection))
+        name = os.path.splitext(os.path.basename(options['input']))[0]
+        for level in levels:
+            body = serialize(topology.encode(*ZOOM_LEVELS[level]))
+            path = os.path.join(options['output_dir'], f'{name}.{level}.topojson')
+            with open(path, 'wb') as f:
+                f.write(body)
+            self.report(path, raw_size, len(body))
+
+    def report(self, label, raw_size, size):
+        self.stdout.write(
+            f'  {label}: {size / 1024:.0f} KB ({raw_size / max(size, 1):.1f}x smaller than GeoJSON)'
+        )
@@ -0,0 +1,60 @@
+"""
+Management command to export voters, interactions or sentiment records
+
+Usage:
+    python manage.py export_data voters --organization bjp --output voters.csv
+    python manage.py export_data interactions --format ndjson --gzip --output interactions.ndjson.gz
+    python manage.py export_data voters --fields full_name,phone --output - | head
+
+Queued export jobs run out of process with `manage.py run_background_job <id>`.
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Organization
+from api.services.base_service import ServiceException
+from api.services.export_service import DATASETS, FORMATS, ExportService
+
+
+class Command(BaseCommand):
+    help = 'Exports voters, voter interactions or sentiment records as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(DATASETS), help='Dataset to export')
+        parser.add_argument('--organization', help='Only export this organization (slug)')
+        parser.add_argument('--format', choices=list(FORMATS), default='csv', help='Output format (default: csv)')
+        parser.add_argument('--gzip', action='store_true', help='Gzip-compress the output')
+        parser.add_argument('--fields', help='Comma-separated columns (default: the dataset defaults)')
+        parser.add_argument('--output', default='-', help="Output file, or '-' for stdout (default)")
+
+    def handle(self, *args, **options):
+        organization = None
+        if options['organization']:
+            organization = Organization.objects.filter(slug=options['organization']).first()
+            if organization is None:
+                raise CommandError(f"Organization '{options['organization']}' not found")
+
+        fields = None
+        if options['fields']:
+            fields = [name.strip() for name in options['fields'].split(',') if name.strip()]
+
+        try:
+            export = ExportService(organization=organization).prepare(
+                options['dataset'],
+                fields=fields,
+                file_format=options['format'],
+                compress=options['gzip'],
+            )
+            if options['output'] == '-':
+                size = export.write_to(sys.stdout.buffer)
+                sys.stdout.buffer.flush()
+                return
+            with open(options['output'], 'wb') as file:
+                size = export.write_to(file)
+        except (OSError, ServiceException) as e:
+            raise CommandError(str(getattr(e, 'message', e)))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {export.row_count} rows ({size:,} bytes) to {options['output']}"
+        ))
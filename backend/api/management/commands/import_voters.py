@@ -0,0 +1,72 @@
+"""
+Management command to import voters from an electoral roll file
+
+Usage:
+    python manage.py import_voters rolls/tn.csv --organization bjp
+    python manage.py import_voters rolls/tn.xlsx --organization bjp --skip-existing --errors-file errors.csv
+"""
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Organization
+from api.services.base_service import ServiceException
+from api.services.voter_import_service import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_ERRORS, VoterImportService
+
+
+class Command(BaseCommand):
+    help = 'Imports voters from a CSV or XLSX electoral roll'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file')
+        parser.add_argument('--organization', help='Organization slug the voters belong to')
+        parser.add_argument('--format', choices=['csv', 'xlsx'], help='File format (default: from extension)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f'Rows per batch (default: {DEFAULT_CHUNK_SIZE})')
+        parser.add_argument('--skip-existing', action='store_true',
+                            help='Leave voters whose voter_id_number already exists untouched')
+        parser.add_argument('--errors-file', help='Write every row error to this CSV file')
+
+    def handle(self, *args, **options):
+        organization = None
+        if options['organization']:
+            organization = Organization.objects.filter(slug=options['organization']).first()
+            if organization is None:
+                raise CommandError(f"Organization '{options['organization']}' not found")
+
+        service = VoterImportService(
+            organization=organization,
+            chunk_size=options['chunk_size'],
+            update_existing=not options['skip_existing'],
+            # With an errors file, errors are flushed after every chunk instead of capped
+            max_errors=None if options['errors_file'] else DEFAULT_MAX_ERRORS,
+        )
+
+        errors_file = open(options['errors_file'], 'w', newline='') if options['errors_file'] else None
+        try:
+            errors_writer = csv.writer(errors_file) if errors_file else None
+            if errors_writer:
+                errors_writer.writerow(['row', 'error'])
+
+            def progress(report):
+                if errors_writer:
+                    errors_writer.writerows(report.errors)
+                    report.errors.clear()
+                self.stdout.write(
+                    f'  {report.rows_read} rows read, {report.imported} imported, '
+                    f'{report.skipped} skipped ({report.rows_per_second:,.0f} rows/s)'
+                )
+
+            self.stdout.write(f"Importing {options['path']}...")
+            with open(options['path'], 'rb') as file:
+                report = service.import_file(file, file_format=options['format'], progress=progress)
+        except (OSError, ServiceException) as e:
+            raise CommandError(str(getattr(e, 'message', e)))
+        finally:
+            if errors_file:
+                errors_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.imported} of {report.rows_read} rows in {report.elapsed:.1f}s '
+            f'({report.error_count} errors)'
+        ))
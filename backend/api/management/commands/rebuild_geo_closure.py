@@ -0,0 +1,19 @@
+"""
+Management command to rebuild the geographic hierarchy closure table
+
+The table is maintained incrementally on saves and deletes; run this after
+bulk changes that bypass model signals (queryset update(), bulk_create(),
+raw SQL imports).
+"""
+from django.core.management.base import BaseCommand
+
+from api.utils.geo_closure import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the State/Zone/District/Constituency/Booth closure table'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Rebuilding geographic hierarchy closure...')
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Geographic closure rebuilt: {count} rows'))
@@ -0,0 +1,62 @@
+"""
+Management command to run a pending background job out of process
+
+Jobs normally start on a worker thread of the web process that created
+them; this runs them from cron or a dedicated worker host instead (e.g.
+when the web process restarted before the job started).
+
+--pending and --cleanup first mark jobs whose worker died as failed and
+delete expired export files, so a cron entry keeps both in check.
+
+Usage:
+    python manage.py run_background_job 42
+    python manage.py run_background_job --pending
+    python manage.py run_background_job --cleanup
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import BackgroundJob
+from api.services.background_jobs import reap_stale_jobs, run_job
+from api.services.export_service import cleanup_exports
+
+
+class Command(BaseCommand):
+    help = 'Runs pending background jobs (exports, bulk voter updates)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help='Jobs to run')
+        parser.add_argument('--pending', action='store_true', help='Run every pending job, oldest first')
+        parser.add_argument(
+            '--cleanup', action='store_true', help='Fail stale running jobs and delete expired export files'
+        )
+
+    def handle(self, *args, **options):
+        if options['pending'] or options['cleanup']:
+            reaped, deleted = reap_stale_jobs(), cleanup_exports()
+            self.stdout.write(f'Marked {reaped} stale jobs failed, deleted {deleted} expired export files')
+            if not options['pending'] and not options['job_ids']:
+                return
+
+        job_ids = list(options['job_ids'])
+        if options['pending']:
+            job_ids += list(
+                BackgroundJob.objects.filter(status='pending').order_by('created_at').values_list('pk', flat=True)
+            )
+        if not job_ids:
+            raise CommandError('Give job ids, --pending or --cleanup')
+
+        failed = 0
+        for job_id in job_ids:
+            job = run_job(job_id)
+            if job is None:
+                self.stdout.write(self.style.WARNING(f'Job {job_id} is not pending, skipped'))
+            elif job.status == 'failed':
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'Job {job_id} ({job.job_type}) failed: {job.error}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Job {job_id} ({job.job_type}) completed: {job.row_count} rows'
+                ))
+
+        if failed:
+            raise CommandError(f'{failed} of {len(job_ids)} jobs failed')
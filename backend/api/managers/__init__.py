@@ -1,7 +1,18 @@
 """
-Custom database managers for tenant-scoped queries
+Custom database managers for tenant-scoped queries, denormalized geographic paths,
+normalized voter search columns and incremental voter and sentiment rollups
 """
 
 from .tenant_manager import TenantManager, TenantQuerySet
+from .geo_path_manager import GeoPathMixin, GeoPathQuerySet, PollingBoothQuerySet, VoterQuerySet
+from .voter_search_manager import VoterSearchMixin, VoterSearchQuerySet
+from .voter_rollup_manager import BoothRollupMixin, BoothRollupQuerySet, VoterRollupMixin, VoterRollupQuerySet
+from .sentiment_rollup_manager import SentimentRollupMixin, SentimentRollupQuerySet
 
-__all__ = ['TenantManager', 'TenantQuerySet']
+__all__ = [
+    'TenantManager', 'TenantQuerySet',
+    'GeoPathMixin', 'GeoPathQuerySet', 'PollingBoothQuerySet', 'VoterQuerySet',
+    'VoterSearchMixin', 'VoterSearchQuerySet',
+    'BoothRollupMixin', 'BoothRollupQuerySet', 'VoterRollupMixin', 'VoterRollupQuerySet',
+    'SentimentRollupMixin', 'SentimentRollupQuerySet',
+]
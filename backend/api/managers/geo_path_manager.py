@@ -0,0 +1,243 @@
+"""
+Denormalized Geographic Path Maintenance
+
+PollingBooth and Voter carry copies of their geographic ancestry
+(state_id, zone_id, district_id and, for voters, constituency_id) so that
+scope filters are single-table index scans instead of joins through
+polling_booth -> constituency.
+
+The path is derived from one foreign key (the "source"):
+- PollingBooth: constituency  -> Constituency.state_ref/zone_ref/district_ref
+- Voter:        polling_booth -> PollingBooth.constituency and its refs
+
+It is kept correct by:
+- GeoPathMixin.save()                        single instances
+- GeoPathQuerySet.bulk_create/bulk_update    bulk paths
+- GeoPathQuerySet.update(<source>=...)       queryset updates
+- api/signals.py                             constituency re-parenting
+- manage.py backfill_geo_paths               existing rows
+
+Querysets of hierarchy nodes (closure_level set: polling booths) also keep
+the closure table (api/utils/geo_closure.py) in sync on the same bulk paths,
+which bypass the model signals that maintain it for single instances.
+
+Usage:
+    Voter.objects.filter(polling_booth__constituency_id=5).sync_geo_path()
+"""
+
+from django.apps import apps
+from django.db import models
+from django.db.models import OuterRef, Subquery
+
+
+def _geo_closure():
+    # api.utils imports the models, which import this module
+    from api.utils import geo_closure
+    return geo_closure
+
+
+class GeoPathQuerySet(models.QuerySet):
+    """
+    QuerySet that keeps denormalized geographic path columns in sync
+
+    Subclasses define:
+        source_field: Foreign key the path is derived from
+        path_fields: Denormalized columns on this model
+        source_lookups: Matching lookups on the source model
+        child_model: Model whose path derives from this one (label), if any
+        closure_level: Level of this model in the geo closure table, if any
+    """
+    source_field = None
+    path_fields = ()
+    source_lookups = ()
+    child_model = None
+    child_source_field = None
+    closure_level = None
+
+    @property
+    def _source(self):
+        return self.model._meta.get_field(self.source_field)
+
+    def geo_paths(self, source_ids):
+        """
+        Path values for source rows
+
+        Returns:
+            dict: {source id: {path field: value}}
+        """
+        source_ids = {source_id for source_id in source_ids if source_id is not None}
+        if not source_ids:
+            return {}
+
+        rows = self._source.related_model._default_manager.filter(
+            pk__in=source_ids
+        ).values_list('pk', *self.source_lookups)
+        return {row[0]: dict(zip(self.path_fields, row[1:])) for row in rows}
+
+    def fill_geo_path(self, objs):
+        """Set path columns on unsaved instances (one query for the batch)"""
+        attname = self._source.attname
+        paths = self.geo_paths(getattr(obj, attname) for obj in objs)
+        empty = dict.fromkeys(self.path_fields)
+        for obj in objs:
+            for field, value in paths.get(getattr(obj, attname), empty).items():
+                setattr(obj, field, value)
+        return objs
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        self.fill_geo_path(objs)
+        created = super().bulk_create(objs, *args, **kwargs)
+        if self.closure_level:
+            geo_closure = _geo_closure()
+            attname = self._source.attname
+            geo_closure.add_nodes(self.closure_level, {
+                obj.pk: geo_closure.parent_through(self.closure_level, self.source_field, getattr(obj, attname))
+                for obj in objs if obj.pk is not None
+            })
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        fields = list(fields)
+        if self.source_field in fields or self._source.attname in fields:
+            objs = list(objs)
+            self.fill_geo_path(objs)
+            fields += [field for field in self.path_fields if field not in fields]
+        # Each batch is an update() with CASE values, which syncs the children
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        names = {self.source_field, self._source.attname} & kwargs.keys()
+        if not names:
+            return super().update(**kwargs)
+
+        # Pin the rows and their old sources first: the filter may match different rows afterwards
+        attname = self._source.attname
+        source_value = kwargs[names.pop()]
+        per_row = hasattr(source_value, 'resolve_expression')
+        old_sources = (
+            dict(self.values_list('pk', attname))
+            if per_row or self.child_model or self.closure_level else {}
+        )
+
+        if per_row:
+            # bulk_update's CASE, F(): paths and new sources come from the stored rows
+            updated = super().update(**kwargs)
+            if not kwargs.keys() >= set(self.path_fields):
+                self.model._default_manager.filter(pk__in=old_sources).sync_geo_path()
+            new_sources = (
+                dict(models.QuerySet(self.model).filter(pk__in=old_sources).values_list('pk', attname))
+                if self.closure_level else {}
+            )
+        else:
+            source_id = getattr(source_value, 'pk', source_value)
+            kwargs.update(
+                self.geo_paths([source_id]).get(source_id, dict.fromkeys(self.path_fields))
+            )
+            updated = super().update(**kwargs)
+            new_sources = dict.fromkeys(old_sources, source_id)
+
+        self._sync_children(old_sources)
+        self._move_closure_nodes(old_sources, new_sources)
+        return updated
+
+    def sync_geo_path(self):
+        """
+        Recompute path columns from the source for every row in this queryset
+
+        Runs a single UPDATE with correlated subqueries, so callers should
+        batch large tables (see backfill_geo_paths).
+
+        Returns:
+            int: Number of rows updated
+        """
+        sources = self._source.related_model._default_manager.filter(
+            pk=OuterRef(self._source.attname)
+        )
+        return super().update(**{
+            field: Subquery(sources.values(lookup)[:1])
+            for field, lookup in zip(self.path_fields, self.source_lookups)
+        })
+
+    def _move_closure_nodes(self, old_sources, new_sources):
+        """Re-parent closure nodes whose source changed ({pk: source id} before and after)"""
+        if not self.closure_level:
+            return
+        geo_closure = _geo_closure()
+        for pk, source_id in new_sources.items():
+            if source_id != old_sources.get(pk):
+                geo_closure.move_node(
+                    self.closure_level, pk,
+                    geo_closure.parent_through(self.closure_level, self.source_field, source_id),
+                )
+
+    def _sync_children(self, pks):
+        """Re-derive the path of rows whose source is one of pks"""
+        if not self.child_model:
+            return
+        pks = list(pks)
+        if pks:
+            apps.get_model(self.child_model)._default_manager.filter(
+                **{f'{self.child_source_field}__in': pks}
+            ).sync_geo_path()
+
+
+class PollingBoothQuerySet(GeoPathQuerySet):
+    source_field = 'constituency'
+    path_fields = ('state_id', 'zone_id', 'district_id')
+    source_lookups = ('state_ref_id', 'zone_ref_id', 'district_ref_id')
+    child_model = 'api.Voter'
+    child_source_field = 'polling_booth_id'
+    closure_level = 'booth'
+
+
+class VoterQuerySet(GeoPathQuerySet):
+    source_field = 'polling_booth'
+    path_fields = ('state_id', 'zone_id', 'district_id', 'constituency_id')
+    source_lookups = (
+        'constituency__state_ref_id',
+        'constituency__zone_ref_id',
+        'constituency__district_ref_id',
+        'constituency_id',
+    )
+
+
+class GeoPathMixin:
+    """
+    Model mixin deriving the geographic path on save()
+
+    The path is recomputed only when the source foreign key changed since the
+    instance was loaded (or it was never set), so ordinary updates cost no
+    extra query. When a saved row moves to another source, rows deriving
+    their path from it (a booth's voters) are re-derived too.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        source_field = cls._default_manager._queryset_class.source_field
+        instance._loaded_geo_source = instance.__dict__.get(cls._meta.get_field(source_field).attname)
+        return instance
+
+    def save(self, *args, **kwargs):
+        queryset = type(self)._default_manager.get_queryset()
+        attname = queryset._source.attname
+        update_fields = kwargs.get('update_fields')
+        loaded_source = getattr(self, '_loaded_geo_source', None)
+        source_changed = self._state.adding or getattr(self, attname) != loaded_source
+        if update_fields is not None and not (
+            {queryset.source_field, attname} & set(update_fields)
+        ):
+            source_changed = False
+
+        if source_changed:
+            queryset.fill_geo_path([self])
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(queryset.path_fields)
+
+        moved = source_changed and not self._state.adding and loaded_source is not None
+        super().save(*args, **kwargs)
+        self._loaded_geo_source = getattr(self, attname)
+
+        if moved:
+            queryset._sync_children([self.pk])
@@ -0,0 +1,211 @@
+"""
+Incremental Sentiment Rollups
+
+SentimentRollup keeps counters of sentiment analyses per (organization,
+constituency, source) and IST day or hour: analyses, positive (score >=
+0.3), negative (<= -0.3) and neutral counts and the score sum. Trends over
+any window are a range scan over rollup rows (api/utils/sentiment_rollups.py)
+instead of a date group-by over every analysis.
+
+Writes are kept in sync in the same transaction:
+- SentimentRollupMixin.save()                         inserts (in memory) and edits
+- SentimentRollupQuerySet.bulk_create                  inserts (in memory)
+- SentimentRollupQuerySet.bulk_update/update()         counters of the rows before and after
+- post_delete signal (api/signals.py)                  deletes, including cascades
+manage.py backfill_sentiment_rollups rebuilds any window from the analyses.
+"""
+
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from django.apps import apps
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from .voter_rollup_manager import SCORE_QUANTUM, SCORE_SUM_FIELD, _add
+
+
+IST = ZoneInfo('Asia/Kolkata')
+
+POSITIVE_THRESHOLD = Decimal('0.3')
+NEGATIVE_THRESHOLD = Decimal('-0.3')
+
+# Granularity -> truncation of created_at to the start of its IST bucket
+GRANULARITIES = {
+    'day': TruncDay,
+    'hour': TruncHour,
+}
+
+ROLLUP_AGGREGATES = {
+    'analysis_count': Count('pk'),
+    'positive_count': Count('pk', filter=Q(sentiment_score__gte=POSITIVE_THRESHOLD)),
+    'negative_count': Count('pk', filter=Q(sentiment_score__lte=NEGATIVE_THRESHOLD)),
+    'neutral_count': Count(
+        'pk', filter=Q(sentiment_score__gt=NEGATIVE_THRESHOLD, sentiment_score__lt=POSITIVE_THRESHOLD)
+    ),
+    'score_sum': Sum('sentiment_score', output_field=SCORE_SUM_FIELD, default=Decimal('0.00')),
+}
+
+ROLLUP_COLUMNS = tuple(ROLLUP_AGGREGATES)
+
+# Fields whose change moves an analysis between rollup rows or counters
+ROLLUP_SOURCE_FIELDS = frozenset({
+    'organization', 'organization_id', 'constituency', 'constituency_id', 'source', 'sentiment_score', 'created_at',
+})
+
+
+def bucket_start(moment, granularity):
+    """Start of the IST day or hour containing moment, as an aware IST datetime"""
+    moment = moment.astimezone(IST)
+    if granularity == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def next_bucket(bucket, granularity):
+    """Start of the bucket after bucket (IST has no DST, so fixed steps)"""
+    return bucket + (timedelta(days=1) if granularity == 'day' else timedelta(hours=1))
+
+
+def analysis_counters(analysis, sign=1):
+    """
+    Rollup deltas of one analysis, for every granularity
+
+    Returns:
+        dict: {(organization_id, constituency_id, source, granularity, bucket): {column: delta}}
+    """
+    score = Decimal(str(analysis.sentiment_score)).quantize(SCORE_QUANTUM)
+    counters = {
+        'analysis_count': sign,
+        'positive_count': sign if score >= POSITIVE_THRESHOLD else 0,
+        'negative_count': sign if score <= NEGATIVE_THRESHOLD else 0,
+        'neutral_count': sign if NEGATIVE_THRESHOLD < score < POSITIVE_THRESHOLD else 0,
+        'score_sum': sign * score,
+    }
+    return {
+        (
+            analysis.organization_id, analysis.constituency_id, analysis.source,
+            granularity, bucket_start(analysis.created_at, granularity),
+        ): dict(counters)
+        for granularity in GRANULARITIES
+    }
+
+
+def contributions(queryset):
+    """Rollup counters of the analyses in queryset, grouped like analysis_counters()"""
+    totals = {}
+    for granularity, trunc in GRANULARITIES.items():
+        rows = (
+            queryset.order_by()
+            .annotate(bucket=trunc('created_at', tzinfo=IST))
+            .values('organization_id', 'constituency_id', 'source', 'bucket')
+            .annotate(**ROLLUP_AGGREGATES)
+        )
+        for row in rows:
+            key = (row['organization_id'], row['constituency_id'], row['source'], granularity, row['bucket'])
+            totals[key] = {column: row[column] for column in ROLLUP_COLUMNS}
+    return totals
+
+
+def merge_counters(totals, other, sign=1):
+    for key, counters in other.items():
+        target = totals.setdefault(key, dict.fromkeys(ROLLUP_COLUMNS, 0))
+        for column, value in counters.items():
+            target[column] += sign * value
+    return totals
+
+
+def apply_deltas(deltas, create=True):
+    """
+    Add {(organization_id, constituency_id, source, granularity, bucket): {column: delta}} to the rollups
+
+    With create=False missing rows are not created (subtracting from rows
+    that a cascade already removed).
+    """
+    rollup = apps.get_model('api', 'SentimentRollup')
+    now = timezone.now()
+    for (organization_id, constituency_id, source, granularity, bucket), delta in deltas.items():
+        delta = {column: value for column, value in delta.items() if value}
+        if not delta:
+            continue
+        key = {
+            'organization_id': organization_id, 'constituency_id': constituency_id,
+            'source': source, 'granularity': granularity, 'bucket': bucket,
+        }
+        if create:
+            _add(rollup, key, delta, now)
+        else:
+            rollup.objects.filter(**key).update(
+                updated_at=now, **{column: F(column) + value for column, value in delta.items()}
+            )
+
+
+@contextmanager
+def track_sentiment_rollups(model, pks):
+    """Apply the rollup change of the analyses with these pks across the block"""
+    pks = list(pks)
+    with transaction.atomic(savepoint=False):
+        before = contributions(models.QuerySet(model).filter(pk__in=pks))
+        yield
+        apply_deltas(merge_counters(contributions(models.QuerySet(model).filter(pk__in=pks)), before, sign=-1))
+
+
+def _tracks(fields):
+    return not ROLLUP_SOURCE_FIELDS.isdisjoint(fields)
+
+
+class SentimentRollupQuerySet(models.QuerySet):
+    """SentimentAnalysis queryset keeping SentimentRollup in sync with bulk writes"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(savepoint=False):
+            created = super().bulk_create(objs, *args, **kwargs)
+            # created_at is only set (auto_now_add) by the insert
+            deltas = {}
+            for obj in objs:
+                merge_counters(deltas, analysis_counters(obj))
+            apply_deltas(deltas)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if not _tracks(fields):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        objs = list(objs)
+        with track_sentiment_rollups(self.model, [obj.pk for obj in objs]):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if not _tracks(kwargs):
+            return super().update(**kwargs)
+        # Pin the rows first: the filter may match different rows afterwards
+        with track_sentiment_rollups(self.model, self.values_list('pk', flat=True)):
+            return super().update(**kwargs)
+
+    update.alters_data = True
+
+
+class SentimentRollupMixin:
+    """
+    Model mixin keeping SentimentRollup in sync with save()
+
+    Inserts add their counters in memory (one UPDATE per granularity); edits
+    of an existing analysis re-read its counters before and after the write.
+    Deletes are handled by a post_delete receiver so cascades are covered.
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding:
+            with transaction.atomic(savepoint=False):
+                super().save(*args, **kwargs)
+                apply_deltas(analysis_counters(self))
+            return
+        if update_fields is not None and not _tracks(update_fields):
+            return super().save(*args, **kwargs)
+        with track_sentiment_rollups(type(self), [self.pk]):
+            super().save(*args, **kwargs)
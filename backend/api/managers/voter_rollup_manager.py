@@ -0,0 +1,472 @@
+"""
+Incremental Voter Rollups
+
+VoterBoothRollup keeps one row of voter counters per (organization, booth):
+totals by gender, category and sentiment, first-time and verified counts,
+and sums for age and sentiment score. Statistics for any scope are sums over
+rollup rows (api/utils/voter_rollups.py) instead of group-bys over voters.
+
+Every write that can change a counter is wrapped in track_rollups(): the
+counters of the affected voters are aggregated before and after the write
+(one GROUP BY per batch of keys) and the difference is added to the rollup
+rows, in the same transaction. This covers:
+- VoterRollupMixin.save()/delete()                 single instances
+  (computed in memory from the values the instance was loaded with)
+- VoterRollupQuerySet.bulk_create/bulk_update      bulk paths
+- VoterRollupQuerySet.update()/delete()            queryset writes
+- VoterImportService                               raw upserts
+Cascades (booth or organization deletion) remove booth rollup rows with
+their voters; api/signals.py subtracts a deleted booth from its constituency
+rollup rows. manage.py reconcile_voter_rollups detects and repairs any drift.
+
+The sentiment part of every booth delta (voter count, sentiment counts and
+score sum) is propagated to VoterConstituencyRollup in the same transaction,
+so constituency sentiment (the dashboard heatmap) is a read of one row per
+constituency. A booth moving to another constituency moves its sentiment
+counters between constituency rows:
+- BoothRollupMixin.save()                          single booths
+- BoothRollupQuerySet.bulk_update/update()         bulk and queryset writes
+
+Usage:
+    with track_rollups(Voter, 'voter_id_number', ids):
+        cursor.execute(raw_upsert_sql)
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from itertools import islice
+
+from django.apps import apps
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .geo_path_manager import PollingBoothQuerySet
+from .voter_search_manager import VoterSearchQuerySet
+
+
+# Voter field -> values counted in their own rollup column (<field>_<value>)
+BREAKDOWNS = {
+    'gender': ('male', 'female', 'other', 'undisclosed'),
+    'voter_category': ('core_supporter', 'swing_voter', 'opposition', 'undecided', 'first_time'),
+    'sentiment': ('strongly_positive', 'positive', 'neutral', 'negative', 'strongly_negative', 'undecided'),
+}
+
+SCORE_SUM_FIELD = models.DecimalField(max_digits=14, decimal_places=2)
+
+
+def rollup_aggregates():
+    """Rollup column -> aggregate over voters"""
+    aggregates = {'voter_count': Count('pk')}
+    for field, values in BREAKDOWNS.items():
+        for value in values:
+            aggregates[f'{field}_{value}'] = Count('pk', filter=Q(**{field: value}))
+    aggregates.update(
+        first_time_voters=Count('pk', filter=Q(first_time_voter=True)),
+        verified_voters=Count('pk', filter=Q(verified=True)),
+        age_count=Count('age'),
+        age_sum=Coalesce(Sum('age'), 0),
+        sentiment_score_sum=Coalesce(Sum('sentiment_score', output_field=SCORE_SUM_FIELD), Decimal('0')),
+    )
+    return aggregates
+
+
+ROLLUP_COLUMNS = tuple(rollup_aggregates())
+
+# Voter fields a rollup row depends on; writes not touching them are not tracked
+ROLLUP_SOURCE_FIELDS = frozenset({
+    'organization', 'organization_id', 'polling_booth', 'polling_booth_id',
+    'age', 'first_time_voter', 'verified', 'sentiment_score', *BREAKDOWNS,
+})
+
+# Voter attributes a rollup row is computed from
+VALUE_FIELDS = (
+    'organization_id', 'polling_booth_id', 'age', 'first_time_voter', 'verified', 'sentiment_score',
+    *BREAKDOWNS,
+)
+
+# Rollup columns also kept per (organization, constituency)
+CONSTITUENCY_COLUMNS = (
+    'voter_count',
+    *(f'sentiment_{value}' for value in BREAKDOWNS['sentiment']),
+    'sentiment_score_sum',
+)
+
+SCORE_QUANTUM = Decimal('0.01')
+
+# Keys per GROUP BY query; keeps IN lists within backend parameter limits
+TRACK_BATCH_SIZE = 10000
+
+_tracking = ContextVar('voter_rollup_tracking', default=False)
+_moving_booths = ContextVar('voter_rollup_moving_booths', default=False)
+
+
+def contributions(queryset):
+    """
+    Rollup counters of the voters in queryset
+
+    Returns:
+        dict: {(organization_id, polling_booth_id): {column: value}}
+    """
+    rows = queryset.order_by().values('organization_id', 'polling_booth_id').annotate(**rollup_aggregates())
+    totals = {}
+    for row in rows:
+        # SQLite sums decimals as floats
+        row['sentiment_score_sum'] = Decimal(row['sentiment_score_sum']).quantize(SCORE_QUANTUM)
+        totals[(row.pop('organization_id'), row.pop('polling_booth_id'))] = row
+    return totals
+
+
+def rollup_values(voter):
+    """VALUE_FIELDS of a voter instance, coerced as the database stores them"""
+    return {
+        name: voter._meta.get_field(name).to_python(getattr(voter, name))
+        for name in VALUE_FIELDS
+    }
+
+
+def voter_counters(values):
+    """
+    Counters of a single voter, as contributions() aggregates them
+
+    Returns:
+        dict: {(organization_id, polling_booth_id): {column: value}}
+    """
+    counters = dict.fromkeys(ROLLUP_COLUMNS, 0)
+    counters['voter_count'] = 1
+    for field in BREAKDOWNS:
+        column = f'{field}_{values[field]}'
+        if column in counters:
+            counters[column] = 1
+    counters['first_time_voters'] = int(bool(values['first_time_voter']))
+    counters['verified_voters'] = int(bool(values['verified']))
+    if values['age'] is not None:
+        counters['age_count'] = 1
+        counters['age_sum'] = values['age']
+    if values['sentiment_score'] is not None:
+        counters['sentiment_score_sum'] = values['sentiment_score'].quantize(SCORE_QUANTUM)
+    return {(values['organization_id'], values['polling_booth_id']): counters}
+
+
+def merge_counters(totals, other, sign=1):
+    for key, counters in other.items():
+        target = totals.setdefault(key, dict.fromkeys(ROLLUP_COLUMNS, 0))
+        for column, value in counters.items():
+            target[column] += sign * value
+    return totals
+
+
+def _add(model, key, delta, now):
+    """Add delta to the row of model identified by key, creating it if missing"""
+    rows = model.objects.filter(**key)
+    changes = {column: F(column) + value for column, value in delta.items()}
+    if rows.update(updated_at=now, **changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**key, **delta)
+    except IntegrityError:
+        # Created concurrently
+        rows.update(updated_at=now, **changes)
+
+
+def constituency_deltas(deltas):
+    """
+    Sentiment part of booth deltas, summed per constituency
+
+    Returns:
+        dict: {(organization_id, constituency_id): {column: delta}}
+    """
+    booth_deltas = {
+        key: {column: delta[column] for column in CONSTITUENCY_COLUMNS if delta.get(column)}
+        for key, delta in deltas.items()
+    }
+    booth_deltas = {key: delta for key, delta in booth_deltas.items() if delta}
+    if not booth_deltas:
+        return {}
+
+    booth_model = apps.get_model('api', 'PollingBooth')
+    constituencies = dict(
+        booth_model.objects.filter(pk__in={booth_id for _, booth_id in booth_deltas}).order_by()
+        .values_list('pk', 'constituency_id')
+    )
+    totals = {}
+    for (organization_id, booth_id), delta in booth_deltas.items():
+        if booth_id in constituencies:
+            merge_counters(totals, {(organization_id, constituencies[booth_id]): delta})
+    return totals
+
+
+def apply_deltas(deltas):
+    """
+    Add {(organization_id, booth_id): {column: delta}} to the rollup rows
+
+    Booth rows first, then the constituency rows of their sentiment columns.
+    """
+    booth_rollup = apps.get_model('api', 'VoterBoothRollup')
+    constituency_rollup = apps.get_model('api', 'VoterConstituencyRollup')
+    now = timezone.now()
+    deltas = {
+        key: {column: value for column, value in delta.items() if value}
+        for key, delta in deltas.items()
+    }
+    for (organization_id, booth_id), delta in deltas.items():
+        if delta:
+            _add(booth_rollup, {'organization_id': organization_id, 'polling_booth_id': booth_id}, delta, now)
+    for (organization_id, constituency_id), delta in constituency_deltas(deltas).items():
+        delta = {column: value for column, value in delta.items() if value}
+        if delta:
+            _add(constituency_rollup, {'organization_id': organization_id, 'constituency_id': constituency_id},
+                 delta, now)
+
+
+def move_booths(moves):
+    """
+    Move the sentiment counters of booths to their new constituency
+
+    Args:
+        moves: {booth_id: (old constituency_id, new constituency_id)}
+    """
+    moves = {booth_id: move for booth_id, move in moves.items() if move[0] != move[1]}
+    if not moves:
+        return
+
+    booth_rollup = apps.get_model('api', 'VoterBoothRollup')
+    constituency_rollup = apps.get_model('api', 'VoterConstituencyRollup')
+    totals = {}
+    for row in booth_rollup.objects.filter(polling_booth_id__in=moves).values(
+        'organization_id', 'polling_booth_id', *CONSTITUENCY_COLUMNS
+    ):
+        old, new = moves[row['polling_booth_id']]
+        counters = {column: row[column] for column in CONSTITUENCY_COLUMNS}
+        merge_counters(totals, {(row['organization_id'], old): counters}, sign=-1)
+        merge_counters(totals, {(row['organization_id'], new): counters})
+
+    now = timezone.now()
+    for (organization_id, constituency_id), delta in totals.items():
+        delta = {column: value for column, value in delta.items() if value}
+        if delta:
+            _add(constituency_rollup, {'organization_id': organization_id, 'constituency_id': constituency_id},
+                 delta, now)
+
+
+@contextmanager
+def track_booth_moves(model, pks):
+    """
+    Move the constituency counters of the booths with these pks that change
+    constituency in the block
+
+    Nested blocks (bulk_update runs update() per batch) are no-ops.
+    """
+    if _moving_booths.get():
+        yield
+        return
+    pks = list(pks)
+
+    def constituencies():
+        return dict(models.QuerySet(model).filter(pk__in=pks).values_list('pk', 'constituency_id'))
+
+    token = _moving_booths.set(True)
+    try:
+        with transaction.atomic(savepoint=False):
+            before = constituencies()
+            yield
+            after = constituencies()
+            move_booths({pk: (before[pk], after[pk]) for pk in before.keys() & after.keys()})
+    finally:
+        _moving_booths.reset(token)
+
+
+@contextmanager
+def track_rollups(model, field, keys):
+    """
+    Apply the rollup change of the voters identified by keys across the block
+
+    keys is a list of values of field (pk or voter_id_number); the block may
+    append to it (e.g. the pk of a row it created). Nested blocks are no-ops:
+    the outermost one already covers their rows.
+    """
+    if _tracking.get():
+        yield []
+        return
+
+    def snapshot():
+        totals = {}
+        values = iter({key for key in keys if key is not None})
+        while True:
+            batch = list(islice(values, TRACK_BATCH_SIZE))
+            if not batch:
+                return totals
+            merge_counters(totals, contributions(
+                models.QuerySet(model).filter(**{f'{field}__in': batch})
+            ))
+
+    token = _tracking.set(True)
+    try:
+        with transaction.atomic(savepoint=False):
+            keys = list(keys)
+            before = snapshot()
+            yield keys
+            apply_deltas(merge_counters(snapshot(), before, sign=-1))
+    finally:
+        _tracking.reset(token)
+
+
+@contextmanager
+def applying(deltas):
+    """Apply deltas known up front together with the writes in the block"""
+    if _tracking.get() or not any(any(delta.values()) for delta in deltas.values()):
+        yield
+        return
+    with transaction.atomic(savepoint=False):
+        yield
+        apply_deltas(deltas)
+
+
+def _tracks(fields):
+    return not ROLLUP_SOURCE_FIELDS.isdisjoint(fields)
+
+
+class VoterRollupQuerySet(VoterSearchQuerySet):
+    """Voter queryset keeping VoterBoothRollup in sync with bulk writes"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+            # Skipped or overwritten rows are only known to the database;
+            # voter_id_number is unique and set before insert
+            with track_rollups(self.model, 'voter_id_number', [obj.voter_id_number for obj in objs]):
+                return super().bulk_create(objs, *args, **kwargs)
+
+        deltas = {}
+        for obj in objs:
+            merge_counters(deltas, voter_counters(rollup_values(obj)))
+        with applying(deltas):
+            return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if not _tracks(fields):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        objs = list(objs)
+        with track_rollups(self.model, 'pk', [obj.pk for obj in objs]):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if not _tracks(kwargs):
+            return super().update(**kwargs)
+        # Pin the rows first: the filter may match different rows afterwards
+        with track_rollups(self.model, 'pk', self.values_list('pk', flat=True)):
+            return super().update(**kwargs)
+
+    update.alters_data = True
+
+    def delete(self):
+        with track_rollups(self.model, 'pk', self.values_list('pk', flat=True)):
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class VoterRollupMixin:
+    """
+    Model mixin keeping VoterBoothRollup in sync with save() and delete()
+
+    The rollup values are remembered when the instance is loaded, so the
+    change is computed in memory: a save that changes no counter costs no
+    extra query, one that does costs an UPDATE of the booth rollup. Instances
+    without a full snapshot (deferred fields, explicit primary keys) read the
+    stored row instead.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = all(name in instance.__dict__ for name in VALUE_FIELDS)
+        instance._loaded_rollup_values = rollup_values(instance) if loaded else None
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not _tracks(update_fields):
+            return super().save(*args, **kwargs)
+
+        loaded = getattr(self, '_loaded_rollup_values', None)
+        if loaded is None and self.pk is not None:
+            with track_rollups(type(self), 'pk', [self.pk]):
+                super().save(*args, **kwargs)
+            self._loaded_rollup_values = None
+            return
+
+        values = rollup_values(self)
+        if loaded is not None and update_fields is not None:
+            written = {self._meta.get_field(name).attname for name in update_fields}
+            values = {name: values[name] if name in written else loaded[name] for name in VALUE_FIELDS}
+
+        deltas = voter_counters(values)
+        if loaded is not None:
+            merge_counters(deltas, voter_counters(loaded), sign=-1)
+        with applying(deltas):
+            super().save(*args, **kwargs)
+        self._loaded_rollup_values = values
+
+    def delete(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_rollup_values', None)
+        if loaded is None:
+            with track_rollups(type(self), 'pk', [self.pk]):
+                return super().delete(*args, **kwargs)
+
+        deltas = merge_counters({}, voter_counters(loaded), sign=-1)
+        with applying(deltas):
+            return super().delete(*args, **kwargs)
+
+
+def _moves_booths(fields):
+    return not {'constituency', 'constituency_id'}.isdisjoint(fields)
+
+
+class BoothRollupQuerySet(PollingBoothQuerySet):
+    """PollingBooth queryset moving constituency rollups with bulk and queryset moves"""
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if not _moves_booths(fields):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        objs = list(objs)
+        with track_booth_moves(self.model, [obj.pk for obj in objs]):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if not _moves_booths(kwargs):
+            return super().update(**kwargs)
+        with track_booth_moves(self.model, self.values_list('pk', flat=True)):
+            return super().update(**kwargs)
+
+    update.alters_data = True
+
+
+class BoothRollupMixin:
+    """
+    Model mixin moving constituency rollups when save() moves a booth
+
+    Compares with the constituency the booth was loaded with (GeoPathMixin),
+    so saves that keep the constituency cost no extra query. Booths not
+    loaded from the database (explicit primary keys) read the stored
+    constituency instead.
+    """
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self.pk is None or (update_fields is not None and not _moves_booths(update_fields)):
+            return super().save(*args, **kwargs)
+
+        loaded = None if self._state.adding else getattr(self, '_loaded_geo_source', None)
+        if loaded is None:
+            with track_booth_moves(type(self), [self.pk]):
+                return super().save(*args, **kwargs)
+        if loaded == self.constituency_id:
+            return super().save(*args, **kwargs)
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            move_booths({self.pk: (loaded, self.constituency_id)})
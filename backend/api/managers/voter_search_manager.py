@@ -0,0 +1,202 @@
+"""
+Normalized Voter Search Columns
+
+Voter carries normalized copies of its searchable fields so that searches
+hit indexes instead of scanning with icontains:
+
+- search_name:      full_name folded for Indic scripts and transliteration
+                    variants (trigram GIN on PostgreSQL, FTS5 on SQLite)
+- epic_normalized:  epic_number, upper-case alphanumerics only (b-tree)
+- phone_normalized: phone, national 10-digit form (b-tree)
+
+They are kept correct by:
+- VoterSearchMixin.save()                           single instances
+- VoterSearchQuerySet.bulk_create/bulk_update/update bulk paths
+- VoterImportService                                 file imports
+- migration 0015                                     existing rows
+
+See api/utils/voter_search.py for the query side.
+"""
+
+import re
+import unicodedata
+
+from .geo_path_manager import VoterQuerySet
+
+
+# ============================================================
+# Normalization
+# ============================================================
+
+# Zero-width space/joiners and nukta signs: spelling variants, not distinct letters
+_IGNORED_CHARS = dict.fromkeys(map(ord, '\u200b\u200c\u200d\u093c\u09bc\u0a3c\u0abc\u0b3c\u0cbc'))
+# Chandrabindu -> anusvara (Devanagari, Bengali, Gurmukhi, Gujarati, Odia, Telugu)
+_IGNORED_CHARS.update({
+    0x0901: '\u0902', 0x0981: '\u0982', 0x0a01: '\u0a02',
+    0x0a81: '\u0a82', 0x0b01: '\u0b02', 0x0c01: '\u0c02',
+})
+
+# Romanization variants of Indian names, applied in order to Latin tokens
+# (Lakshmi / Laxmi / Lakshmy, Murthy / Murty / Moorthi, Azhagu / Alagu)
+_LATIN_FOLDS = [
+    (re.compile(pattern), replacement) for pattern, replacement in (
+        (r'hh+', 'h'),
+        (r'x', 'ks'),
+        (r'q', 'k'),
+        (r'ck', 'k'),
+        (r'zh', 'l'),
+        (r'z', 'j'),
+        (r'w', 'v'),
+        (r'ph', 'f'),
+        (r'([kgcjtdpbs])h', r'\1'),
+        (r'ee|ii', 'i'),
+        (r'oo|uu|ou', 'u'),
+        (r'aa', 'a'),
+        (r'y\b', 'i'),
+        (r'([a-z])\1+', r'\1'),
+    )
+]
+
+_LATIN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize_name(value) -> str:
+    """
+    Search key for a person name
+
+    Unicode is NFKC-normalized and case-folded; Latin diacritics, zero-width
+    joiners and nuktas are dropped; romanized tokens are folded so common
+    transliteration variants compare equal. Punctuation separates tokens.
+    Names in different scripts are not transliterated into each other.
+    """
+    if not value:
+        return ''
+    text = unicodedata.normalize('NFKC', str(value)).casefold().translate(_IGNORED_CHARS)
+    # Strip combining diacritics from Latin letters only; Indic vowel signs are letters
+    text = ''.join(
+        char for char in unicodedata.normalize('NFD', text)
+        if not ('\u0300' <= char <= '\u036f')
+    )
+    text = unicodedata.normalize('NFC', text)
+
+    # Letters, digits and marks (Indic vowel signs) form tokens; anything else separates
+    text = ''.join(char if unicodedata.category(char)[0] in 'LNM' else ' ' for char in text)
+
+    tokens = []
+    for token in text.split():
+        if _LATIN_RE.fullmatch(token):
+            for pattern, replacement in _LATIN_FOLDS:
+                token = pattern.sub(replacement, token)
+        tokens.append(token)
+    return ' '.join(tokens)
+
+
+def normalize_epic(value) -> str:
+    """EPIC / voter id in upper-case alphanumerics ('tn/12 345' -> 'TN12345')"""
+    return re.sub(r'[^0-9A-Z]', '', str(value or '').upper())
+
+
+def normalize_phone(value) -> str:
+    """Indian phone number as its 10 national digits ('+91 98450-12345' -> '9845012345')"""
+    digits = re.sub(r'\D', '', str(value or ''))
+    if len(digits) > 10 and (digits.startswith('91') or digits.startswith('0')):
+        digits = digits[-10:]
+    return digits
+
+
+# Normalized column -> (source field, normalizer)
+SEARCH_SOURCES = {
+    'search_name': ('full_name', normalize_name),
+    'epic_normalized': ('epic_number', normalize_epic),
+    'phone_normalized': ('phone', normalize_phone),
+}
+
+
+def search_values(values) -> dict:
+    """Normalized columns for a {source field: value} mapping (missing sources skipped)"""
+    return {
+        column: normalize(values[source])
+        for column, (source, normalize) in SEARCH_SOURCES.items()
+        if source in values
+    }
+
+
+# ============================================================
+# QuerySet / model integration
+# ============================================================
+
+class VoterSearchQuerySet(VoterQuerySet):
+    """VoterQuerySet that also keeps the normalized search columns in sync"""
+
+    def fill_search_columns(self, objs):
+        """Set normalized columns on instances from their source fields"""
+        for obj in objs:
+            for column, (source, normalize) in SEARCH_SOURCES.items():
+                setattr(obj, column, normalize(getattr(obj, source)))
+        return objs
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = self.fill_search_columns(list(objs))
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        fields = list(fields)
+        columns = _dependent_columns(fields)
+        if columns:
+            objs = self.fill_search_columns(list(objs))
+            fields += [column for column in columns if column not in fields]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        columns = _dependent_columns(kwargs)
+        if not columns:
+            return super().update(**kwargs)
+
+        # Plain values normalize up front; expressions (F(), Concat()) are
+        # re-read after the UPDATE
+        expressions = [
+            column for column in columns
+            if not isinstance(kwargs[SEARCH_SOURCES[column][0]], str)
+        ]
+        for column in columns:
+            if column not in expressions:
+                source, normalize = SEARCH_SOURCES[column]
+                kwargs[column] = normalize(kwargs[source])
+
+        pks = list(self.values_list('pk', flat=True)) if expressions else ()
+        updated = super().update(**kwargs)
+        if pks:
+            self.model._default_manager.filter(pk__in=pks).sync_search_columns()
+        return updated
+
+    def sync_search_columns(self, batch_size=1000):
+        """
+        Recompute normalized columns for every row in this queryset
+
+        Returns:
+            int: Number of rows updated
+        """
+        sources = [source for source, _ in SEARCH_SOURCES.values()]
+        objs = list(self.only('pk', *sources))
+        self.fill_search_columns(objs)
+        return super().bulk_update(objs, list(SEARCH_SOURCES), batch_size=batch_size)
+
+
+def _dependent_columns(fields):
+    """Normalized columns whose source is among fields"""
+    return [column for column, (source, _) in SEARCH_SOURCES.items() if source in fields]
+
+
+class VoterSearchMixin:
+    """Model mixin normalizing search columns on save()"""
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            type(self)._default_manager.get_queryset().fill_search_columns([self])
+        else:
+            columns = _dependent_columns(set(update_fields))
+            if columns:
+                type(self)._default_manager.get_queryset().fill_search_columns([self])
+                kwargs['update_fields'] = set(update_fields) | set(columns)
+        super().save(*args, **kwargs)
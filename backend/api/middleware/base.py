@@ -0,0 +1,62 @@
+"""
+Base class for sync-and-async capable middleware
+
+MiddlewareMixin supports ASGI by running process_request/process_response
+through sync_to_async, i.e. on a worker thread, for every request. Middleware
+built on AsyncCapableMiddleware instead runs natively in whichever mode the
+handler chain uses:
+
+- WSGI: __call__ runs process_request / process_response
+- ASGI: __acall__ awaits aprocess_request / aprocess_response
+
+The async hooks default to calling the sync ones directly, which is right for
+hooks that do no I/O. Hooks that touch the database or request.user (lazy,
+session-backed) must override the async variant and use the async ORM and
+request.auser().
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
+class AsyncCapableMiddleware:
+    """
+    Middleware that runs natively under both WSGI and ASGI
+
+    Subclasses implement process_request(request) and/or
+    process_response(request, response), plus aprocess_request /
+    aprocess_response when those hooks do I/O.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        response = self.process_request(request)
+        if response is None:
+            response = self.get_response(request)
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        response = await self.aprocess_request(request)
+        if response is None:
+            response = await self.get_response(request)
+        return await self.aprocess_response(request, response)
+
+    def process_request(self, request):
+        return None
+
+    def process_response(self, request, response):
+        return response
+
+    async def aprocess_request(self, request):
+        return self.process_request(request)
+
+    async def aprocess_response(self, request, response):
+        return self.process_response(request, response)
@@ -0,0 +1,59 @@
+"""
+Performance instrumentation middleware
+Records latency, DB and serializer cost per request, emits Server-Timing
+headers and feeds the per-route histograms served at /api/metrics/
+"""
+from django.conf import settings
+from api.middleware.base import AsyncCapableMiddleware
+from api.utils import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PerformanceMiddleware(AsyncCapableMiddleware):
+    """
+    Per-request instrumentation
+
+    Should sit first in MIDDLEWARE so the measured latency covers every
+    other middleware as well as the view.
+    """
+
+    def process_request(self, request):
+        """Start collecting metrics for this request"""
+        if not getattr(settings, 'PERFORMANCE_INSTRUMENTATION', True):
+            return None
+
+        request._metrics, request._metrics_token = metrics.start_request_metrics()
+        return None
+
+    def process_response(self, request, response):
+        """Emit Server-Timing and record the request in the registry"""
+        request_metrics = getattr(request, '_metrics', None)
+        if request_metrics is None:
+            return response
+
+        metrics.finish_request_metrics(request._metrics_token)
+        elapsed = request_metrics.elapsed()
+
+        response['Server-Timing'] = metrics.server_timing_header(
+            request_metrics, elapsed, getattr(request, 'auth_duration', None)
+        )
+
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+
+        try:
+            metrics.registry.record(
+                metrics.route_label(request),
+                request.method,
+                response.status_code,
+                request_metrics,
+                elapsed,
+                size,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to record request metrics: {e}")
+
+        return response
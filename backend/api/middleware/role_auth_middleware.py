@@ -1,58 +1,93 @@
 """
 Role-based authentication middleware
 Attaches user role to request for easy access throughout the application
+
+Both middlewares run natively under WSGI and ASGI (see base.py).
 """
-from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
+from api.middleware.base import AsyncCapableMiddleware
+from api.models import UserProfile
+from api.utils.principal import ANONYMOUS_PRINCIPAL, RequestPrincipal, aget_principal, get_principal
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class RoleAuthMiddleware(MiddlewareMixin):
+class RoleAuthMiddleware(AsyncCapableMiddleware):
     """
     Global middleware to attach user role to request
     Makes role checking available throughout the application
     """
 
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode:
+            # Django adapts process_view to the handler mode; an async one
+            # avoids a thread hop per request
+            self.process_view = self.aprocess_view
+
     def process_request(self, request):
         """Attach role to request if user is authenticated"""
+        principal = ANONYMOUS_PRINCIPAL
+
         if hasattr(request, 'user') and request.user.is_authenticated:
             try:
-                # Get or create profile for user
-                profile = getattr(request.user, 'profile', None)
-                if profile:
-                    request.user_role = profile.role
-                    request.is_superadmin = profile.is_superadmin()
-                    request.is_admin = profile.is_admin()
-                    request.is_admin_or_above = profile.is_admin_or_above()
-                else:
+                principal = get_principal(request.user)
+                if not principal.has_profile:
                     # If profile doesn't exist, create it with default role
-                    from api.models import UserProfile
                     profile = UserProfile.objects.create(user=request.user)
-                    request.user_role = 'user'
-                    request.is_superadmin = False
-                    request.is_admin = False
-                    request.is_admin_or_above = False
+                    principal = RequestPrincipal.from_profile(profile)
+                    request.user._principal = principal
             except Exception as e:
                 logger.error(f"Error attaching role to request: {str(e)}")
-                request.user_role = None
-                request.is_superadmin = False
-                request.is_admin = False
-                request.is_admin_or_above = False
-        else:
-            request.user_role = None
-            request.is_superadmin = False
-            request.is_admin = False
-            request.is_admin_or_above = False
+                principal = ANONYMOUS_PRINCIPAL
+
+        self._attach_role(request, principal)
+        return None
 
+    async def aprocess_request(self, request):
+        """Async variant of process_request (async ORM, no thread hop)"""
+        principal = ANONYMOUS_PRINCIPAL
+
+        if hasattr(request, 'auser'):
+            # Resolve the lazy session user once so later sync code can read it
+            user = await request.auser()
+            request.user = user
+            if user.is_authenticated:
+                try:
+                    principal = await aget_principal(user)
+                    if not principal.has_profile:
+                        # If profile doesn't exist, create it with default role
+                        profile = await UserProfile.objects.acreate(user=user)
+                        principal = RequestPrincipal.from_profile(profile)
+                        user._principal = principal
+                except Exception as e:
+                    logger.error(f"Error attaching role to request: {str(e)}")
+                    principal = ANONYMOUS_PRINCIPAL
+
+        self._attach_role(request, principal)
         return None
 
+    @staticmethod
+    def _attach_role(request, principal):
+        request.user_role = principal.role
+        request.is_superadmin = principal.is_superadmin
+        request.is_admin = principal.is_admin
+        request.is_admin_or_above = principal.is_admin_or_above
+
     def process_view(self, request, view_func, view_args, view_kwargs):
         """
         Check role-based access control before view is executed
         Returns 403 if user doesn't have required role
         """
+        return self._check_required_role(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        """Async variant of process_view (request.user is already resolved)"""
+        return self._check_required_role(request, view_func)
+
+    @staticmethod
+    def _check_required_role(request, view_func):
         # Get the view's required role from view attributes
         required_role = getattr(view_func, 'required_role', None)
 
@@ -84,28 +119,40 @@ class RoleAuthMiddleware(MiddlewareMixin):
         return None
 
 
-class RequestLoggingMiddleware(MiddlewareMixin):
+class RequestLoggingMiddleware(AsyncCapableMiddleware):
     """
     Log all API requests with user and role information
-    """
 
-    def process_request(self, request):
-        """Log incoming request"""
-        if request.path.startswith('/api/'):
-            user = 'Anonymous'
-            role = 'None'
-
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                user = request.user.username
-                role = getattr(request, 'user_role', 'Unknown')
-
-            logger.info(f"{request.method} {request.path} - User: {user} - Role: {role}")
-
-        return None
+    One record per request, written once the response is known so the user
+    authenticated by DRF (JWT) and the latency are included.
+    """
 
     def process_response(self, request, response):
-        """Log response status"""
-        if request.path.startswith('/api/'):
-            logger.info(f"Response: {response.status_code} - {request.path}")
+        """Log request, user, role and response status"""
+        if not request.path.startswith('/api/') or not logger.isEnabledFor(logging.INFO):
+            return response
+
+        user = 'Anonymous'
+        role = 'None'
+        if hasattr(request, 'user') and request.user.is_authenticated:
+            user = request.user.username
+            # Reuse the principal if the view loaded one; never query just to log
+            principal = getattr(request.user, '_principal', None)
+            role = getattr(request, 'user_role', None) or (principal and principal.role) or 'Unknown'
+
+        request_metrics = getattr(request, '_metrics', None)
+        duration_ms = round(request_metrics.elapsed() * 1000, 1) if request_metrics else None
+
+        logger.info(
+            f"{request.method} {request.path} {response.status_code} - User: {user} - Role: {role}",
+            extra={
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'user': user,
+                'role': role,
+                'duration_ms': duration_ms,
+            },
+        )
 
         return response
@@ -7,21 +7,24 @@ URL Pattern: /api/org/{org_slug}/...
 Example: /api/org/acme-corp/users/
 
 The middleware:
-1. Extracts org_slug from the URL path
-2. Fetches the Organization from the database
+1. Extracts org_slug from the URL path (or falls back to the Host header)
+2. Resolves the Organization through the cached tenant resolver
 3. Attaches it to request.tenant
 4. Handles missing/invalid organizations gracefully
+
+All tenant middlewares run natively under WSGI and ASGI (see base.py).
 """
 
 import logging
 from django.http import JsonResponse
-from django.utils.deprecation import MiddlewareMixin
-from api.models import Organization
+from api.middleware.base import AsyncCapableMiddleware
+from api.utils.tenant_resolver import tenant_resolver
+from api.utils.principal import aget_principal, get_principal
 
 logger = logging.getLogger(__name__)
 
 
-class TenantDetectionMiddleware(MiddlewareMixin):
+class TenantDetectionMiddleware(AsyncCapableMiddleware):
     """
     Middleware to detect and attach organization (tenant) to request
 
@@ -30,29 +33,60 @@ class TenantDetectionMiddleware(MiddlewareMixin):
 
     URL Pattern: /api/org/{org_slug}/...
 
-    If the organization is not found or the URL doesn't contain an org_slug,
-    request.tenant will be None.
+    Without an org_slug in the path, the tenant is taken from the Host header
+    (tenant subdomain or custom domain). If neither resolves, request.tenant
+    will be None.
     """
 
+    # Skip tenant detection for certain paths
+    skip_paths = [
+        '/admin/',
+        '/api/auth/',
+        '/api/health/',
+        '/api/docs/',
+        '/api/schema/',
+        '/static/',
+        '/media/',
+    ]
+
     def process_request(self, request):
         """Process incoming request to detect tenant"""
+        if not self._prepare(request):
+            return None
+
+        if request.org_slug:
+            organization = tenant_resolver.resolve_slug(request.org_slug)
+            return self._attach_slug_tenant(request, organization)
+
+        # Tenant subdomain (bjp.bachao.co) or custom domain
+        request.tenant = tenant_resolver.resolve_host(request.META.get('HTTP_HOST'))
+        return None
+
+    async def aprocess_request(self, request):
+        """Async variant of process_request (async ORM on cache misses)"""
+        if not self._prepare(request):
+            return None
+
+        if request.org_slug:
+            organization = await tenant_resolver.aresolve_slug(request.org_slug)
+            return self._attach_slug_tenant(request, organization)
+
+        request.tenant = await tenant_resolver.aresolve_host(request.META.get('HTTP_HOST'))
+        return None
+
+    def _prepare(self, request):
+        """
+        Reset tenant attributes and extract org_slug from the path
+
+        Returns:
+            bool: False when tenant detection is skipped for this path
+        """
         request.tenant = None
         request.org_slug = None
 
-        # Skip tenant detection for certain paths
-        skip_paths = [
-            '/admin/',
-            '/api/auth/',
-            '/api/health/',
-            '/api/docs/',
-            '/api/schema/',
-            '/static/',
-            '/media/',
-        ]
-
         # Check if path should skip tenant detection
-        if any(request.path.startswith(path) for path in skip_paths):
-            return None
+        if any(request.path.startswith(path) for path in self.skip_paths):
+            return False
 
         # Extract org_slug from path: /api/org/{org_slug}/...
         path_parts = request.path.split('/')
@@ -67,32 +101,31 @@ class TenantDetectionMiddleware(MiddlewareMixin):
                     if org_slug:  # Ensure org_slug is not empty
                         request.org_slug = org_slug
 
-                        try:
-                            # Fetch organization from database
-                            organization = Organization.objects.get(slug=org_slug)
-                            request.tenant = organization
-
-                            logger.debug(f"Tenant detected: {organization.name} (slug: {org_slug})")
-
-                        except Organization.DoesNotExist:
-                            logger.warning(f"Organization not found: {org_slug}")
-                            # Return 404 for invalid organization
-                            return JsonResponse(
-                                {
-                                    'error': 'Organization not found',
-                                    'detail': f'Organization with slug "{org_slug}" does not exist',
-                                    'org_slug': org_slug
-                                },
-                                status=404
-                            )
-
         except (ValueError, IndexError) as e:
             logger.error(f"Error parsing org_slug from path: {e}")
 
+        return True
+
+    @staticmethod
+    def _attach_slug_tenant(request, organization):
+        if organization is None:
+            logger.warning(f"Organization not found: {request.org_slug}")
+            # Return 404 for invalid organization
+            return JsonResponse(
+                {
+                    'error': 'Organization not found',
+                    'detail': f'Organization with slug "{request.org_slug}" does not exist',
+                    'org_slug': request.org_slug
+                },
+                status=404
+            )
+
+        request.tenant = organization
+        logger.debug(f"Tenant detected: {organization.name} (slug: {request.org_slug})")
         return None
 
 
-class TenantRequiredMiddleware(MiddlewareMixin):
+class TenantRequiredMiddleware(AsyncCapableMiddleware):
     """
     Middleware to enforce tenant requirement for specific endpoints
 
@@ -143,7 +176,7 @@ class TenantRequiredMiddleware(MiddlewareMixin):
         return None
 
 
-class TenantIsolationMiddleware(MiddlewareMixin):
+class TenantIsolationMiddleware(AsyncCapableMiddleware):
     """
     Middleware to enforce tenant data isolation
 
@@ -158,20 +191,30 @@ class TenantIsolationMiddleware(MiddlewareMixin):
         if not request.user.is_authenticated:
             return None
 
+        return self._check_isolation(request, request.user, get_principal(request.user))
+
+    async def aprocess_request(self, request):
+        """Async variant of process_request (async ORM for the principal)"""
+        user = await request.auser()
+        if not user.is_authenticated:
+            return None
+
+        return self._check_isolation(request, user, await aget_principal(user))
+
+    @staticmethod
+    def _check_isolation(request, user, principal):
         # Skip for superadmin users (they can access all tenants)
-        if hasattr(request.user, 'profile') and request.user.profile.is_superadmin():
-            logger.debug(f"Superadmin access: {request.user.username}")
+        if principal.is_superadmin:
+            logger.debug(f"Superadmin access: {user.username}")
             return None
 
         # If tenant is set, verify user belongs to that organization
         if request.tenant:
-            if hasattr(request.user, 'profile'):
-                user_org = request.user.profile.organization
-
-                if user_org != request.tenant:
+            if principal.has_profile:
+                if principal.organization_id != request.tenant.id:
                     logger.warning(
-                        f"Tenant isolation violation: User {request.user.username} "
-                        f"(org: {user_org.slug if user_org else 'None'}) "
+                        f"Tenant isolation violation: User {user.username} "
+                        f"(org: {principal.organization_id or 'None'}) "
                         f"attempted to access {request.tenant.slug}"
                     )
                     return JsonResponse(
@@ -185,7 +228,7 @@ class TenantIsolationMiddleware(MiddlewareMixin):
         return None
 
 
-class OrganizationContextMiddleware(MiddlewareMixin):
+class OrganizationContextMiddleware(AsyncCapableMiddleware):
     """
     Middleware to provide organization context utilities
 
@@ -201,14 +244,16 @@ class OrganizationContextMiddleware(MiddlewareMixin):
             if not request.user.is_authenticated:
                 return False
 
+            principal = get_principal(request.user)
+
             # Superadmins have access to all organizations
-            if hasattr(request.user, 'profile') and request.user.profile.is_superadmin():
+            if principal.is_superadmin:
                 return True
 
             # Check if user's organization matches the specified organization
             target_org = organization or request.tenant
-            if target_org and hasattr(request.user, 'profile'):
-                return request.user.profile.organization == target_org
+            if target_org and principal.has_profile:
+                return principal.organization_id == target_org.id
 
             return False
 
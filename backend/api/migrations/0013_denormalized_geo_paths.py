@@ -0,0 +1,83 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_alter_organization_landing_page_config'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pollingbooth',
+            name='district',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.district'),
+        ),
+        migrations.AddField(
+            model_name='pollingbooth',
+            name='state',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.state'),
+        ),
+        migrations.AddField(
+            model_name='pollingbooth',
+            name='zone',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.zone'),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='constituency',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.constituency'),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='district',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.district'),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='state',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.state'),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='zone',
+            field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='api.zone'),
+        ),
+        migrations.AddIndex(
+            model_name='pollingbooth',
+            index=models.Index(fields=['organization', 'state'], name='api_polling_organiz_d39f7e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pollingbooth',
+            index=models.Index(fields=['organization', 'zone'], name='api_polling_organiz_e217b1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pollingbooth',
+            index=models.Index(fields=['organization', 'district'], name='api_polling_organiz_89f06e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pollingbooth',
+            index=models.Index(fields=['organization', 'constituency'], name='api_polling_organiz_983255_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['organization', 'state'], name='api_voter_organiz_d5edbe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['organization', 'zone'], name='api_voter_organiz_e28c1b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['organization', 'district'], name='api_voter_organiz_f0b0b9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['organization', 'constituency'], name='api_voter_organiz_f0f0df_idx'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:11
+
+from django.db import migrations, models
+
+
+# (level, model, parent fields) root first; a constituency's parent is the first ref set
+HIERARCHY = (
+    ('state', 'State', ()),
+    ('zone', 'Zone', (('state', 'state'),)),
+    ('district', 'District', (('zone', 'zone'),)),
+    ('constituency', 'Constituency', (('district_ref', 'district'), ('zone_ref', 'zone'), ('state_ref', 'state'))),
+    ('booth', 'PollingBooth', (('constituency', 'constituency'),)),
+)
+
+
+def build_closure(apps, schema_editor):
+    """Write every (ancestor, descendant, depth) pair of the existing hierarchy"""
+    GeoHierarchyClosure = apps.get_model('api', 'GeoHierarchyClosure')
+    paths = {}
+    rows = []
+
+    # Parents are processed before children, so their paths are known
+    for level, model_name, parent_fields in HIERARCHY:
+        model = apps.get_model('api', model_name)
+        columns = [f'{field}_id' for field, _ in parent_fields]
+        for pk, *parent_ids in model.objects.order_by().values_list('pk', *columns).iterator():
+            parent = next((
+                (parent_level, parent_id)
+                for (_, parent_level), parent_id in zip(parent_fields, parent_ids)
+                if parent_id is not None
+            ), None)
+            path = [((level, pk), 0)] + [
+                (ancestor, depth + 1) for ancestor, depth in paths.get(parent, ())
+            ]
+            if level != 'booth':
+                paths[(level, pk)] = path
+            rows.extend(
+                GeoHierarchyClosure(
+                    ancestor_level=ancestor_level, ancestor_node=ancestor_node,
+                    descendant_level=level, descendant_node=pk, depth=depth,
+                )
+                for (ancestor_level, ancestor_node), depth in path
+            )
+            if len(rows) >= 5000:
+                GeoHierarchyClosure.objects.bulk_create(rows)
+                rows = []
+    GeoHierarchyClosure.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_denormalized_geo_paths'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeoHierarchyClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ancestor_level', models.CharField(choices=[('state', 'State'), ('zone', 'Zone'), ('district', 'District'), ('constituency', 'Constituency'), ('booth', 'Polling Booth')], max_length=12)),
+                ('ancestor_node', models.PositiveIntegerField()),
+                ('descendant_level', models.CharField(choices=[('state', 'State'), ('zone', 'Zone'), ('district', 'District'), ('constituency', 'Constituency'), ('booth', 'Polling Booth')], max_length=12)),
+                ('descendant_node', models.PositiveIntegerField()),
+                ('depth', models.PositiveSmallIntegerField(help_text='Edges between ancestor and descendant')),
+            ],
+            options={
+                'verbose_name': 'Geographic Hierarchy Closure',
+                'verbose_name_plural': 'Geographic Hierarchy Closure',
+                'indexes': [models.Index(fields=['descendant_level', 'descendant_node', 'depth'], name='api_geohier_descend_e2c0dc_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor_level', 'ancestor_node', 'descendant_level', 'descendant_node'), name='geo_closure_unique_pair')],
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:26
+
+from django.db import migrations, models
+
+
+def backfill_search_columns(apps, schema_editor):
+    from api.managers.voter_search_manager import SEARCH_SOURCES
+
+    Voter = apps.get_model('api', 'Voter')
+    sources = [source for source, _ in SEARCH_SOURCES.values()]
+    last_id = 0
+    while True:
+        batch = list(Voter.objects.filter(pk__gt=last_id).order_by('pk').only('pk', *sources)[:5000])
+        if not batch:
+            return
+        for voter in batch:
+            for column, (source, normalize) in SEARCH_SOURCES.items():
+                setattr(voter, column, normalize(getattr(voter, source)))
+        Voter.objects.bulk_update(batch, list(SEARCH_SOURCES))
+        last_id = batch[-1].pk
+
+
+def install_search_index(apps, schema_editor):
+    from api.utils.voter_search import install_search_index
+
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    from api.utils.voter_search import drop_search_index
+
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_geo_hierarchy_closure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='voter',
+            name='epic_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=50),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='voter',
+            name='search_name',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+        migrations.RunPython(install_search_index, drop_search_index),
+    ]
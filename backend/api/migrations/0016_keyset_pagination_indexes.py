@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_voter_search_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sentimentanalysis',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='api_sentime_organiz_d0301b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['organization', 'polling_booth', 'full_name', 'id'], name='api_voter_organiz_8f45d9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voterinteraction',
+            index=models.Index(fields=['-interaction_date', '-id'], name='api_voterin_interac_671066_idx'),
+        ),
+    ]
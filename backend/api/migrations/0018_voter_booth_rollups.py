@@ -0,0 +1,86 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:38
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+BREAKDOWNS = {
+    'gender': ('male', 'female', 'other', 'undisclosed'),
+    'voter_category': ('core_supporter', 'swing_voter', 'opposition', 'undecided', 'first_time'),
+    'sentiment': ('strongly_positive', 'positive', 'neutral', 'negative', 'strongly_negative', 'undecided'),
+}
+
+
+def build_rollups(apps, schema_editor):
+    Voter = apps.get_model('api', 'Voter')
+    VoterBoothRollup = apps.get_model('api', 'VoterBoothRollup')
+    aggregates = {'voter_count': Count('pk')}
+    for field, values in BREAKDOWNS.items():
+        for value in values:
+            aggregates[f'{field}_{value}'] = Count('pk', filter=Q(**{field: value}))
+    aggregates.update(
+        first_time_voters=Count('pk', filter=Q(first_time_voter=True)),
+        verified_voters=Count('pk', filter=Q(verified=True)),
+        age_count=Count('age'),
+        age_sum=Coalesce(Sum('age'), 0),
+        sentiment_score_sum=Coalesce(
+            Sum('sentiment_score', output_field=models.DecimalField(max_digits=14, decimal_places=2)), Decimal('0'),
+        ),
+    )
+    rows = Voter.objects.order_by().values('organization_id', 'polling_booth_id').annotate(**aggregates)
+
+    def rollups():
+        for row in rows:
+            # SQLite sums decimals as floats
+            row['sentiment_score_sum'] = Decimal(row['sentiment_score_sum']).quantize(Decimal('0.01'))
+            yield VoterBoothRollup(**row)
+
+    VoterBoothRollup.objects.bulk_create(rollups(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_background_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterBoothRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('voter_count', models.IntegerField(default=0)),
+                ('gender_male', models.IntegerField(default=0)),
+                ('gender_female', models.IntegerField(default=0)),
+                ('gender_other', models.IntegerField(default=0)),
+                ('gender_undisclosed', models.IntegerField(default=0)),
+                ('voter_category_core_supporter', models.IntegerField(default=0)),
+                ('voter_category_swing_voter', models.IntegerField(default=0)),
+                ('voter_category_opposition', models.IntegerField(default=0)),
+                ('voter_category_undecided', models.IntegerField(default=0)),
+                ('voter_category_first_time', models.IntegerField(default=0)),
+                ('sentiment_strongly_positive', models.IntegerField(default=0)),
+                ('sentiment_positive', models.IntegerField(default=0)),
+                ('sentiment_neutral', models.IntegerField(default=0)),
+                ('sentiment_negative', models.IntegerField(default=0)),
+                ('sentiment_strongly_negative', models.IntegerField(default=0)),
+                ('sentiment_undecided', models.IntegerField(default=0)),
+                ('first_time_voters', models.IntegerField(default=0)),
+                ('verified_voters', models.IntegerField(default=0)),
+                ('age_count', models.IntegerField(default=0)),
+                ('age_sum', models.BigIntegerField(default=0)),
+                ('sentiment_score_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='voter_rollups', to='api.organization')),
+                ('polling_booth', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='voter_rollups', to='api.pollingbooth')),
+            ],
+            options={
+                'verbose_name': 'Voter Booth Rollup',
+                'verbose_name_plural': 'Voter Booth Rollups',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('organization__isnull', False)), fields=('organization', 'polling_booth'), name='voter_rollup_unique_booth'), models.UniqueConstraint(condition=models.Q(('organization__isnull', True)), fields=('polling_booth',), name='voter_rollup_unique_booth_no_organization')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
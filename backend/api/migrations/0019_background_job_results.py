@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_voter_booth_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='result',
+            field=models.JSONField(blank=True, default=dict, help_text='Outcome details (e.g. per-id results)'),
+        ),
+        migrations.AlterField(
+            model_name='backgroundjob',
+            name='job_type',
+            field=models.CharField(choices=[('export', 'Data Export'), ('voter_bulk_update', 'Voter Bulk Update')], default='export', max_length=20),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:46
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+CONSTITUENCY_COLUMNS = (
+    'voter_count', 'sentiment_strongly_positive', 'sentiment_positive', 'sentiment_neutral',
+    'sentiment_negative', 'sentiment_strongly_negative', 'sentiment_undecided', 'sentiment_score_sum',
+)
+
+
+def build_rollups(apps, schema_editor):
+    VoterBoothRollup = apps.get_model('api', 'VoterBoothRollup')
+    VoterConstituencyRollup = apps.get_model('api', 'VoterConstituencyRollup')
+    rows = (
+        VoterBoothRollup.objects.order_by()
+        .values('organization_id', 'polling_booth__constituency_id')
+        .annotate(**{column: Sum(column) for column in CONSTITUENCY_COLUMNS})
+    )
+    VoterConstituencyRollup.objects.bulk_create(
+        (
+            VoterConstituencyRollup(
+                organization_id=row.pop('organization_id'),
+                constituency_id=row.pop('polling_booth__constituency_id'),
+                **row,
+            )
+            for row in rows
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_background_job_results'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoterConstituencyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('voter_count', models.IntegerField(default=0)),
+                ('sentiment_strongly_positive', models.IntegerField(default=0)),
+                ('sentiment_positive', models.IntegerField(default=0)),
+                ('sentiment_neutral', models.IntegerField(default=0)),
+                ('sentiment_negative', models.IntegerField(default=0)),
+                ('sentiment_strongly_negative', models.IntegerField(default=0)),
+                ('sentiment_undecided', models.IntegerField(default=0)),
+                ('sentiment_score_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('constituency', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='voter_rollups', to='api.constituency')),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='voter_constituency_rollups', to='api.organization')),
+            ],
+            options={
+                'verbose_name': 'Voter Constituency Rollup',
+                'verbose_name_plural': 'Voter Constituency Rollups',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('organization__isnull', False)), fields=('organization', 'constituency'), name='voter_rollup_unique_constituency'), models.UniqueConstraint(condition=models.Q(('organization__isnull', True)), fields=('constituency',), name='voter_rollup_unique_constituency_no_organization')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
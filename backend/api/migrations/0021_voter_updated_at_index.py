@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:51
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_voter_constituency_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='voter',
+            index=models.Index(fields=['organization', 'updated_at'], name='api_voter_organiz_7d5887_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_voter_updated_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoundaryTopology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.CharField(choices=[('state', 'State'), ('district', 'District'), ('constituency', 'Constituency')], max_length=20)),
+                ('source_version', models.CharField(help_text='geometry_version() of the constituencies it was built from', max_length=40)),
+                ('topology', models.JSONField()),
+                ('size', models.IntegerField(default=0, help_text='Serialized size in bytes')),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='boundary_topologies', to='api.organization')),
+            ],
+            options={
+                'verbose_name': 'Boundary Topology',
+                'verbose_name_plural': 'Boundary Topologies',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('organization__isnull', False)), fields=('organization', 'zoom'), name='boundary_topology_unique_zoom'), models.UniqueConstraint(condition=models.Q(('organization__isnull', True)), fields=('zoom',), name='boundary_topology_unique_zoom_no_organization')],
+            },
+        ),
+    ]
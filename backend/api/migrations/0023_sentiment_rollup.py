@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:01
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def build_rollups(apps, schema_editor):
+    from api.managers.sentiment_rollup_manager import contributions
+
+    SentimentAnalysis = apps.get_model('api', 'SentimentAnalysis')
+    SentimentRollup = apps.get_model('api', 'SentimentRollup')
+    SentimentRollup.objects.bulk_create(
+        (
+            SentimentRollup(
+                organization_id=organization_id, constituency_id=constituency_id,
+                source=source, granularity=granularity, bucket=bucket, **counters,
+            )
+            for (organization_id, constituency_id, source, granularity, bucket), counters
+            in contributions(SentimentAnalysis.objects.all()).items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_boundary_topology'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SentimentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('manual', 'Manual Entry'), ('phone_call', 'Phone Call'), ('social_media', 'Social Media'), ('survey', 'Survey'), ('ai_analysis', 'AI Analysis'), ('field_report', 'Field Report')], max_length=30)),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('hour', 'Hour')], max_length=10)),
+                ('bucket', models.DateTimeField(help_text='Start of the IST day or hour')),
+                ('analysis_count', models.IntegerField(default=0)),
+                ('positive_count', models.IntegerField(default=0)),
+                ('negative_count', models.IntegerField(default=0)),
+                ('neutral_count', models.IntegerField(default=0)),
+                ('score_sum', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('constituency', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_rollups', to='api.constituency')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sentiment_rollups', to='api.organization')),
+            ],
+            options={
+                'verbose_name': 'Sentiment Rollup',
+                'verbose_name_plural': 'Sentiment Rollups',
+                'indexes': [models.Index(fields=['organization', 'granularity', 'bucket'], name='api_sentime_organiz_7fa475_idx'), models.Index(fields=['granularity', 'bucket'], name='api_sentime_granula_0aee96_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('constituency__isnull', False)), fields=('organization', 'constituency', 'source', 'granularity', 'bucket'), name='sentiment_rollup_unique_bucket'), models.UniqueConstraint(condition=models.Q(('constituency__isnull', True)), fields=('organization', 'source', 'granularity', 'bucket'), name='sentiment_rollup_unique_bucket_no_constituency')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
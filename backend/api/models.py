@@ -3,6 +3,13 @@ from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from decimal import Decimal
 
+from api.managers.geo_path_manager import GeoPathMixin
+from api.managers.sentiment_rollup_manager import SentimentRollupMixin, SentimentRollupQuerySet
+from api.managers.voter_rollup_manager import (
+    BoothRollupMixin, BoothRollupQuerySet, VoterRollupMixin, VoterRollupQuerySet,
+)
+from api.managers.voter_search_manager import VoterSearchMixin
+
 # Try to import GIS models, fall back to regular models if GDAL not available
 try:
     from django.contrib.gis.db import models as gis_models
@@ -388,48 +395,14 @@ class UserProfile(models.Model):
         return role_hierarchy.get(self.role)
 
     def has_permission(self, permission_name):
-        """Check if user has a specific permission"""
-        # Superadmin has all permissions
-        if self.is_superadmin():
-            return True
-
-        # Check role-based permissions
-        role_has_perm = RolePermission.objects.filter(
-            role=self.role,
-            permission__name=permission_name
-        ).exists()
-
-        if role_has_perm:
-            return True
-
-        # Check user-specific permissions
-        user_perm = UserPermission.objects.filter(
-            user_profile=self,
-            permission__name=permission_name,
-            granted=True
-        ).exists()
-
-        return user_perm
+        """Check if user has a specific permission (no queries, see permission_matrix)"""
+        from api.utils.permission_matrix import permission_engine
+        return permission_engine.has_permission(self.role, self.id, permission_name)
 
     def get_permissions(self):
         """Get all permissions for this user"""
-        if self.is_superadmin():
-            return list(Permission.objects.all().values_list('name', flat=True))
-
-        # Get role permissions
-        role_perms = Permission.objects.filter(
-            role_permissions__role=self.role
-        ).values_list('name', flat=True)
-
-        # Get user-specific permissions
-        user_perms = Permission.objects.filter(
-            user_permissions__user_profile=self,
-            user_permissions__granted=True
-        ).values_list('name', flat=True)
-
-        # Combine and remove duplicates
-        all_perms = set(list(role_perms) + list(user_perms))
-        return list(all_perms)
+        from api.utils.permission_matrix import permission_engine
+        return list(permission_engine.permissions_for(self.role, self.id))
 
     def __str__(self):
         return f"{self.user.username}'s profile"
@@ -682,6 +655,70 @@ class UploadedFile(models.Model):
         return f"{size:.2f} PB"
 
 
+class BackgroundJob(models.Model):
+    """
+    Work executed outside the request/response cycle (large exports and
+    bulk voter updates)
+
+    Jobs run on a worker thread after the creating transaction commits, or
+    through `manage.py run_background_job <id>` (api/services/background_jobs.py).
+    Exports are downloaded through the API; other jobs report in result.
+    """
+    JOB_TYPE_CHOICES = [
+        ('export', 'Data Export'),
+        ('voter_bulk_update', 'Voter Bulk Update'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    job_type = models.CharField(max_length=20, choices=JOB_TYPE_CHOICES, default='export')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='background_jobs'
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='background_jobs'
+    )
+    parameters = models.JSONField(default=dict, blank=True, help_text="Job arguments")
+
+    # Result
+    result_path = models.CharField(max_length=500, blank=True, help_text="Produced file on local storage")
+    result_size = models.BigIntegerField(null=True, blank=True, help_text="Size in bytes")
+    row_count = models.BigIntegerField(default=0)
+    result = models.JSONField(default=dict, blank=True, help_text="Outcome details (e.g. per-id results)")
+    error = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_by', '-created_at']),
+            models.Index(fields=['status']),
+        ]
+        verbose_name = "Background Job"
+        verbose_name_plural = "Background Jobs"
+
+    def __str__(self):
+        return f"{self.get_job_type_display()} #{self.pk} ({self.status})"
+
+
 # ============================================================================
 # PHASE 2: POLITICAL CAMPAIGN DOMAIN MODELS
 # ============================================================================
@@ -792,7 +829,7 @@ class Constituency(models.Model):
         return f"{self.name} ({self.state_ref.name if self.state_ref else self.state})"
 
 
-class PollingBooth(models.Model):
+class PollingBooth(BoothRollupMixin, GeoPathMixin, models.Model):
     """
     Polling Booth model for voting locations
     """
@@ -816,6 +853,41 @@ class PollingBooth(models.Model):
         blank=True
     )
 
+    # Denormalized geographic path (derived from the fields above, see
+    # api/managers/geo_path_manager.py). No FK constraint or own index: rows
+    # are removed through the canonical hierarchy, and scope filters use the
+    # organization-prefixed indexes in Meta.
+    state = models.ForeignKey(
+        State,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+    zone = models.ForeignKey(
+        Zone,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+    district = models.ForeignKey(
+        District,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+
     # Basic Info
     name = models.CharField(max_length=200)
     code = models.CharField(max_length=50, db_index=True)
@@ -855,14 +927,64 @@ class PollingBooth(models.Model):
             models.Index(fields=['constituency', 'status']),
             models.Index(fields=['code']),
             models.Index(fields=['organization']),
+            models.Index(fields=['organization', 'state']),
+            models.Index(fields=['organization', 'zone']),
+            models.Index(fields=['organization', 'district']),
+            models.Index(fields=['organization', 'constituency']),
         ]
         unique_together = ['constituency', 'code']
 
+    objects = BoothRollupQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} - Booth #{self.booth_number}"
 
 
-class Voter(models.Model):
+class GeoHierarchyClosure(models.Model):
+    """
+    Closure table over State -> Zone -> District -> Constituency -> PollingBooth
+
+    One row per (ancestor, descendant) pair, including each node with itself
+    at depth 0. Nodes live in five tables, so each side is identified by its
+    level plus the row id. Maintained by api/utils/geo_closure.py.
+    """
+    LEVEL_CHOICES = [
+        ('state', 'State'),
+        ('zone', 'Zone'),
+        ('district', 'District'),
+        ('constituency', 'Constituency'),
+        ('booth', 'Polling Booth'),
+    ]
+
+    ancestor_level = models.CharField(max_length=12, choices=LEVEL_CHOICES)
+    ancestor_node = models.PositiveIntegerField()
+    descendant_level = models.CharField(max_length=12, choices=LEVEL_CHOICES)
+    descendant_node = models.PositiveIntegerField()
+    depth = models.PositiveSmallIntegerField(help_text="Edges between ancestor and descendant")
+
+    class Meta:
+        verbose_name = "Geographic Hierarchy Closure"
+        verbose_name_plural = "Geographic Hierarchy Closure"
+        constraints = [
+            # Also serves "all <level> under node X" lookups
+            models.UniqueConstraint(
+                fields=['ancestor_level', 'ancestor_node', 'descendant_level', 'descendant_node'],
+                name='geo_closure_unique_pair',
+            ),
+        ]
+        indexes = [
+            # "All ancestors of node Y"
+            models.Index(fields=['descendant_level', 'descendant_node', 'depth']),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.ancestor_level}:{self.ancestor_node} -> "
+            f"{self.descendant_level}:{self.descendant_node} ({self.depth})"
+        )
+
+
+class Voter(VoterRollupMixin, VoterSearchMixin, GeoPathMixin, models.Model):
     """
     Voter model for individual voter tracking
     """
@@ -912,6 +1034,51 @@ class Voter(models.Model):
         blank=True
     )
 
+    # Denormalized geographic path (derived from the fields above, see
+    # api/managers/geo_path_manager.py). No FK constraint or own index: rows
+    # are removed through the canonical hierarchy, and scope filters use the
+    # organization-prefixed indexes in Meta.
+    state = models.ForeignKey(
+        State,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+    zone = models.ForeignKey(
+        Zone,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+    district = models.ForeignKey(
+        District,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+    constituency = models.ForeignKey(
+        Constituency,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+
     # Personal Information
     full_name = models.CharField(max_length=200)
     voter_id_number = models.CharField(max_length=50, unique=True, db_index=True)
@@ -919,6 +1086,11 @@ class Voter(models.Model):
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
 
+    # Normalized search keys, derived from the fields above (voter_search_manager)
+    search_name = models.CharField(max_length=200, blank=True, editable=False)
+    epic_normalized = models.CharField(max_length=50, blank=True, db_index=True, editable=False)
+    phone_normalized = models.CharField(max_length=20, blank=True, db_index=True, editable=False)
+
     # Demographics
     age = models.IntegerField(null=True, blank=True)
     gender = models.CharField(max_length=20, choices=GENDER_CHOICES, default='undisclosed')
@@ -992,12 +1164,205 @@ class Voter(models.Model):
             models.Index(fields=['voter_id_number']),
             models.Index(fields=['sentiment', 'sentiment_score']),
             models.Index(fields=['first_time_voter']),
+            models.Index(fields=['organization', 'state']),
+            models.Index(fields=['organization', 'zone']),
+            models.Index(fields=['organization', 'district']),
+            models.Index(fields=['organization', 'constituency']),
+            # Keyset pagination in the default ordering
+            models.Index(fields=['organization', 'polling_booth', 'full_name', 'id']),
+            # Incremental refresh of the analytics cube (updated_at watermark)
+            models.Index(fields=['organization', 'updated_at']),
         ]
 
+    objects = VoterRollupQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.full_name} ({self.voter_id_number})"
 
 
+class VoterBoothRollup(models.Model):
+    """
+    Voter counters per (organization, polling booth)
+
+    Maintained incrementally on every voter write (see
+    api/managers/voter_rollup_manager.py) so statistics for any scope are a
+    sum over at most one row per booth. Repaired by reconcile_voter_rollups.
+    """
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='voter_rollups',
+        null=True,
+        blank=True
+    )
+    polling_booth = models.ForeignKey(
+        PollingBooth,
+        on_delete=models.CASCADE,
+        related_name='voter_rollups'
+    )
+
+    voter_count = models.IntegerField(default=0)
+
+    # By gender
+    gender_male = models.IntegerField(default=0)
+    gender_female = models.IntegerField(default=0)
+    gender_other = models.IntegerField(default=0)
+    gender_undisclosed = models.IntegerField(default=0)
+
+    # By voter category
+    voter_category_core_supporter = models.IntegerField(default=0)
+    voter_category_swing_voter = models.IntegerField(default=0)
+    voter_category_opposition = models.IntegerField(default=0)
+    voter_category_undecided = models.IntegerField(default=0)
+    voter_category_first_time = models.IntegerField(default=0)
+
+    # By sentiment
+    sentiment_strongly_positive = models.IntegerField(default=0)
+    sentiment_positive = models.IntegerField(default=0)
+    sentiment_neutral = models.IntegerField(default=0)
+    sentiment_negative = models.IntegerField(default=0)
+    sentiment_strongly_negative = models.IntegerField(default=0)
+    sentiment_undecided = models.IntegerField(default=0)
+
+    first_time_voters = models.IntegerField(default=0)
+    verified_voters = models.IntegerField(default=0)
+
+    # Sums for averages (age_count: voters with a known age)
+    age_count = models.IntegerField(default=0)
+    age_sum = models.BigIntegerField(default=0)
+    sentiment_score_sum = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Voter Booth Rollup"
+        verbose_name_plural = "Voter Booth Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'polling_booth'],
+                condition=models.Q(organization__isnull=False),
+                name='voter_rollup_unique_booth',
+            ),
+            # organization is nullable: one row per booth without one too
+            models.UniqueConstraint(
+                fields=['polling_booth'],
+                condition=models.Q(organization__isnull=True),
+                name='voter_rollup_unique_booth_no_organization',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Booth {self.polling_booth_id} ({self.voter_count} voters)"
+
+
+class VoterConstituencyRollup(models.Model):
+    """
+    Voter sentiment counters per (organization, constituency)
+
+    Receives the sentiment part of every VoterBoothRollup delta in the same
+    transaction (see api/managers/voter_rollup_manager.py), so constituency
+    sentiment is one row per constituency. Repaired from the booth rollups by
+    reconcile_voter_rollups.
+    """
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='voter_constituency_rollups',
+        null=True,
+        blank=True
+    )
+    constituency = models.ForeignKey(
+        Constituency,
+        on_delete=models.CASCADE,
+        related_name='voter_rollups'
+    )
+
+    voter_count = models.IntegerField(default=0)
+
+    # By sentiment
+    sentiment_strongly_positive = models.IntegerField(default=0)
+    sentiment_positive = models.IntegerField(default=0)
+    sentiment_neutral = models.IntegerField(default=0)
+    sentiment_negative = models.IntegerField(default=0)
+    sentiment_strongly_negative = models.IntegerField(default=0)
+    sentiment_undecided = models.IntegerField(default=0)
+
+    sentiment_score_sum = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Voter Constituency Rollup"
+        verbose_name_plural = "Voter Constituency Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'constituency'],
+                condition=models.Q(organization__isnull=False),
+                name='voter_rollup_unique_constituency',
+            ),
+            # organization is nullable: one row per constituency without one too
+            models.UniqueConstraint(
+                fields=['constituency'],
+                condition=models.Q(organization__isnull=True),
+                name='voter_rollup_unique_constituency_no_organization',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Constituency {self.constituency_id} ({self.voter_count} voters)"
+
+
+class BoundaryTopology(models.Model):
+    """
+    Simplified constituency boundaries of one organization at one zoom level
+
+    TopoJSON (shared arcs, quantized) built from Constituency.boundaries by
+    the build_boundary_topology command; organization NULL holds every
+    constituency (what superadmins see). Rebuild after boundaries change.
+    """
+    ZOOM_CHOICES = [
+        ('state', 'State'),
+        ('district', 'District'),
+        ('constituency', 'Constituency'),
+    ]
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='boundary_topologies',
+        null=True,
+        blank=True
+    )
+    zoom = models.CharField(max_length=20, choices=ZOOM_CHOICES)
+    source_version = models.CharField(
+        max_length=40,
+        help_text="geometry_version() of the constituencies it was built from"
+    )
+    topology = models.JSONField()
+    size = models.IntegerField(default=0, help_text="Serialized size in bytes")
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Boundary Topology"
+        verbose_name_plural = "Boundary Topologies"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'zoom'],
+                condition=models.Q(organization__isnull=False),
+                name='boundary_topology_unique_zoom',
+            ),
+            # organization is nullable: one shared topology per zoom too
+            models.UniqueConstraint(
+                fields=['zoom'],
+                condition=models.Q(organization__isnull=True),
+                name='boundary_topology_unique_zoom_no_organization',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.zoom} boundaries of organization {self.organization_id} ({self.size} bytes)"
+
+
 class Campaign(models.Model):
     """
     Campaign model for political campaigns
@@ -1310,13 +1675,15 @@ class VoterInteraction(models.Model):
             models.Index(fields=['voter', '-interaction_date']),
             models.Index(fields=['campaign']),
             models.Index(fields=['interaction_type']),
+            # Keyset pagination in the default ordering
+            models.Index(fields=['-interaction_date', '-id']),
         ]
 
     def __str__(self):
         return f"{self.voter.full_name} - {self.interaction_type} ({self.interaction_date.date()})"
 
 
-class SentimentAnalysis(models.Model):
+class SentimentAnalysis(SentimentRollupMixin, models.Model):
     """
     Sentiment Analysis model for AI-based sentiment tracking
     """
@@ -1385,6 +1752,8 @@ class SentimentAnalysis(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = SentimentRollupQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Sentiment Analysis"
@@ -1393,8 +1762,75 @@ class SentimentAnalysis(models.Model):
             models.Index(fields=['voter', '-created_at']),
             models.Index(fields=['constituency', '-created_at']),
             models.Index(fields=['organization', 'source']),
+            # Keyset pagination in the default ordering
+            models.Index(fields=['organization', '-created_at', '-id']),
         ]
 
     def __str__(self):
         target = self.voter.full_name if self.voter else self.constituency.name
         return f"Sentiment for {target}: {self.sentiment_score}"
+
+
+class SentimentRollup(models.Model):
+    """
+    Sentiment analysis counters per (organization, constituency, source) and
+    IST day or hour
+
+    Maintained with every analysis write in the same transaction (see
+    api/managers/sentiment_rollup_manager.py); sentiment trends are range
+    scans over these rows. Rebuilt by backfill_sentiment_rollups.
+    """
+    GRANULARITY_CHOICES = [
+        ('day', 'Day'),
+        ('hour', 'Hour'),
+    ]
+
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        related_name='sentiment_rollups'
+    )
+    constituency = models.ForeignKey(
+        Constituency,
+        on_delete=models.CASCADE,
+        related_name='sentiment_rollups',
+        null=True,
+        blank=True
+    )
+    source = models.CharField(max_length=30, choices=SentimentAnalysis.SOURCE_CHOICES)
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField(help_text="Start of the IST day or hour")
+
+    analysis_count = models.IntegerField(default=0)
+    positive_count = models.IntegerField(default=0)
+    negative_count = models.IntegerField(default=0)
+    neutral_count = models.IntegerField(default=0)
+    score_sum = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Sentiment Rollup"
+        verbose_name_plural = "Sentiment Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'constituency', 'source', 'granularity', 'bucket'],
+                condition=models.Q(constituency__isnull=False),
+                name='sentiment_rollup_unique_bucket',
+            ),
+            # Organization-wide analyses have no constituency: still one row per bucket
+            # (a partial index, as NULLs never collide in the constraint above)
+            models.UniqueConstraint(
+                fields=['organization', 'source', 'granularity', 'bucket'],
+                condition=models.Q(constituency__isnull=True),
+                name='sentiment_rollup_unique_bucket_no_constituency',
+            ),
+        ]
+        indexes = [
+            # Trend windows: organization-wide and platform-wide range scans
+            models.Index(fields=['organization', 'granularity', 'bucket']),
+            models.Index(fields=['granularity', 'bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.granularity} {self.bucket:%Y-%m-%d %H:%M} ({self.analysis_count} analyses)"
@@ -0,0 +1,361 @@
+"""
+Keyset (cursor) pagination for large list endpoints
+
+PageNumberPagination runs COUNT(*) and OFFSET, so page N costs O(N) and the
+count alone scans every row in scope. KeysetPagination instead remembers the
+sort key of the last row and asks for rows after it:
+
+    WHERE (interaction_date, id) < (:last_date, :last_id)
+    ORDER BY interaction_date DESC, id DESC LIMIT :page_size
+
+so every page costs the same index range scan as the first.
+
+- The key is the effective ordering (?ordering= / view.ordering /
+  Meta.ordering) plus the primary key as a unique tiebreaker. Foreign keys
+  sort by their id column, avoiding a join to the related table.
+- NULLs sort last, on every backend.
+- Responses carry next/previous cursor links and no count; ?count=approx
+  adds an estimate (planner row estimate on PostgreSQL, COUNT capped at
+  APPROX_COUNT_CAP elsewhere).
+- Requests with ?page= fall back to page-number pagination for existing
+  clients; those pages keep the OFFSET cost.
+
+Usage:
+    class VoterViewSet(viewsets.ModelViewSet):
+        pagination_class = KeysetPagination
+
+BoundedActionMixin gives custom @action list endpoints the same paginator,
+or a row-capped NDJSON stream on request.
+"""
+import base64
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import F, Q
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+# Counts above this are reported as "at least" on non-PostgreSQL backends
+APPROX_COUNT_CAP = 10000
+
+# Rows a streamed action response carries at most; full pulls go through exports
+STREAM_ROW_LIMIT = 10000
+# Rows serialized per batch while streaming
+STREAM_CHUNK_SIZE = 500
+
+
+class LegacyPageNumberPagination(PageNumberPagination):
+    """?page= / ?page_size= pagination kept for existing clients"""
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a multi-column sort key
+
+    Attributes:
+        page_size: Default rows per page (REST_FRAMEWORK PAGE_SIZE)
+        page_size_query_param: Query parameter overriding page_size
+        max_page_size: Upper bound for page_size_query_param
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    count_query_param = 'count'
+    legacy_query_param = 'page'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy = None
+        if self.legacy_query_param in request.query_params:
+            self.legacy = LegacyPageNumberPagination()
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.page_size = self.get_page_size(request)
+        self.keys = self.get_keys(queryset, view)
+        self.base_url = request.build_absolute_uri()
+        self.count = self.approximate_count(queryset) if self.wants_count(request) else None
+
+        position, reverse = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.order_expressions(self.keys, reverse))
+        if position is not None:
+            queryset = queryset.filter(self.after(self.keys, position, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Going forward, a previous page exists whenever we started from a
+        # cursor; going back, a next page always exists (the one we came from)
+        self.has_next = has_more if not reverse else True
+        self.has_previous = (position is not None) if not reverse else has_more
+        self.first_position = self.position_of(rows[0]) if rows else None
+        self.last_position = self.position_of(rows[-1]) if rows else None
+        if not rows and reverse:
+            self.has_next = False
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+
+        body = OrderedDict()
+        if self.count is not None:
+            body['count'] = self.count
+            body['count_is_estimate'] = True
+        body['next'] = self.get_next_link()
+        body['previous'] = self.get_previous_link()
+        body['results'] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'description': 'Approximate, with ?count=approx'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Sort key
+    # ------------------------------------------------------------------
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_keys(self, queryset, view):
+        """
+        [(column attname, descending, nullable)] ending with the primary key
+
+        Ordering terms that are not local fields (related lookups,
+        annotations) cannot be keyed and are dropped.
+        """
+        ordering = list(queryset.query.order_by) or list(getattr(view, 'ordering', None) or []) \
+            or list(queryset.model._meta.ordering)
+        opts = queryset.model._meta
+
+        keys = []
+        for term in ordering:
+            if not isinstance(term, str):
+                continue
+            descending = term.startswith('-')
+            name = term.lstrip('-')
+            try:
+                field = opts.pk if name == 'pk' else opts.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if not field.concrete or field.many_to_many or field.one_to_many:
+                continue
+            keys.append((field.attname, descending, field.null))
+            if field.primary_key or (field.unique and not field.null):
+                return keys
+
+        descending = keys[0][1] if keys else False
+        keys.append((opts.pk.attname, descending, False))
+        return keys
+
+    @staticmethod
+    def order_expressions(keys, reverse=False):
+        """ORDER BY for keys; reverse mirrors it (NULLs first) to walk backwards"""
+        expressions = []
+        for name, descending, nullable in keys:
+            descending ^= reverse
+            if nullable:
+                nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+                expressions.append(F(name).desc(**nulls) if descending else F(name).asc(**nulls))
+            else:
+                expressions.append(f'-{name}' if descending else name)
+        return expressions
+
+    @staticmethod
+    def after(keys, position, reverse=False):
+        """
+        Rows strictly after position in key order (before it when reverse)
+
+        Expanded row comparison: (a > x) OR (a = x AND b > y) OR ... with the
+        leading column also bounded on its own (a >= x) so the planner can
+        use an index range scan.
+        """
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, descending, nullable), value in zip(keys, position):
+            descending ^= reverse
+            if value is None:
+                # NULLs sort last going forward, first going back
+                greater = None if not reverse else Q(**{f'{name}__isnull': False})
+                same = Q(**{f'{name}__isnull': True})
+            else:
+                greater = Q(**{f'{name}__lt' if descending else f'{name}__gt': value})
+                if nullable and not reverse:
+                    greater |= Q(**{f'{name}__isnull': True})
+                same = Q(**{name: value})
+            if greater is not None:
+                condition |= equal & greater
+            equal &= same
+
+        leading_name, leading_descending, leading_nullable = keys[0]
+        if position[0] is not None and not leading_nullable:
+            leading_descending ^= reverse
+            bound = f'{leading_name}__lte' if leading_descending else f'{leading_name}__gte'
+            condition &= Q(**{bound: position[0]})
+        return condition
+
+    def position_of(self, obj):
+        return [getattr(obj, name) for name, _, _ in self.keys]
+
+    # ------------------------------------------------------------------
+    # Cursors
+    # ------------------------------------------------------------------
+
+    def key_signature(self):
+        return ','.join(('-' if descending else '') + name for name, descending, _ in self.keys)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps(
+            {'k': self.key_signature(), 'p': position, 'r': reverse},
+            default=_cursor_value, separators=(',', ':'),
+        )
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """(position or None, reverse)"""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            position, reverse = payload['p'], bool(payload['r'])
+            valid = payload['k'] == self.key_signature() and len(position) == len(self.keys)
+        except (TypeError, ValueError, KeyError):
+            valid = False
+        if not valid:
+            # Malformed, or issued for a different ?ordering=
+            raise NotFound('Invalid cursor')
+        return position, reverse
+
+    def get_next_link(self):
+        if not self.has_next or self.last_position is None:
+            return None
+        return self.encode_cursor(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_position is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_position, reverse=True)
+
+    # ------------------------------------------------------------------
+    # Approximate count
+    # ------------------------------------------------------------------
+
+    def wants_count(self, request):
+        return request.query_params.get(self.count_query_param) == 'approx'
+
+    @staticmethod
+    def approximate_count(queryset):
+        """
+        Row estimate for queryset
+
+        PostgreSQL: the planner's estimate from EXPLAIN (no rows read).
+        Elsewhere: COUNT over at most APPROX_COUNT_CAP rows.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        return queryset.order_by()[:APPROX_COUNT_CAP].count()
+
+
+def _cursor_value(value):
+    """JSON form of a key value, lossless (DjangoJSONEncoder drops microseconds)"""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f'Cannot encode {type(value).__name__} in a cursor')
+
+
+class BoundedActionMixin:
+    """
+    Bounded responses for custom @action list endpoints
+
+    list_response() returns one page of the view's paginator. With
+    ?stream=1 it streams NDJSON instead (one serialized row per line, read
+    and serialized STREAM_CHUNK_SIZE rows at a time) and stops after
+    STREAM_ROW_LIMIT rows; the limit is sent in the X-Row-Limit header.
+    Either way a request holds at most one page or chunk of rows.
+
+    Usage:
+        @action(detail=False, methods=['get'])
+        def active(self, request):
+            return self.list_response(self.get_queryset().filter(status='active'))
+    """
+    stream_query_param = 'stream'
+    stream_row_limit = STREAM_ROW_LIMIT
+
+    def list_response(self, queryset, serializer_class=None):
+        serializer_class = serializer_class or self.get_serializer_class()
+        context = self.get_serializer_context()
+
+        if self.request.query_params.get(self.stream_query_param, '').lower() in ('1', 'true', 'yes'):
+            return self.stream_response(queryset, serializer_class, context)
+
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            # Pagination disabled on this view: still never unbounded
+            page = queryset[:LegacyPageNumberPagination.max_page_size]
+            return Response(serializer_class(page, many=True, context=context).data)
+        return self.get_paginated_response(serializer_class(page, many=True, context=context).data)
+
+    def stream_response(self, queryset, serializer_class, context):
+        # Primary key tiebreaker: a stable order for clients resuming elsewhere
+        ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+        rows = queryset.order_by(*ordering, 'pk')[:self.stream_row_limit].iterator(chunk_size=STREAM_CHUNK_SIZE)
+        encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+        def lines():
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == STREAM_CHUNK_SIZE:
+                    yield from encode(batch)
+                    batch = []
+            if batch:
+                yield from encode(batch)
+
+        def encode(batch):
+            for item in serializer_class(batch, many=True, context=context).data:
+                yield encoder.encode(item) + '\n'
+
+        response = StreamingHttpResponse(lines(), content_type='application/x-ndjson')
+        response['X-Row-Limit'] = str(self.stream_row_limit)
+        return response
@@ -3,6 +3,7 @@ Custom permission classes for role-based access control
 Includes hierarchical permission checks and geographic scope validation
 """
 from rest_framework import permissions
+from api.utils.principal import get_principal
 from api.utils.visibility_scope import can_user_access_object, get_user_visibility_scope
 
 
@@ -14,20 +15,12 @@ class IsSuperAdmin(permissions.BasePermission):
 
     def has_permission(self, request, view):
         if not request.user or not request.user.is_authenticated:
-            print(f"[IsSuperAdmin] User not authenticated")
             return False
 
-        # Check directly from user profile instead of request attribute
+        # Check from the request principal instead of request attribute
         try:
-            has_profile = hasattr(request.user, 'profile')
-            print(f"[IsSuperAdmin] User: {request.user.username}, Has profile: {has_profile}")
-            if has_profile:
-                role = request.user.profile.role
-                print(f"[IsSuperAdmin] Role: {role}")
-                return role == 'superadmin'
-            return False
-        except Exception as e:
-            print(f"[IsSuperAdmin] Exception: {e}")
+            return get_principal(request.user).role == 'superadmin'
+        except Exception:
             return False
 
 
@@ -41,9 +34,9 @@ class IsAdminOrAbove(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        # Check directly from user profile instead of request attribute
+        # Check from the request principal instead of request attribute
         try:
-            return request.user.profile.role in ['admin', 'superadmin']
+            return get_principal(request.user).role in ['admin', 'superadmin']
         except Exception:
             return False
 
@@ -58,9 +51,9 @@ class IsAdmin(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        # Check directly from user profile instead of request attribute
+        # Check from the request principal instead of request attribute
         try:
-            return request.user.profile.role == 'admin'
+            return get_principal(request.user).role == 'admin'
         except Exception:
             return False
 
@@ -84,7 +77,7 @@ class IsOwnerOrAdminOrAbove(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         # Superadmins and admins can access everything
         try:
-            if request.user.profile.role in ['admin', 'superadmin']:
+            if get_principal(request.user).role in ['admin', 'superadmin']:
                 return True
         except Exception:
             pass
@@ -113,7 +106,7 @@ class CanManageUsers(permissions.BasePermission):
 
         # Superadmins and admins can access user management
         try:
-            return request.user.profile.role in ['admin', 'superadmin']
+            return get_principal(request.user).role in ['admin', 'superadmin']
         except Exception:
             return False
 
@@ -131,16 +124,15 @@ class CanManageUsers(permissions.BasePermission):
         elif hasattr(obj, 'role'):
             target_role = obj.role
 
+        role = get_principal(request.user).role
+
         # Superadmins can manage everyone
-        try:
-            if request.user.profile.role == 'superadmin':
-                return True
-        except Exception:
-            pass
+        if role == 'superadmin':
+            return True
 
         # Admins can only manage regular users (not other admins or superadmins)
         try:
-            if request.user.profile.role == 'admin':
+            if role == 'admin':
                 return target_role == 'user'
         except Exception:
             pass
@@ -158,9 +150,9 @@ class CanChangeRole(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        # Check directly from user profile
+        # Check from the request principal
         try:
-            return request.user.profile.role == 'superadmin'
+            return get_principal(request.user).role == 'superadmin'
         except Exception:
             return False
 
@@ -177,7 +169,7 @@ class ReadOnlyOrAdmin(permissions.BasePermission):
 
         # Write permissions only for admins and above
         try:
-            return request.user.profile.role in ['admin', 'superadmin']
+            return get_principal(request.user).role in ['admin', 'superadmin']
         except Exception:
             return False
 
@@ -227,10 +219,8 @@ class CanManageInScope(permissions.BasePermission):
             return False
 
         # Analysts cannot manage anything (read-only)
-        try:
-            if request.user.profile.role == 'analyst':
-                return False
-        except Exception:
+        principal = get_principal(request.user)
+        if not principal.has_profile or principal.role == 'analyst':
             return False
 
         return True
@@ -238,10 +228,8 @@ class CanManageInScope(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         """Check if user can manage this specific object"""
         # Analysts cannot manage anything
-        try:
-            if request.user.profile.role == 'analyst':
-                return False
-        except Exception:
+        principal = get_principal(request.user)
+        if not principal.has_profile or principal.role == 'analyst':
             return False
 
         return can_user_access_object(request.user, obj)
@@ -266,10 +254,7 @@ class CanCreateUsers(permissions.BasePermission):
             return False
 
         # Check if user can create other users
-        try:
-            return request.user.profile.can_create_users()
-        except Exception:
-            return False
+        return get_principal(request.user).can_create_users
 
 
 class HasGeographicScope(permissions.BasePermission):
@@ -290,54 +275,46 @@ class HasGeographicScope(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        try:
-            profile = request.user.profile
-            role = profile.role
+        principal = get_principal(request.user)
+        if not principal.has_profile:
+            return False
 
-            # SuperAdmin doesn't need geographic assignment
-            if role == 'superadmin':
-                return True
+        role = principal.role
+        state = principal.assigned_state_id is not None
+        zone = principal.assigned_zone_id is not None
+        district = principal.assigned_district_id is not None
+        constituency = principal.assigned_constituency_id is not None
+        booth = principal.assigned_booth_id is not None
 
-            # State Admin must have state
-            if role == 'state_admin':
-                return profile.assigned_state is not None
-
-            # Zone Admin must have zone and state
-            if role == 'zone_admin':
-                return profile.assigned_zone is not None and profile.assigned_state is not None
-
-            # District Admin must have district, zone, and state
-            if role == 'district_admin':
-                return (profile.assigned_district is not None and
-                        profile.assigned_zone is not None and
-                        profile.assigned_state is not None)
-
-            # Constituency Admin must have constituency and all parents
-            if role == 'constituency_admin':
-                return (profile.assigned_constituency is not None and
-                        profile.assigned_district is not None and
-                        profile.assigned_zone is not None and
-                        profile.assigned_state is not None)
-
-            # Booth Admin must have booth and all parents
-            if role == 'booth_admin':
-                return (profile.assigned_booth is not None and
-                        profile.assigned_constituency is not None and
-                        profile.assigned_district is not None and
-                        profile.assigned_zone is not None and
-                        profile.assigned_state is not None)
-
-            # Analyst must have at least one assignment
-            if role == 'analyst':
-                return (profile.assigned_booth is not None or
-                        profile.assigned_constituency is not None or
-                        profile.assigned_district is not None or
-                        profile.assigned_zone is not None or
-                        profile.assigned_state is not None)
+        # SuperAdmin doesn't need geographic assignment
+        if role == 'superadmin':
+            return True
 
-            return False
-        except Exception:
-            return False
+        # State Admin must have state
+        if role == 'state_admin':
+            return state
+
+        # Zone Admin must have zone and state
+        if role == 'zone_admin':
+            return zone and state
+
+        # District Admin must have district, zone, and state
+        if role == 'district_admin':
+            return district and zone and state
+
+        # Constituency Admin must have constituency and all parents
+        if role == 'constituency_admin':
+            return constituency and district and zone and state
+
+        # Booth Admin must have booth and all parents
+        if role == 'booth_admin':
+            return booth and constituency and district and zone and state
+
+        # Analyst must have at least one assignment
+        if role == 'analyst':
+            return booth or constituency or district or zone or state
+
+        return False
 
 
 class IsAnalystOrAbove(permissions.BasePermission):
@@ -350,7 +327,4 @@ class IsAnalystOrAbove(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        try:
-            return hasattr(request.user, 'profile')
-        except Exception:
-            return False
+        return get_principal(request.user).has_profile
@@ -3,8 +3,21 @@ from django.contrib.auth.models import User
 from .models import (
     UserProfile, Task, Permission, Notification, UploadedFile,
     Constituency, PollingBooth, Voter, Campaign, CampaignActivity,
-    Issue, VoterInteraction, SentimentAnalysis, Organization
+    Issue, VoterInteraction, SentimentAnalysis, Organization, BackgroundJob
 )
+from .utils.permission_matrix import permission_engine
+
+# Relations read by UserProfileSerializer; select them with the profile
+# (prefix 'profile__' when listing users) to keep lists at one query.
+PROFILE_RELATED_FIELDS = (
+    'user', 'organization', 'assigned_state', 'assigned_zone',
+    'assigned_district', 'assigned_constituency', 'assigned_booth',
+)
+
+
+def profile_select_related(prefix=''):
+    """select_related() paths for serializing profiles reached via prefix"""
+    return [f'{prefix}{field}' for field in PROFILE_RELATED_FIELDS]
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -42,9 +55,23 @@ class UserProfileSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at', 'permissions']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # One matrix snapshot and one list per distinct permission set for
+        # every row this serializer renders (list pages, nested profiles)
+        self._permission_matrix = None
+        self._permission_lists = {}
+
     def get_permissions(self, obj):
         """Get all permissions for this user"""
-        return obj.get_permissions()
+        if self._permission_matrix is None:
+            self._permission_matrix = permission_engine.matrix()
+
+        mask = self._permission_matrix.mask_for(obj.role, obj.id)
+        names = self._permission_lists.get(mask)
+        if names is None:
+            names = self._permission_lists[mask] = sorted(self._permission_matrix.names_for_mask(mask))
+        return names
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -337,6 +364,38 @@ class VoterSentimentUpdateSerializer(serializers.ModelSerializer):
         fields = ['sentiment', 'sentiment_score', 'sentiment_last_updated']
 
 
+class VoterBulkUpdateSerializer(serializers.ModelSerializer):
+    """
+    Validates the values of a voter bulk update (partial)
+
+    Identity, tenancy and placement (voter_id_number, organization,
+    polling_booth) cannot change in bulk; unknown fields are rejected rather
+    than ignored. One instance validates every row through run_validation().
+    """
+
+    class Meta:
+        model = Voter
+        fields = [
+            'full_name', 'phone', 'address', 'age', 'gender', 'caste_category', 'religion',
+            'occupation', 'education', 'family_size', 'voter_category', 'sentiment',
+            'sentiment_score', 'influencer_score', 'first_time_voter', 'verified',
+            'consent_given', 'contacted_by_party', 'last_contact_date', 'contact_method',
+            'notes', 'tags'
+        ]
+
+    def to_internal_value(self, data):
+        if isinstance(data, dict):
+            unknown = sorted(set(data) - set(self.fields))
+            if unknown:
+                raise serializers.ValidationError(
+                    {name: ['This field cannot be bulk updated.'] for name in unknown}
+                )
+        values = super().to_internal_value(data)
+        if not values:
+            raise serializers.ValidationError({'non_field_errors': ['No fields to update.']})
+        return values
+
+
 class CampaignSerializer(serializers.ModelSerializer):
     """Serializer for Campaign model"""
     constituency_name = serializers.CharField(source='constituency.name', read_only=True)
@@ -464,6 +523,26 @@ class SentimentAnalysisSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    """Serializer for BackgroundJob (status, result and export download link)"""
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            'id', 'job_type', 'status', 'parameters', 'row_count', 'result_size', 'result',
+            'error', 'download_url', 'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
+
+    def get_download_url(self, obj):
+        if obj.job_type != 'export' or obj.status != 'completed':
+            return None
+        path = f'/api/exports/{obj.pk}/download/'
+        request = self.context.get('request')
+        return request.build_absolute_uri(path) if request else path
+
+
 # Dashboard Statistics Serializers
 class DashboardStatsSerializer(serializers.Serializer):
     """Serializer for dashboard statistics"""
@@ -10,6 +10,10 @@ from .user_service import UserService
 from .organization_service import OrganizationService
 from .notification_service import NotificationService
 from .audit_service import AuditService
+from .voter_import_service import VoterImportService
+from .export_service import ExportService
+from .voter_bulk_update_service import VoterBulkUpdateService
+from .voter_analytics_service import VoterAnalyticsService
 
 __all__ = [
     'BaseService',
@@ -17,4 +21,8 @@ __all__ = [
     'OrganizationService',
     'NotificationService',
     'AuditService',
+    'VoterImportService',
+    'ExportService',
+    'VoterBulkUpdateService',
+    'VoterAnalyticsService',
 ]
@@ -0,0 +1,110 @@
+"""
+Background Job Runner
+
+Executes BackgroundJob rows outside the request/response cycle. The
+project has no task queue, so a job runs on a daemon thread once the
+transaction that created it commits; `manage.py run_background_job <id>`
+runs a pending job from another process instead (e.g. cron or a worker
+host).
+
+A job whose worker died (process restart, crash) stays `running`;
+reap_stale_jobs() marks jobs running for longer than
+BACKGROUND_JOB_STALE_MINUTES as failed, and runs from
+`manage.py run_background_job --pending` / `--cleanup`.
+
+Each job type maps to a handler that does the work and records its result
+on the job (result_path, row_count, result); run_job() owns the status
+transitions and error capture.
+
+Usage:
+    job = BackgroundJob.objects.create(job_type='export', parameters={...})
+    enqueue(job)
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from api.models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+# Job type -> handler(job), imported on first use
+JOB_HANDLERS = {
+    'export': 'api.services.export_service.run_export_job',
+    'voter_bulk_update': 'api.services.voter_bulk_update_service.run_bulk_update_job',
+}
+
+
+def enqueue(job: BackgroundJob):
+    """Start the job on a worker thread once the current transaction commits"""
+    transaction.on_commit(lambda: start_job(job.pk))
+
+
+def start_job(job_id: int):
+    """Run a job on a daemon thread"""
+    threading.Thread(target=_run_in_thread, args=(job_id,), name=f'background-job-{job_id}', daemon=True).start()
+
+
+def _run_in_thread(job_id: int):
+    try:
+        run_job(job_id)
+    finally:
+        connection.close()
+
+
+def run_job(job_id: int) -> Optional[BackgroundJob]:
+    """
+    Execute a pending job and record the outcome
+
+    The pending -> running transition is a conditional UPDATE, so a job is
+    only ever executed once even if started twice.
+
+    Returns:
+        The finished job, or None if it was not pending
+    """
+    claimed = BackgroundJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=timezone.now()
+    )
+    if not claimed:
+        return None
+
+    job = BackgroundJob.objects.select_related('created_by', 'organization').get(pk=job_id)
+    try:
+        import_string(JOB_HANDLERS[job.job_type])(job)
+    except Exception as e:
+        logger.exception(f"Background job {job_id} ({job.job_type}) failed")
+        job.status = 'failed'
+        job.error = getattr(e, 'message', str(e))
+    else:
+        job.status = 'completed'
+    job.finished_at = timezone.now()
+    job.save(update_fields=[
+        'status', 'error', 'result_path', 'result_size', 'row_count', 'result', 'finished_at',
+    ])
+    return job
+
+
+def reap_stale_jobs(now=None) -> int:
+    """
+    Mark jobs left running by a dead worker as failed
+
+    Returns:
+        Number of jobs marked failed
+    """
+    now = now or timezone.now()
+    stale_before = now - timedelta(minutes=settings.BACKGROUND_JOB_STALE_MINUTES)
+    reaped = BackgroundJob.objects.filter(status='running', started_at__lt=stale_before).update(
+        status='failed',
+        error=f'Worker stopped: still running after {settings.BACKGROUND_JOB_STALE_MINUTES} minutes',
+        finished_at=now,
+    )
+    if reaped:
+        logger.warning(f"Marked {reaped} stale background jobs as failed")
+    return reaped
@@ -9,6 +9,7 @@ import logging
 from typing import Optional, Dict, Any
 from django.db import transaction
 from django.contrib.auth.models import User
+from api.utils.principal import get_principal
 
 logger = logging.getLogger(__name__)
 
@@ -111,14 +112,15 @@ class BaseService:
         """
         self.validate_user_authenticated()
 
-        if not hasattr(self.user, 'profile'):
+        principal = get_principal(self.user)
+        if not principal.has_profile:
             raise ServiceException(
                 message="User profile not found",
                 code='profile_not_found',
                 status=403
             )
 
-        if not self.user.profile.has_permission(permission_name):
+        if not principal.has_permission(permission_name):
             raise ServiceException(
                 message=f"Permission denied: {permission_name}",
                 code='permission_denied',
@@ -0,0 +1,389 @@
+"""
+Export Service
+
+Streams voters, voter interactions and sentiment records as CSV or NDJSON,
+optionally gzip-compressed, in bounded memory:
+
+- Rows are read with values_list(...).iterator(chunk_size=...), a
+  server-side cursor on PostgreSQL, so no more than one chunk is held.
+- Encoded rows are buffered up to STREAM_BUFFER_SIZE bytes and then yielded
+  (through zlib when compressing).
+- The queryset is restricted to the caller's organization and visibility
+  scope before any row is read; only allow-listed fields can be selected.
+
+Small exports are streamed straight to the client (StreamingHttpResponse);
+large ones run as a BackgroundJob that writes to EXPORT_ROOT and is
+downloaded when finished. cleanup_exports() deletes those files
+EXPORT_RETENTION_HOURS after their job finished, along with files left by
+failed jobs.
+
+Usage:
+    service = ExportService(user=request.user)
+    export = service.prepare('voters', fields=['full_name', 'phone'], file_format='csv', compress=True)
+    response = StreamingHttpResponse(export.stream(), content_type=export.content_type)
+
+    job = service.create_job('voters', file_format='ndjson')  # runs after commit
+"""
+
+import csv
+import datetime
+import io
+import json
+import logging
+import os
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from api.models import BackgroundJob, SentimentAnalysis, Voter, VoterInteraction
+from api.utils.principal import get_principal
+from api.utils.visibility_scope import get_visibility_scope
+from .background_jobs import enqueue
+from .base_service import BaseService, ServiceException
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+ITERATOR_CHUNK_SIZE = 2000
+STREAM_BUFFER_SIZE = 64 * 1024
+GZIP_LEVEL = 6
+
+# Columns never exported (derived search keys, free-form metadata)
+EXCLUDED_FIELDS = {'search_name', 'epic_normalized', 'phone_normalized', 'metadata'}
+
+# Dataset -> model, organization column, default columns, extra related
+# columns and exact-match filters accepted from the request
+DATASETS = {
+    'voters': {
+        'model': Voter,
+        'organization_field': 'organization_id',
+        'default_fields': (
+            'id', 'voter_id_number', 'epic_number', 'full_name', 'age', 'gender', 'phone',
+            'polling_booth__booth_number', 'constituency__name', 'voter_category',
+            'sentiment', 'sentiment_score',
+        ),
+        'related_fields': (
+            'polling_booth__name', 'polling_booth__booth_number',
+            'constituency__name', 'constituency__code', 'district__name', 'state__name',
+        ),
+        'filters': (
+            'polling_booth', 'constituency', 'district', 'sentiment', 'voter_category',
+            'gender', 'first_time_voter',
+        ),
+    },
+    'interactions': {
+        'model': VoterInteraction,
+        'organization_field': 'voter__organization_id',
+        'default_fields': (
+            'id', 'voter__voter_id_number', 'voter__full_name', 'interaction_type',
+            'interaction_date', 'subject', 'sentiment_before', 'sentiment_after',
+            'successful', 'follow_up_required', 'follow_up_date',
+        ),
+        'related_fields': (
+            'voter__voter_id_number', 'voter__full_name', 'campaign__name', 'conducted_by__username',
+        ),
+        'filters': ('voter', 'campaign', 'interaction_type', 'successful', 'follow_up_required'),
+    },
+    'sentiment': {
+        'model': SentimentAnalysis,
+        'organization_field': 'organization_id',
+        'default_fields': (
+            'id', 'voter__voter_id_number', 'constituency__name', 'source',
+            'sentiment_score', 'confidence', 'keywords', 'created_at',
+        ),
+        'related_fields': ('voter__voter_id_number', 'voter__full_name', 'constituency__name'),
+        'filters': ('voter', 'constituency', 'source'),
+    },
+}
+
+
+def allowed_fields(dataset: str) -> List[str]:
+    """Exportable columns of a dataset: local fields plus its related columns"""
+    spec = DATASETS[dataset]
+    local = [
+        field.attname for field in spec['model']._meta.concrete_fields
+        if field.attname not in EXCLUDED_FIELDS
+    ]
+    return local + list(spec['related_fields'])
+
+
+# ============================================================
+# Encoding
+# ============================================================
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class Export:
+    """
+    A prepared export: the scoped queryset plus its encoding
+
+    Attributes:
+        fields: Selected columns, in output order
+        file_format: 'csv' or 'ndjson'
+        compress: gzip the output
+        row_count: Rows written so far (complete once the stream is exhausted)
+    """
+
+    def __init__(self, dataset: str, queryset, fields: List[str], file_format: str,
+                 compress: bool = False, chunk_size: int = ITERATOR_CHUNK_SIZE):
+        self.dataset = dataset
+        self.queryset = queryset
+        self.fields = fields
+        self.file_format = file_format
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.row_count = 0
+
+    @property
+    def content_type(self) -> str:
+        return 'application/gzip' if self.compress else FORMATS[self.file_format][0]
+
+    @property
+    def filename(self) -> str:
+        stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+        extension = FORMATS[self.file_format][1] + ('.gz' if self.compress else '')
+        return f'{self.dataset}-{stamp}.{extension}'
+
+    def rows(self) -> Iterator[tuple]:
+        return self.queryset.values_list(*self.fields).iterator(chunk_size=self.chunk_size)
+
+    def encoded(self) -> Iterator[bytes]:
+        """Uncompressed output in chunks of about STREAM_BUFFER_SIZE bytes"""
+        buffer = io.StringIO()
+        as_csv = self.file_format == 'csv'
+        if as_csv:
+            writer = csv.writer(buffer)
+            writer.writerow(self.fields)
+        else:
+            encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+        for row in self.rows():
+            if as_csv:
+                writer.writerow([_csv_value(value) for value in row])
+            else:
+                buffer.write(encoder.encode(dict(zip(self.fields, row))))
+                buffer.write('\n')
+            self.row_count += 1
+            if buffer.tell() >= STREAM_BUFFER_SIZE:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+
+    def stream(self) -> Iterator[bytes]:
+        """Output chunks, gzip-compressed when requested"""
+        if not self.compress:
+            yield from self.encoded()
+            return
+
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+        for chunk in self.encoded():
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    def write_to(self, file) -> int:
+        """Write the whole export to a binary file object; returns bytes written"""
+        size = 0
+        for chunk in self.stream():
+            file.write(chunk)
+            size += len(chunk)
+        return size
+
+
+# ============================================================
+# Service
+# ============================================================
+
+class ExportService(BaseService):
+    """Service class for data exports"""
+
+    @staticmethod
+    def _dataset(dataset: str) -> Dict:
+        if dataset not in DATASETS:
+            raise ServiceException(
+                message=f"Unknown dataset '{dataset}' (expected {', '.join(DATASETS)})",
+                code='unknown_dataset',
+                status=400
+            )
+        return DATASETS[dataset]
+
+    @staticmethod
+    def _filter_value(model, name: str, value):
+        """
+        Coerce a request filter value to the field's Python type
+
+        Raises:
+            ServiceException: The value is not valid for the field
+        """
+        if isinstance(value, str) and value.lower() in ('true', 'false'):
+            value = value.lower() == 'true'
+        try:
+            return model._meta.get_field(name).to_python(value)
+        except (ValueError, TypeError, ValidationError):
+            raise ServiceException(
+                message=f"Invalid value for filter '{name}': {value!r}",
+                code='invalid_filter',
+                status=400
+            )
+
+    def queryset(self, dataset: str, filters: Optional[Dict] = None):
+        """
+        Rows of a dataset visible to the service's user
+
+        With a user: superadmins see everything, others their organization
+        within their visibility scope. Without a user (management command),
+        rows are limited to the service's organization, if any.
+        """
+        spec = self._dataset(dataset)
+        queryset = spec['model']._default_manager.order_by()
+
+        if self.user is not None:
+            principal = get_principal(self.user)
+            if not principal.is_superadmin:
+                if not principal.organization_id:
+                    return queryset.none()
+                queryset = queryset.filter(**{spec['organization_field']: principal.organization_id})
+            queryset = get_visibility_scope(self.user).filter(queryset)
+        elif self.organization is not None:
+            queryset = queryset.filter(**{spec['organization_field']: self.organization.id})
+
+        for name, value in (filters or {}).items():
+            if name not in spec['filters']:
+                raise ServiceException(
+                    message=f"Unsupported filter '{name}' for {dataset}",
+                    code='invalid_filter',
+                    status=400
+                )
+            queryset = queryset.filter(**{name: self._filter_value(spec['model'], name, value)})
+
+        # Primary-key order: stable, and an index scan for the cursor
+        return queryset.order_by('pk')
+
+    def prepare(self, dataset: str, fields: Optional[Iterable[str]] = None, file_format: str = 'csv',
+                compress: bool = False, filters: Optional[Dict] = None) -> Export:
+        """
+        Validate export options and build the Export
+
+        Raises:
+            ServiceException: Unknown dataset, format, field or filter
+        """
+        spec = self._dataset(dataset)
+        if file_format not in FORMATS:
+            raise ServiceException(
+                message=f"Unsupported format '{file_format}' (expected {', '.join(FORMATS)})",
+                code='unsupported_format',
+                status=400
+            )
+
+        fields = list(fields or spec['default_fields'])
+        unknown = [name for name in fields if name not in allowed_fields(dataset)]
+        if unknown:
+            raise ServiceException(
+                message=f"Unknown fields for {dataset}: {', '.join(unknown)}",
+                code='invalid_fields',
+                status=400
+            )
+
+        return Export(dataset, self.queryset(dataset, filters), fields, file_format, compress)
+
+    # ------------------------------------------------------------------
+    # Background jobs
+    # ------------------------------------------------------------------
+
+    def create_job(self, dataset: str, fields: Optional[Iterable[str]] = None, file_format: str = 'csv',
+                   compress: bool = False, filters: Optional[Dict] = None) -> BackgroundJob:
+        """
+        Queue an export to run in the background (see background_jobs)
+
+        Options are validated up front, so a bad request fails here rather
+        than in the job.
+        """
+        export = self.prepare(dataset, fields, file_format, compress, filters)
+        principal = get_principal(self.user) if self.user is not None else None
+        job = BackgroundJob.objects.create(
+            job_type='export',
+            created_by=self.user,
+            organization_id=principal.organization_id if principal else getattr(self.organization, 'id', None),
+            parameters={
+                'dataset': dataset,
+                'fields': export.fields,
+                'file_format': file_format,
+                'compress': compress,
+                'filters': filters or {},
+            },
+        )
+        enqueue(job)
+        self.log_action('Export job queued', {'job_id': job.pk, 'dataset': dataset})
+        return job
+
+
+def run_export_job(job: BackgroundJob):
+    """Background job handler: write the export to EXPORT_ROOT (see background_jobs)"""
+    if job.created_by is None:
+        raise ServiceException(message='The user who queued this export no longer exists', code='no_user')
+    service = ExportService(user=job.created_by, organization=job.organization)
+    export = service.prepare(**job.parameters)
+    os.makedirs(settings.EXPORT_ROOT, exist_ok=True)
+    path = os.path.join(settings.EXPORT_ROOT, f'{job.pk}-{export.filename}')
+    with open(path, 'wb') as file:
+        job.result_size = export.write_to(file)
+    job.result_path = path
+    job.row_count = export.row_count
+
+
+def cleanup_exports(now=None) -> int:
+    """
+    Delete export files past EXPORT_RETENTION_HOURS
+
+    Expired jobs keep their row (downloads answer 410) but lose result_path;
+    files in EXPORT_ROOT that no job refers to (failed or reaped jobs) are
+    deleted once they are as old.
+
+    Returns:
+        Number of files deleted
+    """
+    now = now or timezone.now()
+    cutoff = now - datetime.timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+    expired = BackgroundJob.objects.filter(job_type='export', finished_at__lt=cutoff).exclude(result_path='')
+    paths = set(expired.values_list('result_path', flat=True))
+    expired.update(result_path='')
+
+    if os.path.isdir(settings.EXPORT_ROOT):
+        kept = set(
+            BackgroundJob.objects.filter(job_type='export').exclude(result_path='').values_list('result_path', flat=True)
+        )
+        for entry in os.scandir(settings.EXPORT_ROOT):
+            if (entry.is_file() and entry.path not in kept
+                    and entry.stat().st_mtime < cutoff.timestamp()):
+                paths.add(entry.path)
+
+    deleted = 0
+    for path in paths:
+        try:
+            os.remove(path)
+            deleted += 1
+        except FileNotFoundError:
+            pass
+    if deleted:
+        logger.info(f"Deleted {deleted} expired export files")
+    return deleted
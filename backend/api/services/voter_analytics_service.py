@@ -0,0 +1,395 @@
+"""
+Voter Analytics Service
+
+Crosstabs (gender x sentiment x voter_category x booth x age band, ...) are
+answered from an in-process columnar cube instead of a GROUP BY per question:
+
+- One VoterCube per organization holds every voter as one small integer
+  code per dimension (dictionary-encoded NumPy arrays) plus the sentiment
+  score, streamed in with values_list().
+- Filters are boolean masks and a group-by is one bincount over the
+  combined codes of the grouped dimensions.
+- Before each query the cube applies the voters updated since its
+  updated_at watermark. A voter count that disagrees with the booth
+  rollups (deletions) triggers a full reload, and cubes are dropped after
+  CUBE_MAX_AGE seconds, which picks up writes that bypass updated_at.
+- Results are restricted to the user's visibility scope. Cells of caste or
+  religion breakdowns with fewer than SMALL_CELL_THRESHOLD voters are
+  suppressed.
+
+NumPy is optional; without it crosstabs fail with a 501.
+
+Usage:
+    VoterAnalyticsService(user=request.user).crosstab(
+        ['gender', 'sentiment'], {'booth': ['12']}
+    )
+"""
+
+import logging
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from django.db.models import Sum
+
+from api.models import Voter, VoterBoothRollup
+from api.utils.cache import TTLCache
+from api.utils.principal import get_principal
+from api.utils.visibility_scope import get_visibility_scope, parse_id
+from .base_service import BaseService, ServiceException
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+CUBE_CHUNK_SIZE = 5000
+CUBE_MAX_AGE = 3600
+CUBE_MAX_ORGANIZATIONS = 16
+
+MAX_GROUP_BY = 5
+# Above this many possible cells, group-bys count only the cells present
+MAX_DENSE_CELLS = 1_000_000
+
+SMALL_CELL_THRESHOLD = 10
+SENSITIVE_DIMENSIONS = frozenset({'caste_category', 'religion'})
+
+# Dimension -> Voter column it is encoded from
+DIMENSIONS = {
+    'gender': 'gender',
+    'sentiment': 'sentiment',
+    'voter_category': 'voter_category',
+    'caste_category': 'caste_category',
+    'religion': 'religion',
+    'age_band': 'age',
+    'first_time_voter': 'first_time_voter',
+    'verified': 'verified',
+    'state': 'state_id',
+    'zone': 'zone_id',
+    'district': 'district_id',
+    'constituency': 'constituency_id',
+    'booth': 'polling_booth_id',
+}
+
+ID_DIMENSIONS = frozenset({'state', 'zone', 'district', 'constituency', 'booth'})
+BOOLEAN_DIMENSIONS = frozenset({'first_time_voter', 'verified'})
+TRUE_VALUES = ('1', 'true', 'yes')
+
+AGE_BANDS = ((18, 25), (26, 35), (36, 45), (46, 60))
+
+
+def age_band(age: Optional[int]) -> Optional[str]:
+    """Band label of an age ('18-25' ... '61+'), None when unknown"""
+    if age is None:
+        return None
+    if age < AGE_BANDS[0][0]:
+        return f'under {AGE_BANDS[0][0]}'
+    for low, high in AGE_BANDS:
+        if age <= high:
+            return f'{low}-{high}'
+    return f'{AGE_BANDS[-1][1] + 1}+'
+
+
+def _code_dtype(size):
+    """Smallest unsigned dtype holding codes 0..size-1"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if size <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.uint64
+
+
+class Dictionary:
+    """Value <-> code mapping of one dimension; codes follow arrival order"""
+
+    def __init__(self):
+        self.labels = []
+        self.codes = {}
+
+    def encode(self, value) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.labels)
+            self.labels.append(value)
+        return code
+
+
+class VoterCube:
+    """
+    Columnar copy of one organization's voters
+
+    Rows are kept in primary-key order. Callers hold lock around refresh()
+    and query().
+    """
+
+    def __init__(self, organization_id: int):
+        self.organization_id = organization_id
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.watermark = None
+        self.dictionaries = {}
+        self.pks = self.scores = None
+        self.codes = {}
+
+    def _voters(self):
+        return Voter.objects.filter(organization_id=self.organization_id).order_by('pk')
+
+    def _read(self, queryset):
+        """Stream queryset into (pks, scores, {dimension: codes}) arrays; advances the watermark"""
+        pks, scores = array('q'), array('f')
+        codes = {name: array('q') for name in DIMENSIONS}
+        encoders = [(codes[name].append, self.dictionaries[name].encode) for name in DIMENSIONS]
+        age_position = list(DIMENSIONS).index('age_band')
+
+        rows = queryset.values_list('pk', 'updated_at', 'sentiment_score', *DIMENSIONS.values())
+        for row in rows.iterator(chunk_size=CUBE_CHUNK_SIZE):
+            pks.append(row[0])
+            if self.watermark is None or row[1] > self.watermark:
+                self.watermark = row[1]
+            scores.append(float(row[2] or 0))
+            values = list(row[3:])
+            values[age_position] = age_band(values[age_position])
+            for (append, encode), value in zip(encoders, values):
+                append(encode(value))
+
+        return (
+            np.asarray(pks, dtype=np.int64),
+            np.asarray(scores, dtype=np.float32),
+            {
+                name: np.asarray(values, dtype=_code_dtype(len(self.dictionaries[name].labels)))
+                for name, values in codes.items()
+            },
+        )
+
+    def load(self):
+        """Read every voter of the organization"""
+        started = time.monotonic()
+        self.watermark = None
+        self.dictionaries = {name: Dictionary() for name in DIMENSIONS}
+        self.pks, self.scores, self.codes = self._read(self._voters())
+        self.loaded = True
+        logger.info(
+            f"Loaded voter cube for organization {self.organization_id}: "
+            f"{self.pks.size} voters in {time.monotonic() - started:.2f}s"
+        )
+
+    def refresh(self):
+        """
+        Apply voters updated since the watermark
+
+        Reloads everything when the row count disagrees with the booth rollups
+        (voters deleted or moved to another organization).
+        """
+        if not self.loaded:
+            self.load()
+            return
+
+        if self.watermark is not None:
+            pks, scores, codes = self._read(self._voters().filter(updated_at__gte=self.watermark))
+            if pks.size:
+                self._apply(pks, scores, codes)
+
+        live = VoterBoothRollup.objects.filter(
+            organization_id=self.organization_id
+        ).aggregate(total=Sum('voter_count'))['total'] or 0
+        if live != self.pks.size:
+            self.load()
+
+    def _apply(self, pks, scores, codes):
+        """Overwrite rows already in the cube, append the others"""
+        positions = np.searchsorted(self.pks, pks)
+        existing = positions < self.pks.size
+        existing[existing] = self.pks[positions[existing]] == pks[existing]
+        targets, new = positions[existing], ~existing
+
+        for name, values in codes.items():
+            column = self.codes[name]
+            if column.dtype != values.dtype:
+                column = column.astype(values.dtype)
+            column[targets] = values[existing]
+            self.codes[name] = np.concatenate([column, values[new]])
+        self.scores[targets] = scores[existing]
+        self.scores = np.concatenate([self.scores, scores[new]])
+        self.pks = np.concatenate([self.pks, pks[new]])
+
+        if new.any() and self.pks.size > 1 and not (np.diff(self.pks) > 0).all():
+            order = np.argsort(self.pks, kind='stable')
+            self.pks, self.scores = self.pks[order], self.scores[order]
+            self.codes = {name: column[order] for name, column in self.codes.items()}
+
+    def query(self, group_by: List[str], conditions: List) -> List:
+        """
+        Counts and score sums per combination of group_by labels
+
+        Args:
+            group_by: Dimensions to group by (may be empty)
+            conditions: [(dimension, labels)]; rows must match every condition
+
+        Returns:
+            list: [(labels tuple, count, sentiment score sum)], largest first
+        """
+        mask = np.ones(self.pks.size, dtype=bool)
+        for name, labels in conditions:
+            dictionary = self.dictionaries[name]
+            wanted = [dictionary.codes[label] for label in labels if label in dictionary.codes]
+            mask &= np.isin(self.codes[name], np.asarray(wanted, dtype=self.codes[name].dtype))
+
+        weights = self.scores[mask]
+        if not group_by:
+            return [((), int(mask.sum()), float(weights.sum(dtype=np.float64)))]
+
+        sizes = tuple(max(len(self.dictionaries[name].labels), 1) for name in group_by)
+        flat = np.ravel_multi_index([self.codes[name][mask].astype(np.intp) for name in group_by], sizes)
+        cells = int(np.prod(sizes, dtype=np.int64))
+        if cells <= MAX_DENSE_CELLS:
+            counts = np.bincount(flat, minlength=cells)
+            sums = np.bincount(flat, weights=weights, minlength=cells)
+            present = np.flatnonzero(counts)
+            counts, sums = counts[present], sums[present]
+        else:
+            present, inverse = np.unique(flat, return_inverse=True)
+            counts = np.bincount(inverse)
+            sums = np.bincount(inverse, weights=weights)
+
+        order = np.argsort(-counts, kind='stable')
+        coordinates = np.unravel_index(present[order], sizes)
+        labels = [
+            [self.dictionaries[name].labels[code] for code in codes.tolist()]
+            for name, codes in zip(group_by, coordinates)
+        ]
+        return [
+            (tuple(column[index] for column in labels), count, total)
+            for index, (count, total) in enumerate(zip(counts[order].tolist(), sums[order].tolist()))
+        ]
+
+
+_cubes = TTLCache(max_entries=CUBE_MAX_ORGANIZATIONS, default_ttl=CUBE_MAX_AGE)
+_cubes_lock = threading.Lock()
+
+
+def get_cube(organization_id: int) -> VoterCube:
+    """The cached cube of an organization (loaded on first refresh)"""
+    cube = _cubes.get(organization_id)
+    if cube is None:
+        with _cubes_lock:
+            cube = _cubes.get(organization_id)
+            if cube is None:
+                cube = VoterCube(organization_id)
+                _cubes.set(organization_id, cube)
+    return cube
+
+
+def clear_cubes():
+    """Drop every cached cube"""
+    _cubes.clear()
+
+
+class VoterAnalyticsService(BaseService):
+    """Service class for voter crosstabs"""
+
+    def crosstab(self, group_by: List[str], filters: Dict[str, List[str]],
+                 organization_id=None) -> Dict:
+        """
+        Voter counts and average sentiment per combination of group_by labels
+
+        Args:
+            group_by: Dimension names (see DIMENSIONS)
+            filters: {dimension: accepted labels (strings, as in query params)}
+            organization_id: Organization to analyse (superadmins only)
+
+        Returns:
+            dict: group_by, filters, total, cells ([{dimension: label, ...,
+            count, avg_sentiment_score}]), suppressed_cells, as_of
+        """
+        if np is None:
+            raise ServiceException(message='Voter analytics requires numpy', code='numpy_unavailable', status=501)
+
+        organization_id = self._organization_id(organization_id)
+        self._check_dimensions(group_by, filters)
+        conditions = [(name, self._parse_labels(name, labels)) for name, labels in filters.items()]
+        applied_filters = dict(conditions)
+
+        scope = get_visibility_scope(self.user)
+        if not scope.is_platform:
+            if scope.level_id is None:
+                conditions.append(('booth', []))
+            else:
+                conditions.append((scope.level, [scope.level_id]))
+
+        cube = get_cube(organization_id)
+        with cube.lock:
+            cube.refresh()
+            rows = cube.query(group_by, conditions)
+            as_of = cube.watermark
+
+        sensitive = bool(SENSITIVE_DIMENSIONS & (set(group_by) | set(filters)))
+        cells, suppressed = [], 0
+        for labels, count, score_sum in rows:
+            cell = dict(zip(group_by, labels))
+            if sensitive and count < SMALL_CELL_THRESHOLD:
+                cell.update(count=None, avg_sentiment_score=None, suppressed=True)
+                suppressed += 1
+            else:
+                cell.update(count=count, avg_sentiment_score=round(score_sum / count, 3) if count else None)
+            cells.append(cell)
+
+        if not group_by:
+            total = cells[0]['count']
+            cells = []
+        elif sensitive and suppressed:
+            # The total minus the visible cells would reveal suppressed ones
+            total = None
+        else:
+            total = sum(count for _, count, _ in rows)
+
+        return {
+            'organization': organization_id,
+            'group_by': group_by,
+            'filters': applied_filters,
+            'total': total,
+            'cells': cells,
+            'suppressed_cells': suppressed,
+            'as_of': as_of,
+        }
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _organization_id(self, requested):
+        principal = get_principal(self.user)
+        if principal.is_superadmin:
+            organization_id = parse_id(requested) if requested else principal.organization_id
+            if organization_id is None:
+                raise ServiceException(message='organization parameter required', code='organization_required')
+            return organization_id
+        if not principal.organization_id:
+            raise ServiceException(message='No organization assigned', code='no_organization', status=403)
+        return principal.organization_id
+
+    @staticmethod
+    def _check_dimensions(group_by, filters):
+        unknown = sorted((set(group_by) | set(filters)) - set(DIMENSIONS))
+        if unknown:
+            raise ServiceException(
+                message=f"Unknown dimensions: {', '.join(unknown)}. Available: {', '.join(DIMENSIONS)}",
+                code='invalid_dimension',
+            )
+        if len(set(group_by)) != len(group_by) or len(group_by) > MAX_GROUP_BY:
+            raise ServiceException(
+                message=f'group_by takes up to {MAX_GROUP_BY} distinct dimensions', code='invalid_group_by'
+            )
+
+    @staticmethod
+    def _parse_labels(name, labels):
+        """Query-string labels as the cube stores them"""
+        if name in ID_DIMENSIONS:
+            ids = [parse_id(label) for label in labels]
+            if None in ids:
+                raise ServiceException(message=f'{name} expects ids', code='invalid_filter')
+            return ids
+        if name in BOOLEAN_DIMENSIONS:
+            return [label.lower() in TRUE_VALUES for label in labels]
+        return list(labels)
@@ -0,0 +1,259 @@
+"""
+Voter Bulk Update Service
+
+Applies one set of values to many voters, or different values per voter:
+
+    uniform: {"voter_ids": [1, 2, 3], "data": {"sentiment": "positive"}}
+    per row: {"updates": [{"id": 1, "age": 40}, {"id": 2, "verified": true}]}
+
+1. Values are validated through VoterBulkUpdateSerializer (allow-listed
+   fields only); invalid rows are reported and skipped.
+2. Ids outside the user's organization or geographic scope are rejected.
+3. Writes run in primary-key order, BULK_UPDATE_CHUNK_SIZE rows per
+   transaction, so no statement locks more than one chunk of rows:
+   QuerySet.update() for uniform values, bulk_update() for per-row values.
+4. One AuditLog record describes the whole request.
+
+Requests above BULK_UPDATE_ASYNC_THRESHOLD rows run as a BackgroundJob
+(see background_jobs) whose result holds the same per-id report.
+
+Usage:
+    outcome = VoterBulkUpdateService(user=request.user).submit(request.data)
+    # dict report, or the queued BackgroundJob
+"""
+
+import json
+from itertools import islice
+from typing import Dict, List, Optional, Union
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from api.models import BackgroundJob, Voter
+from api.serializers import VoterBulkUpdateSerializer
+from api.utils.principal import get_principal
+from api.utils.visibility_scope import accessible_ids, parse_id
+from .audit_service import AuditService
+from .background_jobs import enqueue
+from .base_service import BaseService, ServiceException
+
+
+BULK_UPDATE_CHUNK_SIZE = 500
+BULK_UPDATE_ASYNC_THRESHOLD = 5000
+
+
+class BulkUpdatePlan:
+    """
+    A parsed bulk update request
+
+    Attributes:
+        mode: 'uniform' or 'per_row'
+        ids: Requested ids, in request order (as given)
+        values: Validated values (uniform mode)
+        rows: {requested id: raw values} (per-row mode)
+        errors: {requested id: validation errors}
+    """
+
+    def __init__(self, mode: str, ids: List, values: Optional[Dict] = None, rows: Optional[Dict] = None):
+        self.mode = mode
+        self.ids = ids
+        self.values = values
+        self.rows = rows or {}
+        self.errors = {}
+
+
+class VoterBulkUpdateService(BaseService):
+    """Service class for validated, chunked voter bulk updates"""
+
+    def plan(self, payload) -> BulkUpdatePlan:
+        """
+        Parse a request payload; uniform values are validated here
+
+        Raises:
+            ServiceException: Malformed payload or invalid uniform values
+        """
+        if not isinstance(payload, dict):
+            raise ServiceException(message='Expected a JSON object', code='invalid_payload', status=400)
+
+        if 'updates' in payload:
+            updates = payload['updates']
+            if not isinstance(updates, list) or not updates:
+                raise ServiceException(message='updates must be a non-empty list', code='invalid_payload', status=400)
+            plan = BulkUpdatePlan('per_row', [])
+            for row in updates:
+                if not isinstance(row, dict) or 'id' not in row:
+                    raise ServiceException(message='Each update needs an id', code='invalid_payload', status=400)
+                row = dict(row)
+                voter_id = row.pop('id')
+                self._check_ids([voter_id])
+                if voter_id in plan.rows:
+                    plan.errors[voter_id] = {'id': ['Duplicate id in request.']}
+                plan.ids.append(voter_id)
+                plan.rows[voter_id] = row
+            return plan
+
+        voter_ids = payload.get('voter_ids')
+        data = payload.get('data')
+        if not voter_ids or not data or not isinstance(voter_ids, list):
+            raise ServiceException(message='voter_ids and data required', code='invalid_payload', status=400)
+        self._check_ids(voter_ids)
+        try:
+            values = VoterBulkUpdateSerializer(partial=True).run_validation(data)
+        except serializers.ValidationError as e:
+            details = '; '.join(
+                f"{field}: {' '.join(str(error) for error in errors)}" for field, errors in e.detail.items()
+            )
+            raise ServiceException(message=f'Invalid data: {details}', code='invalid_data', status=400)
+        return BulkUpdatePlan('uniform', list(voter_ids), values=values)
+
+    @staticmethod
+    def _check_ids(ids):
+        if any(not isinstance(voter_id, (int, str)) or isinstance(voter_id, bool) for voter_id in ids):
+            raise ServiceException(message='Voter ids must be integers', code='invalid_payload', status=400)
+
+    def submit(self, payload, ip_address: Optional[str] = None,
+               user_agent: Optional[str] = None) -> Union[Dict, BackgroundJob]:
+        """
+        Run a bulk update now, or queue it as a background job when it is large
+
+        Returns:
+            The per-id report (see run()), or the queued BackgroundJob
+        """
+        plan = self.plan(payload)
+        if len(plan.ids) <= BULK_UPDATE_ASYNC_THRESHOLD:
+            return self.run(plan, ip_address=ip_address, user_agent=user_agent)
+
+        principal = get_principal(self.user)
+        job = BackgroundJob.objects.create(
+            job_type='voter_bulk_update',
+            created_by=self.user,
+            organization_id=principal.organization_id,
+            parameters=payload,
+        )
+        enqueue(job)
+        self.log_action('Voter bulk update queued', {'job_id': job.pk, 'rows': len(plan.ids)})
+        return job
+
+    def run(self, plan: BulkUpdatePlan, job: Optional[BackgroundJob] = None,
+            ip_address: Optional[str] = None, user_agent: Optional[str] = None) -> Dict:
+        """
+        Validate, scope-check and write a plan in chunks
+
+        Returns:
+            dict: updated_count, updated_ids, rejected_ids (not found or out of
+            scope) and errors ({id: validation errors})
+        """
+        values_by_id = self._validated_rows(plan)
+        allowed = accessible_ids(self.user, Voter, values_by_id, queryset=self._queryset())
+
+        updated_ids, rejected_ids = [], []
+        for voter_id in plan.ids:
+            if voter_id in plan.errors:
+                continue
+            (updated_ids if parse_id(voter_id) in allowed else rejected_ids).append(voter_id)
+
+        targets = sorted(allowed)
+        if plan.mode == 'uniform':
+            fields = sorted(plan.values)
+            self._write_uniform(targets, plan.values)
+        else:
+            fields = sorted({field for values in values_by_id.values() for field in values})
+            self._write_rows(targets, {parse_id(voter_id): values for voter_id, values in values_by_id.items()})
+
+        report = {
+            'updated_count': len(targets),
+            'updated_ids': updated_ids,
+            'rejected_ids': rejected_ids,
+            'errors': {str(voter_id): errors for voter_id, errors in plan.errors.items()},
+        }
+        AuditService.log_user_action(
+            user=self.user,
+            action='update',
+            target_model='Voter',
+            target_id=f'bulk:{len(targets)}',
+            changes={
+                'bulk_update': {
+                    'mode': plan.mode,
+                    'fields': fields,
+                    'values': json.loads(json.dumps(plan.values, cls=DjangoJSONEncoder)),
+                    'updated_ids': targets,
+                    'rejected_ids': rejected_ids,
+                    'invalid_ids': list(report['errors']),
+                    'job_id': job.pk if job else None,
+                },
+            },
+            ip_address=ip_address,
+            user_agent=user_agent or '',
+        )
+        self.log_action('Voter bulk update finished', {
+            'mode': plan.mode, 'updated': len(targets), 'rejected': len(rejected_ids), 'invalid': len(plan.errors),
+        })
+        return report
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _queryset(self):
+        """Voters of the user's organization (scope is applied by accessible_ids)"""
+        principal = get_principal(self.user)
+        if principal.is_superadmin:
+            return Voter.objects.all()
+        if principal.organization_id:
+            return Voter.objects.filter(organization_id=principal.organization_id)
+        return Voter.objects.none()
+
+    def _validated_rows(self, plan: BulkUpdatePlan) -> Dict:
+        """{requested id: validated values}; invalid rows are recorded in plan.errors"""
+        if plan.mode == 'uniform':
+            return {voter_id: plan.values for voter_id in plan.ids}
+
+        validator = VoterBulkUpdateSerializer(partial=True)
+        validated = {}
+        for voter_id, row in plan.rows.items():
+            if voter_id in plan.errors:
+                continue
+            try:
+                validated[voter_id] = validator.run_validation(row)
+            except serializers.ValidationError as e:
+                plan.errors[voter_id] = e.detail
+        return validated
+
+    @staticmethod
+    def _chunks(ids):
+        ids = iter(ids)
+        while True:
+            chunk = list(islice(ids, BULK_UPDATE_CHUNK_SIZE))
+            if not chunk:
+                return
+            yield chunk
+
+    def _write_uniform(self, ids, values):
+        for chunk in self._chunks(ids):
+            with transaction.atomic():
+                Voter.objects.filter(pk__in=chunk).update(updated_at=timezone.now(), **values)
+
+    def _write_rows(self, ids, values_by_pk):
+        for chunk in self._chunks(ids):
+            with transaction.atomic():
+                voters = list(Voter.objects.select_for_update().filter(pk__in=chunk).order_by('pk'))
+                fields = {'updated_at'}
+                now = timezone.now()
+                for voter in voters:
+                    for field, value in values_by_pk[voter.pk].items():
+                        setattr(voter, field, value)
+                        fields.add(field)
+                    voter.updated_at = now
+                Voter.objects.bulk_update(voters, sorted(fields))
+
+
+def run_bulk_update_job(job: BackgroundJob):
+    """Background job handler: run a queued bulk update and store its report"""
+    if job.created_by is None:
+        raise ServiceException(message='The user who queued this update no longer exists', code='no_user')
+    service = VoterBulkUpdateService(user=job.created_by, organization=job.organization)
+    report = service.run(service.plan(job.parameters), job=job)
+    job.result = report
+    job.row_count = report['updated_count']
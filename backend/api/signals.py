@@ -0,0 +1,168 @@
+"""
+Model signal handlers
+
+Keeps in-process caches and denormalized columns consistent with writes made
+through the ORM.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.db.models import Q
+from django.db.models.signals import post_migrate, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from api.authentication import invalidate_cached_principals
+from api.managers import sentiment_rollup_manager, voter_rollup_manager
+from api.models import (
+    Constituency, District, Organization, Permission, PollingBooth, RolePermission, SentimentAnalysis, State,
+    UserPermission, UserProfile, Voter, VoterBoothRollup, Zone,
+)
+from api.utils import geo_closure, voter_search
+from api.utils.permission_matrix import permission_engine
+from api.utils.tenant_resolver import tenant_resolver
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_principals(sender, instance, **kwargs):
+    """Account changes (deactivation, deletion) invalidate cached principals"""
+    invalidate_cached_principals(instance.pk)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_profile_principals(sender, instance, **kwargs):
+    """Role, organization or geographic assignment changes invalidate cached principals"""
+    invalidate_cached_principals(instance.user_id)
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def invalidate_tenant_cache(sender, instance, **kwargs):
+    """Slug, subdomain, custom domain or branding changes invalidate tenant lookups"""
+    tenant_resolver.invalidate()
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+@receiver(post_save, sender=RolePermission)
+@receiver(post_delete, sender=RolePermission)
+@receiver(post_save, sender=UserPermission)
+@receiver(post_delete, sender=UserPermission)
+def invalidate_permission_matrix(sender, instance, **kwargs):
+    """Any RBAC write invalidates the compiled permission matrix"""
+    permission_engine.invalidate()
+
+
+GEO_REF_FIELDS = {'state_ref', 'zone_ref', 'district_ref'}
+
+
+@receiver(post_save, sender=Constituency)
+def sync_constituency_geo_paths(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Re-parenting a constituency (state/zone/district change) re-derives the
+    geographic path of its booths and voters
+
+    Only rows whose path actually differs are written, so saves that do not
+    move the constituency cost two index-backed no-op updates.
+    """
+    if created or (update_fields is not None and not GEO_REF_FIELDS & set(update_fields)):
+        return
+
+    stale = (
+        ~Q(state_id=instance.state_ref_id)
+        | ~Q(zone_id=instance.zone_ref_id)
+        | ~Q(district_id=instance.district_ref_id)
+    )
+    PollingBooth.objects.filter(stale, constituency_id=instance.pk).sync_geo_path()
+    Voter.objects.filter(stale, polling_booth__constituency_id=instance.pk).sync_geo_path()
+
+
+@receiver(post_delete, sender=SentimentAnalysis)
+def remove_sentiment_rollup(sender, instance, **kwargs):
+    """
+    Subtract a deleted analysis from its sentiment rollups
+
+    Covers instance, queryset and cascade deletes (e.g. of its voter); rows
+    already removed by a cascade from the organization or constituency are
+    left alone.
+    """
+    sentiment_rollup_manager.apply_deltas(
+        sentiment_rollup_manager.analysis_counters(instance, sign=-1), create=False
+    )
+
+
+GEO_NODE_MODELS = (State, Zone, District, Constituency, PollingBooth)
+
+# Fields whose change moves a node in the closure table
+GEO_PARENT_FIELDS = {
+    State: set(),
+    Zone: {'state'},
+    District: {'zone'},
+    Constituency: GEO_REF_FIELDS,
+    PollingBooth: {'constituency'},
+}
+
+
+def sync_geo_closure(sender, instance, created, update_fields=None, **kwargs):
+    """Insert new hierarchy nodes into the closure table and re-parent moved ones"""
+    if not created and update_fields is not None and not GEO_PARENT_FIELDS[sender] & set(update_fields):
+        return
+    geo_closure.sync_node(instance, created)
+
+
+def remove_geo_closure(sender, instance, origin=None, **kwargs):
+    """
+    Drop closure rows of a deleted node and its subtree
+
+    Booths deleted by a cascade from a higher level are skipped: the
+    constituency they cascade through removes its whole subtree.
+    """
+    if sender is PollingBooth and origin is not instance and isinstance(origin, GEO_NODE_MODELS):
+        return
+    geo_closure.remove_subtree(instance)
+
+
+for model in GEO_NODE_MODELS:
+    post_save.connect(sync_geo_closure, sender=model, dispatch_uid=f'geo_closure_save_{model.__name__}')
+    pre_delete.connect(remove_geo_closure, sender=model, dispatch_uid=f'geo_closure_delete_{model.__name__}')
+
+
+@receiver(pre_delete, sender=PollingBooth)
+def remove_booth_voter_rollups(sender, instance, origin=None, **kwargs):
+    """
+    Subtract a deleted booth's voters from their constituency rollups
+
+    Its voters and booth rollup rows go with it by cascade, which no voter
+    write tracks. Booths deleted by a cascade from a higher level are
+    skipped: the constituency rollup rows cascade with the constituency.
+    """
+    if origin is not instance and isinstance(origin, GEO_NODE_MODELS):
+        return
+    rows = VoterBoothRollup.objects.filter(polling_booth_id=instance.pk).values(
+        'organization_id', *voter_rollup_manager.CONSTITUENCY_COLUMNS
+    )
+    voter_rollup_manager.apply_deltas({
+        (row.pop('organization_id'), instance.pk): {column: -value for column, value in row.items()}
+        for row in rows
+    })
+
+
+@receiver(post_migrate)
+def ensure_voter_search_index(sender, using='default', **kwargs):
+    """
+    Restore the SQLite FTS triggers after migrations
+
+    SQLite alters tables by rebuilding them, which drops their triggers;
+    install_search_index() recreates them and re-syncs the FTS table.
+    """
+    if sender.name != 'api':
+        return
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, Voter._meta.db_table)}
+    if 'search_name' in columns:
+        voter_search.install_search_index(connection)
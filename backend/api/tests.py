@@ -1,3 +1,1870 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
 
-# Create your tests here.
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.db.models import Avg, Count, F
+from django.db import IntegrityError, connection, transaction
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from config.log_pipeline import JSONFormatter, QueueLogHandler, RedactionFilter, SamplingFilter
+from api.authentication import (
+    PRINCIPAL_GENERATION_KEY, TOKEN_SIMPLEJWT, TOKEN_SUPABASE, HybridAuthentication, SupabaseJWTAuthentication,
+    cached_principal, classify_token, get_auth_timing_stats, get_principal_cache_stats, principal_cache,
+    principal_generation, token_digest,
+)
+from api.models import (
+    Organization, State, Zone, District, UserProfile, Constituency, PollingBooth, Voter,
+    Permission, RolePermission, UserPermission, GeoHierarchyClosure, BackgroundJob, VoterBoothRollup,
+    AuditLog, VoterConstituencyRollup, BoundaryTopology, SentimentAnalysis, SentimentRollup,
+)
+from api.managers import sentiment_rollup_manager
+from api.pagination import BoundedActionMixin
+from api.services import voter_analytics_service
+from api.services.background_jobs import reap_stale_jobs, run_job
+from api.services.export_service import cleanup_exports
+from api.services.voter_import_service import VoterImportService
+from api.serializers import UserManagementSerializer, UserProfileSerializer, profile_select_related
+from api.utils import geo_closure, metrics, voter_rollups
+from api.utils.permission_matrix import permission_engine
+from api.utils.principal import get_principal
+from api.utils.tenant_resolver import tenant_resolver
+from api.utils.visibility_scope import (
+    accessible_ids, can_user_access_object, filter_voter_queryset, get_visibility_scope,
+)
+from api.utils.voter_search import QUERY_ID, QUERY_NAME, QUERY_PHONE, classify_query, search_voters
+
+
+class RequestPrincipalTests(TestCase):
+    """The request principal is loaded once and shared by every layer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.state = State.objects.create(name='Tamil Nadu', code='TN')
+        cls.user = User.objects.create_user(username='state_admin', password='pass')
+        UserProfile.objects.create(
+            user=cls.user,
+            role='state_admin',
+            organization=cls.organization,
+            assigned_state=cls.state,
+        )
+        for index in range(3):
+            Constituency.objects.create(
+                organization=cls.organization,
+                name=f'Constituency {index}',
+                code=f'TN-{index}',
+                state='Tamil Nadu',
+                district='Chennai',
+                state_ref=cls.state,
+            )
+
+    def test_principal_loads_with_single_query(self):
+        user = User.objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(1):
+            principal = get_principal(user)
+            get_principal(user)
+
+        self.assertEqual(principal.role, 'state_admin')
+        self.assertEqual(principal.organization_id, self.organization.id)
+        self.assertEqual(principal.organization_slug, 'test-party')
+        self.assertEqual(principal.assigned_state_id, self.state.id)
+
+    def test_list_endpoint_query_count(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+        # user lookup (JWT), principal, page count, page rows
+        with self.assertNumQueries(4):
+            response = client.get('/api/constituencies/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+
+    def test_creates_use_the_principal_organization(self):
+        other = Organization.objects.create(name='Other Party', slug='other-party')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+        response = client.post('/api/issues/', {
+            'organization': other.id, 'constituency': Constituency.objects.first().id,
+            'title': 'Water supply', 'description': 'Irregular supply', 'category': 'infrastructure',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['organization'], self.organization.id)
+
+
+@override_settings(METRICS_TOKEN='scrape-secret')
+class PerformanceInstrumentationTests(TestCase):
+    """Requests carry Server-Timing and feed the per-route histograms"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.user = User.objects.create_user(username='superadmin', password='pass')
+        UserProfile.objects.create(user=cls.user, role='superadmin', organization=cls.organization)
+
+    def setUp(self):
+        metrics.registry.reset()
+
+    def test_server_timing_header(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+        response = client.get('/api/constituencies/')
+
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertIn('total;dur=', timing)
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn('ser;dur=', timing)
+        self.assertIn('auth;dur=', timing)
+
+    def test_metrics_endpoint_labels_routes_by_view_name(self):
+        APIClient().get('/api/health/')
+
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('api_request_duration_seconds_count{route="health-check",method="GET"} 1', body)
+        self.assertIn('api_responses_total{route="health-check",method="GET",status="2xx"} 1', body)
+        self.assertIn('api_auth_principal_cache{stat="hits"}', body)
+
+    def test_metrics_endpoint_requires_token_or_superadmin(self):
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertIn(response.status_code, (401, 403))
+
+
+@override_settings(SUPABASE_JWT_SECRET='supabase-secret')
+class SupabasePrincipalCacheTests(TestCase):
+    """Verified Supabase principals are cached per token and invalidated on account changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.user = User.objects.create_user(username='field', email='field@example.com')
+        UserProfile.objects.create(user=cls.user, role='user', organization=cls.organization)
+
+    def setUp(self):
+        principal_cache.clear()
+        self.auth = SupabaseJWTAuthentication()
+
+    def token(self, user=None, lifetime=3600):
+        return jwt.encode({
+            'sub': 'supabase-id', 'email': (user or self.user).email, 'aud': 'authenticated',
+            'exp': int(time.time()) + lifetime,
+        }, 'supabase-secret', algorithm='HS256')
+
+    def authenticate(self, token):
+        request = RequestFactory().get('/api/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.auth.authenticate(request)[0]
+
+    def test_repeated_tokens_hit_the_cache(self):
+        token = self.token()
+        before = get_principal_cache_stats()
+        self.authenticate(token)
+        with self.assertNumQueries(0):
+            user = self.authenticate(token)
+        self.assertEqual((user.pk, user.profile.organization_id), (self.user.pk, self.organization.id))
+
+        stats = get_principal_cache_stats()
+        self.assertEqual((stats['hits'] - before['hits'], stats['misses'] - before['misses']), (1, 1))
+
+    def test_entries_expire_with_the_token(self):
+        token = self.token(lifetime=60)
+        self.authenticate(token)
+        digest = token_digest(token)
+        self.assertIsNotNone(cached_principal(digest))
+        with mock.patch('api.utils.cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(cached_principal(digest))
+
+    def test_inactive_users_are_not_cached(self):
+        inactive = User.objects.create_user(username='gone', email='gone@example.com', is_active=False)
+        UserProfile.objects.create(user=inactive, role='user')
+        self.authenticate(self.token(inactive))
+        self.assertEqual(len(principal_cache), 0)
+
+    def test_user_and_profile_saves_evict(self):
+        token = self.token()
+        self.authenticate(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertIsNone(cached_principal(token_digest(token)))
+
+        self.authenticate(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserProfile.objects.get(user=self.user).save()
+        self.assertIsNone(cached_principal(token_digest(token)))
+
+    def test_invalidations_reach_other_workers(self):
+        token = self.token()
+        self.authenticate(token)
+        self.assertIsNotNone(cached_principal(token_digest(token)))
+
+        # Another worker published an invalidation
+        with mock.patch.multiple(principal_generation, check_interval=0, _next_check=0):
+            principal_generation.changed()
+            cache.set(PRINCIPAL_GENERATION_KEY, (cache.get(PRINCIPAL_GENERATION_KEY) or 0) + 1, timeout=None)
+            self.assertIsNone(cached_principal(token_digest(token)))
+
+
+@override_settings(SUPABASE_JWT_SECRET='supabase-secret')
+class HybridAuthenticationTests(TestCase):
+    """Bearer tokens go straight to the verifier that issued them"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='field', email='field@example.com')
+        UserProfile.objects.create(user=cls.user, role='user')
+
+    def setUp(self):
+        principal_cache.clear()
+
+    def authenticate(self, token=None):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        return HybridAuthentication().authenticate(RequestFactory().get('/api/', **headers))
+
+    def supabase_token(self):
+        return jwt.encode({
+            'sub': 'supabase-id', 'email': self.user.email, 'aud': 'authenticated',
+            'exp': int(time.time()) + 3600,
+        }, 'supabase-secret', algorithm='HS256')
+
+    def test_simplejwt_tokens_skip_supabase(self):
+        token = str(AccessToken.for_user(self.user))
+        self.assertEqual(classify_token(token), TOKEN_SIMPLEJWT)
+        with mock.patch.object(SupabaseJWTAuthentication, 'verify_supabase_token') as verify:
+            user, _ = self.authenticate(token)
+        verify.assert_not_called()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_supabase_tokens_skip_simplejwt(self):
+        token = self.supabase_token()
+        self.assertEqual(classify_token(token), TOKEN_SUPABASE)
+        with mock.patch.object(JWTAuthentication, 'authenticate') as simplejwt:
+            user, _ = self.authenticate(token)
+        simplejwt.assert_not_called()
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_verifiers_are_shared(self):
+        first, second = HybridAuthentication(), HybridAuthentication()
+        self.assertIs(first.supabase_auth, second.supabase_auth)
+        self.assertIs(first.django_jwt_auth, second.django_jwt_auth)
+
+    def test_timings_are_counted_per_path(self):
+        def counts():
+            stats = get_auth_timing_stats()
+            return [stats.get(path, {}).get('count', 0) for path in ('simplejwt', 'supabase', 'none')]
+
+        before = counts()
+        self.authenticate(str(AccessToken.for_user(self.user)))
+        self.authenticate(self.supabase_token())
+        self.assertIsNone(self.authenticate())
+        self.assertEqual([after - previous for after, previous in zip(counts(), before)], [1, 1, 1])
+
+
+class LogPipelineTests(TestCase):
+    """Structured, sampled and redacted log records"""
+
+    def make_record(self, msg, *args, name='api.views', level=logging.INFO, **extra):
+        record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+        record.__dict__.update(extra)
+        return record
+
+    def test_redaction_masks_credentials(self):
+        record = self.make_record(
+            'Auth Header: %s password=%s', 'Bearer eyJhbGciOi.eyJzdWIiOi.c2ln', 'hunter2',
+            authorization='Bearer abc', path='/api/voters/',
+        )
+        RedactionFilter().filter(record)
+
+        self.assertEqual(record.getMessage(), 'Auth Header: Bearer [REDACTED] password=[REDACTED]')
+        self.assertEqual(record.authorization, '[REDACTED]')
+        self.assertEqual(record.path, '/api/voters/')
+
+    def test_sampling_never_drops_warnings(self):
+        sampler = SamplingFilter('api.middleware=0')
+
+        self.assertFalse(sampler.filter(self.make_record('x', name='api.middleware.role_auth_middleware')))
+        self.assertTrue(sampler.filter(self.make_record('x', name='api.middleware', level=logging.WARNING)))
+        self.assertTrue(sampler.filter(self.make_record('x', name='api.views')))
+
+    def test_queue_handler_writes_json_off_thread(self):
+        stream = io.StringIO()
+        handler = QueueLogHandler(maxsize=10, stream=stream)
+        handler.setFormatter(JSONFormatter())
+
+        handler.handle(self.make_record('Login %s', 'ok', status=200))
+        handler.stop()
+
+        entry = json.loads(stream.getvalue())
+        self.assertEqual(entry['message'], 'Login ok')
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['level'], 'INFO')
+
+
+@override_settings(TENANT_BASE_DOMAINS=['bachao.co'])
+class TenantResolverTests(TestCase):
+    """Tenant lookups are cached, including misses, and invalidated on writes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(
+            name='BJP', slug='bjp', subdomain='bjp', custom_domain='election.bjp.com',
+        )
+
+    def setUp(self):
+        tenant_resolver.clear()
+
+    def test_steady_state_costs_no_queries(self):
+        tenant_resolver.resolve_slug('bjp')
+        tenant_resolver.resolve_slug('no-such-party')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(tenant_resolver.resolve_slug('bjp').id, self.organization.id)
+            self.assertIsNone(tenant_resolver.resolve_slug('no-such-party'))
+
+    def test_resolve_host(self):
+        self.assertEqual(tenant_resolver.resolve_host('BJP.bachao.co:443').id, self.organization.id)
+        self.assertEqual(tenant_resolver.resolve_host('election.bjp.com').id, self.organization.id)
+        self.assertIsNone(tenant_resolver.resolve_host('www.bachao.co'))
+        self.assertIsNone(tenant_resolver.resolve_host('inc.bachao.co'))
+
+    def test_returned_instances_do_not_share_state(self):
+        tenant_resolver.resolve_slug('bjp').name = 'Changed'
+        self.assertEqual(tenant_resolver.resolve_slug('bjp').name, 'BJP')
+
+    def test_save_invalidates(self):
+        self.assertIsNone(tenant_resolver.resolve_slug('inc'))
+
+        Organization.objects.create(name='INC', slug='inc')
+
+        self.assertEqual(tenant_resolver.resolve_slug('inc').name, 'INC')
+
+
+@override_settings(MIDDLEWARE=settings.MIDDLEWARE + [
+    'api.middleware.tenant_middleware.TenantDetectionMiddleware',
+    'api.middleware.tenant_middleware.TenantIsolationMiddleware',
+])
+class AsyncMiddlewareTests(TransactionTestCase):
+    """Custom middleware runs natively under ASGI"""
+
+    def setUp(self):
+        tenant_resolver.clear()
+        self.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        self.other = Organization.objects.create(name='Other Party', slug='other-party')
+        self.user = User.objects.create_user(username='analyst', password='pass')
+        UserProfile.objects.create(user=self.user, role='analyst', organization=self.organization)
+
+    def test_middleware_is_async_capable(self):
+        for path in settings.MIDDLEWARE:
+            if path.startswith('api.'):
+                middleware = import_string(path)
+                self.assertTrue(middleware.async_capable and middleware.sync_capable, path)
+
+    async def test_role_and_tenant_attached_under_asgi(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+
+        response = await client.get('/api/org/test-party/health/')
+
+        request = response.asgi_request
+        self.assertEqual(request.user_role, 'analyst')
+        self.assertEqual(request.tenant.id, self.organization.id)
+        self.assertIn('Server-Timing', response)
+
+    async def test_tenant_isolation_under_asgi(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+
+        response = await client.get('/api/org/other-party/health/')
+
+        self.assertEqual(response.status_code, 403)
+
+        response = await client.get('/api/org/no-such-party/health/')
+
+        self.assertEqual(response.status_code, 404)
+
+
+class PermissionMatrixTests(TestCase):
+    """Permission checks are served from the compiled matrix"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.view = Permission.objects.create(name='view_dashboard', category='data', description='')
+        cls.export = Permission.objects.create(name='export_data', category='data', description='')
+        RolePermission.objects.create(role='analyst', permission=cls.view)
+        cls.user = User.objects.create_user(username='analyst', password='pass')
+        cls.profile = UserProfile.objects.create(user=cls.user, role='analyst')
+
+    def test_checks_run_no_queries(self):
+        permission_engine.matrix()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(self.profile.has_permission('view_dashboard'))
+            self.assertFalse(self.profile.has_permission('export_data'))
+            self.assertEqual(sorted(self.profile.get_permissions()), ['view_dashboard'])
+
+    def test_user_grants_overlay_role(self):
+        grant = UserPermission.objects.create(user_profile=self.profile, permission=self.export)
+
+        self.assertTrue(self.profile.has_permission('export_data'))
+        self.assertTrue(get_principal(self.user).has_permission('export_data'))
+
+        grant.delete()
+
+        self.assertFalse(self.profile.has_permission('export_data'))
+
+    def test_role_permission_write_invalidates(self):
+        self.assertFalse(self.profile.has_permission('export_data'))
+
+        RolePermission.objects.create(role='analyst', permission=self.export)
+
+        self.assertTrue(self.profile.has_permission('export_data'))
+
+    def test_superadmin_holds_every_permission(self):
+        profile = UserProfile(role='superadmin')
+        self.assertEqual(set(profile.get_permissions()), {'view_dashboard', 'export_data'})
+
+
+class UserProfileSerializerTests(TestCase):
+    """Profile lists resolve permissions in one pass"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.state = State.objects.create(name='Tamil Nadu', code='TN')
+        view = Permission.objects.create(name='view_dashboard', category='data', description='')
+        RolePermission.objects.create(role='analyst', permission=view)
+        for index in range(100):
+            user = User.objects.create_user(username=f'user{index}')
+            UserProfile.objects.create(
+                user=user,
+                role='analyst' if index % 2 else 'superadmin',
+                organization=cls.organization,
+                assigned_state=cls.state,
+            )
+
+    def test_page_of_profiles_runs_one_query(self):
+        permission_engine.matrix()
+        profiles = UserProfile.objects.select_related(*profile_select_related())
+
+        with self.assertNumQueries(1):
+            data = UserProfileSerializer(profiles, many=True).data
+
+        self.assertEqual(len(data), 100)
+        analyst = next(row for row in data if row['role'] == 'analyst')
+        self.assertEqual(analyst['permissions'], ['view_dashboard'])
+        self.assertEqual(analyst['assigned_state_name'], 'Tamil Nadu')
+
+    def test_identical_permission_sets_are_shared(self):
+        profiles = UserProfile.objects.filter(role='analyst').select_related(*profile_select_related())
+
+        data = UserProfileSerializer(profiles, many=True).data
+
+        self.assertIs(data[0]['permissions'], data[1]['permissions'])
+
+    def test_nested_user_list_query_count_is_constant(self):
+        permission_engine.matrix()
+        users = User.objects.select_related('profile', *profile_select_related('profile__'))
+
+        with self.assertNumQueries(1):
+            data = UserManagementSerializer(users, many=True).data
+
+        self.assertEqual(len(data), 100)
+
+
+class VisibilityScopeTests(TestCase):
+    """Visibility scopes are id-based and cached per request"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.state = State.objects.create(name='Tamil Nadu', code='TN')
+        zone = Zone.objects.create(state=cls.state, name='North')
+        cls.district = District.objects.create(zone=zone, name='Chennai')
+        other_district = District.objects.create(zone=zone, name='Vellore')
+
+        cls.voters = {}
+        for district in (cls.district, other_district):
+            constituency = Constituency.objects.create(
+                organization=cls.organization,
+                name=f'{district.name} Central',
+                code=f'TN-{district.id}',
+                state='Tamil Nadu',
+                district=district.name,
+                state_ref=cls.state,
+                zone_ref=zone,
+                district_ref=district,
+            )
+            booth = PollingBooth.objects.create(
+                constituency=constituency,
+                organization=cls.organization,
+                name='Booth 1',
+                code=f'B-{district.id}',
+                booth_number='1',
+            )
+            cls.voters[district.name] = Voter.objects.create(
+                polling_booth=booth,
+                organization=cls.organization,
+                full_name='Voter',
+                voter_id_number=f'V-{district.id}',
+            )
+
+        cls.user = User.objects.create_user(username='district_admin')
+        UserProfile.objects.create(
+            user=cls.user,
+            role='district_admin',
+            organization=cls.organization,
+            assigned_state=cls.state,
+            assigned_district=cls.district,
+        )
+
+    def test_scope_is_cached_and_immutable(self):
+        user = User.objects.get(pk=self.user.pk)
+        scope = get_visibility_scope(user)
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_visibility_scope(user), scope)
+            filter_voter_queryset(Voter.objects.all(), user)
+
+        self.assertEqual((scope.level, scope.level_id), ('district', self.district.id))
+        with self.assertRaises(AttributeError):
+            scope.level = 'state'
+
+    def test_queryset_filter_uses_id_columns(self):
+        voters = filter_voter_queryset(Voter.objects.order_by('id'), self.user)
+
+        self.assertEqual(list(voters), [self.voters['Chennai']])
+        sql = str(voters.query)
+        self.assertIn('"api_voter"."district_id" = ', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_object_checks_compare_ids(self):
+        user = User.objects.get(pk=self.user.pk)
+        get_visibility_scope(user)
+        chennai, vellore = Voter.objects.order_by('id')
+        booth = PollingBooth.objects.get(pk=chennai.polling_booth_id)
+
+        with self.assertNumQueries(0):
+            self.assertTrue(can_user_access_object(user, chennai))
+            self.assertFalse(can_user_access_object(user, vellore))
+            self.assertTrue(can_user_access_object(user, booth))
+
+
+    def test_accessible_ids_is_one_query(self):
+        chennai, vellore = self.voters['Chennai'].id, self.voters['Vellore'].id
+        get_visibility_scope(self.user)
+
+        with self.assertNumQueries(1):
+            allowed = accessible_ids(self.user, Voter, [chennai, str(vellore), 'x', 999999])
+
+        self.assertEqual(allowed, {chennai})
+
+    def test_bulk_update_reports_rejected_ids(self):
+        chennai, vellore = self.voters['Chennai'].id, self.voters['Vellore'].id
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+        response = client.post('/api/voters/bulk_update/', {
+            'voter_ids': [chennai, vellore],
+            'data': {'verified': True},
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_count'], 1)
+        self.assertEqual(response.data['rejected_ids'], [vellore])
+        self.assertFalse(Voter.objects.get(pk=vellore).verified)
+
+class GeoPathTests(TestCase):
+    """Booths and voters keep a denormalized copy of their geographic path"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.state = State.objects.create(name='Tamil Nadu', code='TN')
+        zone = Zone.objects.create(state=cls.state, name='North')
+        cls.chennai = District.objects.create(zone=zone, name='Chennai')
+        cls.vellore = District.objects.create(zone=zone, name='Vellore')
+        cls.constituencies = [
+            Constituency.objects.create(
+                name=f'{district.name} Central',
+                code=f'TN-{district.id}',
+                state='Tamil Nadu',
+                district=district.name,
+                state_ref=cls.state,
+                zone_ref=zone,
+                district_ref=district,
+            )
+            for district in (cls.chennai, cls.vellore)
+        ]
+
+    def create_booth(self, constituency, code='B-1'):
+        return PollingBooth.objects.create(
+            constituency=constituency, name='Booth', code=code, booth_number='1',
+        )
+
+    def test_save_fills_path(self):
+        booth = self.create_booth(self.constituencies[0])
+        voter = Voter.objects.create(polling_booth=booth, full_name='Voter', voter_id_number='V-1')
+
+        self.assertEqual(
+            (booth.state_id, booth.district_id), (self.state.id, self.chennai.id),
+        )
+        self.assertEqual(
+            (voter.district_id, voter.constituency_id),
+            (self.chennai.id, self.constituencies[0].id),
+        )
+
+        # Saves that do not move the row cost no extra query
+        voter = Voter.objects.get(pk=voter.pk)
+        with self.assertNumQueries(1):
+            voter.save()
+
+    def test_bulk_create_fills_path_in_one_query(self):
+        booth = self.create_booth(self.constituencies[0])
+
+        # Path lookup and insert, plus the booth and constituency rollups
+        # (booth lookup for the latter; update, then create on first use)
+        with self.assertNumQueries(11):
+            Voter.objects.bulk_create(
+                Voter(polling_booth=booth, full_name='Voter', voter_id_number=f'V-{index}')
+                for index in range(20)
+            )
+
+        self.assertEqual(Voter.objects.filter(district_id=self.chennai.id).count(), 20)
+
+    def test_moving_a_booth_moves_its_voters(self):
+        booth = self.create_booth(self.constituencies[0])
+        Voter.objects.create(polling_booth=booth, full_name='Voter', voter_id_number='V-1')
+
+        booth.constituency = self.constituencies[1]
+        booth.save()
+
+        voter = Voter.objects.get()
+        self.assertEqual(
+            (voter.district_id, voter.constituency_id),
+            (self.vellore.id, self.constituencies[1].id),
+        )
+
+        PollingBooth.objects.filter(pk=booth.pk).update(constituency=self.constituencies[0])
+        self.assertEqual(Voter.objects.get().district_id, self.chennai.id)
+
+    def test_reparenting_a_constituency_updates_paths(self):
+        booth = self.create_booth(self.constituencies[0])
+        Voter.objects.create(polling_booth=booth, full_name='Voter', voter_id_number='V-1')
+
+        constituency = self.constituencies[0]
+        constituency.district_ref = self.vellore
+        constituency.save()
+
+        self.assertEqual(PollingBooth.objects.get().district_id, self.vellore.id)
+        self.assertEqual(Voter.objects.get().district_id, self.vellore.id)
+
+    def test_backfill_command(self):
+        booth = self.create_booth(self.constituencies[0])
+        Voter.objects.create(polling_booth=booth, full_name='Voter', voter_id_number='V-1')
+        Voter.objects.update(state=None, zone=None, district=None, constituency=None)
+
+        call_command('backfill_geo_paths', batch_size=1, stdout=io.StringIO())
+
+        voter = Voter.objects.get()
+        self.assertEqual(
+            (voter.state_id, voter.district_id, voter.constituency_id),
+            (self.state.id, self.chennai.id, self.constituencies[0].id),
+        )
+
+
+class GeoClosureTests(TestCase):
+    """The closure table answers subtree and ancestor lookups in one query"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.state = State.objects.create(name='Tamil Nadu', code='TN')
+        cls.zone = Zone.objects.create(state=cls.state, name='North')
+        cls.chennai = District.objects.create(zone=cls.zone, name='Chennai')
+        cls.vellore = District.objects.create(zone=cls.zone, name='Vellore')
+        cls.constituency = Constituency.objects.create(
+            name='Chennai Central',
+            code='TN-1',
+            state_ref=cls.state,
+            zone_ref=cls.zone,
+            district_ref=cls.chennai,
+        )
+        cls.booths = [
+            PollingBooth.objects.create(
+                constituency=cls.constituency, name='Booth', code=f'B-{index}', booth_number=str(index),
+            )
+            for index in range(3)
+        ]
+
+    def closure_rows(self):
+        return set(GeoHierarchyClosure.objects.values_list(
+            'ancestor_level', 'ancestor_node', 'descendant_level', 'descendant_node', 'depth',
+        ))
+
+    def test_lookups_are_single_queries(self):
+        booth_ids = sorted(booth.id for booth in self.booths)
+
+        with self.assertNumQueries(2):
+            self.assertEqual(sorted(geo_closure.descendant_ids('state', self.state.id)), booth_ids)
+            self.assertEqual(geo_closure.ancestors('booth', self.booths[0].id), {
+                'constituency': self.constituency.id,
+                'district': self.chennai.id,
+                'zone': self.zone.id,
+                'state': self.state.id,
+            })
+
+        self.assertEqual(geo_closure.descendant_ids('district', self.vellore.id), [])
+
+    def test_moving_a_node_moves_its_subtree(self):
+        self.constituency.district_ref = self.vellore
+        self.constituency.save()
+
+        self.assertEqual(geo_closure.descendant_ids('district', self.chennai.id), [])
+        self.assertEqual(len(geo_closure.descendant_ids('district', self.vellore.id)), 3)
+        self.assertEqual(
+            geo_closure.ancestors('booth', self.booths[0].id)['district'], self.vellore.id,
+        )
+
+        # Incremental maintenance matches a full rebuild
+        rows = self.closure_rows()
+        geo_closure.rebuild()
+        self.assertEqual(self.closure_rows(), rows)
+
+    def test_booth_bulk_writes_keep_the_closure(self):
+        vellore_central = Constituency.objects.create(
+            name='Vellore', code='TN-2', state_ref=self.state, zone_ref=self.zone, district_ref=self.vellore,
+        )
+
+        PollingBooth.objects.filter(pk=self.booths[0].pk).update(constituency=vellore_central)
+        booths = list(PollingBooth.objects.filter(pk__in=[self.booths[1].pk, self.booths[2].pk]))
+        booths[0].constituency = vellore_central
+        PollingBooth.objects.bulk_update(booths, ['constituency'])
+        created = PollingBooth.objects.bulk_create([
+            PollingBooth(constituency=vellore_central, name='Booth', code='B-9', booth_number='9'),
+        ])
+
+        self.assertEqual(
+            sorted(geo_closure.descendant_ids('district', self.vellore.id)),
+            sorted([self.booths[0].pk, self.booths[1].pk, created[0].pk]),
+        )
+        self.assertEqual(geo_closure.descendant_ids('district', self.chennai.id), [self.booths[2].pk])
+
+        rows = self.closure_rows()
+        geo_closure.rebuild()
+        self.assertEqual(self.closure_rows(), rows)
+
+    def test_deleting_a_node_removes_its_subtree(self):
+        self.constituency.delete()
+
+        self.assertEqual(geo_closure.descendant_ids('state', self.state.id), [])
+        self.assertFalse(GeoHierarchyClosure.objects.filter(descendant_level='booth').exists())
+
+
+class VoterImportTests(TestCase):
+    """Electoral rolls are imported in validated, deduplicated chunks"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        other = Organization.objects.create(name='Other Party', slug='other-party')
+        cls.state = State.objects.create(name='Tamil Nadu', code='TN')
+        zone = Zone.objects.create(state=cls.state, name='North')
+        cls.district = District.objects.create(zone=zone, name='Chennai')
+        constituency = Constituency.objects.create(
+            organization=cls.organization, name='Chennai Central', code='TN-1',
+            state_ref=cls.state, zone_ref=zone, district_ref=cls.district,
+        )
+        cls.booth = PollingBooth.objects.create(
+            constituency=constituency, organization=cls.organization,
+            name='Booth', code='B-1', booth_number='1',
+        )
+        Voter.objects.create(
+            polling_booth=cls.booth, organization=other, full_name='Taken', voter_id_number='V-OTHER',
+        )
+
+    def roll(self, *rows):
+        lines = ['Constituency Code,Booth Code,Voter ID Number,Full Name,Gender,Age'] + list(rows)
+        return io.BytesIO('\n'.join(lines).encode())
+
+    def test_import_validates_dedupes_and_upserts(self):
+        service = VoterImportService(organization=self.organization, chunk_size=2)
+
+        report = service.import_file(self.roll(
+            'TN-1,B-1,V-1,Anbu,male,34',
+            'TN-1,B-1,V-2,Bala,robot,40',
+            'TN-1,B-9,V-3,Chitra,female,29',
+            'TN-1,b-1,V-4,Devi,Female,',
+            'TN-1,B-1,V-4,Devi K,female,51',
+            'TN-1,B-1,V-OTHER,Hijack,male,30',
+        ), file_format='csv')
+
+        self.assertEqual((report.rows_read, report.imported, report.skipped), (6, 3, 3))
+        self.assertEqual([row for row, _ in report.errors], [3, 4, 7])
+        self.assertIn("gender: 'robot'", report.errors[0][1])
+
+        voter = Voter.objects.get(voter_id_number='V-4')
+        self.assertEqual((voter.full_name, voter.age), ('Devi K', 51))
+        self.assertEqual((voter.district_id, voter.organization_id), (self.district.id, self.organization.id))
+        self.assertEqual(Voter.objects.get(voter_id_number='V-OTHER').full_name, 'Taken')
+
+        # Re-importing updates in place
+        service.import_file(self.roll('TN-1,B-1,V-1,Anbu R,male,35'), file_format='csv')
+        self.assertEqual(Voter.objects.get(voter_id_number='V-1').full_name, 'Anbu R')
+        self.assertEqual(Voter.objects.filter(organization=self.organization).count(), 2)
+
+    def test_reimport_keeps_fields_missing_from_the_file(self):
+        Voter.objects.create(
+            polling_booth=self.booth, organization=self.organization, full_name='Anbu', voter_id_number='V-1',
+            phone='+91 98450 12345', sentiment='strongly_positive', sentiment_score=Decimal('0.90'),
+            verified=True, voter_category='core_supporter', notes='vip',
+        )
+        lines = 'Constituency Code,Booth Code,Voter ID Number,Full Name\nTN-1,B-1,V-1,Anbu R\n'
+        VoterImportService(organization=self.organization).import_file(io.BytesIO(lines.encode()), file_format='csv')
+
+        voter = Voter.objects.get(voter_id_number='V-1')
+        self.assertEqual(voter.full_name, 'Anbu R')
+        self.assertEqual(
+            (voter.sentiment, voter.sentiment_score, voter.verified, voter.voter_category, voter.notes),
+            ('strongly_positive', Decimal('0.90'), True, 'core_supporter', 'vip'),
+        )
+        self.assertEqual((voter.search_name, voter.phone_normalized), ('anbu r', '9845012345'))
+
+    def test_upload_endpoint(self):
+        user = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=user, role='superadmin', organization=self.organization)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+        upload = self.roll('TN-1,B-1,V-1,Anbu,male,34')
+        upload.name = 'roll.csv'
+        response = client.post('/api/voters/import/', {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['imported'], 1)
+        self.assertTrue(Voter.objects.filter(voter_id_number='V-1', state_id=self.state.id).exists())
+
+
+class VoterSearchTests(TestCase):
+    """Voter search classifies the query and reads indexed normalized columns"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        state = State.objects.create(name='Tamil Nadu', code='TN')
+        constituency = Constituency.objects.create(
+            organization=cls.organization, name='Chennai Central', code='TN-1', state_ref=state,
+        )
+        cls.booths = [
+            PollingBooth.objects.create(
+                constituency=constituency, organization=cls.organization,
+                name=f'Booth {number}', code=f'B-{number}', booth_number=str(number),
+            )
+            for number in (1, 2)
+        ]
+        cls.lakshmi = Voter.objects.create(
+            polling_booth=cls.booths[0], organization=cls.organization, full_name='Lakshmi R',
+            voter_id_number='V-1', epic_number='tna/1234567', phone='+91 98450-12345',
+        )
+        cls.laxmi = Voter.objects.create(
+            polling_booth=cls.booths[1], organization=cls.organization,
+            full_name='Laxmi Narayan', voter_id_number='V-2',
+        )
+        cls.kumar = Voter.objects.create(
+            polling_booth=cls.booths[0], organization=cls.organization,
+            full_name='குமார் ராஜா', voter_id_number='V-3',
+        )
+
+    def search(self, query):
+        return [voter.voter_id_number for voter in search_voters(Voter.objects.all(), query)]
+
+    def test_classify_query(self):
+        self.assertEqual(classify_query('+91 98450 12345'), (QUERY_PHONE, '9845012345'))
+        self.assertEqual(classify_query('tna1234567'), (QUERY_ID, 'TNA1234567'))
+        self.assertEqual(classify_query('  Moorthy  K. '), (QUERY_NAME, 'murti k'))
+
+    def test_name_search_folds_transliteration(self):
+        self.assertCountEqual(self.search('LAKSHMY'), ['V-1', 'V-2'])
+        self.assertEqual(self.search('laxmi nar'), ['V-2'])
+        self.assertEqual(self.search('குமா'), ['V-3'])
+
+    def test_id_and_phone_lookups(self):
+        self.assertEqual(self.search('TNA1234567'), ['V-1'])
+        self.assertEqual(self.search('tna12'), ['V-1'])
+        self.assertEqual(self.search('v-2'), [])
+        self.assertEqual(self.search('V-2'), ['V-2'])
+        self.assertEqual(self.search('098450 12345'), ['V-1'])
+        self.assertEqual(self.search('98450'), ['V-1'])
+
+    def test_index_follows_writes(self):
+        Voter.objects.filter(pk=self.laxmi.pk).update(full_name='Saraswathi')
+        self.assertEqual(self.search('laxmi'), ['V-1'])
+        self.assertEqual(self.search('saraswati'), ['V-2'])
+
+        self.lakshmi.phone = '9000000001'
+        self.lakshmi.save(update_fields=['phone'])
+        self.assertEqual(self.search('9000000001'), ['V-1'])
+
+        self.lakshmi.delete()
+        self.assertEqual(self.search('laxmi'), [])
+
+    def test_endpoint_applies_scope_before_ranking(self):
+        user = User.objects.create_user(username='agent')
+        UserProfile.objects.create(
+            user=user, role='booth_admin', organization=self.organization, assigned_booth=self.booths[1],
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+        response = client.get('/api/voters/search/', {'q': 'lakshmi'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([voter['voter_id_number'] for voter in response.data], ['V-2'])
+
+
+class KeysetPaginationTests(TestCase):
+    """Large lists page by sort key, so deep pages cost the same as the first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name='Test Party', slug='test-party')
+        constituency = Constituency.objects.create(organization=organization, name='Central', code='C-1')
+        booths = [
+            PollingBooth.objects.create(
+                constituency=constituency, organization=organization,
+                name=f'Booth {number}', code=f'B-{number}', booth_number=str(number),
+            )
+            for number in (1, 2)
+        ]
+        Voter.objects.bulk_create(
+            Voter(
+                polling_booth=booths[number % 2], organization=organization,
+                full_name=f'Voter {number % 5}', voter_id_number=f'V-{number}',
+                age=None if number % 4 == 0 else 20 + number % 7,
+            )
+            for number in range(23)
+        )
+        user = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=user, role='superadmin', organization=organization)
+        cls.token = str(AccessToken.for_user(user))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def walk(self, url):
+        """Follow next links; returns (ids, responses)"""
+        ids, responses = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            responses.append(response)
+            ids += [voter['id'] for voter in response.data['results']]
+            url = response.data['next']
+        return ids, responses
+
+    def test_pages_follow_ordering_with_tiebreaker(self):
+        ids, responses = self.walk('/api/voters/?page_size=5')
+
+        expected = list(Voter.objects.order_by('polling_booth_id', 'full_name', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(responses), 5)
+        self.assertNotIn('count', responses[0].data)
+
+        # Walking back from the last page returns the previous page
+        previous = self.client.get(responses[-1].data['previous'])
+        self.assertEqual(previous.data['results'], responses[-2].data['results'])
+
+    def test_deep_pages_cost_the_same_queries(self):
+        _, responses = self.walk('/api/voters/?page_size=5')
+        last = responses[-2].data['next']
+
+        # user lookup (JWT), principal, page rows: no COUNT, no OFFSET
+        with self.assertNumQueries(3) as first:
+            self.client.get('/api/voters/?page_size=5')
+        with self.assertNumQueries(3):
+            self.client.get(last)
+        self.assertFalse(any('COUNT(' in query['sql'] for query in first.captured_queries))
+        self.assertFalse(any('OFFSET' in query['sql'] for query in first.captured_queries))
+
+    def test_nullable_ordering_keeps_every_row(self):
+        ids, _ = self.walk('/api/voters/?page_size=4&ordering=-age')
+
+        self.assertCountEqual(ids, Voter.objects.values_list('id', flat=True))
+        self.assertEqual(len(ids), len(set(ids)))
+        tail = list(Voter.objects.filter(id__in=ids[-6:]).values_list('age', flat=True))
+        self.assertEqual(tail, [None] * 6)
+
+    def test_approximate_count_and_legacy_pages(self):
+        response = self.client.get('/api/voters/?count=approx')
+        self.assertEqual((response.data['count'], response.data['count_is_estimate']), (23, True))
+
+        legacy = self.client.get('/api/voters/?page=2&page_size=10')
+        self.assertEqual((legacy.data['count'], len(legacy.data['results'])), (23, 10))
+
+        other_ordering = self.client.get('/api/voters/?page_size=5').data['next'] + '&ordering=age'
+        self.assertEqual(self.client.get(other_ordering).status_code, 404)
+
+
+class ExportTests(TestCase):
+    """Exports stream in chunks and respect the caller's scope"""
+
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name='Test Party', slug='test-party')
+        constituency = Constituency.objects.create(organization=organization, name='Central', code='C-1')
+        cls.booths = [
+            PollingBooth.objects.create(
+                constituency=constituency, organization=organization,
+                name=f'Booth {number}', code=f'B-{number}', booth_number=str(number),
+            )
+            for number in (1, 2)
+        ]
+        Voter.objects.bulk_create(
+            Voter(
+                polling_booth=cls.booths[number % 2], organization=organization,
+                full_name=f'Voter {number}', voter_id_number=f'V-{number}', phone=f'98400{number:05d}',
+            )
+            for number in range(10)
+        )
+        admin = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=admin, role='superadmin', organization=organization)
+        cls.admin_token = str(AccessToken.for_user(admin))
+
+        booth_admin = User.objects.create_user(username='booth_admin')
+        profile = UserProfile.objects.create(
+            user=booth_admin, role='booth_admin', organization=organization, assigned_booth=cls.booths[0],
+        )
+        export = Permission.objects.create(name='export_data', category='data', description='')
+        UserPermission.objects.create(user_profile=profile, permission=export)
+        cls.booth_admin_token = str(AccessToken.for_user(booth_admin))
+
+    def client_for(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return client
+
+    def test_stream_csv_respects_scope_and_fields(self):
+        response = self.client_for(self.booth_admin_token).get(
+            '/api/exports/stream/?dataset=voters&fields=voter_id_number,phone'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'voter_id_number,phone')
+        self.assertEqual(lines[1:], [f'V-{number},98400{number:05d}' for number in range(0, 10, 2)])
+
+    def test_stream_gzip_ndjson_with_filter(self):
+        response = self.client_for(self.admin_token).get(
+            f'/api/exports/stream/?dataset=voters&file_format=ndjson&gzip=1'
+            f'&fields=id,full_name&polling_booth={self.booths[1].id}'
+        )
+
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.ndjson.gz', response['Content-Disposition'])
+        rows = [json.loads(line) for line in gzip.decompress(b''.join(response.streaming_content)).splitlines()]
+        self.assertEqual([row['full_name'] for row in rows], [f'Voter {number}' for number in range(1, 10, 2)])
+
+    def test_invalid_options_are_rejected(self):
+        client = self.client_for(self.admin_token)
+
+        self.assertEqual(client.get('/api/exports/stream/?dataset=voters&fields=password').status_code, 400)
+        self.assertEqual(client.get('/api/exports/stream/?dataset=users').status_code, 400)
+        self.assertEqual(client.get('/api/exports/stream/?dataset=voters&file_format=xml').status_code, 400)
+
+    def test_invalid_filter_values_are_rejected(self):
+        client = self.client_for(self.admin_token)
+
+        stream = client.get('/api/exports/stream/?dataset=voters&polling_booth=abc')
+        self.assertEqual((stream.status_code, stream.data['code']), (400, 'invalid_filter'))
+        job = client.post('/api/exports/', {'dataset': 'voters', 'filters': {'polling_booth': 'abc'}}, format='json')
+        self.assertEqual((job.status_code, job.data['code']), (400, 'invalid_filter'))
+        self.assertFalse(BackgroundJob.objects.exists())
+
+    def test_background_job_writes_file_for_download(self):
+        client = self.client_for(self.booth_admin_token)
+        response = client.post(
+            '/api/exports/', {'dataset': 'voters', 'fields': ['voter_id_number']}, format='json'
+        )
+        self.assertEqual((response.status_code, response.data['status']), (202, 'pending'))
+        self.assertEqual(client.get(f"/api/exports/{response.data['id']}/download/").status_code, 409)
+
+        with tempfile.TemporaryDirectory() as export_root, override_settings(EXPORT_ROOT=export_root):
+            job = run_job(response.data['id'])
+            self.assertEqual((job.status, job.row_count), ('completed', 5))
+            self.assertIsNone(run_job(job.pk))
+
+            status = client.get(f'/api/exports/{job.pk}/')
+            self.assertTrue(status.data['download_url'].endswith(f'/api/exports/{job.pk}/download/'))
+            download = client.get(f'/api/exports/{job.pk}/download/')
+            content = b''.join(download.streaming_content).decode()
+            download.close()
+
+        self.assertEqual(content.splitlines(), ['voter_id_number'] + [f'V-{n}' for n in range(0, 10, 2)])
+        self.assertEqual(BackgroundJob.objects.get(pk=job.pk).result_size, len(content))
+
+    def test_background_job_without_user_fails(self):
+        response = self.client_for(self.booth_admin_token).post(
+            '/api/exports/', {'dataset': 'voters', 'fields': ['voter_id_number']}, format='json'
+        )
+        BackgroundJob.objects.filter(pk=response.data['id']).update(created_by=None)
+
+        with tempfile.TemporaryDirectory() as export_root, override_settings(EXPORT_ROOT=export_root):
+            job = run_job(response.data['id'])
+            self.assertEqual(os.listdir(export_root), [])
+
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('no longer exists', job.error)
+        self.assertEqual(job.result_path, '')
+
+    @override_settings(BACKGROUND_JOB_STALE_MINUTES=60)
+    def test_stale_running_jobs_are_marked_failed(self):
+        now = timezone.now()
+        stale = BackgroundJob.objects.create(status='running', started_at=now - timedelta(minutes=61))
+        live = BackgroundJob.objects.create(status='running', started_at=now - timedelta(minutes=5))
+
+        self.assertEqual(reap_stale_jobs(now), 1)
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.finished_at), ('failed', now))
+        self.assertIn('60 minutes', stale.error)
+        self.assertEqual(BackgroundJob.objects.get(pk=live.pk).status, 'running')
+
+    @override_settings(EXPORT_RETENTION_HOURS=24)
+    def test_cleanup_deletes_expired_and_orphaned_export_files(self):
+        now = timezone.now()
+        old = (now - timedelta(hours=25)).timestamp()
+        with tempfile.TemporaryDirectory() as export_root, override_settings(EXPORT_ROOT=export_root):
+            def export_file(name, mtime):
+                path = os.path.join(export_root, name)
+                with open(path, 'w') as file:
+                    file.write('id')
+                os.utime(path, (mtime, mtime))
+                return path
+
+            expired = BackgroundJob.objects.create(
+                status='completed', finished_at=now - timedelta(hours=25), result_path=export_file('1-a.csv', old),
+            )
+            recent = BackgroundJob.objects.create(
+                status='completed', finished_at=now - timedelta(hours=1), result_path=export_file('2-b.csv', old),
+            )
+            orphan = export_file('3-c.csv', old)
+            fresh_orphan = export_file('4-d.csv', now.timestamp())
+
+            self.assertEqual(cleanup_exports(now), 2)
+            self.assertEqual(sorted(os.listdir(export_root)), ['2-b.csv', '4-d.csv'])
+            self.assertFalse(os.path.exists(orphan))
+            self.assertTrue(os.path.exists(fresh_orphan))
+            self.assertEqual(BackgroundJob.objects.get(pk=expired.pk).result_path, '')
+            self.assertEqual(BackgroundJob.objects.get(pk=recent.pk).result_path, recent.result_path)
+
+        download = self.client_for(self.admin_token).get(f'/api/exports/{expired.pk}/download/')
+        self.assertEqual(download.status_code, 410)
+
+
+class VoterRollupTests(TestCase):
+    """Per-booth voter rollups follow every write path and answer statistics"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        state = State.objects.create(name='Tamil Nadu', code='TN')
+        zone = Zone.objects.create(state=state, name='North')
+        district = District.objects.create(zone=zone, name='Chennai')
+        constituency = Constituency.objects.create(
+            organization=cls.organization, name='Chennai Central', code='TN-1',
+            state_ref=state, zone_ref=zone, district_ref=district,
+        )
+        cls.booths = [
+            PollingBooth.objects.create(
+                constituency=constituency, organization=cls.organization,
+                name=f'Booth {number}', code=f'B-{number}', booth_number=str(number),
+            )
+            for number in (1, 2)
+        ]
+        genders = ('male', 'female', 'other')
+        sentiments = ('positive', 'neutral', 'negative', 'strongly_positive')
+        for number in range(12):
+            Voter.objects.create(
+                polling_booth=cls.booths[number % 2], organization=cls.organization,
+                full_name=f'Voter {number}', voter_id_number=f'V-{number}',
+                gender=genders[number % 3], sentiment=sentiments[number % 4],
+                age=None if number % 5 == 0 else 20 + number, sentiment_score=Decimal(number - 6) / 10,
+                first_time_voter=number % 3 == 0, verified=number % 2 == 0,
+            )
+
+    def assertConsistent(self):
+        self.assertEqual(voter_rollups.find_drift(), {})
+        self.assertEqual(voter_rollups.find_constituency_drift(), {})
+
+    def test_rollups_match_group_bys(self):
+        stats = voter_rollups.rollup_statistics(VoterBoothRollup.objects.all())
+        voters = Voter.objects.all()
+
+        self.assertEqual(stats['total_voters'], 12)
+        self.assertEqual(stats['by_gender'], {'male': 4, 'female': 4, 'other': 4})
+        self.assertEqual(stats['by_sentiment'], dict(
+            voters.values('sentiment').annotate(count=Count('id')).values_list('sentiment', 'count')
+        ))
+        self.assertEqual(stats['verified_voters'], 6)
+        self.assertAlmostEqual(stats['average_age'], voters.aggregate(Avg('age'))['age__avg'])
+        self.assertAlmostEqual(stats['average_sentiment_score'], -0.05)
+        self.assertEqual(VoterBoothRollup.objects.count(), 2)
+
+    def test_every_write_path_keeps_rollups_exact(self):
+        voter = Voter.objects.get(voter_id_number='V-1')
+        voter.sentiment, voter.polling_booth = 'negative', self.booths[0]
+        voter.save()
+        self.assertConsistent()
+
+        # The filter no longer matches the rows once updated
+        Voter.objects.filter(sentiment='neutral').update(sentiment='positive', age=F('age') + 1)
+        self.assertConsistent()
+
+        voters = list(Voter.objects.filter(polling_booth=self.booths[0]))
+        for voter in voters:
+            voter.verified = not voter.verified
+        Voter.objects.bulk_update(voters, ['verified'], batch_size=2)
+        self.assertConsistent()
+
+        Voter.objects.bulk_create([
+            Voter(polling_booth=self.booths[1], organization=self.organization,
+                  full_name=name, voter_id_number=name, gender='female')
+            for name in ('V-1', 'V-20', 'V-21')
+        ], ignore_conflicts=True)
+        self.assertConsistent()
+        self.assertEqual(voter_rollups.rollup_statistics(VoterBoothRollup.objects.all())['total_voters'], 14)
+
+        Voter.objects.get(voter_id_number='V-20').delete()
+        Voter.objects.filter(polling_booth=self.booths[1]).delete()
+        self.assertConsistent()
+
+        VoterImportService(organization=self.organization).import_file(io.BytesIO(
+            b'Constituency Code,Booth Code,Voter ID Number,Full Name,Gender,Age\n'
+            b'TN-1,B-2,V-0,Moved,female,40\nTN-1,B-2,V-30,New,male,22\n'
+        ), file_format='csv')
+        self.assertConsistent()
+        self.assertEqual(
+            VoterBoothRollup.objects.get(polling_booth=self.booths[1]).gender_female, 1
+        )
+
+    def test_statistics_endpoint_sums_scoped_rollups(self):
+        user = User.objects.create_user(username='booth_admin')
+        UserProfile.objects.create(
+            user=user, role='booth_admin', organization=self.organization, assigned_booth=self.booths[0],
+        )
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+        # user lookup (JWT), principal, one aggregate
+        with self.assertNumQueries(3):
+            response = client.get('/api/voters/statistics/')
+        self.assertEqual(response.data['total_voters'], 6)
+        self.assertEqual(response.data['first_time_voters'], 2)
+
+        response = client.get(f'/api/voters/statistics/?polling_booth={self.booths[1].id}')
+        self.assertEqual(response.data['total_voters'], 0)
+
+    def test_sentiment_changes_propagate_to_constituencies(self):
+        user = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=user, role='admin', organization=self.organization)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        voter = Voter.objects.get(voter_id_number='V-0')
+
+        response = client.patch(
+            f'/api/voters/{voter.pk}/update_sentiment/',
+            {'sentiment': 'strongly_positive', 'sentiment_score': '0.90'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        rollup = VoterConstituencyRollup.objects.get()
+        self.assertEqual((rollup.sentiment_strongly_positive, rollup.sentiment_score_sum), (4, Decimal('0.90')))
+        self.assertConsistent()
+
+        # user lookup (JWT), principal, one query over constituencies and their rollups
+        with self.assertNumQueries(3):
+            heatmap = client.get('/api/dashboard/heatmap/').data
+        self.assertEqual([(row['voter_count'], row['avg_sentiment_score']) for row in heatmap], [(12, 0.07)])
+
+        # Moving a booth moves its voters between constituencies
+        north = Constituency.objects.create(
+            organization=self.organization, name='Chennai North', code='TN-2', state='Tamil Nadu',
+        )
+        booth = self.booths[1]
+        booth.constituency = north
+        booth.save()
+        self.assertConsistent()
+        self.assertEqual(VoterConstituencyRollup.objects.get(constituency=north).voter_count, 6)
+
+    def test_booth_moves_carry_constituency_rollups(self):
+        central = Constituency.objects.get()
+        north = Constituency.objects.create(
+            organization=self.organization, name='Chennai North', code='TN-2', state='Tamil Nadu',
+        )
+
+        # A save that keeps the constituency: the UPDATE and the closure check
+        booth = PollingBooth.objects.get(pk=self.booths[0].pk)
+        booth.name = 'Renamed'
+        with self.assertNumQueries(2):
+            booth.save()
+
+        PollingBooth.objects.filter(pk=self.booths[0].pk).update(constituency=north)
+        self.assertConsistent()
+        self.assertEqual(VoterConstituencyRollup.objects.get(constituency=north).voter_count, 6)
+
+        booths = list(PollingBooth.objects.all())
+        for booth in booths:
+            booth.constituency = north
+        PollingBooth.objects.bulk_update(booths, ['constituency'])
+        self.assertConsistent()
+        self.assertEqual(VoterConstituencyRollup.objects.get(constituency=north).voter_count, 12)
+        self.assertEqual(VoterConstituencyRollup.objects.get(constituency=central).voter_count, 0)
+        self.assertEqual(Voter.objects.filter(constituency=north).count(), 12)
+
+        # Not loaded from the database: the stored constituency is read
+        PollingBooth(pk=self.booths[1].pk, **{
+            field.attname: getattr(self.booths[1], field.attname)
+            for field in PollingBooth._meta.concrete_fields if not field.primary_key
+        }).save()
+        self.assertConsistent()
+        self.assertEqual(VoterConstituencyRollup.objects.get(constituency=central).voter_count, 6)
+
+    def test_booth_deletes_leave_constituency_rollups_exact(self):
+        central = Constituency.objects.get()
+
+        PollingBooth.objects.get(pk=self.booths[0].pk).delete()
+        self.assertConsistent()
+        rollup = VoterConstituencyRollup.objects.get(constituency=central)
+        self.assertEqual((rollup.voter_count, rollup.sentiment_neutral), (6, 3))
+
+        PollingBooth.objects.filter(pk=self.booths[1].pk).delete()
+        self.assertConsistent()
+        self.assertEqual(VoterConstituencyRollup.objects.get(constituency=central).voter_count, 0)
+
+        # Cascading from the constituency: its rollup rows go with it
+        PollingBooth.objects.create(constituency=central, name='Booth 3', code='B-3', booth_number='3')
+        central.delete()
+        self.assertFalse(VoterConstituencyRollup.objects.exists())
+
+    def test_reconcile_detects_and_repairs_drift(self):
+        VoterBoothRollup.objects.filter(polling_booth=self.booths[0]).update(voter_count=99)
+        VoterBoothRollup.objects.filter(polling_booth=self.booths[1]).delete()
+        VoterConstituencyRollup.objects.update(sentiment_positive=0)
+
+        call_command('reconcile_voter_rollups', '--dry-run', stdout=io.StringIO())
+        self.assertEqual(len(voter_rollups.find_drift()), 2)
+        self.assertEqual(len(voter_rollups.find_constituency_drift()), 1)
+
+        out = io.StringIO()
+        call_command('reconcile_voter_rollups', stdout=out)
+        self.assertIn('voter_count 99 -> 6', out.getvalue())
+        self.assertIn('sentiment_positive 0 -> 3', out.getvalue())
+        self.assertConsistent()
+
+    def test_one_booth_rollup_without_organization(self):
+        VoterBoothRollup.objects.create(polling_booth=self.booths[0])
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            VoterBoothRollup.objects.create(polling_booth=self.booths[0])
+
+
+class HeatmapGeometryTests(TestCase):
+    """Constituency geometry is served apart from the heatmap numbers and cached by version"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.constituency = Constituency.objects.create(
+            organization=cls.organization, name='Chennai Central', code='TN-1', state='Tamil Nadu',
+        )
+        user = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=user, role='admin', organization=cls.organization)
+        cls.token = str(AccessToken.for_user(user))
+
+    def client_for_admin(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return client
+
+    def test_heatmap_geometry_is_served_once(self):
+        constituency = self.constituency
+        constituency.boundaries = {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [80.27, 13.08]}}
+        constituency.save()
+        client = self.client_for_admin()
+
+        self.assertNotIn('boundaries', client.get('/api/dashboard/heatmap/').data[0])
+
+        response = client.get('/api/dashboard/heatmap/geometry/')
+        feature = json.loads(response.content)['features'][0]
+        self.assertEqual((feature['id'], feature['geometry']['type']), (constituency.id, 'Point'))
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        etag = response['ETag']
+
+        # user lookup (JWT), principal, version aggregate
+        with self.assertNumQueries(3):
+            response = client.get('/api/dashboard/heatmap/geometry/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        pinned = client.get('/api/dashboard/heatmap/geometry/', {'v': etag.strip('"')})
+        self.assertIn('immutable', pinned['Cache-Control'])
+
+        constituency.name = 'Chennai Central (SC)'
+        constituency.save()
+        response = client.get('/api/dashboard/heatmap/geometry/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class BoundaryTopologyTests(TestCase):
+    """Simplified TopoJSON boundaries are built per zoom level with shared borders"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.constituency = Constituency.objects.create(
+            organization=cls.organization, name='Chennai Central', code='TN-1', state='Tamil Nadu',
+        )
+        user = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=user, role='admin', organization=cls.organization)
+        cls.token = str(AccessToken.for_user(user))
+
+    def client_for_admin(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        return client
+
+    def test_boundary_topology_shares_borders_per_zoom(self):
+        # Two squares sharing a zig-zag border at x=81
+        border = [[81 + (0.001 if i % 2 else 0), 13 + i / 100] for i in range(101)]
+        west = self.constituency
+        west.boundaries = {'type': 'Polygon', 'coordinates': [[[80, 13]] + border + [[80, 14], [80, 13]]]}
+        west.save()
+        east = Constituency.objects.create(
+            organization=self.organization, name='Chennai East', code='TN-2', state='Tamil Nadu',
+            boundaries={'type': 'Feature', 'geometry': {
+                'type': 'Polygon', 'coordinates': [[[81, 13], [82, 13], [82, 14]] + border[::-1]],
+            }},
+        )
+        client = self.client_for_admin()
+
+        self.assertEqual(client.get('/api/dashboard/heatmap/geometry/', {'zoom': 'street'}).status_code, 400)
+        self.assertEqual(client.get('/api/dashboard/heatmap/geometry/', {'zoom': 5}).status_code, 404)
+
+        call_command('build_boundary_topology', stdout=io.StringIO())
+        self.assertEqual(BoundaryTopology.objects.filter(organization=self.organization).count(), 3)
+        call_command('build_boundary_topology', stdout=io.StringIO())
+        self.assertEqual(BoundaryTopology.objects.filter(organization__isnull=True).count(), 3)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            BoundaryTopology.objects.create(zoom='state', source_version='', topology={})
+
+        response = client.get('/api/dashboard/heatmap/geometry/', {'zoom': 5})
+        self.assertEqual((response['X-Zoom-Level'], response['Cache-Control']), ('state', 'private, max-age=86400'))
+        topology = json.loads(response.content)
+        geometries = {g['id']: g for g in topology['objects']['constituencies']['geometries']}
+        self.assertEqual(len(topology['arcs']), 3)
+        shared = set(geometries[west.id]['arcs'][0]) & {~index for index in geometries[east.id]['arcs'][0]}
+        self.assertEqual(len(shared), 1)
+        # The border's zig-zag is below the state tolerance
+        shared = shared.pop()
+        self.assertEqual(len(topology['arcs'][shared]), 2)
+        self.assertEqual(geometries[east.id]['properties']['bbox'], [81.0, 13.0, 82.0, 14.0])
+        self.assertAlmostEqual(geometries[east.id]['properties']['centroid'][0], 81.5, places=2)
+
+        detailed = client.get('/api/dashboard/heatmap/geometry/', {'zoom': 'constituency'})
+        self.assertEqual(len(json.loads(detailed.content)['arcs'][shared]), 101)
+
+        # user lookup (JWT), principal, topology version
+        with self.assertNumQueries(3):
+            response = client.get('/api/dashboard/heatmap/geometry/', {'zoom': 5}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+class VoterBulkUpdateTests(TestCase):
+    """Bulk updates are validated, scoped, chunked and audited once"""
+
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name='Test Party', slug='test-party')
+        constituency = Constituency.objects.create(organization=organization, name='Central', code='C-1')
+        booths = [
+            PollingBooth.objects.create(
+                constituency=constituency, organization=organization,
+                name=f'Booth {number}', code=f'B-{number}', booth_number=str(number),
+            )
+            for number in (1, 2)
+        ]
+        cls.voters = [
+            Voter.objects.create(
+                polling_booth=booths[number % 2], organization=organization,
+                full_name=f'Voter {number}', voter_id_number=f'V-{number}',
+            ).pk
+            for number in range(6)
+        ]
+        cls.user = User.objects.create_user(username='booth_admin')
+        UserProfile.objects.create(
+            user=cls.user, role='booth_admin', organization=organization, assigned_booth=booths[0],
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def post(self, payload):
+        return self.client.post('/api/voters/bulk_update/', payload, format='json')
+
+    def test_fields_are_validated_through_the_serializer(self):
+        for data in ({'organization': 2}, {'voter_id_number': 'X'}, {'sentiment': 'ecstatic'}, {}):
+            response = self.post({'voter_ids': self.voters, 'data': data})
+            self.assertEqual(response.status_code, 400, data)
+        self.assertIn('voter_id_number', self.post({'voter_ids': [1], 'data': {'voter_id_number': 'X'}}).data['error'])
+        self.assertFalse(AuditLog.objects.exists())
+
+    def test_uniform_update_in_chunks_with_one_audit_record(self):
+        with mock.patch('api.services.voter_bulk_update_service.BULK_UPDATE_CHUNK_SIZE', 2), \
+                CaptureQueriesContext(connection) as queries:
+            response = self.post({'voter_ids': self.voters, 'data': {'sentiment': 'positive'}})
+
+        in_scope = self.voters[0::2]
+        self.assertEqual(response.data['updated_ids'], in_scope)
+        self.assertEqual(response.data['rejected_ids'], self.voters[1::2])
+        self.assertEqual(
+            list(Voter.objects.filter(sentiment='positive').order_by('pk').values_list('pk', flat=True)), in_scope,
+        )
+        voter_updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE "api_voter"')]
+        self.assertEqual(len(voter_updates), 2)
+
+        audit = AuditLog.objects.get()
+        self.assertEqual(audit.changes['bulk_update']['updated_ids'], in_scope)
+        self.assertEqual(audit.changes['bulk_update']['values'], {'sentiment': 'positive'})
+
+    def test_per_row_updates_report_each_id(self):
+        first, second, other_booth = self.voters[0], self.voters[2], self.voters[1]
+        response = self.post({'updates': [
+            {'id': first, 'age': 41, 'sentiment_score': '0.50'},
+            {'id': second, 'age': 'old'},
+            {'id': other_booth, 'verified': True},
+            {'id': 999999, 'verified': True},
+        ]})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated_ids'], [first])
+        self.assertEqual(response.data['rejected_ids'], [other_booth, 999999])
+        self.assertEqual(list(response.data['errors']), [str(second)])
+        voter = Voter.objects.get(pk=first)
+        self.assertEqual((voter.age, voter.sentiment_score), (41, Decimal('0.50')))
+        self.assertIsNone(Voter.objects.get(pk=second).age)
+        self.assertEqual(voter_rollups.find_drift(), {})
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_large_requests_run_as_background_jobs(self):
+        with mock.patch('api.services.voter_bulk_update_service.BULK_UPDATE_ASYNC_THRESHOLD', 2):
+            response = self.post({'voter_ids': self.voters, 'data': {'verified': True}})
+
+        self.assertEqual((response.status_code, response.data['status']), (202, 'pending'))
+        self.assertFalse(Voter.objects.filter(verified=True).exists())
+
+        job = run_job(response.data['id'])
+        self.assertEqual((job.status, job.row_count), ('completed', 3))
+        status = self.client.get(f'/api/jobs/{job.pk}/').data
+        self.assertEqual(status['result']['rejected_ids'], self.voters[1::2])
+        self.assertEqual(Voter.objects.filter(verified=True).count(), 3)
+        self.assertEqual(AuditLog.objects.get().changes['bulk_update']['job_id'], job.pk)
+
+
+@skipIf(voter_analytics_service.np is None, 'numpy is not installed')
+class VoterAnalyticsTests(TestCase):
+    """Crosstabs from the columnar cube match the ORM and follow writes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        constituency = Constituency.objects.create(organization=cls.organization, name='Central', code='C-1')
+        cls.booths = [
+            PollingBooth.objects.create(
+                constituency=constituency, organization=cls.organization,
+                name=f'Booth {number}', code=f'B-{number}', booth_number=str(number),
+            )
+            for number in (1, 2)
+        ]
+        genders = ('male', 'female')
+        sentiments = ('positive', 'neutral', 'negative')
+        for number in range(30):
+            Voter.objects.create(
+                polling_booth=cls.booths[number % 2], organization=cls.organization,
+                full_name=f'Voter {number}', voter_id_number=f'V-{number}',
+                gender=genders[number % 2], sentiment=sentiments[number % 3],
+                caste_category='sc' if number < 3 else 'general',
+                age=None if number == 0 else 18 + number * 2, sentiment_score=Decimal(number % 3 - 1) / 2,
+            )
+
+        admin = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=admin, role='superadmin', organization=cls.organization)
+        cls.admin_token = str(AccessToken.for_user(admin))
+
+        booth_admin = User.objects.create_user(username='booth_admin')
+        profile = UserProfile.objects.create(
+            user=booth_admin, role='booth_admin', organization=cls.organization, assigned_booth=cls.booths[0],
+        )
+        analytics = Permission.objects.create(name='view_analytics', category='data', description='')
+        UserPermission.objects.create(user_profile=profile, permission=analytics)
+        cls.booth_admin_token = str(AccessToken.for_user(booth_admin))
+
+    def setUp(self):
+        voter_analytics_service.clear_cubes()
+
+    def crosstab(self, query, token=None):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token or self.admin_token}')
+        return client.get(f'/api/analytics/crosstab/?organization={self.organization.id}&{query}')
+
+    def cells(self, response, *dimensions):
+        return {tuple(cell[name] for name in dimensions): cell['count'] for cell in response.data['cells']}
+
+    def test_crosstab_matches_group_by(self):
+        response = self.crosstab('group_by=gender,sentiment')
+        self.assertEqual(response.status_code, 200)
+        expected = {
+            (row['gender'], row['sentiment']): row['count']
+            for row in Voter.objects.values('gender', 'sentiment').annotate(count=Count('id'))
+        }
+        self.assertEqual(self.cells(response, 'gender', 'sentiment'), expected)
+        self.assertEqual(response.data['total'], 30)
+
+        response = self.crosstab(f'group_by=age_band&booth={self.booths[1].id}&gender=female')
+        self.assertEqual(self.cells(response, 'age_band'), {
+            ('18-25',): 2, ('26-35',): 2, ('36-45',): 3, ('46-60',): 4, ('61+',): 4,
+        })
+        negative = self.crosstab('sentiment=negative').data
+        self.assertEqual((negative['total'], negative['cells']), (10, []))
+
+    def test_scope_permission_and_validation(self):
+        response = self.crosstab('group_by=booth', token=self.booth_admin_token)
+        self.assertEqual(self.cells(response, 'booth'), {(self.booths[0].id,): 15})
+
+        # Filtering on a booth outside the scope yields nothing
+        response = self.crosstab(f'booth={self.booths[1].id}', token=self.booth_admin_token)
+        self.assertEqual(response.data['total'], 0)
+
+        self.assertEqual(self.crosstab('group_by=full_name').status_code, 400)
+        self.assertEqual(self.crosstab('booth=first').status_code, 400)
+
+        outsider = User.objects.create_user(username='volunteer')
+        UserProfile.objects.create(user=outsider, role='user', organization=self.organization)
+        self.assertEqual(self.crosstab('group_by=gender', token=AccessToken.for_user(outsider)).status_code, 403)
+
+    def test_cube_follows_writes(self):
+        self.assertEqual(self.crosstab('sentiment=positive').data['total'], 10)
+
+        voter = Voter.objects.get(voter_id_number='V-1')
+        voter.sentiment = 'positive'
+        voter.save()
+        Voter.objects.create(
+            polling_booth=self.booths[0], organization=self.organization,
+            full_name='New', voter_id_number='V-100', sentiment='positive',
+        )
+        # Only the changed voters are read again
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.crosstab('sentiment=positive').data['total'], 12)
+        voter_reads = [q for q in queries.captured_queries if 'FROM "api_voter"' in q['sql']]
+        self.assertEqual(len(voter_reads), 1)
+        self.assertIn('"updated_at" >=', voter_reads[0]['sql'])
+
+        Voter.objects.filter(voter_id_number__in=['V-1', 'V-4']).delete()
+        self.assertEqual(self.crosstab('sentiment=positive').data['total'], 11)
+        self.assertEqual(self.crosstab('').data['total'], 29)
+
+    def test_small_caste_cells_are_suppressed(self):
+        response = self.crosstab('group_by=caste_category')
+        cells = {cell['caste_category']: cell for cell in response.data['cells']}
+        self.assertEqual(cells['general']['count'], 27)
+        self.assertEqual((cells['sc']['count'], cells['sc']['suppressed']), (None, True))
+        self.assertEqual((response.data['total'], response.data['suppressed_cells']), (None, 1))
+
+        self.assertIsNone(self.crosstab('caste_category=sc').data['total'])
+        # Other breakdowns are not suppressed
+        self.assertEqual(self.cells(self.crosstab('group_by=gender&sentiment=negative'), 'gender'),
+                         {('male',): 5, ('female',): 5})
+
+
+class BoundedActionTests(TestCase):
+    """Custom list actions are paginated, or streamed under a row ceiling"""
+
+    @classmethod
+    def setUpTestData(cls):
+        organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.constituency = Constituency.objects.create(organization=organization, name='Central', code='C-1')
+        booths = [
+            PollingBooth.objects.create(
+                constituency=cls.constituency, organization=organization,
+                name=f'Booth {number}', code=f'B-{number}', booth_number=f'{number:02}',
+            )
+            for number in range(15)
+        ]
+        Voter.objects.bulk_create(
+            Voter(
+                polling_booth=booths[0], organization=organization, sentiment='positive',
+                full_name=f'Voter {number:02}', voter_id_number=f'V-{number}',
+            )
+            for number in range(25)
+        )
+        admin = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=admin, role='superadmin', organization=organization)
+        cls.token = str(AccessToken.for_user(admin))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_actions_return_one_page(self):
+        url = f'/api/constituencies/{self.constituency.id}/polling_booths/'
+        response = self.client.get(url)
+        self.assertEqual((response.data['count'], len(response.data['results'])), (15, 10))
+        self.assertEqual(len(self.client.get(url, {'page': 2}).data['results']), 5)
+
+        # Voters use the view's cursor pagination
+        response = self.client.get('/api/voters/by_sentiment/', {'sentiment': 'positive'})
+        self.assertEqual(len(response.data['results']), 10)
+        following = self.client.get(response.data['next'])
+        self.assertEqual(following.data['results'][0]['full_name'], 'Voter 10')
+
+    def test_streams_stop_at_the_row_limit(self):
+        url = f'/api/polling-booths/by_constituency/?constituency_id={self.constituency.id}&stream=1'
+        response = self.client.get(url)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([json.loads(line)['booth_number'] for line in lines], [f'{n:02}' for n in range(15)])
+
+        with mock.patch.object(BoundedActionMixin, 'stream_row_limit', 20):
+            response = self.client.get('/api/voters/by_sentiment/?sentiment=positive&stream=1')
+            lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual((len(lines), response['X-Row-Limit']), (20, '20'))
+
+
+class SentimentRollupTests(TestCase):
+    """IST daily and hourly sentiment rollups follow analysis writes and answer trends"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organization = Organization.objects.create(name='Test Party', slug='test-party')
+        cls.constituency = Constituency.objects.create(
+            organization=cls.organization, name='Chennai Central', code='TN-1', state='Tamil Nadu',
+        )
+        booth = PollingBooth.objects.create(
+            constituency=cls.constituency, organization=cls.organization,
+            name='Booth 1', code='B-1', booth_number='1',
+        )
+        cls.voter = Voter.objects.create(
+            polling_booth=booth, organization=cls.organization, full_name='Voter', voter_id_number='V-1',
+        )
+        admin = User.objects.create_user(username='admin')
+        UserProfile.objects.create(user=admin, role='admin', organization=cls.organization)
+        cls.token = str(AccessToken.for_user(admin))
+
+    def analysis(self, score, **fields):
+        fields.setdefault('constituency', self.constituency)
+        return SentimentAnalysis(
+            organization=self.organization, sentiment_score=Decimal(score), confidence=Decimal('0.90'), **fields
+        )
+
+    def assertConsistent(self):
+        stored = {
+            (row.organization_id, row.constituency_id, row.source, row.granularity, row.bucket):
+                {column: getattr(row, column) for column in sentiment_rollup_manager.ROLLUP_COLUMNS}
+            for row in SentimentRollup.objects.all()
+        }
+        stored = {key: counters for key, counters in stored.items() if counters['analysis_count']}
+        self.assertEqual(stored, sentiment_rollup_manager.contributions(SentimentAnalysis.objects.all()))
+
+    def test_rollups_follow_writes(self):
+        self.analysis('0.50', voter=self.voter).save()
+        SentimentAnalysis.objects.bulk_create([
+            self.analysis('-0.40', source='survey'), self.analysis('0.10'), self.analysis('0.30', constituency=None),
+        ])
+        self.assertConsistent()
+        self.assertEqual(SentimentRollup.objects.filter(granularity='day').count(), 3)
+
+        # 19:00 UTC is 00:30 IST the next day
+        evening = timezone.now().replace(hour=19, minute=0) - timedelta(days=2)
+        SentimentAnalysis.objects.filter(sentiment_score=Decimal('0.10')).update(created_at=evening)
+        self.assertConsistent()
+        bucket = SentimentRollup.objects.get(granularity='day', bucket__lt=timezone.now() - timedelta(days=1)).bucket
+        self.assertEqual(bucket.astimezone(sentiment_rollup_manager.IST).date(), (evening + timedelta(days=1)).date())
+
+        analysis = SentimentAnalysis.objects.get(source='survey')
+        analysis.sentiment_score = Decimal('0.90')
+        analysis.save()
+        analysis.delete()
+        self.voter.delete()
+        self.assertConsistent()
+        self.assertEqual(SentimentAnalysis.objects.count(), 2)
+
+    def test_trends_read_rollups(self):
+        SentimentAnalysis.objects.bulk_create([
+            self.analysis('0.50'), self.analysis('-0.50'), self.analysis('0.00', source='survey'),
+        ])
+        old = self.analysis('0.80')
+        old.save()
+        SentimentAnalysis.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=40))
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        # user lookup (JWT), principal, one range scan over the rollups
+        with self.assertNumQueries(3):
+            trends = client.get('/api/dashboard/sentiment_trends/').data
+        self.assertEqual(len(trends), 1)
+        self.assertEqual(
+            [trends[0][key] for key in ('positive_count', 'negative_count', 'neutral_count', 'average_score')],
+            [1, 1, 1, 0.0],
+        )
+        self.assertEqual(trends[0]['date'], timezone.now().astimezone(sentiment_rollup_manager.IST).date())
+
+        hourly = client.get('/api/dashboard/sentiment_trends/', {'granularity': 'hour', 'source': 'survey'}).data
+        self.assertEqual([row['analysis_count'] for row in hourly], [1])
+        self.assertEqual(len(client.get('/api/dashboard/sentiment_trends/', {'days': 60}).data), 2)
+        self.assertEqual(len(client.get('/api/dashboard/sentiment_trends/', {'days': 99999999999}).data), 2)
+        self.assertEqual(client.get('/api/dashboard/sentiment_trends/', {'granularity': 'week'}).status_code, 400)
+
+    def test_backfill_rebuilds_rollups(self):
+        SentimentAnalysis.objects.bulk_create([self.analysis('0.50'), self.analysis('-0.50')])
+        SentimentRollup.objects.update(positive_count=7)
+        SentimentRollup.objects.create(
+            organization=self.organization, source='manual', granularity='day',
+            bucket=timezone.now() - timedelta(days=400), analysis_count=3,
+        )
+
+        call_command('backfill_sentiment_rollups', '--days', '1', stdout=io.StringIO())
+        self.assertEqual(SentimentRollup.objects.filter(positive_count=7).count(), 0)
+        self.assertEqual(SentimentRollup.objects.count(), 3)
+
+        call_command('backfill_sentiment_rollups', stdout=io.StringIO())
+        self.assertConsistent()
+        self.assertEqual(SentimentRollup.objects.count(), 2)
+
+    def test_one_rollup_per_bucket_without_constituency(self):
+        bucket = timezone.now().replace(minute=0, second=0, microsecond=0)
+        SentimentRollup.objects.create(organization=self.organization, source='manual', granularity='hour', bucket=bucket)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            SentimentRollup.objects.create(
+                organization=self.organization, source='manual', granularity='hour', bucket=bucket,
+            )
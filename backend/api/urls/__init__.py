@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from api.views import UserViewSet, UserProfileViewSet, TaskViewSet, NotificationViewSet, UploadedFileViewSet, profile_me
 from api.views.auth_views import CustomTokenObtainPairView, CustomTokenRefreshView, health_check
 from api.views.state_config_views import get_states_config
+from api.views.metrics_views import metrics_view
 
 # Create router for viewsets (legacy routes)
 router = DefaultRouter()
@@ -16,6 +17,9 @@ urlpatterns = [
     # Health check (with database connectivity status)
     path('health/', health_check, name='health-check'),
 
+    # Prometheus metrics (per-route latency, DB and serializer histograms)
+    path('metrics/', metrics_view, name='metrics'),
+
     # JWT Authentication (with database pre-checks)
     path('auth/login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('auth/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
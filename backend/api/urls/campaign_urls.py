@@ -16,6 +16,9 @@ from ..views.campaign_views import (
     SentimentAnalysisViewSet,
     DashboardViewSet
 )
+from ..views.analytics_views import AnalyticsViewSet
+from ..views.export_views import ExportViewSet
+from ..views.job_views import BackgroundJobViewSet
 
 # Create router and register viewsets
 router = DefaultRouter()
@@ -29,5 +32,8 @@ router.register(r'issues', IssueViewSet, basename='issue')
 router.register(r'voter-interactions', VoterInteractionViewSet, basename='voterinteraction')
 router.register(r'sentiment-analyses', SentimentAnalysisViewSet, basename='sentimentanalysis')
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'exports', ExportViewSet, basename='export')
+router.register(r'jobs', BackgroundJobViewSet, basename='backgroundjob')
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
 
 urlpatterns = router.urls
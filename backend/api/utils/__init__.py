@@ -2,6 +2,8 @@
 API Utilities Package
 """
 from .visibility_scope import (
+    VisibilityScope,
+    get_visibility_scope,
     get_user_visibility_scope,
     filter_constituency_queryset,
     filter_polling_booth_queryset,
@@ -9,10 +11,13 @@ from .visibility_scope import (
     filter_campaign_queryset,
     filter_user_queryset,
     can_user_access_object,
+    accessible_ids,
     get_visibility_scope_summary
 )
 
 __all__ = [
+    'VisibilityScope',
+    'get_visibility_scope',
     'get_user_visibility_scope',
     'filter_constituency_queryset',
     'filter_polling_booth_queryset',
@@ -20,5 +25,6 @@ __all__ = [
     'filter_campaign_queryset',
     'filter_user_queryset',
     'can_user_access_object',
+    'accessible_ids',
     'get_visibility_scope_summary',
 ]
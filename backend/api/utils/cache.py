@@ -0,0 +1,178 @@
+"""
+In-process caching helpers
+
+Small, thread-safe caches used on hot request paths (authentication,
+tenant resolution) where a round-trip to the database would dominate the
+cost of the lookup itself.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with a per-entry expiry time
+
+    - Entries are evicted least-recently-used first once max_entries is reached
+    - Expired entries are dropped lazily when they are read
+    - Hit/miss/eviction counters are kept for observability
+
+    Usage:
+        cache = TTLCache(max_entries=1024, default_ttl=300)
+        cache.set('key', value, ttl=60)
+        value = cache.get('key')
+    """
+
+    def __init__(self, max_entries=1024, default_ttl=300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store value under key
+
+        Args:
+            key: Hashable cache key
+            value: Value to store (may be None)
+            ttl: Seconds until the entry expires (defaults to default_ttl)
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        """Remove a single entry"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate):
+        """
+        Remove every entry for which predicate(key, value) is true
+
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            doomed = [key for key, (_, value) in self._data.items() if predicate(key, value)]
+            for key in doomed:
+                del self._data[key]
+        return len(doomed)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Return counters for monitoring"""
+        with self._lock:
+            size = len(self._data)
+        lookups = self.hits + self.misses
+        return {
+            'size': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class SharedGeneration:
+    """
+    Cross-process invalidation counter kept in the Django cache
+
+    In-process caches cannot see writes made by other workers. Writers call
+    bump(); readers call changed(), which polls the shared counter at most
+    every check_interval seconds and reports whether it moved since the
+    last poll. Without a shared cache backend (LocMem) this only covers the
+    current process and other workers rely on their own TTLs.
+
+    Usage:
+        generation = SharedGeneration('tenant_resolver:generation')
+        if generation.changed():
+            local_cache.clear()
+    """
+
+    def __init__(self, key, check_interval=5):
+        self.key = key
+        self.check_interval = check_interval
+        self._seen = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def changed(self):
+        """True if another process bumped the counter since the last poll"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+
+        with self._lock:
+            if now < self._next_check:
+                return False
+            self._next_check = now + self.check_interval
+
+        try:
+            current = cache.get(self.key)
+        except Exception as e:
+            logger.warning(f"Could not read {self.key}: {e}")
+            return False
+
+        if current == self._seen:
+            return False
+        self._seen = current
+        return True
+
+    def bump(self):
+        """Publish an invalidation to every process"""
+        try:
+            try:
+                current = cache.incr(self.key)
+            except ValueError:
+                current = 1
+                cache.set(self.key, current, timeout=None)
+            self._seen = current
+        except Exception as e:
+            logger.warning(f"Could not publish {self.key}: {e}")
@@ -0,0 +1,138 @@
+"""
+Constituency geometry for maps
+
+Boundaries are large and rarely change, so they are served apart from the
+metrics that reference them (DashboardViewSet.heatmap returns metrics keyed
+by constituency id):
+
+    version = geometry_version(constituencies)    # one aggregate query
+    body = feature_collection(constituencies, version)
+
+The version is derived from the number of constituencies and their latest
+updated_at, so every worker computes the same ETag without reading any
+boundaries. Serialized collections are cached per version in-process.
+
+Maps zoomed out to a whole state draw far more detail than they can show, so
+build_boundary_topology also stores simplified TopoJSON per ZOOM_LEVELS entry
+(BoundaryTopology); zoom_level() maps a web map zoom to the level to serve.
+"""
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+
+from .cache import TTLCache
+from .topology import Topology
+
+GEOMETRY_CACHE_TTL = 3600
+
+# Level -> (Douglas-Peucker tolerance in degrees, quantization); tolerances
+# stay under a pixel at the web map zooms zoom_level() maps to each level
+ZOOM_LEVELS = {
+    'state': (0.015, 10_000),
+    'district': (0.002, 100_000),
+    'constituency': (0.0002, 100_000),
+}
+
+_collections = TTLCache(max_entries=16, default_ttl=GEOMETRY_CACHE_TTL)
+_topologies = TTLCache(max_entries=64, default_ttl=GEOMETRY_CACHE_TTL)
+
+
+def geometry_version(constituencies):
+    """Opaque version of the boundaries of constituencies (changes on any save)"""
+    state = constituencies.order_by().aggregate(count=Count('id'), changed=Max('updated_at'))
+    changed = state['changed'].isoformat() if state['changed'] else ''
+    digest = hashlib.sha1(f"{constituencies.query}|{state['count']}|{changed}".encode())
+    return digest.hexdigest()[:20]
+
+
+def _geometry(boundaries):
+    """GeoJSON geometry of a boundaries value (a geometry or a Feature), or None"""
+    if not boundaries:
+        return None
+    if boundaries.get('type') == 'Feature':
+        return boundaries.get('geometry')
+    return boundaries
+
+
+def serialize(data):
+    """Compact JSON bytes, as served"""
+    return json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+
+
+def feature_collection(constituencies, version):
+    """
+    GeoJSON FeatureCollection of constituencies as UTF-8 bytes
+
+    Features carry the constituency id (matching heatmap rows) and name.
+    """
+    cached = _collections.get(version)
+    if cached is not None:
+        return cached
+
+    features = [
+        {
+            'type': 'Feature',
+            'id': constituency_id,
+            'properties': {'name': name},
+            'geometry': _geometry(boundaries),
+        }
+        for constituency_id, name, boundaries in constituencies.order_by('id').values_list(
+            'id', 'name', 'boundaries'
+        ).iterator(chunk_size=100)
+    ]
+    body = serialize({'type': 'FeatureCollection', 'features': features})
+    _collections.set(version, body)
+    return body
+
+
+def zoom_level(zoom):
+    """
+    ZOOM_LEVELS key for a level name or a web map zoom (0-22), or None
+
+    Zooms up to 6 show a whole state, up to 9 a district.
+    """
+    if zoom in ZOOM_LEVELS:
+        return zoom
+    try:
+        zoom = float(zoom)
+    except (TypeError, ValueError):
+        return None
+    if not 0 <= zoom <= 22:
+        return None
+    if zoom <= 6:
+        return 'state'
+    return 'district' if zoom <= 9 else 'constituency'
+
+
+def build_topologies(constituencies, levels=None):
+    """
+    Simplified TopoJSON of constituencies at each zoom level
+
+    Geometries carry the constituency id and name plus the bbox and centroid
+    of the full boundary.
+
+    Returns:
+        dict: {level: TopoJSON dict}
+    """
+    topology = Topology(
+        (constituency_id, {'name': name}, _geometry(boundaries))
+        for constituency_id, name, boundaries in constituencies.order_by('id').values_list(
+            'id', 'name', 'boundaries'
+        ).iterator(chunk_size=100)
+    )
+    return {
+        level: topology.encode(*ZOOM_LEVELS[level])
+        for level in (levels or ZOOM_LEVELS)
+    }
+
+
+def topology_body(boundary_topology):
+    """Serialized TopoJSON of a BoundaryTopology, cached per build"""
+    key = (boundary_topology.pk, boundary_topology.source_version, boundary_topology.built_at)
+    cached = _topologies.get(key)
+    if cached is None:
+        cached = serialize(boundary_topology.topology)
+        _topologies.set(key, cached)
+    return cached
@@ -0,0 +1,327 @@
+"""
+Geographic hierarchy closure table
+
+GeoHierarchyClosure stores every (ancestor, descendant, depth) pair of the
+State -> Zone -> District -> Constituency -> PollingBooth hierarchy, so
+subtree and ancestor questions are a single indexed lookup instead of joins
+across five tables:
+
+    from api.utils.geo_closure import descendant_ids, ancestors
+
+    booth_ids = descendant_ids('district', 12)             # every booth under district 12
+    PollingBooth.objects.filter(id__in=descendants('zone', 3))  # as a subquery
+    ancestors('booth', 812)  # {'constituency': 40, 'district': 12, 'zone': 3, 'state': 1}
+
+A node's parent is the nearest level it references: zones belong to a
+state, districts to a zone, booths to a constituency, and a constituency to
+its district_ref, else zone_ref, else state_ref.
+
+The table is maintained incrementally: by api/signals.py for inserts, moves
+and deletes of single instances, and by GeoPathQuerySet
+(api/managers/geo_path_manager.py) for booth bulk_create(), bulk_update()
+and update(constituency=...). `manage.py rebuild_geo_closure` recomputes it
+after raw SQL writes.
+"""
+import logging
+from itertools import islice
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+logger = logging.getLogger(__name__)
+
+# Levels, root first
+LEVELS = ('state', 'zone', 'district', 'constituency', 'booth')
+
+LEVEL_MODELS = {
+    'state': 'api.State',
+    'zone': 'api.Zone',
+    'district': 'api.District',
+    'constituency': 'api.Constituency',
+    'booth': 'api.PollingBooth',
+}
+
+# Fields that determine a node's parent, per level
+PARENT_FIELDS = {
+    'state': (),
+    'zone': ('state',),
+    'district': ('zone',),
+    'constituency': ('district_ref', 'zone_ref', 'state_ref'),
+    'booth': ('constituency',),
+}
+
+BATCH_SIZE = 5000
+
+
+def _closure(apps=global_apps):
+    return apps.get_model('api', 'GeoHierarchyClosure')
+
+
+def level_of(instance):
+    """Hierarchy level of a State/Zone/District/Constituency/PollingBooth, or None"""
+    label = instance._meta.label
+    for level, model_label in LEVEL_MODELS.items():
+        if model_label == label:
+            return level
+    return None
+
+
+def parent_of(level, instance):
+    """(level, id) of a node's parent, or None for states and orphans"""
+    for field in PARENT_FIELDS[level]:
+        parent_id = getattr(instance, f'{field}_id')
+        if parent_id is not None:
+            return (_parent_level(level, field), parent_id)
+    return None
+
+
+def _parent_level(level, field):
+    if level == 'constituency':
+        return field[:-len('_ref')]
+    return LEVELS[LEVELS.index(level) - 1]
+
+
+# ============================================================
+# Lookups
+# ============================================================
+
+def descendants(level, node_id, descendant_level='booth'):
+    """
+    Ids of descendant_level nodes under a node, as a lazy values queryset
+
+    Usable directly as a subquery: Model.objects.filter(id__in=descendants(...)).
+    Includes the node itself when descendant_level == level.
+    """
+    return _closure().objects.filter(
+        ancestor_level=level,
+        ancestor_node=node_id,
+        descendant_level=descendant_level,
+    ).values_list('descendant_node', flat=True)
+
+
+def descendant_ids(level, node_id, descendant_level='booth'):
+    """Like descendants(), evaluated to a list"""
+    return list(descendants(level, node_id, descendant_level))
+
+
+def ancestors(level, node_id):
+    """
+    Ancestors of a node, nearest first
+
+    Returns:
+        dict: {level: id}, e.g. {'constituency': 40, 'district': 12, 'zone': 3, 'state': 1}
+    """
+    rows = _closure().objects.filter(
+        descendant_level=level,
+        descendant_node=node_id,
+        depth__gt=0,
+    ).order_by('depth').values_list('ancestor_level', 'ancestor_node')
+    return dict(rows)
+
+
+# ============================================================
+# Incremental maintenance
+# ============================================================
+
+def _node_q(prefix, level, node_id):
+    return Q(**{f'{prefix}_level': level, f'{prefix}_node': node_id})
+
+
+def _bulk_insert(model, rows, ignore_conflicts=False):
+    """bulk_create from an iterator in BATCH_SIZE chunks (bulk_create itself materializes)"""
+    rows = iter(rows)
+    count = 0
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            return count
+        model.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        count += len(batch)
+
+
+def add_node(level, node_id, parent):
+    """Insert a new leaf node under parent ((level, id) or None)"""
+    add_nodes(level, {node_id: parent})
+
+
+def add_nodes(level, parents):
+    """
+    Insert new leaf nodes
+
+    Args:
+        parents: {node_id: parent (level, id) or None}; each distinct parent's
+            ancestors are read once
+    """
+    Closure = _closure()
+    parent_paths = {
+        parent: list(Closure.objects.filter(
+            _node_q('descendant', *parent)
+        ).values_list('ancestor_level', 'ancestor_node', 'depth'))
+        for parent in set(parents.values()) if parent is not None
+    }
+
+    def rows():
+        for node_id, parent in parents.items():
+            yield Closure(
+                ancestor_level=level, ancestor_node=node_id,
+                descendant_level=level, descendant_node=node_id, depth=0,
+            )
+            for ancestor_level, ancestor_node, depth in parent_paths.get(parent, ()):
+                yield Closure(
+                    ancestor_level=ancestor_level, ancestor_node=ancestor_node,
+                    descendant_level=level, descendant_node=node_id, depth=depth + 1,
+                )
+
+    _bulk_insert(Closure, rows(), ignore_conflicts=True)
+
+
+def parent_through(level, field, parent_id):
+    """(level, id) of the parent a node references through field, or None"""
+    return None if parent_id is None else (_parent_level(level, field), parent_id)
+
+
+def move_node(level, node_id, parent):
+    """
+    Re-parent a node and its whole subtree
+
+    Paths from the node's old ancestors into the subtree are removed and
+    paths from the new parent's ancestors are added.
+    """
+    Closure = _closure()
+    subtree = Closure.objects.filter(_node_q('ancestor', level, node_id))
+
+    with transaction.atomic():
+        old_ancestors = list(Closure.objects.filter(
+            _node_q('descendant', level, node_id), depth__gt=0,
+        ).values_list('ancestor_level', 'ancestor_node'))
+
+        if old_ancestors:
+            in_subtree = Exists(subtree.filter(
+                descendant_level=OuterRef('descendant_level'),
+                descendant_node=OuterRef('descendant_node'),
+            ))
+            old_q = Q()
+            for ancestor in old_ancestors:
+                old_q |= _node_q('ancestor', *ancestor)
+            Closure.objects.filter(old_q).filter(in_subtree).delete()
+
+        if parent is None:
+            return
+
+        new_ancestors = list(Closure.objects.filter(
+            _node_q('descendant', *parent)
+        ).values_list('ancestor_level', 'ancestor_node', 'depth'))
+        subtree_nodes = list(subtree.values_list('descendant_level', 'descendant_node', 'depth'))
+
+        _bulk_insert(Closure, (
+            Closure(
+                ancestor_level=ancestor_level, ancestor_node=ancestor_node,
+                descendant_level=descendant_level, descendant_node=descendant_node,
+                depth=ancestor_depth + 1 + descendant_depth,
+            )
+            for descendant_level, descendant_node, descendant_depth in subtree_nodes
+            for ancestor_level, ancestor_node, ancestor_depth in new_ancestors
+        ), ignore_conflicts=True)
+
+    logger.info(f"Geo closure: moved {level}:{node_id} under {parent[0]}:{parent[1]}")
+
+
+def sync_node(instance, created):
+    """
+    Bring a saved node's closure rows up to date
+
+    New nodes are inserted; existing nodes are moved when their parent
+    changed. Nodes missing from the table (saved before it existed) are
+    inserted on their next save.
+    """
+    level = level_of(instance)
+    parent = parent_of(level, instance)
+
+    if created:
+        add_node(level, instance.pk, parent)
+        return
+
+    current = {
+        depth: (ancestor_level, ancestor_node)
+        for depth, ancestor_level, ancestor_node in _closure().objects.filter(
+            _node_q('descendant', level, instance.pk), depth__lte=1,
+        ).values_list('depth', 'ancestor_level', 'ancestor_node')
+    }
+
+    if 0 not in current:
+        add_node(level, instance.pk, parent)
+    elif current.get(1) != parent:
+        move_node(level, instance.pk, parent)
+
+
+def remove_subtree(instance):
+    """Delete closure rows of a node and everything below it"""
+    level = level_of(instance)
+    Closure = _closure()
+    in_subtree = Exists(Closure.objects.filter(
+        _node_q('ancestor', level, instance.pk),
+        descendant_level=OuterRef('descendant_level'),
+        descendant_node=OuterRef('descendant_node'),
+    ))
+    Closure.objects.filter(in_subtree).delete()
+
+
+# ============================================================
+# Full rebuild
+# ============================================================
+
+def rebuild(apps=global_apps):
+    """
+    Recompute the whole closure table from the hierarchy tables
+
+    Args:
+        apps: App registry (historical registry when run from a migration)
+
+    Returns:
+        int: Number of closure rows written
+    """
+    Closure = _closure(apps)
+    parents = {}
+    nodes = []
+
+    for level in LEVELS:
+        model = apps.get_model(LEVEL_MODELS[level])
+        columns = [f'{field}_id' for field in PARENT_FIELDS[level]]
+        for row in model._default_manager.order_by().values_list('pk', *columns).iterator():
+            node = (level, row[0])
+            nodes.append(node)
+            parent_ids = row[1:]
+            for field, parent_id in zip(PARENT_FIELDS[level], parent_ids):
+                if parent_id is not None:
+                    parents[node] = (_parent_level(level, field), parent_id)
+                    break
+
+    # Memoized for inner nodes only; booths are leaves and too many to keep
+    paths = {}
+
+    def ancestors_of(node):
+        """[(ancestor, depth)] including the node itself"""
+        if node in paths:
+            return paths[node]
+        parent = parents.get(node)
+        inherited = ancestors_of(parent) if parent else []
+        path = [(node, 0)] + [(ancestor, depth + 1) for ancestor, depth in inherited]
+        if node[0] != 'booth':
+            paths[node] = path
+        return path
+
+    def rows():
+        for node in nodes:
+            for (ancestor_level, ancestor_node), depth in ancestors_of(node):
+                yield Closure(
+                    ancestor_level=ancestor_level, ancestor_node=ancestor_node,
+                    descendant_level=node[0], descendant_node=node[1], depth=depth,
+                )
+
+    with transaction.atomic():
+        Closure.objects.all().delete()
+        count = _bulk_insert(Closure, rows())
+
+    logger.info(f"Geo closure rebuilt: {count} rows for {len(nodes)} nodes")
+    return count
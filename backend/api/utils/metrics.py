@@ -0,0 +1,255 @@
+"""
+Per-request performance instrumentation
+
+Collects, for every request:
+- total latency
+- DB query count and DB time (via a connection execute wrapper)
+- serializer time (time spent building serializer.data)
+- response size
+
+The per-request numbers are emitted as a Server-Timing header by
+PerformanceMiddleware and aggregated here into per-route histograms that
+/api/metrics/ exposes in the Prometheus text format.
+
+Routes are labelled by their URL/DRF view name (e.g. 'voter-detail'), never
+by the raw path, so label cardinality stays bounded by the URLconf.
+
+Metrics are kept per process: every worker exposes its own registry.
+"""
+import contextvars
+import threading
+import time
+
+from rest_framework import serializers
+
+
+# ============================================================================
+# PER-REQUEST ACCUMULATOR
+# ============================================================================
+
+class RequestMetrics:
+    """Numbers collected while a single request is being served"""
+
+    __slots__ = ('started', 'db_queries', 'db_seconds', 'serializer_seconds', '_serializer_depth')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self._serializer_depth = 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+_current_metrics = contextvars.ContextVar('request_metrics', default=None)
+
+
+def start_request_metrics():
+    """Begin collecting for the current request; returns (metrics, reset token)"""
+    metrics = RequestMetrics()
+    return metrics, _current_metrics.set(metrics)
+
+
+def finish_request_metrics(token):
+    """Stop collecting for the current request"""
+    _current_metrics.reset(token)
+
+
+def get_request_metrics():
+    """Metrics of the request being served in this context, if any"""
+    return _current_metrics.get()
+
+
+def query_timer(execute, sql, params, many, context):
+    """
+    Connection execute wrapper counting and timing queries
+
+    Only queries issued while a request is being instrumented are counted.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """connection_created handler attaching query_timer once per connection"""
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def _timed_serializer_data(original):
+    """Wrap BaseSerializer.data so only the outermost access is timed"""
+
+    def data(self):
+        metrics = _current_metrics.get()
+        if metrics is None:
+            return original(self)
+
+        metrics._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self)
+        finally:
+            metrics._serializer_depth -= 1
+            if metrics._serializer_depth == 0:
+                metrics.serializer_seconds += time.perf_counter() - started
+
+    data.instrumented = True
+    return property(data)
+
+
+def install_serializer_timer():
+    """Time serializer.data for every DRF serializer (idempotent)"""
+    current = serializers.BaseSerializer.data
+    if getattr(current.fget, 'instrumented', False):
+        return
+    serializers.BaseSerializer.data = _timed_serializer_data(current.fget)
+
+
+# ============================================================================
+# AGGREGATION
+# ============================================================================
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024)
+
+
+class Histogram:
+    """Cumulative histogram keyed by a label tuple"""
+
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self._series = {}
+
+    def observe(self, labels, value):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = {
+                'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0,
+            }
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series['buckets'][index] += 1
+        series['sum'] += value
+        series['count'] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, series in sorted(self._series.items()):
+            label_text = _format_labels(zip(self.label_names, labels))
+            for bound, count in zip(self.buckets, series['buckets']):
+                le = _format_labels(list(zip(self.label_names, labels)) + [('le', _format_number(bound))])
+                lines.append(f'{self.name}_bucket{le} {count}')
+            inf = _format_labels(list(zip(self.label_names, labels)) + [('le', '+Inf')])
+            lines.append(f'{self.name}_bucket{inf} {series["count"]}')
+            lines.append(f'{self.name}_sum{label_text} {_format_number(series["sum"])}')
+            lines.append(f'{self.name}_count{label_text} {series["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Thread-safe per-route request metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        labels = ('route', 'method')
+        self.latency = Histogram(
+            'api_request_duration_seconds', 'Total request latency', LATENCY_BUCKETS, labels)
+        self.db_time = Histogram(
+            'api_request_db_seconds', 'Time spent in database queries', LATENCY_BUCKETS, labels)
+        self.db_queries = Histogram(
+            'api_request_db_queries', 'Database queries per request', QUERY_COUNT_BUCKETS, labels)
+        self.serializer_time = Histogram(
+            'api_request_serializer_seconds', 'Time spent building serializer data', LATENCY_BUCKETS, labels)
+        self.response_size = Histogram(
+            'api_response_size_bytes', 'Response body size', SIZE_BUCKETS, labels)
+        self._responses = {}
+
+    def record(self, route, method, status_code, metrics, elapsed, size):
+        labels = (route, method)
+        with self._lock:
+            self.latency.observe(labels, elapsed)
+            self.db_time.observe(labels, metrics.db_seconds)
+            self.db_queries.observe(labels, metrics.db_queries)
+            self.serializer_time.observe(labels, metrics.serializer_seconds)
+            if size is not None:
+                self.response_size.observe(labels, size)
+            key = (route, method, f'{status_code // 100}xx')
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def render(self, extra_lines=()):
+        """Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            lines = []
+            for histogram in (self.latency, self.db_time, self.db_queries,
+                              self.serializer_time, self.response_size):
+                lines.extend(histogram.render())
+            lines.append('# HELP api_responses_total Responses by route and status class')
+            lines.append('# TYPE api_responses_total counter')
+            for (route, method, status_class), count in sorted(self._responses.items()):
+                label_text = _format_labels([('route', route), ('method', method), ('status', status_class)])
+                lines.append(f'api_responses_total{label_text} {count}')
+        lines.extend(extra_lines)
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self.__init__()
+
+
+registry = MetricsRegistry()
+
+
+def route_label(request):
+    """
+    Low-cardinality route label for a request
+
+    Uses the URL name (DRF router names such as 'voter-detail'), falling back
+    to the route pattern, and 'unmatched' when no URL resolved.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route or 'unmatched'
+
+
+def server_timing_header(metrics, elapsed, auth_seconds=None):
+    """Build a Server-Timing header value from a request's metrics"""
+    parts = [
+        f'total;dur={elapsed * 1000:.1f}',
+        f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.db_queries} queries"',
+        f'ser;dur={metrics.serializer_seconds * 1000:.1f}',
+    ]
+    if auth_seconds is not None:
+        parts.append(f'auth;dur={auth_seconds * 1000:.1f}')
+    return ', '.join(parts)
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(pairs):
+    pairs = list(pairs)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
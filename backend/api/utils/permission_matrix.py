@@ -0,0 +1,171 @@
+"""
+Compiled permission matrix
+
+The whole RBAC configuration is small (tens of permissions, a handful of
+roles), so instead of querying RolePermission/UserPermission for every
+check, each process loads it once into integer bitsets:
+
+- every Permission gets a bit
+- every role gets a mask of its permissions
+- UserPermission grants are overlaid per profile
+
+A check is then a dict lookup and a bit test. Writes to Permission,
+RolePermission or UserPermission invalidate the matrix (see api/signals.py):
+the writing process rebuilds on its next check, other workers notice the
+bumped shared generation within VERSION_CHECK_INTERVAL seconds.
+
+Usage:
+    from api.utils.permission_matrix import permission_engine
+
+    permission_engine.has_permission(profile.role, profile.id, 'users.create')
+    permission_engine.permissions_for(profile.role, profile.id)  # frozenset
+"""
+import threading
+
+from django.conf import settings
+from django.db import transaction
+
+from api.models import Permission, RolePermission, UserPermission
+from api.utils.cache import SharedGeneration
+
+GENERATION_KEY = 'permission_matrix:generation'
+
+# Roles that implicitly hold every permission
+ALL_PERMISSIONS_ROLES = frozenset({'superadmin'})
+
+
+class PermissionMatrix:
+    """
+    Immutable snapshot of permissions as bitsets
+
+    Attributes:
+        names: Permission names, indexed by bit
+        bits: {permission name: bit}
+        role_masks: {role: mask}
+        user_masks: {profile id: mask of UserPermission grants}
+        all_mask: Mask with every permission set
+    """
+
+    def __init__(self, names, role_grants, user_grants):
+        self.names = tuple(names)
+        self.bits = {name: bit for bit, name in enumerate(self.names)}
+        self.all_mask = (1 << len(self.names)) - 1
+        self.role_masks = self._compile(role_grants)
+        self.user_masks = self._compile(user_grants)
+        self._name_sets = {}
+        self._lock = threading.Lock()
+
+    def _compile(self, grants):
+        masks = {}
+        for owner, name in grants:
+            bit = self.bits.get(name)
+            if bit is not None:
+                masks[owner] = masks.get(owner, 0) | (1 << bit)
+        return masks
+
+    @classmethod
+    def load(cls):
+        """Build the matrix from the database (three queries)"""
+        permissions = dict(Permission.objects.order_by('id').values_list('id', 'name'))
+        role_grants = [
+            (role, permissions.get(permission_id))
+            for role, permission_id in RolePermission.objects.values_list('role', 'permission_id')
+        ]
+        user_grants = [
+            (profile_id, permissions.get(permission_id))
+            for profile_id, permission_id in UserPermission.objects.filter(
+                granted=True
+            ).values_list('user_profile_id', 'permission_id')
+        ]
+        return cls(permissions.values(), role_grants, user_grants)
+
+    def mask_for(self, role, profile_id=None):
+        """Effective permission mask for a role plus a profile's own grants"""
+        if role in ALL_PERMISSIONS_ROLES:
+            return self.all_mask
+        return self.role_masks.get(role, 0) | self.user_masks.get(profile_id, 0)
+
+    def has_permission(self, role, profile_id, permission_name):
+        bit = self.bits.get(permission_name)
+        if bit is None:
+            return role in ALL_PERMISSIONS_ROLES
+        return bool(self.mask_for(role, profile_id) >> bit & 1)
+
+    def names_for_mask(self, mask):
+        """
+        Permission names in mask
+
+        Results are interned per mask, so every user sharing a role (and no
+        personal grants) shares one frozenset.
+        """
+        names = self._name_sets.get(mask)
+        if names is None:
+            with self._lock:
+                names = self._name_sets.get(mask)
+                if names is None:
+                    names = frozenset(
+                        name for bit, name in enumerate(self.names) if mask >> bit & 1
+                    )
+                    self._name_sets[mask] = names
+        return names
+
+    def permissions_for(self, role, profile_id=None):
+        return self.names_for_mask(self.mask_for(role, profile_id))
+
+
+class PermissionEngine:
+    """
+    Process-wide holder of the current PermissionMatrix
+
+    The matrix is built on first use and rebuilt after an invalidation, from
+    this process or (via SharedGeneration) from another worker.
+    """
+
+    def __init__(self, version_check_interval=5):
+        self._matrix = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._generation = SharedGeneration(GENERATION_KEY, check_interval=version_check_interval)
+
+    def matrix(self):
+        """Current matrix, rebuilding it if it was invalidated"""
+        if self._generation.changed():
+            self._drop()
+
+        matrix = self._matrix
+        if matrix is None:
+            with self._lock:
+                matrix = self._matrix
+                if matrix is None:
+                    version = self._version
+                    matrix = PermissionMatrix.load()
+                    # Keep it only if no invalidation raced with the load
+                    if version == self._version:
+                        self._matrix = matrix
+        return matrix
+
+    def has_permission(self, role, profile_id, permission_name):
+        """O(1) permission check for a role and profile"""
+        return self.matrix().has_permission(role, profile_id, permission_name)
+
+    def permissions_for(self, role, profile_id=None):
+        """Interned frozenset of permission names for a role and profile"""
+        return self.matrix().permissions_for(role, profile_id)
+
+    def invalidate(self):
+        """Rebuild on next use here, and in other workers once committed"""
+        self._drop()
+        transaction.on_commit(self._publish_invalidation)
+
+    def _publish_invalidation(self):
+        self._drop()
+        self._generation.bump()
+
+    def _drop(self):
+        self._version += 1
+        self._matrix = None
+
+
+permission_engine = PermissionEngine(
+    version_check_interval=getattr(settings, 'PERMISSION_MATRIX_VERSION_CHECK_INTERVAL', 5),
+)
@@ -0,0 +1,216 @@
+"""
+Request-scoped principal
+
+Middleware, permission classes, visibility scope and viewsets all need the
+same facts about the authenticated user: role, organization and geographic
+assignment. RequestPrincipal loads them once per request with a single
+query and every layer reads them from here instead of walking
+request.user.profile and its lazy foreign keys.
+
+Usage:
+    principal = get_principal(request.user)
+    if principal.is_superadmin:
+        ...
+    queryset.filter(organization_id=principal.organization_id)
+"""
+from api.models import Organization, UserProfile
+from api.utils.permission_matrix import permission_engine
+
+
+ADMIN_LEVEL_ROLES = ('state_admin', 'zone_admin', 'district_admin', 'constituency_admin')
+
+PRINCIPAL_FIELDS = (
+    'id', 'role', 'organization_id',
+    'assigned_state_id', 'assigned_zone_id', 'assigned_district_id',
+    'assigned_constituency_id', 'assigned_booth_id',
+)
+
+_UNSET = object()
+
+
+class RequestPrincipal:
+    """
+    Immutable snapshot of the authenticated user's role and assignments
+
+    Attributes:
+        user_id: Django user id (None when anonymous)
+        profile_id: UserProfile id (None when the user has no profile)
+        role: Profile role
+        organization_id: Organization the user belongs to
+        assigned_*_id: Geographic assignment ids
+    """
+
+    def __init__(self, user_id=None, profile_id=None, role=None, organization_id=None,
+                 assigned_state_id=None, assigned_zone_id=None, assigned_district_id=None,
+                 assigned_constituency_id=None, assigned_booth_id=None,
+                 organization_slug=_UNSET):
+        self.user_id = user_id
+        self.profile_id = profile_id
+        self.role = role
+        self.organization_id = organization_id
+        self.assigned_state_id = assigned_state_id
+        self.assigned_zone_id = assigned_zone_id
+        self.assigned_district_id = assigned_district_id
+        self.assigned_constituency_id = assigned_constituency_id
+        self.assigned_booth_id = assigned_booth_id
+        self._organization_slug = organization_slug
+
+    @classmethod
+    def from_profile(cls, profile):
+        """Build from an already-loaded profile without touching the database"""
+        return cls(
+            user_id=profile.user_id,
+            profile_id=profile.id,
+            role=profile.role,
+            organization_id=profile.organization_id,
+            assigned_state_id=profile.assigned_state_id,
+            assigned_zone_id=profile.assigned_zone_id,
+            assigned_district_id=profile.assigned_district_id,
+            assigned_constituency_id=profile.assigned_constituency_id,
+            assigned_booth_id=profile.assigned_booth_id,
+        )
+
+    @classmethod
+    def load(cls, user):
+        """Load the principal for user with one query (profile joined to organization)"""
+        return cls._from_row(user, cls._row_queryset(user).first())
+
+    @classmethod
+    async def aload(cls, user):
+        """Async variant of load()"""
+        return cls._from_row(user, await cls._row_queryset(user).afirst())
+
+    @staticmethod
+    def _row_queryset(user):
+        return (
+            UserProfile.objects
+            .filter(user_id=user.pk)
+            .values_list(*PRINCIPAL_FIELDS, 'organization__slug')
+        )
+
+    @classmethod
+    def _from_row(cls, user, row):
+        if row is None:
+            return cls(user_id=user.pk, organization_slug=None)
+
+        values = dict(zip(PRINCIPAL_FIELDS, row))
+        return cls(
+            user_id=user.pk,
+            profile_id=values.pop('id'),
+            organization_slug=row[-1],
+            **values
+        )
+
+    @property
+    def is_authenticated(self):
+        return self.user_id is not None
+
+    @property
+    def has_profile(self):
+        return self.profile_id is not None
+
+    @property
+    def is_superadmin(self):
+        return self.role == 'superadmin'
+
+    @property
+    def is_admin(self):
+        """Any admin level below superadmin"""
+        return self.role in ADMIN_LEVEL_ROLES
+
+    @property
+    def is_admin_or_above(self):
+        return self.is_superadmin or self.is_admin
+
+    @property
+    def can_create_users(self):
+        """Every level except analyst can create users at the next level down"""
+        return self.role in ('superadmin',) + ADMIN_LEVEL_ROLES + ('booth_admin',)
+
+    @property
+    def organization_slug(self):
+        """Organization slug (resolved lazily when built from a cached profile)"""
+        if self._organization_slug is _UNSET:
+            self._organization_slug = None
+            if self.organization_id is not None:
+                self._organization_slug = (
+                    Organization.objects
+                    .filter(id=self.organization_id)
+                    .values_list('slug', flat=True)
+                    .first()
+                )
+        return self._organization_slug
+
+    @property
+    def permissions(self):
+        """Set of permission names granted to this user (no queries, see permission_matrix)"""
+        if not self.has_profile:
+            return frozenset()
+        return permission_engine.permissions_for(self.role, self.profile_id)
+
+    def has_permission(self, permission_name):
+        if not self.has_profile:
+            return False
+        return permission_engine.has_permission(self.role, self.profile_id, permission_name)
+
+    def __repr__(self):
+        return f"<RequestPrincipal user={self.user_id} role={self.role} org={self.organization_id}>"
+
+
+ANONYMOUS_PRINCIPAL = RequestPrincipal(organization_slug=None)
+
+
+def get_principal(user):
+    """
+    Return the principal for user, loading it at most once per user instance
+
+    Authentication classes build a new user instance per request, so caching
+    on the instance makes the principal request-scoped.
+    """
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_PRINCIPAL
+
+    principal = getattr(user, '_principal', None)
+    if principal is not None:
+        return principal
+
+    profile = _cached_profile(user)
+    if profile is not None:
+        principal = RequestPrincipal.from_profile(profile)
+    else:
+        principal = RequestPrincipal.load(user)
+
+    user._principal = principal
+    return principal
+
+
+async def aget_principal(user):
+    """Async variant of get_principal() for async middleware and views"""
+    if user is None or not user.is_authenticated:
+        return ANONYMOUS_PRINCIPAL
+
+    principal = getattr(user, '_principal', None)
+    if principal is not None:
+        return principal
+
+    profile = _cached_profile(user)
+    if profile is not None:
+        principal = RequestPrincipal.from_profile(profile)
+    else:
+        principal = await RequestPrincipal.aload(user)
+
+    user._principal = principal
+    return principal
+
+
+def _cached_profile(user):
+    """The user's reverse profile if it is already loaded (no query)"""
+    profile_cache = UserProfile.user.field.remote_field
+    if profile_cache.is_cached(user):
+        return profile_cache.get_cached_value(user)
+    return None
+
+
+def get_request_principal(request):
+    """Principal for a Django or DRF request"""
+    return get_principal(getattr(request, 'user', None))
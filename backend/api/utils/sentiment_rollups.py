@@ -0,0 +1,99 @@
+"""
+Sentiment trends from SentimentRollup
+
+A trend over any window is one range scan over the rollup rows of its IST
+day or hour buckets, grouped by bucket, instead of a date group-by over the
+sentiment analyses:
+
+    from api.utils.sentiment_rollups import trends
+
+    trends(SentimentRollup.objects.filter(organization_id=org), start, 'day')
+
+Rollups are maintained incrementally (api/managers/sentiment_rollup_manager.py);
+rebuild() recomputes a window from the analyses and backs
+`manage.py backfill_sentiment_rollups`.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Sum
+
+from api.managers.sentiment_rollup_manager import IST, ROLLUP_COLUMNS, bucket_start, contributions
+from api.models import SentimentAnalysis, SentimentRollup
+
+logger = logging.getLogger(__name__)
+
+
+def trends(rollups, start, granularity='day', end=None):
+    """
+    Counts and average score per bucket of rollups from start (inclusive)
+
+    Args:
+        rollups: SentimentRollup queryset (organization, constituency, source filters)
+        start: Any moment; the window starts at its bucket
+        granularity: 'day' or 'hour'
+        end: Optional moment; buckets starting after it are excluded
+
+    Returns:
+        list: {'bucket': IST datetime, 'positive_count', 'negative_count',
+        'neutral_count', 'analysis_count', 'average_score'} in bucket order
+    """
+    rows = rollups.filter(granularity=granularity, bucket__gte=bucket_start(start, granularity))
+    if end is not None:
+        rows = rows.filter(bucket__lte=end)
+    rows = rows.values('bucket').annotate(
+        **{column: Sum(column) for column in ROLLUP_COLUMNS}
+    ).order_by('bucket')
+
+    result = []
+    for row in rows:
+        count = row['analysis_count']
+        result.append({
+            'bucket': row['bucket'].astimezone(IST),
+            'positive_count': row['positive_count'],
+            'negative_count': row['negative_count'],
+            'neutral_count': row['neutral_count'],
+            'analysis_count': count,
+            'average_score': round(float(row['score_sum']) / count, 4) if count else None,
+        })
+    return result
+
+
+def rebuild(organization_id=None, since=None):
+    """
+    Recompute the rollups of a window from the analyses
+
+    Args:
+        organization_id: Only this organization (default: all)
+        since: Rebuild from the IST day containing this moment (default: all history)
+
+    Returns:
+        int: Rollup rows written
+    """
+    analyses = SentimentAnalysis.objects.all()
+    rollups = SentimentRollup.objects.all()
+    if organization_id is not None:
+        analyses = analyses.filter(organization_id=organization_id)
+        rollups = rollups.filter(organization_id=organization_id)
+    if since is not None:
+        # Whole days, so both granularities cover the same span
+        since = bucket_start(since, 'day')
+        analyses = analyses.filter(created_at__gte=since)
+        rollups = rollups.filter(bucket__gte=since)
+
+    with transaction.atomic():
+        rollups.delete()
+        created = SentimentRollup.objects.bulk_create(
+            (
+                SentimentRollup(
+                    organization_id=org_id, constituency_id=constituency_id,
+                    source=source, granularity=granularity, bucket=bucket, **counters,
+                )
+                for (org_id, constituency_id, source, granularity, bucket), counters
+                in contributions(analyses).items()
+            ),
+            batch_size=1000,
+        )
+    logger.info(f"Rebuilt {len(created)} sentiment rollups for organization {organization_id} since {since}")
+    return len(created)
+
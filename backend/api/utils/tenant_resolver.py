@@ -0,0 +1,181 @@
+"""
+Cached tenant (Organization) resolution
+
+Resolves the organization for a request from:
+- the path slug:          /api/org/<slug>/...
+- the Host subdomain:     bjp.bachao.co          (TENANT_BASE_DOMAINS)
+- a custom domain:        election.bjp.com       (Organization.custom_domain)
+
+Lookups are served from an in-process TTL cache, so steady-state tenant
+resolution costs no queries. Misses are cached too (for a shorter time) so
+scanning random slugs cannot turn into a query per request.
+
+Cross-worker invalidation: every Organization save/delete clears the local
+cache and bumps a generation counter in the shared Django cache. Each worker
+polls that counter at most every VERSION_CHECK_INTERVAL seconds and drops its
+cache when it changes. Without a shared cache backend (LocMem), other workers
+converge within TTL.
+
+Usage:
+    from api.utils.tenant_resolver import tenant_resolver
+
+    organization = tenant_resolver.resolve_slug('bjp')
+    organization = tenant_resolver.resolve_host(request.META.get('HTTP_HOST'))
+"""
+import copy
+
+from django.conf import settings
+from django.db import transaction
+
+from api.models import Organization
+from api.utils.cache import SharedGeneration, TTLCache
+
+GENERATION_KEY = 'tenant_resolver:generation'
+
+# Cached marker for "no such organization"
+_MISSING = object()
+
+
+class TenantResolver:
+    """
+    Organization lookup by slug, subdomain or custom domain with caching
+
+    Callers always receive a shallow copy, so modifying the returned instance
+    (e.g. assigning branding before save()) never leaks into the cache.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300, negative_ttl=60, version_check_interval=5):
+        self.negative_ttl = negative_ttl
+        self._cache = TTLCache(max_entries=max_entries, default_ttl=ttl)
+        self._generation = SharedGeneration(GENERATION_KEY, check_interval=version_check_interval)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def resolve_slug(self, slug):
+        """Organization with this slug, or None"""
+        return self._resolve('slug', slug)
+
+    def resolve_subdomain(self, subdomain):
+        """Organization with this subdomain, or None"""
+        return self._resolve('subdomain', subdomain)
+
+    def resolve_domain(self, domain):
+        """Organization whose custom_domain is domain, or None"""
+        return self._resolve('custom_domain', domain)
+
+    def resolve_host(self, host):
+        """
+        Organization for a Host header value
+
+        Hosts under one of TENANT_BASE_DOMAINS resolve by their subdomain
+        (bjp.bachao.co -> 'bjp'); any other host is tried as a custom domain.
+
+        Args:
+            host: Host header (port is ignored)
+
+        Returns:
+            Organization or None
+        """
+        lookup = self._host_lookup(host)
+        return self._resolve(*lookup) if lookup else None
+
+    async def aresolve_slug(self, slug):
+        """Async variant of resolve_slug()"""
+        return await self._aresolve('slug', slug)
+
+    async def aresolve_host(self, host):
+        """Async variant of resolve_host()"""
+        lookup = self._host_lookup(host)
+        return await self._aresolve(*lookup) if lookup else None
+
+    @staticmethod
+    def _host_lookup(host):
+        """(field, value) to resolve a Host header by, or None"""
+        if not host:
+            return None
+
+        host = host.split(':', 1)[0].lower().rstrip('.')
+        for base_domain in getattr(settings, 'TENANT_BASE_DOMAINS', []):
+            if host == base_domain or host == f'www.{base_domain}':
+                return None
+            if host.endswith(f'.{base_domain}'):
+                subdomain = host[:-len(base_domain) - 1]
+                if '.' in subdomain:
+                    return None
+                return ('subdomain', subdomain)
+
+        return ('custom_domain', host)
+
+    def _resolve(self, field, value):
+        if not value:
+            return None
+
+        organization = self._cached(field, value)
+        if organization is None:
+            organization = self._store(field, value, Organization.objects.filter(**{field: value}).first())
+        return self._result(organization)
+
+    async def _aresolve(self, field, value):
+        if not value:
+            return None
+
+        organization = self._cached(field, value)
+        if organization is None:
+            organization = self._store(field, value, await Organization.objects.filter(**{field: value}).afirst())
+        return self._result(organization)
+
+    def _cached(self, field, value):
+        """Cached organization, _MISSING for a cached miss, None if not cached"""
+        if self._generation.changed():
+            self.clear()
+        return self._cache.get((field, value))
+
+    def _store(self, field, value, organization):
+        if organization is None:
+            self._cache.set((field, value), _MISSING, ttl=self.negative_ttl)
+            return _MISSING
+        self._cache.set((field, value), organization)
+        return organization
+
+    @staticmethod
+    def _result(organization):
+        return None if organization is _MISSING else copy.copy(organization)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def clear(self):
+        """Drop this worker's cached lookups"""
+        self._cache.clear()
+
+    def invalidate(self):
+        """
+        Drop cached lookups in every worker
+
+        Clears the local cache now and bumps the shared generation once the
+        current transaction commits, so other workers cannot re-cache the
+        pre-commit row.
+        """
+        self.clear()
+        transaction.on_commit(self._publish_invalidation)
+
+    def _publish_invalidation(self):
+        self.clear()
+        self._generation.bump()
+
+    def stats(self):
+        """Cache counters for monitoring"""
+        return self._cache.stats()
+
+
+_resolver_settings = getattr(settings, 'TENANT_RESOLVER', {})
+
+tenant_resolver = TenantResolver(
+    max_entries=_resolver_settings.get('MAX_ENTRIES', 1024),
+    ttl=_resolver_settings.get('TTL', 300),
+    negative_ttl=_resolver_settings.get('NEGATIVE_TTL', 60),
+    version_check_interval=_resolver_settings.get('VERSION_CHECK_INTERVAL', 5),
+)
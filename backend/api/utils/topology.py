@@ -0,0 +1,299 @@
+"""
+TopoJSON encoding with per-level simplification
+
+Polygons that share borders (neighbouring constituencies) store each border
+once as an arc. Arcs are cut at junctions, points where rings stop running
+together, so simplifying an arc moves both neighbours identically and
+simplified maps keep no gaps or overlaps:
+
+    topology = Topology(features)                        # arcs at full precision
+    topology.encode(tolerance=0.005, quantization=10000)   # one TopoJSON dict per level
+
+Coordinates are first snapped to a BASE_QUANTIZATION grid over the bounding
+box; each level then simplifies the arcs (Douglas-Peucker, tolerance in
+degrees), snaps them to its own coarser grid and delta-encodes them as the
+TopoJSON spec describes. Feature properties get the bbox and centroid of the
+full-precision geometry.
+"""
+
+BASE_QUANTIZATION = 1_000_000
+
+
+def polygons(geometry):
+    """Polygons (lists of rings) of a GeoJSON geometry; other types have none"""
+    if not geometry:
+        return []
+    if geometry.get('type') == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry.get('type') == 'MultiPolygon':
+        return list(geometry['coordinates'])
+    if geometry.get('type') == 'GeometryCollection':
+        return [polygon for part in geometry.get('geometries', []) for polygon in polygons(part)]
+    return []
+
+
+def _ring_centroid(ring):
+    """(signed area, centroid x, centroid y) of a ring (shoelace formula)"""
+    area = cx = cy = 0.0
+    for (x0, y0), (x1, y1) in zip(ring, ring[1:]):
+        cross = x0 * y1 - x1 * y0
+        area += cross
+        cx += (x0 + x1) * cross
+        cy += (y0 + y1) * cross
+    area /= 2
+    if not area:
+        return 0.0, 0.0, 0.0
+    return area, cx / (6 * area), cy / (6 * area)
+
+
+def bbox_and_centroid(feature_polygons):
+    """
+    Bounding box and area-weighted centroid of polygons (holes subtract)
+
+    Returns:
+        tuple: ([min x, min y, max x, max y], [x, y]), or (None, None) if empty
+    """
+    xs = [point[0] for polygon in feature_polygons for ring in polygon for point in ring]
+    ys = [point[1] for polygon in feature_polygons for ring in polygon for point in ring]
+    if not xs:
+        return None, None
+    bbox = [min(xs), min(ys), max(xs), max(ys)]
+
+    weight = sx = sy = 0.0
+    for polygon in feature_polygons:
+        for index, ring in enumerate(polygon):
+            area, cx, cy = _ring_centroid([tuple(point[:2]) for point in ring])
+            area = abs(area) if index == 0 else -abs(area)
+            weight += area
+            sx += area * cx
+            sy += area * cy
+    if weight:
+        centroid = [sx / weight, sy / weight]
+    else:
+        centroid = [(bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2]
+    return [round(value, 4) for value in bbox], [round(value, 4) for value in centroid]
+
+
+def _distance2(point, start, end):
+    """Squared distance from point to the segment start-end"""
+    (px, py), (ax, ay), (bx, by) = point, start, end
+    dx, dy = bx - ax, by - ay
+    length2 = dx * dx + dy * dy
+    if length2:
+        t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length2))
+        ax, ay = ax + t * dx, ay + t * dy
+    return (px - ax) ** 2 + (py - ay) ** 2
+
+
+def douglas_peucker(points, tolerance):
+    """Points of a line kept by Douglas-Peucker simplification (endpoints always kept)"""
+    if len(points) <= 2:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    tolerance2 = tolerance * tolerance
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        farthest, index = -1.0, None
+        for i in range(first + 1, last):
+            distance = _distance2(points[i], points[first], points[last])
+            if distance > farthest:
+                farthest, index = distance, i
+        if index is not None and farthest > tolerance2:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def simplify_arc(points, tolerance):
+    """
+    Simplify one arc; closed arcs (whole rings) keep at least a triangle
+
+    A closed arc is split at the point farthest from its start so both
+    halves have distinct endpoints.
+    """
+    if tolerance <= 0 or len(points) <= 2:
+        return list(points)
+    if points[0] != points[-1]:
+        return douglas_peucker(points, tolerance)
+    if len(points) <= 4:
+        return list(points)
+
+    start = points[0]
+    far = max(range(1, len(points) - 1), key=lambda i: _distance2(points[i], start, start))
+    simplified = douglas_peucker(points[:far + 1], tolerance)[:-1] + douglas_peucker(points[far:], tolerance)
+    if len(simplified) < 4:
+        # Keep the point farthest from the start-far chord
+        extra = max(
+            (i for i in range(1, len(points) - 1) if i != far),
+            key=lambda i: _distance2(points[i], start, points[far]),
+        )
+        kept = sorted({0, far, extra, len(points) - 1})
+        simplified = [points[i] for i in kept]
+    return simplified
+
+
+class Topology:
+    """
+    Shared-arc topology of polygon features
+
+    Args:
+        features: Iterable of (id, properties, GeoJSON geometry); ids and
+            properties are copied to the TopoJSON geometries
+    """
+
+    def __init__(self, features):
+        features = [(feature_id, dict(properties or {}), polygons(geometry))
+                    for feature_id, properties, geometry in features]
+        points = [point for _, _, parts in features for polygon in parts for ring in polygon for point in ring]
+        if points:
+            self.bbox = [
+                min(point[0] for point in points), min(point[1] for point in points),
+                max(point[0] for point in points), max(point[1] for point in points),
+            ]
+        else:
+            self.bbox = [0, 0, 0, 0]
+        extent = max(self.bbox[2] - self.bbox[0], self.bbox[3] - self.bbox[1])
+        self.translate = (self.bbox[0], self.bbox[1])
+        # Grid units per degree (one scale for both axes keeps distances isotropic)
+        self.scale = (BASE_QUANTIZATION - 1) / extent if extent else 1.0
+
+        rings = {}
+        for index, (_, _, parts) in enumerate(features):
+            for part, polygon in enumerate(parts):
+                for ring_index, ring in enumerate(polygon):
+                    quantized = self._quantize_ring(ring)
+                    if quantized:
+                        rings[(index, part, ring_index)] = quantized
+
+        junctions = self._junctions(rings.values())
+        self.arcs = []
+        self._arc_index = {}
+        ring_arcs = {key: self._cut(ring, junctions) for key, ring in rings.items()}
+
+        self.geometries = []
+        for index, (feature_id, properties, parts) in enumerate(features):
+            arcs = []
+            for part, polygon in enumerate(parts):
+                part_arcs = [
+                    ring_arcs[(index, part, ring_index)]
+                    for ring_index in range(len(polygon))
+                    if (index, part, ring_index) in ring_arcs
+                ]
+                # A polygon needs its outer ring
+                if part_arcs and (index, part, 0) in ring_arcs:
+                    arcs.append(part_arcs)
+            bbox, centroid = bbox_and_centroid(parts)
+            properties.update(bbox=bbox, centroid=centroid)
+            self.geometries.append((feature_id, properties, arcs))
+
+    def _quantize_ring(self, ring):
+        """Ring snapped to the base grid, consecutive duplicates removed; None if degenerate"""
+        min_x, min_y = self.translate
+        quantized = []
+        for point in ring:
+            snapped = (round((point[0] - min_x) * self.scale), round((point[1] - min_y) * self.scale))
+            if not quantized or snapped != quantized[-1]:
+                quantized.append(snapped)
+        if quantized and quantized[0] != quantized[-1]:
+            quantized.append(quantized[0])
+        return quantized if len(quantized) >= 4 else None
+
+    @staticmethod
+    def _junctions(rings):
+        """Points where rings meet with different neighbours"""
+        neighbours, junctions = {}, set()
+        for ring in rings:
+            points = ring[:-1]
+            for i, point in enumerate(points):
+                pair = frozenset((points[i - 1], points[(i + 1) % len(points)]))
+                seen = neighbours.setdefault(point, pair)
+                if seen != pair:
+                    junctions.add(point)
+        return junctions
+
+    def _cut(self, ring, junctions):
+        """Arc indices of a ring cut at its junctions (~index for reversed arcs)"""
+        points = ring[:-1]
+        cuts = [i for i, point in enumerate(points) if point in junctions]
+        if not cuts:
+            # Whole ring is one arc; start at its smallest point so shared rings match
+            start = points.index(min(points))
+            points = points[start:] + points[:start]
+            return [self._arc(points + points[:1])]
+
+        start = cuts[0]
+        points = points[start:] + points[:start]
+        cuts = [i - start for i in cuts] + [len(points)]
+        points = points + points[:1]
+        return [self._arc(points[first:last + 1]) for first, last in zip(cuts, cuts[1:])]
+
+    def _arc(self, points):
+        key = tuple(points)
+        index = self._arc_index.get(key)
+        if index is not None:
+            return index
+        reverse = self._arc_index.get(key[::-1])
+        if reverse is not None:
+            return ~reverse
+        if key[0] == key[-1]:
+            # Closed arcs may be stored reversed and rotated
+            body = key[:-1]
+            flipped = body[::-1]
+            start = flipped.index(min(flipped))
+            rotated = flipped[start:] + flipped[:start]
+            reverse = self._arc_index.get(rotated + rotated[:1])
+            if reverse is not None:
+                return ~reverse
+        self._arc_index[key] = len(self.arcs)
+        self.arcs.append(points)
+        return len(self.arcs) - 1
+
+    def encode(self, tolerance, quantization, object_name='constituencies'):
+        """
+        TopoJSON topology of the features at one level of detail
+
+        Args:
+            tolerance: Douglas-Peucker tolerance in degrees (0 keeps every point)
+            quantization: Grid size of the output coordinates
+
+        Returns:
+            dict: TopoJSON Topology (quantized, delta-encoded arcs)
+        """
+        factor = (quantization - 1) / (BASE_QUANTIZATION - 1)
+        arcs = []
+        for arc in self.arcs:
+            simplified = simplify_arc(arc, tolerance * self.scale)
+            encoded, previous = [], None
+            for x, y in simplified:
+                point = (round(x * factor), round(y * factor))
+                if point != previous:
+                    encoded.append(
+                        [point[0] - previous[0], point[1] - previous[1]] if previous else [point[0], point[1]]
+                    )
+                    previous = point
+            if len(encoded) == 1:
+                encoded.append([0, 0])
+            arcs.append(encoded)
+
+        step = 1 / (self.scale * factor) if factor else 1
+        geometries = []
+        for feature_id, properties, polygon_arcs in self.geometries:
+            if not polygon_arcs:
+                geometry = {'type': None}
+            elif len(polygon_arcs) == 1:
+                geometry = {'type': 'Polygon', 'arcs': polygon_arcs[0]}
+            else:
+                geometry = {'type': 'MultiPolygon', 'arcs': polygon_arcs}
+            geometry.update(id=feature_id, properties=properties)
+            geometries.append(geometry)
+
+        return {
+            'type': 'Topology',
+            'bbox': self.bbox,
+            'transform': {'scale': [step, step], 'translate': list(self.translate)},
+            'objects': {object_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+            'arcs': arcs,
+        }
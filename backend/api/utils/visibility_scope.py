@@ -9,249 +9,346 @@ This module provides utilities to filter querysets based on user's geographic sc
 - Constituency Admin: Constituency-wide data
 - Booth Admin: Booth-only data
 - Analyst: Assigned level data (read-only)
+
+A scope is an immutable set of integer ids built from the request principal
+and cached on it, so evaluating it again within a request costs no queries.
+Queryset filters are expressed on *_id columns, and object checks compare the
+ids already on the row instead of loading related objects.
 """
 from django.db.models import Q
 
-
-def get_user_visibility_scope(user):
+from api.models import (
+    Campaign, Constituency, District, PollingBooth, SentimentAnalysis, State, Voter, VoterBoothRollup,
+    VoterInteraction, Zone,
+)
+
+from .principal import get_principal
+
+
+# Geographic levels, broadest first
+SCOPE_LEVELS = ('state', 'zone', 'district', 'constituency', 'booth')
+
+# Admin roles and the level they are scoped to
+ROLE_SCOPE_LEVELS = {
+    'state_admin': 'state',
+    'zone_admin': 'zone',
+    'district_admin': 'district',
+    'constituency_admin': 'constituency',
+    'booth_admin': 'booth',
+}
+
+# Per model: scope level -> lookup on the model's *_id columns. Booths and
+# voters carry their geographic path denormalized (geo_path_manager), so
+# their filters never join.
+# A model missing a level cannot be scoped at it (e.g. a booth admin has no
+# Constituency or Campaign rows in scope). A tuple of lookups matches rows
+# satisfying any of them (sentiment records hang off a voter or a constituency).
+SCOPE_LOOKUPS = {
+    Constituency: {
+        'state': 'state_ref_id',
+        'zone': 'zone_ref_id',
+        'district': 'district_ref_id',
+        'constituency': 'id',
+    },
+    PollingBooth: {
+        'state': 'state_id',
+        'zone': 'zone_id',
+        'district': 'district_id',
+        'constituency': 'constituency_id',
+        'booth': 'id',
+    },
+    Voter: {
+        'state': 'state_id',
+        'zone': 'zone_id',
+        'district': 'district_id',
+        'constituency': 'constituency_id',
+        'booth': 'polling_booth_id',
+    },
+    Campaign: {
+        'state': 'constituency__state_ref_id',
+        'zone': 'constituency__zone_ref_id',
+        'district': 'constituency__district_ref_id',
+        'constituency': 'constituency_id',
+    },
+    VoterInteraction: {
+        'state': 'voter__state_id',
+        'zone': 'voter__zone_id',
+        'district': 'voter__district_id',
+        'constituency': 'voter__constituency_id',
+        'booth': 'voter__polling_booth_id',
+    },
+    VoterBoothRollup: {
+        'state': 'polling_booth__state_id',
+        'zone': 'polling_booth__zone_id',
+        'district': 'polling_booth__district_id',
+        'constituency': 'polling_booth__constituency_id',
+        'booth': 'polling_booth_id',
+    },
+    SentimentAnalysis: {
+        'state': ('constituency__state_ref_id', 'voter__state_id'),
+        'zone': ('constituency__zone_ref_id', 'voter__zone_id'),
+        'district': ('constituency__district_ref_id', 'voter__district_id'),
+        'constituency': ('constituency_id', 'voter__constituency_id'),
+        'booth': 'voter__polling_booth_id',
+    },
+}
+
+# Ids per query in accessible_ids(); keeps IN lists within backend parameter limits
+ACCESS_CHECK_BATCH_SIZE = 10000
+
+# Scope level -> UserProfile assignment column, for user management lists
+USER_SCOPE_LOOKUPS = {
+    'state': 'profile__assigned_state_id',
+    'zone': 'profile__assigned_zone_id',
+    'district': 'profile__assigned_district_id',
+    'constituency': 'profile__assigned_constituency_id',
+    'booth': 'profile__assigned_booth_id',
+}
+
+
+def parse_id(value):
+    """Primary key from request data (int or numeric string), or None"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_tuple(lookup):
+    return lookup if isinstance(lookup, tuple) else (lookup,)
+
+
+class VisibilityScope:
     """
-    Get the user's visibility scope based on their role and geographic assignment.
+    Immutable geographic scope of a user
 
-    Returns a dict with:
-        - role: user's role
-        - scope: geographic scope level
-        - filters: dict of filter kwargs for querysets
+    Attributes:
+        role: Profile role (None without a profile)
+        scope: 'platform', one of SCOPE_LEVELS, 'assigned_level' (analyst) or 'none'
+        level: Level querysets are filtered at (None for platform and none)
+        state_id, zone_id, district_id, constituency_id, booth_id: Assignment ids
     """
-    if not hasattr(user, 'profile'):
-        return {
-            'role': None,
-            'scope': 'none',
-            'filters': {}
+    __slots__ = (
+        'role', 'scope', 'level',
+        'state_id', 'zone_id', 'district_id', 'constituency_id', 'booth_id',
+        '_ancestry',
+    )
+
+    def __init__(self, role=None, scope='none', level=None, state_id=None, zone_id=None,
+                 district_id=None, constituency_id=None, booth_id=None):
+        values = {
+            'role': role,
+            'scope': scope,
+            'level': level,
+            'state_id': state_id,
+            'zone_id': zone_id,
+            'district_id': district_id,
+            'constituency_id': constituency_id,
+            'booth_id': booth_id,
+            # (model, pk, lookup) -> id, for rows whose ancestry is not on the row
+            '_ancestry': {},
         }
-
-    profile = user.profile
-    role = profile.role
-
-    # SuperAdmin: Platform-wide access
-    if role == 'superadmin':
-        return {
-            'role': 'superadmin',
-            'scope': 'platform',
-            'filters': {}  # No filtering - sees everything
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('VisibilityScope is immutable')
+
+    @classmethod
+    def from_principal(cls, principal):
+        """Build the scope from a RequestPrincipal without touching the database"""
+        if not principal.has_profile:
+            return cls()
+
+        ids = {
+            'state_id': principal.assigned_state_id,
+            'zone_id': principal.assigned_zone_id,
+            'district_id': principal.assigned_district_id,
+            'constituency_id': principal.assigned_constituency_id,
+            'booth_id': principal.assigned_booth_id,
         }
-
-    # State Admin: State-wide access
-    if role == 'state_admin':
-        filters = {}
-        if profile.assigned_state:
-            # Use state_ref for ForeignKey, state for CharField
-            filters['state_ref'] = profile.assigned_state
+        role = principal.role
+
+        if role == 'superadmin':
+            return cls(role=role, scope='platform', **ids)
+
+        if role in ROLE_SCOPE_LEVELS:
+            level = ROLE_SCOPE_LEVELS[role]
+            return cls(role=role, scope=level, level=level, **ids)
+
+        if role == 'analyst':
+            # Analysts see data at their most specific assignment
+            level = next(
+                (level for level in reversed(SCOPE_LEVELS) if ids[f'{level}_id']),
+                None,
+            )
+            return cls(role=role, scope='assigned_level', level=level, **ids)
+
+        return cls(role=role, **ids)
+
+    @property
+    def is_platform(self):
+        return self.scope == 'platform'
+
+    @property
+    def level_id(self):
+        """Assignment id at the scope level, or None"""
+        return getattr(self, f'{self.level}_id') if self.level else None
+
+    def lookup_for(self, model):
+        """Column lookup restricting model to this scope, or None if it cannot"""
+        if not self.level_id:
+            return None
+        return SCOPE_LOOKUPS.get(model, {}).get(self.level)
+
+    def filter(self, queryset):
+        """
+        Restrict a queryset of a model in SCOPE_LOOKUPS
+
+        Returns:
+            The filtered queryset, or queryset.none() when nothing is in scope
+        """
+        if self.is_platform:
+            return queryset
+
+        lookup = self.lookup_for(queryset.model)
+        if lookup is None:
+            return queryset.none()
+
+        condition = Q()
+        for column in _as_tuple(lookup):
+            condition |= Q(**{column: self.level_id})
+        return queryset.filter(condition)
+
+    def accessible_ids(self, queryset, ids):
+        """
+        Subset of ids that exist in queryset and fall inside this scope
+
+        One query per ACCESS_CHECK_BATCH_SIZE ids, reading only the primary key
+        and the scope column. Ids that are not integers are never accessible.
+
+        Returns:
+            set: Accessible primary keys
+        """
+        candidates = {parse_id(value) for value in ids} - {None}
+
+        scoped = self.filter(queryset).order_by()
+        candidates = sorted(candidates)
+        accessible = set()
+        for start in range(0, len(candidates), ACCESS_CHECK_BATCH_SIZE):
+            batch = candidates[start:start + ACCESS_CHECK_BATCH_SIZE]
+            accessible.update(scoped.filter(pk__in=batch).values_list('pk', flat=True))
+        return accessible
+
+    def can_access(self, obj):
+        """
+        Check an object against the scope by comparing ids
+
+        Foreign keys are read from the row; related rows are only consulted
+        when already loaded (select_related), otherwise their ids are looked
+        up once per request and memoized on the scope.
+        """
+        if self.is_platform:
+            return True
+
+        lookup = self.lookup_for(type(obj))
+        if lookup is None:
+            return False
+        return any(self._resolve(obj, column) == self.level_id for column in _as_tuple(lookup))
+
+    def _resolve(self, obj, lookup):
+        """Value of a *_id lookup path for obj"""
+        name, _, rest = lookup.partition('__')
+        if not rest:
+            return getattr(obj, name)
+
+        field = obj._meta.get_field(name)
+        if field.is_cached(obj):
+            related = field.get_cached_value(obj)
+            return self._resolve(related, rest) if related is not None else None
+
+        related_id = getattr(obj, field.attname)
+        if related_id is None:
+            return None
+
+        key = (field.related_model, related_id, rest)
+        if key not in self._ancestry:
+            self._ancestry[key] = field.related_model._default_manager.filter(
+                pk=related_id
+            ).values_list(rest, flat=True).first()
+        return self._ancestry[key]
+
+    def as_dict(self):
+        """Plain dict form (see get_user_visibility_scope)"""
         return {
-            'role': 'state_admin',
-            'scope': 'state',
-            'filters': filters
+            'role': self.role,
+            'scope': self.scope,
+            'level': self.level,
+            'filters': {
+                f'{level}_id': getattr(self, f'{level}_id')
+                for level in SCOPE_LEVELS
+                if getattr(self, f'{level}_id')
+            },
         }
 
-    # Zone Admin: Zone-wide access
-    if role == 'zone_admin':
-        filters = {}
-        if profile.assigned_zone:
-            filters['zone_ref'] = profile.assigned_zone
-        if profile.assigned_state:
-            filters['state_ref'] = profile.assigned_state
-        return {
-            'role': 'zone_admin',
-            'scope': 'zone',
-            'filters': filters
-        }
+    def __repr__(self):
+        return f'<VisibilityScope role={self.role} scope={self.scope} level={self.level} id={self.level_id}>'
 
-    # District Admin: District-wide access
-    if role == 'district_admin':
-        filters = {}
-        if profile.assigned_district:
-            filters['district_ref'] = profile.assigned_district
-        if profile.assigned_zone:
-            filters['zone_ref'] = profile.assigned_zone
-        if profile.assigned_state:
-            filters['state_ref'] = profile.assigned_state
-        return {
-            'role': 'district_admin',
-            'scope': 'district',
-            'filters': filters
-        }
 
-    # Constituency Admin: Constituency-wide access
-    if role == 'constituency_admin':
-        filters = {}
-        if profile.assigned_constituency:
-            filters['constituency'] = profile.assigned_constituency
-        if profile.assigned_district:
-            filters['district_ref'] = profile.assigned_district
-        if profile.assigned_zone:
-            filters['zone_ref'] = profile.assigned_zone
-        if profile.assigned_state:
-            filters['state_ref'] = profile.assigned_state
-        return {
-            'role': 'constituency_admin',
-            'scope': 'constituency',
-            'filters': filters
-        }
+def get_visibility_scope(user):
+    """
+    Get the user's VisibilityScope
 
-    # Booth Admin: Booth-only access
-    if role == 'booth_admin':
-        filters = {}
-        if profile.assigned_booth:
-            filters['polling_booth'] = profile.assigned_booth
-        if profile.assigned_constituency:
-            filters['constituency'] = profile.assigned_constituency
-        return {
-            'role': 'booth_admin',
-            'scope': 'booth',
-            'filters': filters
-        }
+    Cached on the request principal, so only the first call per request may
+    query (to load the principal).
+    """
+    principal = get_principal(user)
+    scope = getattr(principal, '_visibility_scope', None)
+    if scope is None:
+        scope = VisibilityScope.from_principal(principal)
+        principal._visibility_scope = scope
+    return scope
 
-    # Analyst: Assigned level access (read-only)
-    if role == 'analyst':
-        filters = {}
-        # Analysts see data at their assigned level
-        if profile.assigned_booth:
-            filters['polling_booth'] = profile.assigned_booth
-        elif profile.assigned_constituency:
-            filters['constituency'] = profile.assigned_constituency
-        elif profile.assigned_district:
-            filters['district'] = profile.assigned_district
-        elif profile.assigned_zone:
-            filters['zone'] = profile.assigned_zone
-        elif profile.assigned_state:
-            filters['state'] = profile.assigned_state
-        return {
-            'role': 'analyst',
-            'scope': 'assigned_level',
-            'filters': filters
-        }
 
-    # Default: No access
-    return {
-        'role': role,
-        'scope': 'none',
-        'filters': {}
-    }
+def get_user_visibility_scope(user):
+    """
+    Get the user's visibility scope based on their role and geographic assignment.
+
+    Returns a dict with:
+        - role: user's role
+        - scope: geographic scope level
+        - level: level querysets are filtered at
+        - filters: assignment ids keyed by level (e.g. {'state_id': 1})
+    """
+    return get_visibility_scope(user).as_dict()
 
 
 def filter_constituency_queryset(queryset, user):
     """
     Filter Constituency queryset based on user's visibility scope.
     """
-    scope = get_user_visibility_scope(user)
-
-    # SuperAdmin sees everything
-    if scope['scope'] == 'platform':
-        return queryset
-
-    # Apply filters based on scope
-    filters = scope['filters']
-    if filters:
-        return queryset.filter(**filters)
-
-    # No access
-    return queryset.none()
+    return get_visibility_scope(user).filter(queryset)
 
 
 def filter_polling_booth_queryset(queryset, user):
     """
     Filter PollingBooth queryset based on user's visibility scope.
     """
-    scope = get_user_visibility_scope(user)
-
-    # SuperAdmin sees everything
-    if scope['scope'] == 'platform':
-        return queryset
-
-    # Apply filters based on scope
-    filters = {}
-    user_filters = scope['filters']
-
-    # Map constituency/district/zone/state filters to PollingBooth fields
-    if 'polling_booth' in user_filters:
-        filters['id'] = user_filters['polling_booth'].id
-    elif 'constituency' in user_filters:
-        filters['constituency'] = user_filters['constituency']
-    elif 'district_ref' in user_filters:
-        filters['constituency__district_ref'] = user_filters['district_ref']
-    elif 'zone_ref' in user_filters:
-        filters['constituency__zone_ref'] = user_filters['zone_ref']
-    elif 'state_ref' in user_filters:
-        filters['constituency__state_ref'] = user_filters['state_ref']
-
-    if filters:
-        return queryset.filter(**filters)
-
-    # No access
-    return queryset.none()
+    return get_visibility_scope(user).filter(queryset)
 
 
 def filter_voter_queryset(queryset, user):
     """
     Filter Voter queryset based on user's visibility scope.
     """
-    scope = get_user_visibility_scope(user)
-
-    # SuperAdmin sees everything
-    if scope['scope'] == 'platform':
-        return queryset
-
-    # Apply filters based on scope
-    filters = {}
-    user_filters = scope['filters']
-
-    # Map filters to Voter fields (through polling_booth relationship)
-    if 'polling_booth' in user_filters:
-        filters['polling_booth'] = user_filters['polling_booth']
-    elif 'constituency' in user_filters:
-        filters['polling_booth__constituency'] = user_filters['constituency']
-    elif 'district_ref' in user_filters:
-        filters['polling_booth__constituency__district_ref'] = user_filters['district_ref']
-    elif 'zone_ref' in user_filters:
-        filters['polling_booth__constituency__zone_ref'] = user_filters['zone_ref']
-    elif 'state_ref' in user_filters:
-        filters['polling_booth__constituency__state_ref'] = user_filters['state_ref']
-
-    if filters:
-        return queryset.filter(**filters)
-
-    # No access
-    return queryset.none()
+    return get_visibility_scope(user).filter(queryset)
 
 
 def filter_campaign_queryset(queryset, user):
     """
     Filter Campaign queryset based on user's visibility scope.
     """
-    scope = get_user_visibility_scope(user)
-
-    # SuperAdmin sees everything
-    if scope['scope'] == 'platform':
-        return queryset
-
-    # Apply filters based on scope
-    filters = {}
-    user_filters = scope['filters']
-
-    # Map filters to Campaign fields
-    if 'constituency' in user_filters:
-        filters['constituency'] = user_filters['constituency']
-    elif 'district_ref' in user_filters:
-        filters['constituency__district_ref'] = user_filters['district_ref']
-    elif 'zone_ref' in user_filters:
-        filters['constituency__zone_ref'] = user_filters['zone_ref']
-    elif 'state_ref' in user_filters:
-        filters['constituency__state_ref'] = user_filters['state_ref']
-
-    if filters:
-        return queryset.filter(**filters)
-
-    # No access
-    return queryset.none()
+    return get_visibility_scope(user).filter(queryset)
 
 
 def filter_user_queryset(queryset, user):
@@ -259,35 +356,20 @@ def filter_user_queryset(queryset, user):
     Filter User queryset based on user's visibility scope.
     Shows users that the current user can see/manage.
     """
-    scope = get_user_visibility_scope(user)
+    scope = get_visibility_scope(user)
 
     # SuperAdmin sees all users
-    if scope['scope'] == 'platform':
+    if scope.is_platform:
         return queryset
 
-    # Filter users based on geographic assignment
-    profile = user.profile
-    q_filters = Q()
-
-    if scope['scope'] == 'state':
-        q_filters |= Q(profile__assigned_state=profile.assigned_state)
-    elif scope['scope'] == 'zone':
-        q_filters |= Q(profile__assigned_zone=profile.assigned_zone)
-    elif scope['scope'] == 'district':
-        q_filters |= Q(profile__assigned_district=profile.assigned_district)
-    elif scope['scope'] == 'constituency':
-        q_filters |= Q(profile__assigned_constituency=profile.assigned_constituency)
-    elif scope['scope'] == 'booth':
-        q_filters |= Q(profile__assigned_booth=profile.assigned_booth)
-
-    # Also show users created by this user
-    q_filters |= Q(profile__created_by=user)
+    # Users created by this user, plus users sharing the admin's assignment
+    q_filters = Q(profile__created_by_id=user.id)
 
-    if q_filters:
-        return queryset.filter(q_filters).distinct()
+    lookup = USER_SCOPE_LOOKUPS.get(scope.scope)
+    if lookup and scope.level_id:
+        q_filters |= Q(**{lookup: scope.level_id})
 
-    # No access
-    return queryset.none()
+    return queryset.filter(q_filters).distinct()
 
 
 def can_user_access_object(user, obj):
@@ -296,74 +378,41 @@ def can_user_access_object(user, obj):
 
     Args:
         user: The user requesting access
-        obj: The object to check (Constituency, PollingBooth, Voter, etc.)
+        obj: The object to check (Constituency, PollingBooth, Voter, Campaign)
 
     Returns:
         bool: True if user can access, False otherwise
     """
-    scope = get_user_visibility_scope(user)
-
-    # SuperAdmin can access everything
-    if scope['scope'] == 'platform':
-        return True
-
-    profile = user.profile
-
-    # Check based on object type
-    obj_type = type(obj).__name__
-
-    if obj_type == 'Constituency':
-        if scope['scope'] == 'state':
-            # Use state_ref (ForeignKey) if available, otherwise fall back to state CharField
-            obj_state = obj.state_ref if hasattr(obj, 'state_ref') and obj.state_ref else None
-            return obj_state == profile.assigned_state if obj_state else False
-        elif scope['scope'] == 'zone':
-            obj_zone = obj.zone_ref if hasattr(obj, 'zone_ref') and obj.zone_ref else None
-            return obj_zone == profile.assigned_zone if obj_zone else False
-        elif scope['scope'] == 'district':
-            obj_district = obj.district_ref if hasattr(obj, 'district_ref') and obj.district_ref else None
-            return obj_district == profile.assigned_district if obj_district else False
-        elif scope['scope'] == 'constituency':
-            return obj == profile.assigned_constituency
-
-    elif obj_type == 'PollingBooth':
-        if scope['scope'] == 'state':
-            constituency = obj.constituency
-            obj_state = constituency.state_ref if hasattr(constituency, 'state_ref') and constituency.state_ref else None
-            return obj_state == profile.assigned_state if obj_state else False
-        elif scope['scope'] == 'zone':
-            constituency = obj.constituency
-            obj_zone = constituency.zone_ref if hasattr(constituency, 'zone_ref') and constituency.zone_ref else None
-            return obj_zone == profile.assigned_zone if obj_zone else False
-        elif scope['scope'] == 'district':
-            constituency = obj.constituency
-            obj_district = constituency.district_ref if hasattr(constituency, 'district_ref') and constituency.district_ref else None
-            return obj_district == profile.assigned_district if obj_district else False
-        elif scope['scope'] == 'constituency':
-            return obj.constituency == profile.assigned_constituency
-        elif scope['scope'] == 'booth':
-            return obj == profile.assigned_booth
-
-    elif obj_type == 'Voter':
-        if scope['scope'] == 'state':
-            constituency = obj.polling_booth.constituency
-            obj_state = constituency.state_ref if hasattr(constituency, 'state_ref') and constituency.state_ref else None
-            return obj_state == profile.assigned_state if obj_state else False
-        elif scope['scope'] == 'zone':
-            constituency = obj.polling_booth.constituency
-            obj_zone = constituency.zone_ref if hasattr(constituency, 'zone_ref') and constituency.zone_ref else None
-            return obj_zone == profile.assigned_zone if obj_zone else False
-        elif scope['scope'] == 'district':
-            constituency = obj.polling_booth.constituency
-            obj_district = constituency.district_ref if hasattr(constituency, 'district_ref') and constituency.district_ref else None
-            return obj_district == profile.assigned_district if obj_district else False
-        elif scope['scope'] == 'constituency':
-            return obj.polling_booth.constituency == profile.assigned_constituency
-        elif scope['scope'] == 'booth':
-            return obj.polling_booth == profile.assigned_booth
-
-    # Default: No access
-    return False
+    return get_visibility_scope(user).can_access(obj)
+
+
+def accessible_ids(user, model, ids, queryset=None):
+    """
+    Vectorized can_user_access_object() for a set of ids
+
+    Args:
+        user: The user requesting access
+        model: Constituency, PollingBooth, Voter or Campaign
+        ids: Candidate primary keys (any iterable; non-integers are rejected)
+        queryset: Optional base queryset (e.g. already restricted to the
+            user's organization); defaults to all rows of model
+
+    Returns:
+        set: The permitted subset of ids
+    """
+    if queryset is None:
+        queryset = model._default_manager.all()
+    return get_visibility_scope(user).accessible_ids(queryset, ids)
+
+
+# Scope level -> (model, name column, summary label)
+_SUMMARY_LABELS = {
+    'state': (State, 'name', 'State-wide access: {}'),
+    'zone': (Zone, 'name', 'Zone-wide access: {}'),
+    'district': (District, 'name', 'District-wide access: {}'),
+    'constituency': (Constituency, 'name', 'Constituency-wide access: {}'),
+    'booth': (PollingBooth, 'booth_number', 'Booth-only access: Booth #{}'),
+}
 
 
 def get_visibility_scope_summary(user):
@@ -373,26 +422,19 @@ def get_visibility_scope_summary(user):
     Returns:
         str: Description of user's access scope
     """
-    scope = get_user_visibility_scope(user)
-    role = scope['role']
-    scope_level = scope['scope']
+    scope = get_visibility_scope(user)
 
-    if scope_level == 'platform':
+    if scope.is_platform:
         return "Platform-wide access (all data)"
 
-    profile = user.profile
-
-    if scope_level == 'state':
-        return f"State-wide access: {profile.assigned_state.name if profile.assigned_state else 'Not assigned'}"
-    elif scope_level == 'zone':
-        return f"Zone-wide access: {profile.assigned_zone.name if profile.assigned_zone else 'Not assigned'}"
-    elif scope_level == 'district':
-        return f"District-wide access: {profile.assigned_district.name if profile.assigned_district else 'Not assigned'}"
-    elif scope_level == 'constituency':
-        return f"Constituency-wide access: {profile.assigned_constituency.name if profile.assigned_constituency else 'Not assigned'}"
-    elif scope_level == 'booth':
-        return f"Booth-only access: Booth #{profile.assigned_booth.booth_number if profile.assigned_booth else 'Not assigned'}"
-    elif scope_level == 'assigned_level':
+    if scope.scope == 'assigned_level':
         return "Read-only access at assigned level"
 
+    if scope.scope in _SUMMARY_LABELS:
+        model, column, label = _SUMMARY_LABELS[scope.scope]
+        name = None
+        if scope.level_id:
+            name = model.objects.filter(pk=scope.level_id).values_list(column, flat=True).first()
+        return label.format(name or 'Not assigned')
+
     return "No access"
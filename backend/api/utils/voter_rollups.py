@@ -0,0 +1,241 @@
+"""
+Voter statistics from VoterBoothRollup
+
+Statistics for any set of booths are one aggregate over their rollup rows
+(at most one row per organization and booth) instead of a group-by per
+breakdown over the voter table:
+
+    from api.utils.voter_rollups import rollup_statistics, scoped_rollups
+
+    rollup_statistics(scoped_rollups(request.user, {'constituency': 12}))
+
+Rollups are maintained incrementally (api/managers/voter_rollup_manager.py).
+find_drift() compares them with the voters they summarize and repair()
+rewrites the rows that disagree; find_constituency_drift() and
+repair_constituencies() do the same for VoterConstituencyRollup against the
+booth rollups. All back `manage.py reconcile_voter_rollups`.
+"""
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+
+from api.managers.voter_rollup_manager import (
+    BREAKDOWNS, CONSTITUENCY_COLUMNS, ROLLUP_COLUMNS, SCORE_QUANTUM, contributions, merge_counters,
+)
+from api.models import Voter, VoterBoothRollup, VoterConstituencyRollup
+
+from .principal import get_principal
+from .visibility_scope import get_visibility_scope, parse_id
+
+logger = logging.getLogger(__name__)
+
+# Query parameter -> rollup lookup narrowing statistics to part of the hierarchy
+SCOPE_PARAMS = {
+    'state': 'polling_booth__state_id',
+    'zone': 'polling_booth__zone_id',
+    'district': 'polling_booth__district_id',
+    'constituency': 'polling_booth__constituency_id',
+    'polling_booth': 'polling_booth_id',
+}
+
+
+def scoped_rollups(user, params=None):
+    """
+    Rollup rows of the user's organization and geographic scope
+
+    Args:
+        user: Request user (superadmins see every organization)
+        params: Optional {SCOPE_PARAMS key: id} narrowing the rows further
+    """
+    principal = get_principal(user)
+    rollups = VoterBoothRollup.objects.all()
+    if not principal.is_superadmin:
+        if not principal.organization_id:
+            return rollups.none()
+        rollups = rollups.filter(organization_id=principal.organization_id)
+    rollups = get_visibility_scope(user).filter(rollups)
+
+    for param, lookup in SCOPE_PARAMS.items():
+        value = (params or {}).get(param)
+        if value not in (None, ''):
+            rollups = rollups.filter(**{lookup: parse_id(value)})
+    return rollups
+
+
+def rollup_statistics(rollups):
+    """
+    Voter statistics summed over rollup rows (one query)
+
+    Returns:
+        dict: total_voters, by_gender, by_category, by_sentiment,
+        first_time_voters, verified_voters, average_age, average_sentiment_score
+    """
+    totals = rollups.aggregate(**{column: Sum(column) for column in ROLLUP_COLUMNS})
+    totals = {column: value or 0 for column, value in totals.items()}
+
+    def breakdown(field):
+        return {
+            value: totals[f'{field}_{value}']
+            for value in BREAKDOWNS[field]
+            if totals[f'{field}_{value}']
+        }
+
+    voter_count = totals['voter_count']
+    return {
+        'total_voters': voter_count,
+        'by_gender': breakdown('gender'),
+        'by_category': breakdown('voter_category'),
+        'by_sentiment': breakdown('sentiment'),
+        'first_time_voters': totals['first_time_voters'],
+        'verified_voters': totals['verified_voters'],
+        'average_age': totals['age_sum'] / totals['age_count'] if totals['age_count'] else 0,
+        'average_sentiment_score': float(totals['sentiment_score_sum']) / voter_count if voter_count else 0,
+    }
+
+
+# ============================================================
+# Reconciliation
+# ============================================================
+
+def _current(rollups):
+    """Counters per key as stored, plus the number of rows per key"""
+    current, rows = {}, {}
+    for row in rollups.values('organization_id', 'polling_booth_id', *ROLLUP_COLUMNS):
+        key = (row.pop('organization_id'), row.pop('polling_booth_id'))
+        merge_counters(current, {key: row})
+        rows[key] = rows.get(key, 0) + 1
+    return current, rows
+
+
+def find_drift(organization_id=None):
+    """
+    Keys whose rollup rows disagree with their voters
+
+    Missing, stale and duplicated rows are drift; rows of booths without
+    voters are drift unless all their counters are zero.
+
+    Returns:
+        dict: {(organization_id, polling_booth_id): (expected, stored)}
+    """
+    voters = Voter.objects.all()
+    rollups = VoterBoothRollup.objects.all()
+    if organization_id is not None:
+        voters = voters.filter(organization_id=organization_id)
+        rollups = rollups.filter(organization_id=organization_id)
+
+    expected = contributions(voters)
+    stored, row_counts = _current(rollups)
+    zeros = dict.fromkeys(ROLLUP_COLUMNS, 0)
+
+    drift = {}
+    for key in expected.keys() | stored.keys():
+        want, have = expected.get(key, zeros), stored.get(key, zeros)
+        if row_counts.get(key, 0) > 1 or any(want[column] != have[column] for column in ROLLUP_COLUMNS):
+            drift[key] = (want, have)
+    return drift
+
+
+def repair(keys):
+    """
+    Rewrite the rollup rows of keys from their voters
+
+    Each key is recomputed in its own transaction while its rollup rows are
+    locked, so concurrent voter writes apply their deltas on top of the
+    repaired row.
+
+    Returns:
+        int: Number of keys repaired
+    """
+    for organization_id, booth_id in keys:
+        with transaction.atomic():
+            rows = VoterBoothRollup.objects.filter(organization_id=organization_id, polling_booth_id=booth_id)
+            list(rows.select_for_update().values_list('pk', flat=True))
+            counters = contributions(
+                Voter.objects.filter(organization_id=organization_id, polling_booth_id=booth_id)
+            ).get((organization_id, booth_id))
+            rows.delete()
+            if counters:
+                VoterBoothRollup.objects.create(
+                    organization_id=organization_id, polling_booth_id=booth_id, **counters
+                )
+        logger.info(f"Repaired voter rollup for organization {organization_id}, booth {booth_id}")
+    return len(keys)
+
+
+def constituency_totals(booth_rollups):
+    """
+    CONSTITUENCY_COLUMNS of booth rollup rows, summed per constituency
+
+    Returns:
+        dict: {(organization_id, constituency_id): {column: value}}
+    """
+    rows = (
+        booth_rollups.order_by()
+        .values('organization_id', 'polling_booth__constituency_id')
+        .annotate(**{column: Sum(column) for column in CONSTITUENCY_COLUMNS})
+    )
+    totals = {}
+    for row in rows:
+        row['sentiment_score_sum'] = Decimal(row['sentiment_score_sum'] or 0).quantize(SCORE_QUANTUM)
+        totals[(row.pop('organization_id'), row.pop('polling_booth__constituency_id'))] = row
+    return totals
+
+
+def find_constituency_drift(organization_id=None):
+    """
+    Constituency rollup rows that disagree with the sum of their booth rollups
+
+    Run after repair(): booth rollups are the reference.
+
+    Returns:
+        dict: {(organization_id, constituency_id): (expected, stored)}
+    """
+    booth_rollups = VoterBoothRollup.objects.all()
+    rollups = VoterConstituencyRollup.objects.all()
+    if organization_id is not None:
+        booth_rollups = booth_rollups.filter(organization_id=organization_id)
+        rollups = rollups.filter(organization_id=organization_id)
+
+    expected = constituency_totals(booth_rollups)
+    stored, row_counts = {}, {}
+    for row in rollups.values('organization_id', 'constituency_id', *CONSTITUENCY_COLUMNS):
+        key = (row.pop('organization_id'), row.pop('constituency_id'))
+        target = stored.setdefault(key, dict.fromkeys(CONSTITUENCY_COLUMNS, 0))
+        for column in CONSTITUENCY_COLUMNS:
+            target[column] += row[column]
+        row_counts[key] = row_counts.get(key, 0) + 1
+    zeros = dict.fromkeys(CONSTITUENCY_COLUMNS, 0)
+
+    drift = {}
+    for key in expected.keys() | stored.keys():
+        want, have = expected.get(key, zeros), stored.get(key, zeros)
+        if row_counts.get(key, 0) > 1 or any(want[column] != have[column] for column in CONSTITUENCY_COLUMNS):
+            drift[key] = (want, have)
+    return drift
+
+
+def repair_constituencies(keys):
+    """
+    Rewrite the constituency rollup rows of keys from the booth rollups
+
+    Returns:
+        int: Number of keys repaired
+    """
+    for organization_id, constituency_id in keys:
+        with transaction.atomic():
+            rows = VoterConstituencyRollup.objects.filter(
+                organization_id=organization_id, constituency_id=constituency_id
+            )
+            list(rows.select_for_update().values_list('pk', flat=True))
+            counters = constituency_totals(VoterBoothRollup.objects.filter(
+                organization_id=organization_id, polling_booth__constituency_id=constituency_id
+            )).get((organization_id, constituency_id))
+            rows.delete()
+            if counters:
+                VoterConstituencyRollup.objects.create(
+                    organization_id=organization_id, constituency_id=constituency_id, **counters
+                )
+        logger.info(f"Repaired voter rollup for organization {organization_id}, constituency {constituency_id}")
+    return len(keys)
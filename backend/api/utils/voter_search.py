@@ -0,0 +1,245 @@
+"""
+Voter Search
+
+Indexed replacement for OR-ed icontains scans over full_name,
+voter_id_number, epic_number and phone:
+
+    from api.utils.voter_search import search_voters
+
+    voters = search_voters(filter_voter_queryset(queryset, user), 'Laxmi R', limit=50)
+
+Queries are classified first (classify_query):
+- phone: digits, optionally with +91 / spaces / dashes -> phone_normalized,
+  exact for a full 10-digit number, prefix otherwise
+- id:    letters and digits without spaces (EPIC / voter id) -> exact
+  voter_id_number or epic_normalized, or an epic_normalized prefix
+- name:  anything else -> search_name, ranked by relevance
+    PostgreSQL: pg_trgm word similarity over a GIN trigram index
+    SQLite:     FTS5 shadow table (FTS_TABLE) with bm25 ranking
+
+The queryset passed in carries the caller's organization and visibility
+scope filters; they run in the same query, before ranking and the limit.
+Normalized columns are maintained by api/managers/voter_search_manager.py.
+"""
+import logging
+import re
+
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from api.managers.voter_search_manager import normalize_epic, normalize_name, normalize_phone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 50
+
+QUERY_PHONE = 'phone'
+QUERY_ID = 'id'
+QUERY_NAME = 'name'
+
+PHONE_LENGTH = 10
+# Shorter digit strings are treated as ids (e.g. a voter number fragment)
+PHONE_MIN_DIGITS = 5
+
+_PHONE_RE = re.compile(r'^\+?[\d\s\-()]+$')
+_ID_RE = re.compile(r'^(?=.*\d)(?=.*[A-Za-z])[A-Za-z0-9/\-]{3,}$')
+
+TRIGRAM_INDEX = 'api_voter_search_name_trgm'
+FTS_TABLE = 'api_voter_search'
+FTS_TRIGGERS = ('api_voter_search_ai', 'api_voter_search_ad', 'api_voter_search_au')
+
+
+# ============================================================
+# Classification
+# ============================================================
+
+def classify_query(query):
+    """
+    Kind of a search string and its normalized form
+
+    Returns:
+        tuple: (QUERY_PHONE | QUERY_ID | QUERY_NAME, normalized value);
+            the value is '' when nothing searchable remains
+    """
+    query = (query or '').strip()
+    if _PHONE_RE.match(query):
+        digits = normalize_phone(query)
+        if len(digits) >= PHONE_MIN_DIGITS:
+            return QUERY_PHONE, digits
+        return QUERY_ID, digits
+    if _ID_RE.match(query):
+        return QUERY_ID, normalize_epic(query)
+    return QUERY_NAME, normalize_name(query)
+
+
+def _prefix_q(column, prefix, max_char, max_length):
+    """
+    Prefix match as a b-tree range
+
+    Normalized columns hold only [0-9A-Z] (or digits), where max_char sorts
+    last under byte-wise and locale collations alike, so the range is
+    index-friendly on every backend, unlike LIKE 'x%'.
+    """
+    return Q(**{
+        f'{column}__gte': prefix,
+        f'{column}__lte': prefix + max_char * max(max_length - len(prefix), 0),
+    })
+
+
+# ============================================================
+# Search
+# ============================================================
+
+def search_voters(queryset, query, limit=DEFAULT_LIMIT):
+    """
+    Search voters within a (scoped) queryset
+
+    Args:
+        queryset: Voter queryset already restricted to what the caller may see
+        query: Raw search string
+        limit: Maximum results
+
+    Returns:
+        Sliced queryset annotated with search_rank (higher is better), best
+        match first; empty when the query has nothing searchable
+    """
+    kind, value = classify_query(query)
+    if not value:
+        return queryset.none()
+
+    if kind == QUERY_PHONE:
+        matches = _search_phone(queryset, value)
+    elif kind == QUERY_ID:
+        matches = _search_id(queryset, query.strip(), value)
+    else:
+        matches = _search_name(queryset, value)
+
+    return matches.order_by('-search_rank', 'full_name', 'id')[:limit]
+
+
+def _search_phone(queryset, digits):
+    if len(digits) == PHONE_LENGTH:
+        return queryset.filter(phone_normalized=digits).annotate(
+            search_rank=Value(1.0, output_field=FloatField())
+        )
+    max_length = queryset.model._meta.get_field('phone_normalized').max_length
+    return queryset.filter(
+        _prefix_q('phone_normalized', digits, '9', max_length)
+    ).annotate(search_rank=Value(0.5, output_field=FloatField()))
+
+
+def _search_id(queryset, raw, compact):
+    exact = Q(voter_id_number=raw) | Q(epic_normalized=compact)
+    if compact != raw:
+        exact |= Q(voter_id_number=compact)
+    max_length = queryset.model._meta.get_field('epic_normalized').max_length
+    return queryset.filter(
+        exact | _prefix_q('epic_normalized', compact, 'Z', max_length)
+    ).annotate(search_rank=Case(
+        When(exact, then=Value(1.0)),
+        default=Value(0.5),
+        output_field=FloatField(),
+    ))
+
+
+def _search_name(queryset, name):
+    vendor = connections[queryset.db].vendor
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        # search_name %> name: served by the GIN trigram index
+        return queryset.filter(
+            TrigramWordSimilar(F('search_name'), Value(name))
+        ).annotate(search_rank=TrigramWordSimilarity(Value(name), 'search_name'))
+
+    if vendor == 'sqlite':
+        quote = connections[queryset.db].ops.quote_name
+        table = quote(queryset.model._meta.db_table)
+        fts = quote(FTS_TABLE)
+        # Every token as a prefix; normalized tokens hold no FTS syntax characters
+        match = ' '.join(f'"{token}"*' for token in name.split())
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {fts} WHERE {fts} MATCH %s', [match])
+        ).annotate(search_rank=RawSQL(
+            f'SELECT -rank FROM {fts} WHERE {fts} MATCH %s AND rowid = {table}."id"',
+            [match],
+            output_field=FloatField(),
+        ))
+
+    # Unindexed fallback for other backends
+    tokens = Q()
+    for token in name.split():
+        tokens &= Q(search_name__contains=token)
+    return queryset.filter(tokens).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+# ============================================================
+# Index maintenance
+# ============================================================
+
+def install_search_index(connection):
+    """
+    Create the name search index for the connection's backend (idempotent)
+
+    PostgreSQL: pg_trgm and a GIN trigram index on search_name.
+    SQLite: an external-content FTS5 table over search_name, kept in sync
+    by triggers on api_voter.
+
+    Returns:
+        bool: True if anything was (re)created; the SQLite FTS table is then
+            rebuilt, as rows may have changed while triggers were missing
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} '
+                f'ON api_voter USING gin (search_name gin_trgm_ops)'
+            )
+            return False
+
+        if connection.vendor != 'sqlite':
+            return False
+
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            [FTS_TABLE, *FTS_TRIGGERS],
+        )
+        if len(cursor.fetchall()) == 1 + len(FTS_TRIGGERS):
+            return False
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"search_name, content='api_voter', content_rowid='id', "
+            f"tokenize=\"unicode61 remove_diacritics 0 categories 'L* N* Co M*'\")"
+        )
+        insert = f"INSERT INTO {FTS_TABLE}(rowid, search_name) VALUES (new.id, new.search_name);"
+        delete = (
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_name) "
+            f"VALUES ('delete', old.id, old.search_name);"
+        )
+        triggers = zip(FTS_TRIGGERS, (
+            f'AFTER INSERT ON api_voter BEGIN {insert} END',
+            f'AFTER DELETE ON api_voter BEGIN {delete} END',
+            f'AFTER UPDATE OF search_name ON api_voter BEGIN {delete} {insert} END',
+        ))
+        for name, body in triggers:
+            cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    logger.info(f"Voter search index installed ({connection.vendor})")
+    return True
+
+
+def drop_search_index(connection):
+    """Remove what install_search_index() created"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+        elif connection.vendor == 'sqlite':
+            for name in FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
@@ -9,7 +9,7 @@ from django.contrib.auth.models import User
 from django.db.models import Q
 
 from api.models import UserProfile
-from api.serializers import UserManagementSerializer
+from api.serializers import UserManagementSerializer, profile_select_related
 from api.permissions.role_permissions import IsAdminOrAbove, CanManageUsers
 
 
@@ -30,7 +30,9 @@ class AdminUserManagementViewSet(viewsets.ModelViewSet):
         """
         Admins can only see regular users, not other admins or superadmins
         """
-        queryset = User.objects.filter(profile__role='user').select_related('profile').order_by('-date_joined')
+        queryset = User.objects.filter(profile__role='user').select_related(
+            'profile', *profile_select_related('profile__')
+        ).order_by('-date_joined')
 
         # Search by username, email, or name
         search = self.request.query_params.get('search', None)
@@ -0,0 +1,47 @@
+"""
+Voter analytics endpoints
+
+- GET /api/analytics/crosstab/?group_by=gender,sentiment&booth=12&age_band=18-25,26-35
+      Voter counts and average sentiment per combination of the group_by
+      dimensions; any dimension can also be passed as a comma-separated filter
+
+Answered from the in-process voter cube of the user's organization
+(superadmins pass ?organization=<id>), within the user's visibility scope.
+Requires the view_analytics permission (see
+api/services/voter_analytics_service.py).
+"""
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from ..services.base_service import ServiceException
+from ..services.voter_analytics_service import DIMENSIONS, VoterAnalyticsService
+from ..utils.principal import get_principal
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """
+    ViewSet for voter analytics
+    """
+    permission_classes = [IsAuthenticated]
+
+    @action(detail=False, methods=['get'])
+    def crosstab(self, request):
+        """Crosstab of voters over any combination of dimensions"""
+        principal = get_principal(request.user)
+        if not (principal.is_superadmin or principal.has_permission('view_analytics')):
+            return Response({'error': 'Permission denied: view_analytics'}, status=403)
+
+        params = request.query_params
+        group_by = [name.strip() for name in params.get('group_by', '').split(',') if name.strip()]
+        filters = {name: params[name].split(',') for name in DIMENSIONS if name in params}
+
+        try:
+            result = VoterAnalyticsService(user=request.user).crosstab(
+                group_by, filters, organization_id=params.get('organization'),
+            )
+        except ServiceException as e:
+            return Response({'error': e.message, 'code': e.code}, status=e.status)
+
+        return Response(result)
@@ -6,15 +6,20 @@ Provides REST APIs for political campaign management
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Count, Avg, Sum
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from datetime import timedelta
 
 from ..models import (
-    Constituency, PollingBooth, Voter, Campaign, CampaignActivity,
-    Issue, VoterInteraction, SentimentAnalysis
+    Organization, Constituency, PollingBooth, Voter, Campaign, CampaignActivity,
+    Issue, VoterInteraction, SentimentAnalysis, SentimentRollup, VoterBoothRollup, BackgroundJob, BoundaryTopology
 )
 from ..serializers import (
     ConstituencySerializer, ConstituencyListSerializer,
@@ -25,12 +30,35 @@ from ..serializers import (
     IssueSerializer, IssueListSerializer,
     VoterInteractionSerializer,
     SentimentAnalysisSerializer,
-    DashboardStatsSerializer
+    DashboardStatsSerializer,
+    BackgroundJobSerializer
 )
+from ..pagination import BoundedActionMixin, KeysetPagination
 from ..permissions import IsAdminOrAbove, IsSuperAdmin
+from ..managers.sentiment_rollup_manager import GRANULARITIES
+from ..services.base_service import ServiceException
+from ..services.voter_bulk_update_service import VoterBulkUpdateService
+from ..services.voter_import_service import VoterImportService
+from ..utils import sentiment_rollups
+from ..utils.constituency_geometry import (
+    feature_collection, geometry_version, topology_body, zoom_level,
+)
+from ..utils.principal import get_principal
+from ..utils.visibility_scope import filter_polling_booth_queryset, filter_voter_queryset, parse_id
+from ..utils.voter_rollups import rollup_statistics, scoped_rollups
+from ..utils.voter_search import search_voters
+
+# Longest sentiment trend window (?days=), about ten years
+MAX_TREND_DAYS = 3660
+
 
+def save_for_organization(serializer, request, **kwargs):
+    """Save with the caller's organization (from the request principal), ignoring any sent in the body"""
+    serializer.validated_data.pop('organization', None)
+    return serializer.save(organization_id=get_principal(request.user).organization_id, **kwargs)
 
-class ConstituencyViewSet(viewsets.ModelViewSet):
+
+class ConstituencyViewSet(BoundedActionMixin, viewsets.ModelViewSet):
     """
     ViewSet for Constituency management
 
@@ -58,15 +86,15 @@ class ConstituencyViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by organization for multi-tenancy"""
         queryset = super().get_queryset()
-        user = self.request.user
+        principal = get_principal(self.request.user)
 
         # Superadmin sees all
-        if user.profile.is_superadmin():
+        if principal.is_superadmin:
             return queryset
 
         # Others see only their organization's data
-        if hasattr(user, 'profile') and user.profile.organization:
-            return queryset.filter(organization=user.profile.organization)
+        if principal.organization_id:
+            return queryset.filter(organization_id=principal.organization_id)
 
         return queryset.none()
 
@@ -87,14 +115,13 @@ class ConstituencyViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def polling_booths(self, request, pk=None):
-        """Get all polling booths for a constituency"""
+        """Get the polling booths of a constituency (paginated, or ?stream=1)"""
         constituency = self.get_object()
         booths = constituency.polling_booths.all()
-        serializer = PollingBoothListSerializer(booths, many=True)
-        return Response(serializer.data)
+        return self.list_response(booths, PollingBoothListSerializer)
 
 
-class PollingBoothViewSet(viewsets.ModelViewSet):
+class PollingBoothViewSet(BoundedActionMixin, viewsets.ModelViewSet):
     """
     ViewSet for Polling Booth management
 
@@ -122,22 +149,19 @@ class PollingBoothViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by organization for multi-tenancy"""
         queryset = super().get_queryset()
-        user = self.request.user
+        principal = get_principal(self.request.user)
 
-        if user.profile.is_superadmin():
+        if principal.is_superadmin:
             return queryset
 
-        if hasattr(user, 'profile') and user.profile.organization:
-            return queryset.filter(organization=user.profile.organization)
+        if principal.organization_id:
+            return queryset.filter(organization_id=principal.organization_id)
 
         return queryset.none()
 
     def perform_create(self, serializer):
         """Auto-assign organization and last_updated_by"""
-        serializer.save(
-            organization=self.request.user.profile.organization,
-            last_updated_by=self.request.user
-        )
+        save_for_organization(serializer, self.request, last_updated_by=self.request.user)
 
     def perform_update(self, serializer):
         """Update last_updated_by"""
@@ -145,22 +169,21 @@ class PollingBoothViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def by_constituency(self, request):
-        """Get booths by constituency ID"""
+        """Get booths by constituency ID (paginated, or ?stream=1)"""
         constituency_id = request.query_params.get('constituency_id')
         if not constituency_id:
             return Response({'error': 'constituency_id parameter required'}, status=400)
 
         booths = self.get_queryset().filter(constituency_id=constituency_id)
-        serializer = self.get_serializer(booths, many=True)
-        return Response(serializer.data)
+        return self.list_response(booths)
 
 
-class VoterViewSet(viewsets.ModelViewSet):
+class VoterViewSet(BoundedActionMixin, viewsets.ModelViewSet):
     """
     ViewSet for Voter management
 
     Endpoints:
-    - GET /api/voters/ - List all voters (paginated)
+    - GET /api/voters/ - List all voters (cursor-paginated, see api/pagination.py)
     - POST /api/voters/ - Create new voter
     - GET /api/voters/{id}/ - Get voter details
     - PUT/PATCH /api/voters/{id}/ - Update voter
@@ -168,10 +191,12 @@ class VoterViewSet(viewsets.ModelViewSet):
     - GET /api/voters/search/?q={query} - Search voters
     - PATCH /api/voters/{id}/update_sentiment/ - Update voter sentiment
     - POST /api/voters/bulk_update/ - Bulk update voters
+    - POST /api/voters/import/ - Import voters from a CSV/XLSX file
     - GET /api/voters/statistics/ - Get voter statistics
     """
     queryset = Voter.objects.select_related('polling_booth', 'polling_booth__constituency', 'organization')
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = [
         'polling_booth', 'gender', 'voter_category', 'sentiment',
@@ -191,33 +216,33 @@ class VoterViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by organization for multi-tenancy"""
         queryset = super().get_queryset()
-        user = self.request.user
+        principal = get_principal(self.request.user)
 
-        if user.profile.is_superadmin():
+        if principal.is_superadmin:
             return queryset
 
-        if hasattr(user, 'profile') and user.profile.organization:
-            return queryset.filter(organization=user.profile.organization)
+        if principal.organization_id:
+            return queryset.filter(organization_id=principal.organization_id)
 
         return queryset.none()
 
     def perform_create(self, serializer):
         """Auto-assign organization"""
-        serializer.save(organization=self.request.user.profile.organization)
+        save_for_organization(serializer, self.request)
 
     @action(detail=False, methods=['get'])
     def search(self, request):
-        """Advanced voter search"""
+        """
+        Voter search by name, EPIC / voter id or phone
+
+        Served from indexed normalized columns (see api/utils/voter_search.py)
+        within the user's organization and geographic scope.
+        """
         query = request.query_params.get('q', '')
         if not query:
             return Response({'error': 'q parameter required'}, status=400)
 
-        voters = self.get_queryset().filter(
-            Q(full_name__icontains=query) |
-            Q(voter_id_number__icontains=query) |
-            Q(epic_number__icontains=query) |
-            Q(phone__icontains=query)
-        )[:50]  # Limit to 50 results
+        voters = search_voters(filter_voter_queryset(self.get_queryset(), request.user), query)
 
         serializer = VoterListSerializer(voters, many=True)
         return Response(serializer.data)
@@ -236,52 +261,103 @@ class VoterViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['post'])
     def bulk_update(self, request):
-        """Bulk update voters"""
-        voter_ids = request.data.get('voter_ids', [])
-        update_data = request.data.get('data', {})
-
-        if not voter_ids or not update_data:
-            return Response({'error': 'voter_ids and data required'}, status=400)
-
-        voters = self.get_queryset().filter(id__in=voter_ids)
-        updated_count = voters.update(**update_data)
+        """
+        Bulk update voters
+
+        Uniform values:  {"voter_ids": [1, 2], "data": {"sentiment": "positive"}}
+        Per-row values:  {"updates": [{"id": 1, "age": 40}, {"id": 2, "verified": true}]}
+
+        Values are validated through VoterBulkUpdateSerializer and written in
+        chunks (api/services/voter_bulk_update_service.py). Only voters inside
+        the user's organization and geographic scope are updated; the others
+        are reported back in rejected_ids, invalid rows in errors. Large
+        requests are queued and answered with 202 and the background job.
+        """
+        service = VoterBulkUpdateService(user=request.user)
+        try:
+            outcome = service.submit(
+                request.data,
+                ip_address=request.META.get('REMOTE_ADDR'),
+                user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            )
+        except ServiceException as e:
+            return Response({'error': e.message, 'code': e.code}, status=e.status)
+
+        if isinstance(outcome, BackgroundJob):
+            serializer = BackgroundJobSerializer(outcome, context={'request': request})
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
         return Response({
-            'message': f'{updated_count} voters updated successfully',
-            'updated_count': updated_count
+            'message': f"{outcome['updated_count']} voters updated successfully",
+            **outcome,
         })
 
-    @action(detail=False, methods=['get'])
-    def statistics(self, request):
-        """Get voter statistics"""
-        queryset = self.get_queryset()
+    @action(detail=False, methods=['post'], url_path='import',
+            parser_classes=[MultiPartParser, FormParser])
+    def import_voters(self, request):
+        """
+        Import voters from an electoral roll file
 
-        stats = {
-            'total_voters': queryset.count(),
-            'by_gender': dict(queryset.values('gender').annotate(count=Count('id')).values_list('gender', 'count')),
-            'by_category': dict(queryset.values('voter_category').annotate(count=Count('id')).values_list('voter_category', 'count')),
-            'by_sentiment': dict(queryset.values('sentiment').annotate(count=Count('id')).values_list('sentiment', 'count')),
-            'first_time_voters': queryset.filter(first_time_voter=True).count(),
-            'verified_voters': queryset.filter(verified=True).count(),
-            'average_age': queryset.aggregate(Avg('age'))['age__avg'] or 0,
-            'average_sentiment_score': queryset.aggregate(Avg('sentiment_score'))['sentiment_score__avg'] or 0,
-        }
+        Expected fields:
+        - file: CSV or XLSX (required)
+        - update_existing: 'false' to skip voters that already exist (default: true)
+
+        Rows may only reference booths inside the user's organization and
+        geographic scope. Returns the import report with per-row errors.
+        """
+        principal = get_principal(request.user)
+        if not principal.has_permission('import_data'):
+            return Response({'error': 'Permission denied: import_data'}, status=403)
+
+        if 'file' not in request.FILES:
+            return Response({'error': 'No file provided'}, status=400)
+
+        organization = Organization.objects.filter(pk=principal.organization_id).first()
+        if organization is None:
+            return Response({'error': 'Organization context required'}, status=400)
 
+        booths = filter_polling_booth_queryset(
+            PollingBooth.objects.filter(organization=organization), request.user
+        )
+        service = VoterImportService(
+            user=request.user,
+            organization=organization,
+            booth_queryset=booths,
+            update_existing=str(request.data.get('update_existing', 'true')).lower() != 'false',
+        )
+
+        uploaded_file = request.FILES['file']
+        try:
+            report = service.import_file(uploaded_file, filename=uploaded_file.name)
+        except ServiceException as e:
+            return Response({'error': e.message, 'code': e.code}, status=e.status)
+
+        return Response(report.as_dict())
+
+    @action(detail=False, methods=['get'])
+    def statistics(self, request):
+        """
+        Get voter statistics
+
+        Summed from per-booth rollups (api/utils/voter_rollups.py) within the
+        user's organization and geographic scope, optionally narrowed with
+        ?state=, ?zone=, ?district=, ?constituency= or ?polling_booth=.
+        """
+        stats = rollup_statistics(scoped_rollups(request.user, request.query_params))
         return Response(stats)
 
     @action(detail=False, methods=['get'])
     def by_sentiment(self, request):
-        """Get voters filtered by sentiment"""
+        """Get voters filtered by sentiment (cursor-paginated, or ?stream=1)"""
         sentiment = request.query_params.get('sentiment')
         if not sentiment:
             return Response({'error': 'sentiment parameter required'}, status=400)
 
         voters = self.get_queryset().filter(sentiment=sentiment)
-        serializer = VoterListSerializer(voters, many=True)
-        return Response(serializer.data)
+        return self.list_response(voters, VoterListSerializer)
 
 
-class CampaignViewSet(viewsets.ModelViewSet):
+class CampaignViewSet(BoundedActionMixin, viewsets.ModelViewSet):
     """
     ViewSet for Campaign management
 
@@ -310,34 +386,32 @@ class CampaignViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by organization for multi-tenancy"""
         queryset = super().get_queryset()
-        user = self.request.user
+        principal = get_principal(self.request.user)
 
-        if user.profile.is_superadmin():
+        if principal.is_superadmin:
             return queryset
 
-        if hasattr(user, 'profile') and user.profile.organization:
-            return queryset.filter(organization=user.profile.organization)
+        if principal.organization_id:
+            return queryset.filter(organization_id=principal.organization_id)
 
         return queryset.none()
 
     def perform_create(self, serializer):
         """Auto-assign organization"""
-        serializer.save(organization=self.request.user.profile.organization)
+        save_for_organization(serializer, self.request)
 
     @action(detail=True, methods=['get'])
     def activities(self, request, pk=None):
-        """Get all activities for a campaign"""
+        """Get the activities of a campaign (paginated, or ?stream=1)"""
         campaign = self.get_object()
-        activities = campaign.activities.all()
-        serializer = CampaignActivitySerializer(activities, many=True)
-        return Response(serializer.data)
+        activities = campaign.activities.select_related('campaign', 'polling_booth', 'assigned_to')
+        return self.list_response(activities, CampaignActivitySerializer)
 
     @action(detail=False, methods=['get'])
     def active(self, request):
-        """Get all active campaigns"""
+        """Get active campaigns (paginated, or ?stream=1)"""
         campaigns = self.get_queryset().filter(status='active')
-        serializer = CampaignListSerializer(campaigns, many=True)
-        return Response(serializer.data)
+        return self.list_response(campaigns, CampaignListSerializer)
 
 
 class CampaignActivityViewSet(viewsets.ModelViewSet):
@@ -356,13 +430,13 @@ class CampaignActivityViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by organization through campaign"""
         queryset = super().get_queryset()
-        user = self.request.user
+        principal = get_principal(self.request.user)
 
-        if user.profile.is_superadmin():
+        if principal.is_superadmin:
             return queryset
 
-        if hasattr(user, 'profile') and user.profile.organization:
-            return queryset.filter(campaign__organization=user.profile.organization)
+        if principal.organization_id:
+            return queryset.filter(campaign__organization_id=principal.organization_id)
 
         return queryset.none()
 
@@ -387,22 +461,19 @@ class IssueViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by organization for multi-tenancy"""
         queryset = super().get_queryset()
-        user = self.request.user
+        principal = get_principal(self.request.user)
 
-        if user.profile.is_superadmin():
+        if principal.is_superadmin:
             return queryset
 
-        if hasattr(user, 'profile') and user.profile.organization:
-            return queryset.filter(organization=user.profile.organization)
+        if principal.organization_id:
+            return queryset.filter(organization_id=principal.organization_id)
 
         return queryset.none()
 
     def perform_create(self, serializer):
         """Auto-assign organization and reported_by"""
-        serializer.save(
-            organization=self.request.user.profile.organization,
-            reported_by=self.request.user
-        )
+        save_for_organization(serializer, self.request, reported_by=self.request.user)
 
 
 class VoterInteractionViewSet(viewsets.ModelViewSet):
@@ -411,6 +482,7 @@ class VoterInteractionViewSet(viewsets.ModelViewSet):
     """
     queryset = VoterInteraction.objects.select_related('voter', 'campaign', 'conducted_by')
     serializer_class = VoterInteractionSerializer
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['voter', 'campaign', 'interaction_type', 'successful', 'follow_up_required']
@@ -421,13 +493,13 @@ class VoterInteractionViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by organization through voter"""
         queryset = super().get_queryset()
-        user = self.request.user
+        principal = get_principal(self.request.user)
 
-        if user.profile.is_superadmin():
+        if principal.is_superadmin:
             return queryset
 
-        if hasattr(user, 'profile') and user.profile.organization:
-            return queryset.filter(voter__organization=user.profile.organization)
+        if principal.organization_id:
+            return queryset.filter(voter__organization_id=principal.organization_id)
 
         return queryset.none()
 
@@ -442,6 +514,7 @@ class SentimentAnalysisViewSet(viewsets.ModelViewSet):
     """
     queryset = SentimentAnalysis.objects.select_related('voter', 'constituency', 'organization', 'analyzed_by')
     serializer_class = SentimentAnalysisSerializer
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['voter', 'constituency', 'source', 'organization']
@@ -452,22 +525,19 @@ class SentimentAnalysisViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         """Filter by organization for multi-tenancy"""
         queryset = super().get_queryset()
-        user = self.request.user
+        principal = get_principal(self.request.user)
 
-        if user.profile.is_superadmin():
+        if principal.is_superadmin:
             return queryset
 
-        if hasattr(user, 'profile') and user.profile.organization:
-            return queryset.filter(organization=user.profile.organization)
+        if principal.organization_id:
+            return queryset.filter(organization_id=principal.organization_id)
 
         return queryset.none()
 
     def perform_create(self, serializer):
         """Auto-assign organization and analyzed_by"""
-        serializer.save(
-            organization=self.request.user.profile.organization,
-            analyzed_by=self.request.user
-        )
+        save_for_organization(serializer, self.request, analyzed_by=self.request.user)
 
 
 class DashboardViewSet(viewsets.ViewSet):
@@ -477,15 +547,17 @@ class DashboardViewSet(viewsets.ViewSet):
     Endpoints:
     - GET /api/dashboard/overview/ - Overall statistics
     - GET /api/dashboard/sentiment-trends/ - Sentiment trends over time
-    - GET /api/dashboard/heatmap/ - Geographic heatmap data
+    - GET /api/dashboard/heatmap/ - Geographic heatmap metrics
+    - GET /api/dashboard/heatmap/geometry/ - Constituency boundaries (ETag)
     """
     permission_classes = [IsAuthenticated]
 
     def _get_organization(self, request):
-        """Get user's organization or None for superadmin"""
-        if request.user.profile.is_superadmin():
+        """Get user's organization id or None for superadmin"""
+        principal = get_principal(request.user)
+        if principal.is_superadmin:
             return None
-        return request.user.profile.organization
+        return principal.organization_id
 
     @action(detail=False, methods=['get'])
     def overview(self, request):
@@ -493,25 +565,24 @@ class DashboardViewSet(viewsets.ViewSet):
         org = self._get_organization(request)
 
         # Base querysets
-        voters_qs = Voter.objects.filter(organization=org) if org else Voter.objects.all()
-        constituencies_qs = Constituency.objects.filter(organization=org) if org else Constituency.objects.all()
-        booths_qs = PollingBooth.objects.filter(organization=org) if org else PollingBooth.objects.all()
-        campaigns_qs = Campaign.objects.filter(organization=org) if org else Campaign.objects.all()
-        interactions_qs = VoterInteraction.objects.filter(voter__organization=org) if org else VoterInteraction.objects.all()
+        rollups_qs = VoterBoothRollup.objects.filter(organization_id=org) if org else VoterBoothRollup.objects.all()
+        constituencies_qs = Constituency.objects.filter(organization_id=org) if org else Constituency.objects.all()
+        booths_qs = PollingBooth.objects.filter(organization_id=org) if org else PollingBooth.objects.all()
+        campaigns_qs = Campaign.objects.filter(organization_id=org) if org else Campaign.objects.all()
+        interactions_qs = VoterInteraction.objects.filter(voter__organization_id=org) if org else VoterInteraction.objects.all()
+
+        # Voter counts come from the per-booth rollups in one aggregate
+        voter_stats = rollup_statistics(rollups_qs)
 
         # Calculate statistics
         stats = {
-            'total_voters': voters_qs.count(),
+            'total_voters': voter_stats['total_voters'],
             'total_constituencies': constituencies_qs.count(),
             'total_polling_booths': booths_qs.count(),
             'total_campaigns': campaigns_qs.count(),
             'active_campaigns': campaigns_qs.filter(status='active').count(),
-            'sentiment_distribution': dict(
-                voters_qs.values('sentiment').annotate(count=Count('id')).values_list('sentiment', 'count')
-            ),
-            'voter_category_distribution': dict(
-                voters_qs.values('voter_category').annotate(count=Count('id')).values_list('voter_category', 'count')
-            ),
+            'sentiment_distribution': voter_stats['by_sentiment'],
+            'voter_category_distribution': voter_stats['by_category'],
             'recent_interactions': interactions_qs.filter(
                 interaction_date__gte=timezone.now() - timedelta(days=7)
             ).count(),
@@ -522,51 +593,147 @@ class DashboardViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'])
     def sentiment_trends(self, request):
-        """Get sentiment trends over time (last 30 days)"""
-        org = self._get_organization(request)
-        days = int(request.query_params.get('days', 30))
-
-        start_date = timezone.now() - timedelta(days=days)
-        analyses_qs = SentimentAnalysis.objects.filter(created_at__gte=start_date)
+        """
+        Get sentiment trends over time (last 30 IST days)
 
+        A range scan over the daily (or with ?granularity=hour, hourly)
+        sentiment rollups; optional ?constituency= and ?source= filters.
+        ?days= is clamped to 1..MAX_TREND_DAYS.
+        """
+        org = self._get_organization(request)
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            days = 30
+        days = min(max(days, 1), MAX_TREND_DAYS)
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in GRANULARITIES:
+            return Response(
+                {'error': 'granularity must be day or hour', 'code': 'invalid_granularity'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rollups = SentimentRollup.objects.all()
         if org:
-            analyses_qs = analyses_qs.filter(organization=org)
-
-        # Group by date
-        trends = analyses_qs.extra(
-            select={'date': 'DATE(created_at)'}
-        ).values('date').annotate(
-            positive_count=Count('id', filter=Q(sentiment_score__gte=0.3)),
-            negative_count=Count('id', filter=Q(sentiment_score__lte=-0.3)),
-            neutral_count=Count('id', filter=Q(sentiment_score__gt=-0.3, sentiment_score__lt=0.3)),
-            average_score=Avg('sentiment_score')
-        ).order_by('date')
-
-        return Response(list(trends))
+            rollups = rollups.filter(organization_id=org)
+        if request.query_params.get('constituency'):
+            constituency_id = parse_id(request.query_params['constituency'])
+            if constituency_id is None:
+                return Response(
+                    {'error': 'constituency must be an id', 'code': 'invalid_constituency'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            rollups = rollups.filter(constituency_id=constituency_id)
+        if request.query_params.get('source'):
+            rollups = rollups.filter(source=request.query_params['source'])
+
+        trends = []
+        for row in sentiment_rollups.trends(rollups, timezone.now() - timedelta(days=days), granularity):
+            bucket = row.pop('bucket')
+            row['date'] = bucket.date()
+            if granularity == 'hour':
+                row['hour'] = bucket
+            trends.append(row)
+        return Response(trends)
 
     @action(detail=False, methods=['get'])
     def heatmap(self, request):
-        """Get geographic heatmap data"""
+        """
+        Get geographic heatmap metrics
+
+        One grouped query over the per-constituency voter rollups; the voter
+        table is never read. Rows carry metrics keyed by constituency id,
+        boundaries come from heatmap/geometry/.
+        """
         org = self._get_organization(request)
 
         constituencies_qs = Constituency.objects.all()
         if org:
-            constituencies_qs = constituencies_qs.filter(organization=org)
+            constituencies_qs = constituencies_qs.filter(organization_id=org)
+
+        rows = constituencies_qs.values('id', 'name', 'state', 'district').annotate(
+            rollup_voter_count=Coalesce(Sum('voter_rollups__voter_count'), 0),
+            rollup_score_sum=Sum('voter_rollups__sentiment_score_sum'),
+        ).order_by('state', 'name')
 
-        # Aggregate sentiment by constituency
         heatmap_data = []
-        for const in constituencies_qs:
-            voters = Voter.objects.filter(polling_booth__constituency=const)
-            avg_sentiment = voters.aggregate(Avg('sentiment_score'))['sentiment_score__avg'] or 0
+        for row in rows:
+            voter_count = row['rollup_voter_count']
+            avg_sentiment = float(row['rollup_score_sum']) / voter_count if voter_count else 0
 
             heatmap_data.append({
-                'constituency_id': const.id,
-                'constituency_name': const.name,
-                'state': const.state,
-                'district': const.district,
-                'voter_count': voters.count(),
+                'constituency_id': row['id'],
+                'constituency_name': row['name'],
+                'state': row['state'],
+                'district': row['district'],
+                'voter_count': voter_count,
                 'avg_sentiment_score': round(avg_sentiment, 2),
-                'boundaries': const.boundaries
             })
 
         return Response(heatmap_data)
+
+    @action(detail=False, methods=['get'], url_path='heatmap/geometry')
+    def heatmap_geometry(self, request):
+        """
+        Get constituency boundaries as a GeoJSON FeatureCollection
+
+        Feature ids match heatmap constituency_id. Responses carry an ETag
+        (If-None-Match answers 304 after one aggregate query); requests
+        pinned to the current version with ?v=<etag> are cacheable forever.
+
+        With ?zoom=<state|district|constituency or web map zoom> returns the
+        simplified TopoJSON prebuilt for that level by build_boundary_topology
+        (404 until built), cacheable for a day.
+        """
+        org = self._get_organization(request)
+
+        if 'zoom' in request.query_params:
+            return self._heatmap_topology(request, org)
+
+        constituencies_qs = Constituency.objects.all()
+        if org:
+            constituencies_qs = constituencies_qs.filter(organization_id=org)
+
+        version = geometry_version(constituencies_qs)
+        etag = quote_etag(version)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                feature_collection(constituencies_qs, version), content_type='application/geo+json'
+            )
+        response['ETag'] = etag
+        if request.query_params.get('v') == version:
+            response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def _heatmap_topology(self, request, org):
+        level = zoom_level(request.query_params['zoom'])
+        if level is None:
+            return Response(
+                {'error': 'zoom must be state, district, constituency or a map zoom (0-22)', 'code': 'invalid_zoom'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        boundary_topology = BoundaryTopology.objects.defer('topology').filter(
+            organization_id=org, zoom=level
+        ).first()
+        if boundary_topology is None:
+            return Response(
+                {'error': f'No {level} boundaries built yet (run build_boundary_topology)',
+                 'code': 'topology_not_built'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        version = f'{boundary_topology.source_version}-{level}'
+        etag = quote_etag(version)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(topology_body(boundary_topology), content_type='application/json')
+        response['ETag'] = etag
+        response['X-Zoom-Level'] = level
+        if request.query_params.get('v') == version:
+            response['Cache-Control'] = 'private, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'private, max-age=86400'
+        return response
@@ -0,0 +1,110 @@
+"""
+Data export endpoints
+
+- GET  /api/exports/stream/?dataset=voters&file_format=csv&gzip=1&fields=a,b&<filter>=<value>
+       Streams the export directly
+- POST /api/exports/ {"dataset", "file_format", "gzip", "fields", "filters"}
+       Queues a background export job (large exports)
+- GET  /api/exports/                List the user's export jobs
+- GET  /api/exports/{id}/           Job status, with download_url once completed
+- GET  /api/exports/{id}/download/  Download the produced file
+
+Exports are limited to the user's organization and visibility scope and
+require the export_data permission (see api/services/export_service.py).
+"""
+import os
+
+from django.http import FileResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from ..services.base_service import ServiceException
+from ..services.export_service import DATASETS, ExportService
+from ..utils.principal import get_principal
+from .job_views import BackgroundJobViewSet
+
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+class ExportViewSet(BackgroundJobViewSet):
+    """
+    ViewSet for data exports (streamed or as background jobs)
+    """
+    job_type = 'export'
+
+    def _permission_denied(self, request):
+        principal = get_principal(request.user)
+        if principal.is_superadmin or principal.has_permission('export_data'):
+            return None
+        return Response({'error': 'Permission denied: export_data'}, status=403)
+
+    def create(self, request):
+        """Queue a background export"""
+        denied = self._permission_denied(request)
+        if denied:
+            return denied
+
+        fields = request.data.get('fields') or None
+        if isinstance(fields, str):
+            fields = [name.strip() for name in fields.split(',') if name.strip()]
+
+        try:
+            job = ExportService(user=request.user).create_job(
+                request.data.get('dataset', ''),
+                fields=fields,
+                file_format=request.data.get('file_format', 'csv'),
+                compress=str(request.data.get('gzip', '')).lower() in TRUE_VALUES,
+                filters=request.data.get('filters') or {},
+            )
+        except ServiceException as e:
+            return Response({'error': e.message, 'code': e.code}, status=e.status)
+
+        serializer = self.get_serializer(job)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'])
+    def stream(self, request):
+        """Stream an export as CSV or NDJSON (optionally gzip)"""
+        denied = self._permission_denied(request)
+        if denied:
+            return denied
+
+        params = request.query_params
+        dataset = params.get('dataset', '')
+        fields = [name.strip() for name in params.get('fields', '').split(',') if name.strip()]
+        filters = {
+            name: params[name]
+            for name in DATASETS.get(dataset, {}).get('filters', ())
+            if name in params
+        }
+
+        try:
+            export = ExportService(user=request.user).prepare(
+                dataset,
+                fields=fields or None,
+                file_format=params.get('file_format', 'csv'),
+                compress=params.get('gzip', '').lower() in TRUE_VALUES,
+                filters=filters,
+            )
+        except ServiceException as e:
+            return Response({'error': e.message, 'code': e.code}, status=e.status)
+
+        response = StreamingHttpResponse(export.stream(), content_type=export.content_type)
+        response['Content-Disposition'] = f'attachment; filename="{export.filename}"'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Download the file of a completed export job"""
+        job = self.get_object()
+        if job.status != 'completed':
+            return Response({'error': f'Export is {job.status}'}, status=409)
+        if not job.result_path or not os.path.exists(job.result_path):
+            return Response({'error': 'Export file no longer available'}, status=410)
+
+        return FileResponse(
+            open(job.result_path, 'rb'),
+            as_attachment=True,
+            filename=os.path.basename(job.result_path),
+        )
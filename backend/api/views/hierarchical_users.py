@@ -9,7 +9,7 @@ from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from api.models import UserProfile, Organization, State, Zone, District, Constituency, PollingBooth
-from api.serializers import UserSerializer
+from api.serializers import UserSerializer, profile_select_related
 from api.permissions.role_permissions import IsSuperAdmin
 from api.utils.visibility_scope import filter_user_queryset, get_visibility_scope_summary
 
@@ -537,7 +537,10 @@ def list_my_users(request):
     profile = request.user.profile
 
     # Get base queryset of all users
-    users_queryset = User.objects.select_related('profile').all()
+    # Same profile relations as every other profile list, plus created_by read below
+    users_queryset = User.objects.select_related(
+        'profile', 'profile__created_by', *profile_select_related('profile__'),
+    ).all()
 
     # Filter based on visibility scope
     visible_users = filter_user_queryset(users_queryset, request.user)
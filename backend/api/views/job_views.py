@@ -0,0 +1,34 @@
+"""
+Background job status endpoints
+
+- GET /api/jobs/                   List the user's jobs (?job_type=export|voter_bulk_update)
+- GET /api/jobs/{id}/              Job status and result
+
+Jobs are created by the endpoints that need them (exports, voter bulk
+updates); see api/services/background_jobs.py.
+"""
+from rest_framework import mixins, viewsets
+from rest_framework.permissions import IsAuthenticated
+
+from ..models import BackgroundJob
+from ..serializers import BackgroundJobSerializer
+from ..utils.principal import get_principal
+
+
+class BackgroundJobViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Read-only ViewSet for background jobs
+    """
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [IsAuthenticated]
+    job_type = None
+
+    def get_queryset(self):
+        """Users see their own jobs; superadmins see all"""
+        queryset = BackgroundJob.objects.all()
+        job_type = self.job_type or self.request.query_params.get('job_type')
+        if job_type:
+            queryset = queryset.filter(job_type=job_type)
+        if get_principal(self.request.user).is_superadmin:
+            return queryset
+        return queryset.filter(created_by=self.request.user)
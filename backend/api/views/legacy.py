@@ -6,7 +6,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.contrib.auth.models import User
 from api.models import UserProfile, Task, Notification, UploadedFile
-from api.serializers import UserSerializer, UserProfileSerializer, TaskSerializer, NotificationSerializer, UploadedFileSerializer
+from api.serializers import UserSerializer, UserProfileSerializer, profile_select_related, TaskSerializer, NotificationSerializer, UploadedFileSerializer
 import os
 import uuid
 from supabase import create_client, Client
@@ -128,7 +128,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Users can only see their own profile"""
-        return UserProfile.objects.filter(user=self.request.user)
+        return UserProfile.objects.filter(user=self.request.user).select_related(*profile_select_related())
 
 
 class TaskViewSet(viewsets.ModelViewSet):
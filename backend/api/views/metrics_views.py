@@ -0,0 +1,70 @@
+"""
+Prometheus metrics endpoint
+Exposes per-route request histograms plus authentication cache counters
+"""
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import BasePermission
+
+from api.authentication import HybridAuthentication, get_auth_timing_stats, get_principal_cache_stats
+from api.utils import metrics
+from api.utils.principal import get_principal
+
+
+class CanScrapeMetrics(BasePermission):
+    """
+    Allow scrapers holding METRICS_TOKEN, or authenticated superadmins
+
+    The token is sent as `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+
+    def has_permission(self, request, view):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        if token:
+            auth_header = request.META.get('HTTP_AUTHORIZATION', '')
+            if hmac.compare_digest(auth_header.encode(), f'Bearer {token}'.encode()):
+                return True
+
+        return get_principal(request.user).is_superadmin
+
+
+def _auth_metric_lines():
+    """Principal cache and auth timing counters in exposition format"""
+    lines = []
+
+    cache_stats = get_principal_cache_stats()
+    lines.append('# HELP api_auth_principal_cache Verified-principal cache counters')
+    lines.append('# TYPE api_auth_principal_cache gauge')
+    for name in ('size', 'hits', 'misses', 'evictions'):
+        lines.append(f'api_auth_principal_cache{{stat="{name}"}} {cache_stats[name]}')
+
+    lines.append('# HELP api_auth_requests_total Authentication attempts by verifier path')
+    lines.append('# TYPE api_auth_requests_total counter')
+    timing_stats = get_auth_timing_stats()
+    for path, stats in sorted(timing_stats.items()):
+        lines.append(f'api_auth_requests_total{{path="{path}"}} {stats["count"]}')
+
+    lines.append('# HELP api_auth_seconds_total Time spent authenticating by verifier path')
+    lines.append('# TYPE api_auth_seconds_total counter')
+    for path, stats in sorted(timing_stats.items()):
+        lines.append(f'api_auth_seconds_total{{path="{path}"}} {round(stats["total_ms"] / 1000, 6)}')
+
+    return lines
+
+
+@api_view(['GET'])
+# HybridAuthentication only; the stock JWTAuthentication would reject the scrape token
+@authentication_classes([HybridAuthentication])
+@permission_classes([CanScrapeMetrics])
+def metrics_view(request):
+    """
+    Prometheus text exposition of this worker's request metrics
+
+    Returns:
+        HttpResponse: text/plain metrics (format version 0.0.4)
+    """
+    body = metrics.registry.render(extra_lines=_auth_metric_lines())
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from api.models import Organization, UserProfile
 from api.permissions.role_permissions import IsSuperAdmin
 from api.serializers import OrganizationSerializer
+from api.utils.tenant_resolver import tenant_resolver
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -136,21 +137,20 @@ def get_tenant_by_subdomain(request, subdomain):
 
     Example: GET /api/tenants/by-subdomain/bjp/
     """
-    try:
-        org = Organization.objects.get(subdomain=subdomain, is_active=True)
-        serializer = OrganizationSerializer(org)
-
-        return Response({
-            'success': True,
-            'tenant': serializer.data
-        })
-
-    except Organization.DoesNotExist:
+    org = tenant_resolver.resolve_subdomain(subdomain)
+    if org is None or not org.is_active:
         return Response({
             'success': False,
             'error': f'Tenant with subdomain "{subdomain}" not found or inactive'
         }, status=404)
 
+    serializer = OrganizationSerializer(org)
+
+    return Response({
+        'success': True,
+        'tenant': serializer.data
+    })
+
 
 @api_view(['GET'])
 @permission_classes([AllowAny])  # Public endpoint
@@ -8,7 +8,7 @@ from django.contrib.auth.models import User
 from django.db.models import Q
 
 from api.models import UserProfile, State, Organization
-from api.serializers import UserManagementSerializer, UserRoleSerializer
+from api.serializers import UserManagementSerializer, UserRoleSerializer, profile_select_related
 from api.permissions.role_permissions import IsSuperAdmin, CanChangeRole
 
 
@@ -23,7 +23,9 @@ class SuperAdminUserManagementViewSet(viewsets.ModelViewSet):
     """
     serializer_class = UserManagementSerializer
     permission_classes = [IsSuperAdmin]
-    queryset = User.objects.all().select_related('profile').order_by('-date_joined')
+    queryset = User.objects.all().select_related(
+        'profile', *profile_select_related('profile__')
+    ).order_by('-date_joined')
 
     def get_queryset(self):
         """
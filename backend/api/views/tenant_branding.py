@@ -21,12 +21,7 @@ def my_tenant_branding(request):
     Get or update current user's tenant branding
     Only accessible to State Admin and above
     """
-    # Debug logging
-    logger.info(f"=== Tenant Branding Request ===")
-    logger.info(f"Method: {request.method}")
-    logger.info(f"User: {request.user}")
-    logger.info(f"Is Authenticated: {request.user.is_authenticated}")
-    logger.info(f"Auth Header: {request.META.get('HTTP_AUTHORIZATION', 'MISSING')}")
+    logger.debug(f"Tenant branding {request.method} by {request.user}")
 
     try:
         # Get user's organization/tenant
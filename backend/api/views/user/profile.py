@@ -8,7 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth.models import User
 
 from api.models import UserProfile
-from api.serializers import UserProfileSerializer, UserSerializer
+from api.serializers import UserProfileSerializer, UserSerializer, profile_select_related
 
 
 class UserProfileViewSet(viewsets.ModelViewSet):
@@ -26,7 +26,7 @@ class UserProfileViewSet(viewsets.ModelViewSet):
         """
         Users can only see their own profile
         """
-        return UserProfile.objects.filter(user=self.request.user)
+        return UserProfile.objects.filter(user=self.request.user).select_related(*profile_select_related())
 
     @action(detail=False, methods=['get'])
     def me(self, request):
@@ -0,0 +1,214 @@
+"""
+Non-blocking structured logging
+
+Request threads hand log records to a bounded in-memory queue and return;
+a background QueueListener thread formats them as JSON and writes them to
+the console. On top of that:
+
+- SamplingFilter keeps only a fraction of INFO/DEBUG records per logger
+  (warnings and errors are always kept)
+- RedactionFilter masks bearer tokens, JWTs, passwords and API keys before
+  anything is written
+
+Lives in the project package rather than api/ because Django configures
+logging before apps (and models) are loaded. Configured from
+settings.LOGGING, e.g.:
+
+    'handlers': {
+        'console': {
+            '()': 'config.log_pipeline.QueueLogHandler',
+            'formatter': 'json',
+            'filters': ['sampling'],
+        },
+    }
+"""
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+REDACTED = '[REDACTED]'
+
+_REDACTION_PATTERNS = (
+    # Authorization: Bearer <token> / Basic <credentials>
+    (re.compile(r'(?i)\b(bearer|basic)\s+[A-Za-z0-9._~+/=-]+'), r'\1 ' + REDACTED),
+    # Bare JWTs (header.payload.signature)
+    (re.compile(r'\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]*'), REDACTED),
+    # password=..., "token": "...", api_key: ..., secret=...
+    (re.compile(
+        r'(?i)(["\']?\b(?:password|passwd|secret|token|api[_-]?key|access|refresh|authorization)\b["\']?\s*[:=]\s*)'
+        r'(["\']?)[^\s"\',}]+\2'
+    ), r'\1\2' + REDACTED + r'\2'),
+)
+
+_SENSITIVE_KEYS = re.compile(r'(?i)password|passwd|secret|token|api[_-]?key|authorization|cookie')
+
+
+def redact(text):
+    """Mask credentials in a string"""
+    for pattern, replacement in _REDACTION_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class RedactionFilter(logging.Filter):
+    """Mask credentials in the message and in `extra=` fields"""
+
+    def filter(self, record):
+        record.msg = redact(record.getMessage())
+        record.args = None
+        if record.exc_text:
+            record.exc_text = redact(record.exc_text)
+
+        for key, value in list(vars(record).items()):
+            if key in _RECORD_ATTRS:
+                continue
+            if _SENSITIVE_KEYS.search(key):
+                setattr(record, key, REDACTED)
+            elif isinstance(value, str):
+                setattr(record, key, redact(value))
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of low-severity records per logger
+
+    Args:
+        rates: {logger_name: rate} with rate in [0, 1], or the same as a
+            'logger=rate,logger=rate' string. The longest matching logger
+            prefix wins; loggers without a rate are never sampled.
+        max_level: Records above this level are always kept (default INFO)
+    """
+
+    def __init__(self, rates=None, max_level=logging.INFO):
+        super().__init__()
+        if isinstance(rates, str):
+            rates = parse_sample_rates(rates)
+        self.rates = dict(rates or {})
+        self.max_level = logging._checkLevel(max_level)
+        self._resolved = {}
+
+    def rate_for(self, name):
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            best = -1
+            for prefix, value in self.rates.items():
+                if (name == prefix or name.startswith(prefix + '.')) and len(prefix) > best:
+                    rate, best = value, len(prefix)
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        rate = self.rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message and extras"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        if record.stack_info:
+            entry['stack_info'] = record.stack_info
+
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def parse_sample_rates(value):
+    """
+    Parse 'logger=rate,logger=rate' into a dict (for env-driven settings)
+
+    Returns:
+        dict: {logger_name: float}
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in (value or '').split(','))):
+        name, _, rate = item.partition('=')
+        rates[name.strip()] = max(0.0, min(1.0, float(rate)))
+    return rates
+
+
+class QueueLogHandler(QueueHandler):
+    """
+    Queue-backed console handler
+
+    emit() only enqueues; a QueueListener thread does formatting, redaction
+    and I/O. When the queue is full records are dropped (and counted) rather
+    than blocking the request thread.
+
+    Args:
+        maxsize: Queue capacity
+        stream: Output stream for the listener (default stderr)
+    """
+
+    def __init__(self, maxsize=10000, stream=None):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.dropped = 0
+
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.target.addFilter(RedactionFilter())
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def setFormatter(self, fmt):
+        # Formatting happens on the listener thread
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Snapshot the record for another thread
+
+        Merges args into the message (args may be mutable request objects)
+        and renders the traceback; JSON formatting is left to the listener.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """Flush queued records and stop the listener thread"""
+        if self.listener._thread is not None:
+            self.listener.stop()
+            self.target.flush()
+
+    def close(self):
+        self.stop()
+        super().close()
@@ -69,6 +69,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.performance_middleware.PerformanceMiddleware',  # Server-Timing + /api/metrics/
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files in production
     'corsheaders.middleware.CorsMiddleware',
@@ -197,11 +198,68 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Background export jobs write their files here (served through the API, not MEDIA_URL)
+EXPORT_ROOT = config('EXPORT_ROOT', default=str(MEDIA_ROOT / 'exports'))
+# Export files are deleted this many hours after their job finished
+EXPORT_RETENTION_HOURS = config('EXPORT_RETENTION_HOURS', default=72, cast=int)
+# Jobs still running after this many minutes lost their worker and are marked failed
+BACKGROUND_JOB_STALE_MINUTES = config('BACKGROUND_JOB_STALE_MINUTES', default=60, cast=int)
+
 # Supabase Configuration
 SUPABASE_URL = config('SUPABASE_URL', default='')
 SUPABASE_ANON_KEY = config('SUPABASE_ANON_KEY', default='')
 SUPABASE_JWT_SECRET = config('SUPABASE_JWT_SECRET', default='')
 
+# Verified-principal cache for Supabase JWT authentication
+# Entries expire at the token's `exp`, capped at MAX_TTL seconds
+SUPABASE_AUTH_CACHE = {
+    'MAX_ENTRIES': config('SUPABASE_AUTH_CACHE_MAX_ENTRIES', default=2048, cast=int),
+    'MAX_TTL': config('SUPABASE_AUTH_CACHE_MAX_TTL', default=900, cast=int),
+    # Seconds between checks of the shared invalidation counter
+    'VERSION_CHECK_INTERVAL': config('SUPABASE_AUTH_CACHE_VERSION_CHECK_INTERVAL', default=5, cast=int),
+}
+
+# Cache
+# Redis when REDIS_URL is set (shared across workers), otherwise per-process memory
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Tenant resolution (api/utils/tenant_resolver.py)
+# Hosts under these domains resolve tenants by subdomain (bjp.bachao.co -> 'bjp')
+TENANT_BASE_DOMAINS = config(
+    'TENANT_BASE_DOMAINS',
+    default='bachao.co,pulseofpeople.com',
+    cast=lambda v: [s.strip().lower() for s in v.split(',') if s.strip()]
+)
+TENANT_RESOLVER = {
+    'MAX_ENTRIES': config('TENANT_RESOLVER_MAX_ENTRIES', default=1024, cast=int),
+    'TTL': config('TENANT_RESOLVER_TTL', default=300, cast=int),
+    'NEGATIVE_TTL': config('TENANT_RESOLVER_NEGATIVE_TTL', default=60, cast=int),
+    # Seconds between checks of the shared invalidation counter
+    'VERSION_CHECK_INTERVAL': config('TENANT_RESOLVER_VERSION_CHECK_INTERVAL', default=5, cast=int),
+}
+
+# Compiled permission matrix (api/utils/permission_matrix.py)
+# Seconds between checks for invalidations published by other workers
+PERMISSION_MATRIX_VERSION_CHECK_INTERVAL = config('PERMISSION_MATRIX_VERSION_CHECK_INTERVAL', default=5, cast=int)
+
+# Per-request instrumentation (Server-Timing headers, /api/metrics/)
+PERFORMANCE_INSTRUMENTATION = config('PERFORMANCE_INSTRUMENTATION', default=True, cast=bool)
+# Bearer token for Prometheus scrapers; superadmins can always read metrics
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -317,10 +375,24 @@ CSRF_TRUSTED_ORIGINS = config(
 )
 
 # Logging Configuration
+# Records go through a bounded queue to a background writer thread
+# (config/log_pipeline.py), so request threads never block on console I/O.
+LOG_FORMAT = config('LOG_FORMAT', default='json')  # 'json' or 'verbose'
+LOG_QUEUE_SIZE = config('LOG_QUEUE_SIZE', default=10000, cast=int)
+# Fraction of INFO/DEBUG records kept per logger, e.g. "api.middleware=0.1,django.server=0.5".
+# Warnings and errors are never sampled.
+LOG_SAMPLE_RATES = config(
+    'LOG_SAMPLE_RATES',
+    default='' if DEBUG else 'api.middleware.role_auth_middleware=0.1',
+)
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
+        'json': {
+            '()': 'config.log_pipeline.JSONFormatter',
+        },
         'verbose': {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
@@ -330,10 +402,18 @@ LOGGING = {
             'style': '{',
         },
     },
+    'filters': {
+        'sampling': {
+            '()': 'config.log_pipeline.SamplingFilter',
+            'rates': LOG_SAMPLE_RATES,
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            '()': 'config.log_pipeline.QueueLogHandler',
+            'maxsize': LOG_QUEUE_SIZE,
+            'formatter': LOG_FORMAT,
+            'filters': ['sampling'],
         },
     },
     'loggers': {
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration (WSGI)
+
+    gunicorn config.wsgi:application
+
+Picked up automatically from the working directory. For the ASGI stack
+(async middleware, async views) use gunicorn_asgi.conf.py instead:
+
+    gunicorn config.asgi:application -c gunicorn_asgi.conf.py
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+keepalive = 5
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+accesslog = None  # requests are logged by RequestLoggingMiddleware
+errorlog = '-'
@@ -0,0 +1,20 @@
+"""
+Gunicorn configuration (ASGI, uvicorn workers)
+
+    gunicorn config.asgi:application -c gunicorn_asgi.conf.py
+
+Same process model as gunicorn.conf.py, but each worker runs an event loop,
+so async middleware and async views run without a thread per request. Sync
+views still work; Django runs them in a thread pool.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+worker_class = 'uvicorn.workers.UvicornWorker'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '30'))
+keepalive = 5
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+accesslog = None  # requests are logged by RequestLoggingMiddleware
+errorlog = '-'
@@ -136,9 +136,18 @@ export const campaignsService = {
 
   /**
    * Get campaign activities
+   *
+   * Paginated like getAll(): returns { count, next, previous, results }.
    */
-  async getActivities(campaignId: number | string) {
-    const response = await apiCall(`/campaigns/${campaignId}/activities/`);
+  async getActivities(campaignId: number | string, page?: { page?: number; page_size?: number }) {
+    const params = new URLSearchParams();
+    Object.entries(page || {}).forEach(([key, value]) => {
+      if (value !== undefined && value !== null) {
+        params.append(key, value.toString());
+      }
+    });
+
+    const response = await apiCall(`/campaigns/${campaignId}/activities/?${params}`);
     if (!response.ok) {
       throw new Error('Failed to fetch campaign activities');
     }
@@ -147,9 +156,18 @@ export const campaignsService = {
 
   /**
    * Get active campaigns
+   *
+   * Paginated like getAll(): returns { count, next, previous, results }.
    */
-  async getActive() {
-    const response = await apiCall(`/campaigns/active/`);
+  async getActive(page?: { page?: number; page_size?: number }) {
+    const params = new URLSearchParams();
+    Object.entries(page || {}).forEach(([key, value]) => {
+      if (value !== undefined && value !== null) {
+        params.append(key, value.toString());
+      }
+    });
+
+    const response = await apiCall(`/campaigns/active/?${params}`);
     if (!response.ok) {
       throw new Error('Failed to fetch active campaigns');
     }
@@ -127,9 +127,18 @@ export const constituenciesService = {
 
   /**
    * Get polling booths for a constituency
+   *
+   * Paginated like getAll(): returns { count, next, previous, results }.
    */
-  async getPollingBooths(id: number | string) {
-    const response = await apiCall(`/constituencies/${id}/polling_booths/`);
+  async getPollingBooths(id: number | string, page?: { page?: number; page_size?: number }) {
+    const params = new URLSearchParams();
+    Object.entries(page || {}).forEach(([key, value]) => {
+      if (value !== undefined && value !== null) {
+        params.append(key, value.toString());
+      }
+    });
+
+    const response = await apiCall(`/constituencies/${id}/polling_booths/?${params}`);
     if (!response.ok) {
       throw new Error('Failed to fetch polling booths');
     }
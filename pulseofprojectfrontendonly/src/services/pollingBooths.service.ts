@@ -112,9 +112,18 @@ export const pollingBoothsService = {
 
   /**
    * Get polling booths by constituency
+   *
+   * Paginated like getAll(): returns { count, next, previous, results }.
    */
-  async getByConstituency(constituencyId: number | string) {
-    const response = await apiCall(`/polling-booths/by_constituency/?constituency_id=${constituencyId}`);
+  async getByConstituency(constituencyId: number | string, page?: { page?: number; page_size?: number }) {
+    const params = new URLSearchParams({ constituency_id: constituencyId.toString() });
+    Object.entries(page || {}).forEach(([key, value]) => {
+      if (value !== undefined && value !== null) {
+        params.append(key, value.toString());
+      }
+    });
+
+    const response = await apiCall(`/polling-booths/by_constituency/?${params}`);
     if (!response.ok) {
       throw new Error('Failed to fetch polling booths by constituency');
     }
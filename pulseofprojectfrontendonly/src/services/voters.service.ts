@@ -191,9 +191,19 @@ export const votersService = {
 
   /**
    * Get voters by sentiment
+   *
+   * Cursor-paginated: returns { next, previous, results }. Pass the `cursor`
+   * of `next` to fetch the following page (or `page` for numbered pages).
    */
-  async getBySentiment(sentiment: string) {
-    const response = await apiCall(`/voters/by_sentiment/?sentiment=${sentiment}`);
+  async getBySentiment(sentiment: string, page?: { cursor?: string; page?: number; page_size?: number }) {
+    const params = new URLSearchParams({ sentiment });
+    Object.entries(page || {}).forEach(([key, value]) => {
+      if (value !== undefined && value !== null) {
+        params.append(key, value.toString());
+      }
+    });
+
+    const response = await apiCall(`/voters/by_sentiment/?${params}`);
     if (!response.ok) {
       throw new Error('Failed to fetch voters by sentiment');
     }